@@ -0,0 +1,101 @@
+"""生成用于性能测试的合成日志
+
+每行模仿 logcat 的格式：时间戳、进程号、线程号、级别、标签和消息。可以配置行数、
+平均行长、编码以及包含关键字的行所占的比例（命中密度），同样的参数和随机种子
+总是生成同样的内容。
+
+用法：
+    python -m benchmarks.log_generator out.log --lines 100000 --line-length 120 \\
+        --encoding gbk --density 0.01
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+# 命中密度所对应的关键字，性能测试中的过滤表达式都以它为准
+MATCH_KEYWORD = "TimeoutException"
+
+_LEVELS = "VDIWE"
+_TAGS = ["ActivityManager", "WindowManager", "PackageManager", "InputDispatcher",
+         "SurfaceFlinger", "AudioFlinger", "ConnectivityService", "BatteryService"]
+_ASCII_WORDS = ["start", "stop", "request", "response", "session", "client", "server",
+                "connect", "update", "state", "value", "buffer", "queue", "event", "handler",
+                "config", "result", "status=0", "count=42", "uid=10086", "pid=1234", "ok"]
+_CJK_WORDS = ["启动", "停止", "请求", "响应", "会话", "连接", "更新", "状态", "缓冲区", "事件"]
+# 可以表示中文的编码
+_CJK_ENCODINGS = ("utf-8", "utf-8-sig", "gbk", "gb2312", "gb18030", "utf-16", "utf-32")
+
+
+def _supports_cjk(encoding: str) -> bool:
+    return encoding.lower().replace("_", "-") in _CJK_ENCODINGS
+
+
+def generate_lines(lines: int, line_length: int = 120, density: float = 0.01,
+                   non_ascii: float = 0.1, seed: int = 0) -> List[str]:
+    """生成日志行（不含换行符）
+
+    Args:
+        lines: 行数
+        line_length: 平均行长（字符数），实际长度在其上下浮动约 25%
+        density: 包含 MATCH_KEYWORD 的行所占的比例
+        non_ascii: 消息中非 ASCII 词所占的比例，为 0 时只生成 ASCII
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    result = []
+    for i in range(lines):
+        timestamp = start + timedelta(milliseconds=i * 7)
+        prefix = (f"{timestamp:%m-%d %H:%M:%S}.{timestamp.microsecond // 1000:03d} "
+                  f"{rng.randint(100, 9999):5d} {rng.randint(100, 9999):5d} "
+                  f"{rng.choice(_LEVELS)} {rng.choice(_TAGS)}: ")
+        target = max(line_length + rng.randint(-line_length // 4, line_length // 4), len(prefix) + 1)
+        words = []
+        if rng.random() < density:
+            words.append(MATCH_KEYWORD)
+        length = len(prefix) + sum(len(word) + 1 for word in words)
+        while length < target:
+            word = rng.choice(_CJK_WORDS if rng.random() < non_ascii else _ASCII_WORDS)
+            words.append(word)
+            length += len(word) + 1
+        rng.shuffle(words)
+        result.append(prefix + " ".join(words))
+    return result
+
+
+def generate_log(filepath: str, lines: int, line_length: int = 120, encoding: str = "utf-8",
+                 density: float = 0.01, non_ascii: float = 0.1, seed: int = 0) -> int:
+    """生成日志文件
+
+    不能表示中文的编码（如 iso-8859-1）只生成 ASCII 内容。
+
+    Returns:
+        int: 文件大小（字节）
+    """
+    if not _supports_cjk(encoding):
+        non_ascii = 0.0
+    text = "\n".join(generate_lines(lines, line_length, density, non_ascii, seed)) + "\n"
+    data = text.encode(encoding)
+    with open(filepath, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成用于性能测试的合成日志")
+    parser.add_argument("output", help="输出文件")
+    parser.add_argument("--lines", type=int, default=100000, help="行数")
+    parser.add_argument("--line-length", type=int, default=120, help="平均行长（字符数）")
+    parser.add_argument("--encoding", default="utf-8", help="编码")
+    parser.add_argument("--density", type=float, default=0.01, help=f"包含 {MATCH_KEYWORD} 的行所占的比例")
+    parser.add_argument("--non-ascii", type=float, default=0.1, help="非 ASCII 词所占的比例")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+    size = generate_log(args.output, args.lines, args.line_length, args.encoding,
+                        args.density, args.non_ascii, args.seed)
+    print(f"{args.output}: {args.lines} 行, {size} 字节")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+"""加载、过滤、高亮和导航等热点路径的性能测试
+
+每个测试项在独立的子进程中运行，互不影响缓存和内存峰值。结果以 JSON 输出，
+包含耗时、吞吐量、单次操作的延迟分布和进程的内存峰值（RSS）；指定基线文件时
+逐项比较，超过容差的退化会使退出码为 1。
+
+用法：
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --only filter_text,highlight
+    python -m benchmarks.run --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不统计内存峰值
+    resource = None
+
+from benchmarks.log_generator import MATCH_KEYWORD, generate_log
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 默认参数，--quick 使用更小的数据量
+DEFAULT_PARAMS = {
+    "lines": 200000,
+    "line_length": 120,
+    "encoding": "utf-8",
+    "density": 0.01,
+    "gui_lines": 20000,
+    "marks": 5000,
+    "repeat": 3,
+    "seed": 0,
+}
+QUICK_PARAMS = {"lines": 20000, "gui_lines": 2000, "marks": 1000, "repeat": 1}
+
+# 比较基线时，差值低于这些下限的变化视为噪声
+_NOISE_FLOOR = {"seconds": 0.005, "latency_p95_ms": 0.05, "peak_rss_mb": 5.0}
+
+# 测试项名称 -> (函数, 是否需要 Qt)
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, gui: bool = False):
+    """注册测试项
+
+    测试函数接收参数字典，返回一次运行的测量结果：
+      seconds: 被测部分的总耗时（秒）
+      bytes / lines / ops: 处理的数据量，用于计算吞吐量（可选）
+      latencies: 每次操作的耗时列表（秒，可选）
+    """
+    def decorator(func: Callable[[dict], dict]):
+        BENCHMARKS[name] = (func, gui)
+        return func
+    return decorator
+
+
+def _timed(func: Callable, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _read_text(params: dict) -> str:
+    from src.utils.file_utils import read_file_with_encoding
+    return read_file_with_encoding(params["data_file"])
+
+
+def _filter_options(use_regex: bool = False) -> dict:
+    return {"case_sensitive": False, "whole_word": False, "use_regex": use_regex}
+
+
+@benchmark("detect_encoding")
+def bench_detect_encoding(params: dict) -> dict:
+    from src.utils.file_utils import detect_encoding
+    latencies = [_timed(detect_encoding, params["data_file"]) for _ in range(20)]
+    return {"seconds": sum(latencies), "ops": len(latencies), "latencies": latencies}
+
+
+@benchmark("read_file_with_encoding")
+def bench_read_file(params: dict) -> dict:
+    from src.utils.file_utils import read_file_with_encoding
+    start = time.perf_counter()
+    text = read_file_with_encoding(params["data_file"])
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "bytes": os.path.getsize(params["data_file"]), "lines": text.count("\n")}
+
+
+def _bench_filter_text(params: dict, expression: str, use_regex: bool) -> dict:
+    from src.utils.filter_engine import FilterEngine
+    text = _read_text(params)
+    engine = FilterEngine()
+    engine.set_filter_expression(expression, _filter_options(use_regex))
+    start = time.perf_counter()
+    filtered_lines, _ = engine.filter_text(text)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "bytes": len(text.encode("utf-8")), "lines": len(engine.cached_lines),
+            "matches": len(filtered_lines)}
+
+
+@benchmark("filter_text")
+def bench_filter_text(params: dict) -> dict:
+    return _bench_filter_text(params, MATCH_KEYWORD, False)
+
+
+@benchmark("filter_text_regex")
+def bench_filter_text_regex(params: dict) -> dict:
+    return _bench_filter_text(params, r"Timeout\w+|count=\d+", True)
+
+
+@benchmark("find_keyword_matches")
+def bench_find_keyword_matches(params: dict) -> dict:
+    from src.utils.filter_engine import FilterEngine
+    text = _read_text(params)
+    engine = FilterEngine()
+    engine.set_filter_expression(MATCH_KEYWORD, _filter_options())
+    engine.set_text(text)
+    start = time.perf_counter()
+    matches = engine.find_keyword_matches(text)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "bytes": len(text.encode("utf-8")), "lines": len(engine.cached_lines),
+            "matches": len(matches)}
+
+
+# 按分组过滤的关键字：包含互相包含（Timeout/out、000/00）和自身可以重叠（"00" 在 "000" 中）的关键字
+_GROUP_RULES = [
+    (MATCH_KEYWORD, {}),
+    ("Timeout", {"case_sensitive": True}),
+    ("out", {}),
+    ("000", {}),
+    ("00", {}),
+    ("state", {"whole_word": True}),
+    ("session", {}),
+    ("SESSION", {}),
+    (r"count=\d+", {"use_regex": True}),
+]
+
+
+@benchmark("keyword_group")
+def bench_keyword_group(params: dict) -> dict:
+    from src.utils.log_statistics import compile_keyword_pattern
+    from src.utils.multi_pattern import MultiPatternMatcher
+    lines = _read_text(params).split("\n")
+    matcher = MultiPatternMatcher(_GROUP_RULES)
+    start = time.perf_counter()
+    counts = matcher.count_lines(lines)
+    seconds = time.perf_counter() - start
+    # 每个关键字的次数必须与单独查找时（互不重叠的匹配）相同
+    data = "\n".join(lines).encode("utf-8")
+    for (keyword, options), count in zip(_GROUP_RULES, counts):
+        expected = sum(1 for _ in compile_keyword_pattern(keyword, options).finditer(data))
+        if count != expected:
+            raise RuntimeError(f"关键字 {keyword!r} 的匹配次数为 {count}，单独查找时为 {expected}")
+    return {"seconds": seconds, "lines": len(lines), "matches": sum(counts)}
+
+
+@benchmark("expression_parse")
+def bench_expression_parse(params: dict) -> dict:
+    from src.utils.expression_parser import ExpressionParser
+    # 只使用带引号的关键字、and/or 和括号，各个版本的解析器都接受，结果可以与旧的基线比较
+    expressions = [
+        '"error"',
+        '"error" and "timeout"',
+        '"error" or "warning" or "fatal"',
+        '("error" or "warning") and "debug"',
+        '(("a" and "b") or ("c" and "d")) and ("e" or "f")',
+        " or ".join(f'"keyword{i}"' for i in range(50)),
+    ]
+    parser = ExpressionParser()
+    for expression in expressions:
+        # 解析失败时只会测到异常路径
+        if parser.parse(expression) is None:
+            raise RuntimeError(f"表达式解析失败：{expression}，{parser.error_message}")
+    latencies = []
+    for _ in range(200):
+        for expression in expressions:
+            latencies.append(_timed(parser.parse, expression))
+    return {"seconds": sum(latencies), "ops": len(latencies), "latencies": latencies}
+
+
+@benchmark("highlight", gui=True)
+def bench_highlight(params: dict) -> dict:
+    from PyQt6.QtGui import QTextDocument
+    from src.utils.highlighter import LogHighlighter
+    document = QTextDocument()
+    document.setPlainText(_read_text(params))
+    highlighter = LogHighlighter()
+    highlighter.set_keywords({MATCH_KEYWORD, "state"}, _filter_options())
+    highlighter.setDocument(document)
+    latencies = []
+    block = document.firstBlock()
+    while block.isValid():
+        latencies.append(_timed(highlighter.rehighlightBlock, block))
+        block = block.next()
+    return {"seconds": sum(latencies), "lines": len(latencies), "latencies": latencies}
+
+
+@benchmark("navigation", gui=True)
+def bench_navigation(params: dict) -> dict:
+    from src.ui.filter_panel.filter_input import SCFilterInput
+    from src.ui.workspace_panel.log_panel.filter_log_viewer import SCFilteredLogViewer, TextWorker
+    text = _read_text(params)
+    filter_input = SCFilterInput()
+    viewer = SCFilteredLogViewer(filter_input)
+    viewer.resize(1200, 800)
+    viewer.original_viewer.setPlainText(text)
+    # 在当前线程中同步执行过滤，结果直接交给视图
+    worker = TextWorker(text, viewer.filter_engine, MATCH_KEYWORD, _filter_options())
+    worker.finished.connect(viewer._on_filter_processed)
+    worker.process()
+    if not viewer.total_matches:
+        raise RuntimeError("测试数据中没有匹配项，请调大 --density")
+    rng = random.Random(params["seed"])
+    indexes = [rng.randrange(viewer.total_matches) for _ in range(200)]
+    latencies = [_timed(viewer._on_navigate_to_match, index) for index in indexes]
+    return {"seconds": sum(latencies), "ops": len(latencies), "latencies": latencies,
+            "matches": viewer.total_matches}
+
+
+def _mark_lines(params: dict) -> List[int]:
+    rng = random.Random(params["seed"])
+    return rng.sample(range(params["lines"]), min(params["marks"], params["lines"]))
+
+
+@benchmark("marks_add")
+def bench_marks_add(params: dict) -> dict:
+    from src.utils.mark_manager import MarkManager
+    manager = MarkManager()
+    latencies = [_timed(manager.add_mark, params["data_file"], line, "content") for line in _mark_lines(params)]
+    return {"seconds": sum(latencies), "ops": len(latencies), "latencies": latencies}
+
+
+@benchmark("marks_lookup")
+def bench_marks_lookup(params: dict) -> dict:
+    from src.utils.mark_manager import MarkManager
+    manager = MarkManager()
+    lines = _mark_lines(params)
+    for line in lines:
+        manager.add_mark(params["data_file"], line, "content")
+    rng = random.Random(params["seed"] + 1)
+    probes = [rng.randrange(params["lines"]) for _ in range(len(lines))]
+    latencies = [_timed(manager.is_marked, params["data_file"], line) for line in probes]
+    return {"seconds": sum(latencies), "ops": len(latencies), "latencies": latencies}
+
+
+@benchmark("marks_remove")
+def bench_marks_remove(params: dict) -> dict:
+    from src.utils.mark_manager import MarkManager
+    manager = MarkManager()
+    lines = _mark_lines(params)
+    for line in lines:
+        manager.add_mark(params["data_file"], line, "content")
+    random.Random(params["seed"] + 2).shuffle(lines)
+    latencies = [_timed(manager.remove_mark, params["data_file"], line) for line in lines]
+    return {"seconds": sum(latencies), "ops": len(latencies), "latencies": latencies}
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(runs: List[dict]) -> dict:
+    """把多次运行的测量结果汇总为报告中的一项"""
+    seconds = statistics.median(run["seconds"] for run in runs)
+    result = {"seconds": round(seconds, 6), "runs": len(runs)}
+    first = runs[0]
+    throughput = {}
+    if seconds > 0:
+        if "bytes" in first:
+            throughput["MB/s"] = round(first["bytes"] / seconds / (1024 * 1024), 2)
+        if "lines" in first:
+            throughput["lines/s"] = round(first["lines"] / seconds, 1)
+        if "ops" in first:
+            throughput["ops/s"] = round(first["ops"] / seconds, 1)
+    if throughput:
+        result["throughput"] = throughput
+    latencies = sorted(latency for run in runs for latency in run.get("latencies", ()))
+    if latencies:
+        result["latency_ms"] = {
+            "count": len(latencies),
+            "mean": round(statistics.fmean(latencies) * 1000, 4),
+            "p50": round(_percentile(latencies, 0.5) * 1000, 4),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 4),
+            "max": round(latencies[-1] * 1000, 4),
+        }
+    if "matches" in first:
+        result["matches"] = first["matches"]
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def run_child(name: str, params: dict):
+    """在子进程中运行一个测试项，把汇总结果以 JSON 写到标准输出"""
+    func, gui = BENCHMARKS[name]
+    app = None
+    if gui:
+        from PyQt6.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+    runs = []
+    # 被测代码中的调试输出不计入结果
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(params["repeat"]):
+            runs.append(func(params))
+    sys.stdout.write(json.dumps(summarize(runs)) + "\n")
+    sys.stdout.flush()
+
+
+def prepare_data(params: dict, data_dir: str) -> Dict[str, str]:
+    """生成测试数据（已存在的同参数文件直接复用）
+
+    Returns:
+        Dict[str, str]: {"data_file": 完整数据, "gui_data_file": 界面测试使用的较小数据}
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    files = {}
+    for key, lines in (("data_file", params["lines"]), ("gui_data_file", params["gui_lines"])):
+        name = (f"bench_{lines}_{params['line_length']}_{params['encoding']}_"
+                f"{params['density']}_{params['seed']}.log")
+        filepath = os.path.join(data_dir, name)
+        if not os.path.exists(filepath):
+            generate_log(filepath, lines, params["line_length"], params["encoding"],
+                         params["density"], seed=params["seed"])
+        files[key] = filepath
+    return files
+
+
+def run_benchmark(name: str, params: dict) -> dict:
+    """在独立的子进程中运行一个测试项"""
+    _, gui = BENCHMARKS[name]
+    child_params = dict(params)
+    if gui:
+        child_params["data_file"] = params["gui_data_file"]
+        child_params["lines"] = params["gui_lines"]
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", name, "--params", json.dumps(child_params)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"退出码 {process.returncode}"}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def _metrics(result: dict) -> Dict[str, float]:
+    """参与基线比较的指标，数值越大越差"""
+    metrics = {"seconds": result.get("seconds")}
+    if "latency_ms" in result:
+        metrics["latency_p95_ms"] = result["latency_ms"]["p95"]
+    metrics["peak_rss_mb"] = result.get("peak_rss_mb")
+    return {key: value for key, value in metrics.items() if value is not None}
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """与基线逐项比较
+
+    Returns:
+        List[str]: 退化的指标说明，为空表示没有退化
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or "error" in base or "error" in result:
+            continue
+        current_metrics = _metrics(result)
+        for key, base_value in _metrics(base).items():
+            value = current_metrics.get(key)
+            if value is None:
+                continue
+            limit = base_value * (1 + tolerance)
+            if value > limit and value - base_value > _NOISE_FLOOR[key]:
+                change = (value / base_value - 1) * 100 if base_value else float("inf")
+                regressions.append(f"{name}.{key}: {base_value} -> {value} (+{change:.1f}%)")
+    return regressions
+
+
+def _print_table(report: dict):
+    print(f"{'测试项':<26}{'耗时(s)':>12}{'吞吐量':>22}{'p95(ms)':>12}{'RSS(MB)':>10}", file=sys.stderr)
+    for name, result in report["results"].items():
+        if "error" in result:
+            print(f"{name:<26}  失败：{result['error']}", file=sys.stderr)
+            continue
+        throughput = result.get("throughput", {})
+        unit = next(iter(throughput), "")
+        rate = f"{throughput[unit]} {unit}" if unit else "-"
+        p95 = result.get("latency_ms", {}).get("p95", "-")
+        rss = result.get("peak_rss_mb") or "-"
+        print(f"{name:<26}{result['seconds']:>12.4f}{rate:>22}{p95:>12}{rss:>10}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="日志分析工具的性能测试")
+    parser.add_argument("--lines", type=int, help=f"测试数据行数（默认 {DEFAULT_PARAMS['lines']}）")
+    parser.add_argument("--line-length", type=int, help="平均行长（字符数）")
+    parser.add_argument("--encoding", help="测试数据的编码，如 utf-8、gbk")
+    parser.add_argument("--density", type=float, help="包含关键字的行所占的比例")
+    parser.add_argument("--gui-lines", type=int, help="高亮和导航测试使用的行数")
+    parser.add_argument("--marks", type=int, help="标记测试的标记数量")
+    parser.add_argument("--repeat", type=int, help="每个测试项的运行次数，耗时取中位数")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    parser.add_argument("--quick", action="store_true", help="使用较小的数据量快速运行")
+    parser.add_argument("--only", help="只运行指定的测试项，多个用逗号分隔")
+    parser.add_argument("--list", action="store_true", help="列出所有测试项")
+    parser.add_argument("--data-dir", help="测试数据目录（默认使用系统临时目录）")
+    parser.add_argument("--output", help="把结果写入 JSON 文件（可作为之后比较的基线）")
+    parser.add_argument("--baseline", help="与之比较的基线结果文件")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的退化比例（默认 0.2，即 20%%）")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--params", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, json.loads(args.params))
+        return 0
+    if args.list:
+        for name, (_, gui) in BENCHMARKS.items():
+            print(f"{name}{'  (Qt)' if gui else ''}")
+        return 0
+
+    params = dict(DEFAULT_PARAMS)
+    if args.quick:
+        params.update(QUICK_PARAMS)
+    for key in DEFAULT_PARAMS:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+    params["gui_lines"] = min(params["gui_lines"], params["lines"])
+
+    names = list(BENCHMARKS)
+    if args.only:
+        names = [name.strip() for name in args.only.split(",") if name.strip()]
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            parser.error(f"未知的测试项：{', '.join(unknown)}")
+
+    data_dir = args.data_dir or os.path.join(tempfile.gettempdir(), "sc_log_benchmarks")
+    files = prepare_data(params, data_dir)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": params,
+        },
+        "results": {},
+    }
+    for name in names:
+        print(f"运行 {name}...", file=sys.stderr)
+        report["results"][name] = run_benchmark(name, {**params, **files})
+
+    _print_table(report)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    exit_code = 2 if any("error" in result for result in report["results"].values()) else 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("params") != params:
+            print("警告：基线使用的测试参数与本次不同，比较结果可能没有意义", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"超过容差 {args.tolerance:.0%} 的退化：", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            exit_code = exit_code or 1
+        else:
+            print("与基线相比没有退化", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""启动耗时测试：从启动解释器到主窗口第一次绘制出内容的时间
+
+每次运行都启动一个新的解释器（带 -X importtime），在临时目录中使用独立的配置文件
+和结果缓存目录，不读写程序目录下的 caches/。测试两种场景：
+  welcome: 没有上次打开的文件，显示欢迎页面
+  restore: 恢复上次打开的一个文件
+
+结果包含墙钟时间（启动解释器到第一次绘制出欢迎页面或标签页、到标签页恢复完成）、主模块的导入耗时
+和累计导入耗时最多的模块。
+
+用法：
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --scenario welcome --top 20 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.log_generator import generate_log
+from src.utils.result_cache import RESULT_CACHE_ENV
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ["welcome", "restore"]
+# restore 场景打开的文件行数
+RESTORE_LINES = 20000
+# 等待窗口显示和标签页恢复的最长时间（秒）
+CHILD_TIMEOUT = 60
+
+
+def run_child(scenario: str, config_file: str):
+    """在子进程中启动主窗口，把各阶段的时间以 JSON 写到标准输出"""
+    start = time.perf_counter()
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+    import main
+    from src.resources.config_manager import ConfigManager
+    imported = time.perf_counter()
+
+    config_manager = ConfigManager()
+    config_manager.config_dir = os.path.dirname(config_file)
+    config_manager.config_file = config_file
+
+    app = QApplication(sys.argv[:1])
+    times = {"import_main": imported - start}
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            # 堆叠部件还是空的（欢迎页面和标签页都没有创建）时的绘制不算
+            if (event.type() == QEvent.Type.Paint and "first_paint" not in times
+                    and window.stack.currentWidget() is not None):
+                times["first_paint"] = time.perf_counter() - start
+                times["first_paint_wall"] = time.time()
+            return False
+
+    window = main.SCMainWindow()
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.show()
+    times["window_shown"] = time.perf_counter() - start
+
+    def poll():
+        if "first_paint" not in times or getattr(window, "_restore_pending", False):
+            return
+        if scenario == "restore" and not window.tabs:
+            return
+        times["restored"] = time.perf_counter() - start
+        times["restored_wall"] = time.time()
+        app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(poll)
+    timer.start(1)
+    QTimer.singleShot(CHILD_TIMEOUT * 1000, app.quit)
+    app.exec()
+    sys.stdout.write(json.dumps(times) + "\n")
+    sys.stdout.flush()
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, float]]:
+    """解析 -X importtime 的输出：模块名 -> {"self_ms", "cumulative_ms"}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        name = parts[2].strip()
+        modules[name] = {"self_ms": int(parts[0]) / 1000, "cumulative_ms": int(parts[1]) / 1000}
+    return modules
+
+
+def run_once(scenario: str, work_dir: str, data_file: str) -> dict:
+    """启动一次主窗口并测量"""
+    config_file = os.path.join(work_dir, "config.json")
+    state = {"opened_files": [data_file] if scenario == "restore" else [],
+             "current_tab": 0, "keyword_groups": {"default": []}, "recent_files": []}
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = ROOT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env[RESULT_CACHE_ENV] = os.path.join(work_dir, "results")
+    spawned = time.time()
+    # 工作目录设为临时目录，界面日志（logs/）不写入程序目录
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks.startup",
+         "--child", scenario, "--config", config_file],
+        cwd=work_dir, env=env, capture_output=True, text=True, timeout=CHILD_TIMEOUT + 30)
+    if process.returncode != 0:
+        lines = [line for line in process.stderr.splitlines() if not line.startswith("import time:")]
+        return {"error": lines[-1] if lines else f"退出码 {process.returncode}"}
+    times = json.loads(process.stdout.strip().splitlines()[-1])
+    if "first_paint" not in times or "restored" not in times:
+        return {"error": f"{CHILD_TIMEOUT} 秒内没有完成启动"}
+    modules = parse_importtime(process.stderr)
+    return {
+        "first_window_s": times["first_paint_wall"] - spawned,
+        "ready_s": times["restored_wall"] - spawned,
+        "import_main_s": times["import_main"],
+        "imports_ms": sum(module["self_ms"] for module in modules.values()),
+        "module_count": len(modules),
+        "modules": modules,
+    }
+
+
+def summarize(runs: List[dict], top: int) -> dict:
+    """多次运行取中位数，导入耗时按累计耗时的中位数排序取前 top 个"""
+    result = {"runs": len(runs)}
+    for key in ("first_window_s", "ready_s", "import_main_s", "imports_ms"):
+        result[key] = round(statistics.median(run[key] for run in runs), 4)
+    result["first_window_min_s"] = round(min(run["first_window_s"] for run in runs), 4)
+    result["module_count"] = runs[-1]["module_count"]
+    names = set().union(*(run["modules"] for run in runs))
+    cumulative = {
+        name: statistics.median(run["modules"].get(name, {}).get("cumulative_ms", 0.0) for run in runs)
+        for name in names
+    }
+    result["top_imports"] = [
+        {"module": name, "cumulative_ms": round(value, 2)}
+        for name, value in sorted(cumulative.items(), key=lambda item: -item[1])[:top]
+    ]
+    return result
+
+
+def _print_table(report: dict):
+    print(f"{'场景':<10}{'首次绘制(s)':>14}{'恢复完成(s)':>14}{'导入 main(s)':>14}{'导入模块数':>12}",
+          file=sys.stderr)
+    for scenario, result in report["results"].items():
+        if "error" in result:
+            print(f"{scenario:<10}错误：{result['error']}", file=sys.stderr)
+            continue
+        print(f"{scenario:<10}{result['first_window_s']:>14.3f}{result['ready_s']:>14.3f}"
+              f"{result['import_main_s']:>14.3f}{result['module_count']:>12}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="日志分析工具的启动耗时测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个场景的运行次数，取中位数（默认 5）")
+    parser.add_argument("--scenario", help=f"只运行指定的场景，多个用逗号分隔（{', '.join(SCENARIOS)}）")
+    parser.add_argument("--top", type=int, default=15, help="列出累计导入耗时最多的模块数（默认 15）")
+    parser.add_argument("--output", help="把结果写入 JSON 文件")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.config)
+        return 0
+
+    scenarios = SCENARIOS
+    if args.scenario:
+        scenarios = [name.strip() for name in args.scenario.split(",") if name.strip()]
+        unknown = [name for name in scenarios if name not in SCENARIOS]
+        if unknown:
+            parser.error(f"未知的场景：{', '.join(unknown)}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="sc_log_startup_") as work_dir:
+        data_file = os.path.join(work_dir, "startup.log")
+        generate_log(data_file, RESTORE_LINES, 120, "utf-8", 0.01)
+        for scenario in scenarios:
+            print(f"运行 {scenario}...", file=sys.stderr)
+            runs = []
+            for _ in range(args.repeat):
+                run = run_once(scenario, work_dir, data_file)
+                if "error" in run:
+                    runs = run
+                    break
+                runs.append(run)
+            report["results"][scenario] = runs if isinstance(runs, dict) else summarize(runs, args.top)
+
+    _print_table(report)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 2 if any("error" in result for result in report["results"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,51 @@
+import argparse
 import sys
 import os
+from typing import TYPE_CHECKING
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget,
                            QVBoxLayout, QFileDialog, QMenuBar, QToolBar,
                            QDockWidget, QListWidget, QMessageBox, QStackedWidget,
                            QHBoxLayout, QLabel, QPushButton, QMenu)
-from PyQt6.QtCore import Qt, QSize, pyqtSignal
+from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal
 from PyQt6.QtGui import QAction, QKeySequence, QIcon, QColor
-from src.ui.welcome_page import SCWelcomePage
-from src.ui.workspace_panel.log_panel.log_tab import SCLogTab
 from src.ui.widgets.custom_tab import SCCustomTab
-from src.ui.keyword_panel.saved_keyword_list import SCSavedKeywordList
 from src.resources.config_manager import ConfigManager
 from src.resources.theme import THEME
 from src.utils.logger import log_ui_event
+from src.utils.single_instance import SingleInstanceServer, send_to_running_instance
+
+# 标签页、关键字面板、批量搜索面板等模块（连同 numpy 和过滤引擎）在第一次使用时才导入，
+# 主窗口不需要等它们加载完就能显示；类型检查时照常导入
+if TYPE_CHECKING:
+    from src.ui.workspace_panel.log_panel.log_tab import SCLogTab
+    from src.ui.workspace_panel.merged_panel.merged_view import SCMergedLogTab
+    from src.ui.keyword_panel.saved_keyword_list import SCSavedKeywordList
+
+
+def _is_log_tab(widget) -> bool:
+    """是否是单文件标签页（按类名判断，不需要为此导入标签页模块）"""
+    return widget.__class__.__name__ == 'SCLogTab'
+
+
+# 主窗口一直没有绘制时，最晚在这个时间（毫秒）后恢复上次打开的文件
+RESTORE_FALLBACK_MS = 1000
+
 
 class SCMainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config_manager = ConfigManager()
         self.tabs = []  # 存储标签页对象
-        self.keyword_dock = None  # 关键字视图
+        self.welcome_page = None  # 欢迎页面，第一次显示时创建
+        self.keyword_dock = None  # 关键字视图，第一次显示时创建
+        self._keyword_list = None
+        self._keyword_groups = {"default": []}  # 关键字面板创建之前保存的关键字分组
+        self._restore_pending = False  # 打开的文件是否还在等待恢复
+        self._pending_state = None     # 等待恢复的状态，第一次绘制后取出
+        self._queued_files = []        # 恢复完成之前要求打开的文件
         self.filter_dock = None   # 过滤视图
+        self.search_dock = None   # 批量搜索视图，第一次打开时创建
+        self.profiler_dialog = None  # 性能统计面板
         self.setup_ui()
         self.setup_shortcuts()  # 添加快捷键设置
         self.restore_state()
@@ -41,11 +66,17 @@ class SCMainWindow(QMainWindow):
         close_shortcut.setShortcut(QKeySequence.StandardKey.Close)  # 使用标准快捷键
         close_shortcut.triggered.connect(self._close_current_tab)
         self.addAction(close_shortcut)
+
+        # 批量搜索快捷键 (Ctrl+Shift+F/Command+Shift+F)
+        search_shortcut = QAction(self)
+        search_shortcut.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        search_shortcut.triggered.connect(lambda: self.toggle_search_view(True))
+        self.addAction(search_shortcut)
         
     def _close_current_tab(self):
         """关闭当前标签页"""
         current_widget = self.stack.currentWidget()
-        if isinstance(current_widget, SCLogTab):
+        if current_widget.__class__.__name__ in ('SCLogTab', 'SCMergedLogTab'):
             # 找到对应的标签页和标签部件
             for tab, tab_widget in self.tabs:
                 if tab == current_widget:
@@ -82,14 +113,7 @@ class SCMainWindow(QMainWindow):
         self.stack = QStackedWidget()
         layout.addWidget(self.stack)
         
-        # 创建欢迎页面
-        self.welcome_page = SCWelcomePage()
-        self.welcome_page.openFileClicked.connect(self.open_file)
-        self.welcome_page.openRecentFileClicked.connect(self.open_recent_file)
-        self.stack.addWidget(self.welcome_page)
-        
-        # 创建关键字停靠窗口
-        self.create_keyword_dock()
+        # 欢迎页面和停靠窗口在第一次需要时创建（show_welcome_page、show_editor_view、toggle_search_view）
         
         # 设置应用程序样式
         self.setStyleSheet(f"""
@@ -189,6 +213,12 @@ class SCMainWindow(QMainWindow):
         self.recent_menu.setStyleSheet(self.menu.styleSheet())
         self.recent_menu.aboutToShow.connect(self.update_recent_files_menu)
         self.menu.addMenu(self.recent_menu)
+
+        self.merge_action = self.menu.addAction("按时间合并打开多个文件")
+        self.merge_action.triggered.connect(self.open_merged_files)
+
+        self.export_action = self.menu.addAction("导出...")
+        self.export_action.triggered.connect(self.show_export_dialog)
         
         self.menu.addSeparator()
         
@@ -200,6 +230,15 @@ class SCMainWindow(QMainWindow):
         self.filter_view_action = self.menu.addAction("筛选视图")
         self.filter_view_action.setCheckable(True)
         self.filter_view_action.triggered.connect(self.toggle_filter_view)
+
+        self.search_view_action = self.menu.addAction("批量搜索")
+        self.search_view_action.setCheckable(True)
+        self.search_view_action.triggered.connect(self.toggle_search_view)
+
+        self.menu.addSeparator()
+
+        self.profiler_action = self.menu.addAction("性能统计")
+        self.profiler_action.triggered.connect(self.show_profiler_dialog)
         
         # 设置按钮的上下文菜单
         self.sc_tool_btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -254,7 +293,7 @@ class SCMainWindow(QMainWindow):
         # 检查文件是否已经打开
         for i in range(self.stack.count()):
             widget = self.stack.widget(i)
-            if isinstance(widget, SCLogTab) and widget.filepath == filepath:
+            if _is_log_tab(widget) and widget.filepath == filepath:
                 self.switch_to_tab(widget)
                 return
         
@@ -269,10 +308,12 @@ class SCMainWindow(QMainWindow):
         # 更新视图状态
         if self.keyword_dock:
             self.keyword_view_action.setChecked(not self.keyword_dock.isHidden())
+        if self.search_dock:
+            self.search_view_action.setChecked(not self.search_dock.isHidden())
             
         # 检查当前标签页的过滤视图状态
         current_widget = self.stack.currentWidget()
-        if isinstance(current_widget, SCLogTab):
+        if _is_log_tab(current_widget):
             workspace_panel = current_widget.workspace_panel
             # 检查底部面板是否显示，以及当前是否在过滤标签页
             is_filter_visible = (workspace_panel.tab_list.isVisible() and 
@@ -285,13 +326,47 @@ class SCMainWindow(QMainWindow):
 
     def toggle_keyword_view(self, checked):
         log_ui_event("toggle_view", "KeywordPanel", f"Visible: {checked}")
+        if checked:
+            self.create_keyword_dock()
         if self.keyword_dock:
             self.keyword_dock.setVisible(checked)
 
+    def toggle_search_view(self, checked):
+        log_ui_event("toggle_view", "SearchPanel", f"Visible: {checked}")
+        if checked:
+            self.create_search_dock()
+        if not self.search_dock:
+            return
+        self.search_dock.setVisible(checked)
+        if checked:
+            # 默认搜索当前标签页的过滤表达式
+            current_widget = self.stack.currentWidget()
+            if _is_log_tab(current_widget) and not self.search_panel.input.text():
+                filter_input = current_widget.workspace_panel.get_filtered_view().filter_input
+                self.search_panel.set_expression(filter_input.input.text(), filter_input.get_filter_options())
+            self.search_panel.input.setFocus()
+
+    def show_export_dialog(self):
+        """导出当前标签页的过滤结果、标记的行或行范围"""
+        current_widget = self.stack.currentWidget()
+        if not _is_log_tab(current_widget):
+            QMessageBox.information(self, "导出", "请先打开一个日志文件")
+            return
+        from src.ui.widgets.export_dialog import SCExportDialog
+        SCExportDialog(current_widget, self).exec()
+
+    def show_profiler_dialog(self):
+        """显示性能统计面板（非模态）"""
+        if self.profiler_dialog is None:
+            from src.ui.widgets.profiler_dialog import SCProfilerDialog
+            self.profiler_dialog = SCProfilerDialog(self)
+        self.profiler_dialog.show()
+        self.profiler_dialog.raise_()
+
     def toggle_filter_view(self, checked):
         log_ui_event("toggle_view", "FilterPanel", f"Visible: {checked}")
         current_widget = self.stack.currentWidget()
-        if isinstance(current_widget, SCLogTab):
+        if _is_log_tab(current_widget):
             workspace_panel = current_widget.workspace_panel
             if checked:
                 # 显示底部面板并切换到过滤标签页
@@ -302,14 +377,24 @@ class SCMainWindow(QMainWindow):
                 if workspace_panel.tab_list.currentRow() == 0:
                     workspace_panel._hide_bottom_panel()
 
+    @property
+    def keyword_list(self) -> 'SCSavedKeywordList':
+        """保存的关键字列表，第一次访问时创建关键字停靠窗口"""
+        self.create_keyword_dock()
+        return self._keyword_list
+
     def create_keyword_dock(self):
+        """创建关键字停靠窗口（已创建时直接返回）"""
+        if self.keyword_dock is not None:
+            return
+        from src.ui.keyword_panel.saved_keyword_list import SCSavedKeywordList
         dock = QDockWidget(self)  # 移除标题文本
         dock.setAllowedAreas(Qt.DockWidgetArea.LeftDockWidgetArea | 
                             Qt.DockWidgetArea.RightDockWidgetArea)
         
         # 创建关键字列表
-        self.keyword_list = SCSavedKeywordList()
-        self.keyword_list.setStyleSheet(f"""
+        self._keyword_list = SCSavedKeywordList()
+        self._keyword_list.setStyleSheet(f"""
             QListWidget {{
                 background: {THEME['tab_bg']};
                 color: {THEME['text']};
@@ -328,7 +413,11 @@ class SCMainWindow(QMainWindow):
                 color: {THEME['highlight_text']};
             }}
         """)
-        self.keyword_list.keywordSelected.connect(self._on_keyword_selected)
+        self._keyword_list.keywordSelected.connect(self._on_keyword_selected)
+        self._keyword_list.keywordGroupSelected.connect(self._on_keyword_group_selected)
+        # 恢复保存的关键字分组
+        self._keyword_list.load_keywords(self._keyword_groups)
+        self._update_keyword_hit_counts()
         
         # 创建自定义标题栏部件
         title_widget = QWidget()
@@ -362,7 +451,7 @@ class SCMainWindow(QMainWindow):
                 border-radius: 3px;
             }}
         """)
-        add_group_btn.clicked.connect(self.keyword_list.add_group)
+        add_group_btn.clicked.connect(self._keyword_list.add_group)
         
         # 最小化按钮
         minimize_btn = QPushButton("−")
@@ -399,24 +488,79 @@ class SCMainWindow(QMainWindow):
             }}
         """)
         
-        dock.setWidget(self.keyword_list)
+        dock.setWidget(self._keyword_list)
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, dock)
+        if not _is_log_tab(self.stack.currentWidget()):
+            dock.hide()
         self.keyword_dock = dock
 
+    def create_search_dock(self):
+        """创建批量搜索停靠窗口（已创建时直接返回）"""
+        if self.search_dock is not None:
+            return
+        from src.ui.search_panel.multi_file_search import SCMultiFileSearchPanel
+        dock = QDockWidget("批量搜索", self)
+        dock.setAllowedAreas(Qt.DockWidgetArea.LeftDockWidgetArea |
+                            Qt.DockWidgetArea.RightDockWidgetArea |
+                            Qt.DockWidgetArea.BottomDockWidgetArea)
+        self.search_panel = SCMultiFileSearchPanel()
+        self.search_panel.resultActivated.connect(self.open_file_at)
+        dock.setStyleSheet(f"""
+            QDockWidget {{
+                background: {THEME['tab_bg']};
+                color: {THEME['text']};
+                border: 1px solid {THEME['border']};
+            }}
+        """)
+        dock.setWidget(self.search_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, dock)
+        dock.hide()
+        self.search_dock = dock
+
+    def open_file_at(self, filepath: str, line_number: int, position: int = 0, length: int = 0):
+        """打开文件（已打开时切换到对应标签页）并定位到指定行"""
+        log_ui_event("open_file_at", "MainWindow", f"File: {filepath}, Line: {line_number + 1}")
+        tab = None
+        for t, _ in self.tabs:
+            if t.filepath == filepath:
+                tab = t
+                break
+        if tab is None:
+            if not os.path.exists(filepath):
+                QMessageBox.critical(self, "错误", f"文件不存在：\n{filepath}")
+                return
+            self.config_manager.update_recent_files(filepath)
+            tab = self.add_new_tab(filepath)
+            self.save_state()
+        self.switch_to_tab(tab)
+        tab.workspace_panel.log_viewer.highlight_line(line_number, keyword_position=position,
+                                                      keyword_length=length, center_on_screen=True)
+
     def _on_keyword_selected(self, expression: str, options: dict):
         """处理关键字选择事件"""
         # 获取当前标签页
         current_widget = self.stack.currentWidget()
-        if isinstance(current_widget, SCLogTab):
+        if _is_log_tab(current_widget):
             # 设置过滤输入框的文本和选项
             current_widget.workspace_panel.get_filtered_view().filter_input.set_expression(expression)
             current_widget.workspace_panel.get_filtered_view().filter_input.set_filter_options(options)
             
+    def _on_keyword_group_selected(self, group_path: str, rules: list):
+        """在当前标签页中运行整个关键字分组"""
+        current_widget = self.stack.currentWidget()
+        if _is_log_tab(current_widget):
+            current_widget.workspace_panel.get_filtered_view().apply_keyword_group(group_path, rules)
+            
+    def _on_keyword_group_filtered(self, group_path: str, counts: list):
+        """分组过滤完成，在关键字面板中显示每个关键字的匹配次数"""
+        if self._keyword_list is not None:
+            self._keyword_list.set_group_hit_counts(group_path, counts)
+            
     def add_saved_keyword(self, expression: str):
         """添加关键字到保存列表"""
         # 获取当前标签页
         current_widget = self.stack.currentWidget()
-        if isinstance(current_widget, SCLogTab):
+        if _is_log_tab(current_widget):
             # 获取当前过滤选项
             options = current_widget.workspace_panel.get_filtered_view().filter_input.get_filter_options()
             # 设置当前过滤选项到关键字列表
@@ -425,11 +569,40 @@ class SCMainWindow(QMainWindow):
         self.keyword_list.add_keyword(expression)
         self.save_state()
 
-    def add_new_tab(self, filepath: str = "") -> SCLogTab:
+    def add_new_tab(self, filepath: str = "") -> 'SCLogTab':
+        from src.ui.workspace_panel.log_panel.log_tab import SCLogTab
         new_tab = SCLogTab(filepath)
+        new_tab.workspace_panel.get_filtered_view().keywordGroupFiltered.connect(self._on_keyword_group_filtered)
         # 如果有文件路径使用文件名，否则使用 "New Tab"
         name = os.path.basename(filepath) if filepath else "New Tab"
-        
+        # 如果有文件路径则为只读，否则为可编辑
+        self._add_tab(new_tab, name, is_read_only=bool(filepath))
+        return new_tab
+
+    def open_merged_files(self):
+        """选择多个文件，按时间合并后在一个标签页中显示"""
+        log_ui_event("open_merged_files_dialog", "MainWindow")
+        filenames, _ = QFileDialog.getOpenFileNames(
+            self,
+            "选择要合并的日志文件",
+            "",
+            "所有文件 (*.*)"
+        )
+        if len(filenames) < 2:
+            if filenames:
+                QMessageBox.information(self, "提示", "请至少选择两个文件进行合并")
+            return
+        self.add_merged_tab(filenames)
+
+    def add_merged_tab(self, filepaths: list) -> 'SCMergedLogTab':
+        from src.ui.workspace_panel.merged_panel.merged_view import SCMergedLogTab
+        log_ui_event("open_merged_files", "MainWindow", f"Files: {filepaths}")
+        new_tab = SCMergedLogTab(filepaths)
+        self._add_tab(new_tab, new_tab.title, is_read_only=True)
+        return new_tab
+
+    def _add_tab(self, new_tab: QWidget, name: str, is_read_only: bool):
+        """把标签页添加到工具栏和堆叠部件中并切换过去"""
         # 如果已经有标签页，添加分隔符
         if self.tabs and not self.toolbar.actions()[-1].isSeparator():
             separator = QLabel("|")
@@ -444,7 +617,7 @@ class SCMainWindow(QMainWindow):
             self.toolbar.addWidget(separator)
         
         # 创建自定义标签
-        tab_widget = SCCustomTab(name, is_read_only=bool(filepath))  # 如果有文件路径则为只读，否则为可编辑
+        tab_widget = SCCustomTab(name, is_read_only=is_read_only)
         tab_widget.closeClicked.connect(lambda: self.close_tab(new_tab, tab_widget))
         tab_widget.clicked.connect(lambda: self.switch_to_tab(new_tab))
         tab_widget.readOnlyChanged.connect(lambda read_only: new_tab.set_read_only(read_only))  # 连接只读模式信号
@@ -461,10 +634,8 @@ class SCMainWindow(QMainWindow):
         
         # 确保显示编辑器视图
         self.show_editor_view()
-        
-        return new_tab
 
-    def switch_to_tab(self, tab: SCLogTab):
+    def switch_to_tab(self, tab: 'SCLogTab'):
         log_ui_event("switch_tab", "MainWindow", f"Tab: {tab.filepath if tab.filepath else 'Untitled'}")
         # 更新标签页状态
         for t, widget in self.tabs:
@@ -472,8 +643,16 @@ class SCMainWindow(QMainWindow):
             
         # 切换到对应的部件
         self.stack.setCurrentWidget(tab)
+        self._update_keyword_hit_counts()
+
+    def _update_keyword_hit_counts(self):
+        """在关键字面板中显示每个关键字在当前文件中的匹配次数（后台统计）"""
+        if self._keyword_list is None:
+            return
+        current_widget = self.stack.currentWidget()
+        self._keyword_list.set_active_file(current_widget.filepath if _is_log_tab(current_widget) else "")
 
-    def close_tab(self, tab: SCLogTab, tab_widget: SCCustomTab):
+    def close_tab(self, tab: 'SCLogTab', tab_widget: SCCustomTab):
         log_ui_event("close_tab", "MainWindow", f"Tab: {tab.filepath if tab.filepath else 'Untitled'}")
         
         # 显示保存确认对话框
@@ -521,8 +700,9 @@ class SCMainWindow(QMainWindow):
         if tab.filepath:
             self.config_manager.update_recent_files(tab.filepath, is_close=True)
         
-        # 移除标签页
+        # 移除标签页（close() 让标签页停止后台任务）
         self.stack.removeWidget(tab)
+        tab.close()
         tab.deleteLater()
         tab_widget.deleteLater()
         
@@ -550,7 +730,7 @@ class SCMainWindow(QMainWindow):
             # 检查文件是否已经打开
             for i in range(self.stack.count()):
                 widget = self.stack.widget(i)
-                if isinstance(widget, SCLogTab) and widget.filepath == filename:
+                if _is_log_tab(widget) and widget.filepath == filename:
                     self.switch_to_tab(widget)
                     return
             
@@ -564,6 +744,12 @@ class SCMainWindow(QMainWindow):
     def show_welcome_page(self):
         """显示欢迎页面"""
         log_ui_event("show_page", "MainWindow", "WelcomePage")
+        if self.welcome_page is None:
+            from src.ui.welcome_page import SCWelcomePage
+            self.welcome_page = SCWelcomePage()
+            self.welcome_page.openFileClicked.connect(self.open_file)
+            self.welcome_page.openRecentFileClicked.connect(self.open_recent_file)
+            self.stack.addWidget(self.welcome_page)
         self.welcome_page.update_recent_files()  # 更新最近文件列表
         self.stack.setCurrentWidget(self.welcome_page)
         # 隐藏关键字面板
@@ -573,12 +759,16 @@ class SCMainWindow(QMainWindow):
     def show_editor_view(self):
         """显示编辑器视图"""
         log_ui_event("show_page", "MainWindow", "EditorView")
-        # 显示关键字面板
+        # 显示关键字面板，批量搜索面板保持原来的显示状态
+        self.create_keyword_dock()
         for dock in self.findChildren(QDockWidget):
-            dock.show()
+            if dock is not self.search_dock:
+                dock.show()
 
     def save_state(self):
         """保存程序状态"""
+        if self._restore_pending:
+            return  # 上次的状态还没有恢复，不能用空的标签页列表覆盖
         opened_files = []
         for t, _ in self.tabs:
             filepath = t.filepath
@@ -587,28 +777,57 @@ class SCMainWindow(QMainWindow):
         
         current_widget = self.stack.currentWidget()
         current_index = 0  # 默认为欢迎页面
-        if isinstance(current_widget, SCLogTab):
+        if _is_log_tab(current_widget):
             for i, (t, _) in enumerate(self.tabs):
                 if t == current_widget:
                     current_index = i
                     break
         
         # 获取所有关键字分组
-        keyword_groups = self.keyword_list.get_all_keywords()
+        if self._keyword_list is not None:
+            keyword_groups = self._keyword_list.get_all_keywords()
+        else:
+            keyword_groups = self._keyword_groups
         
-        # 获取当前的最近文件列表
+        # 获取当前的最近文件列表（内存中的状态，不读磁盘）
         state = self.config_manager.load_state()
         recent_files = state.get("recent_files", [])
         
         self.config_manager.save_state(opened_files, current_index, keyword_groups, recent_files)
 
     def restore_state(self):
-        """恢复程序状态"""
+        """恢复程序状态
+
+        这里只读出状态，打开的文件在主窗口显示之后的下一轮事件循环中再恢复，
+        第一次显示窗口不需要等标签页模块导入和文件加载。没有要恢复的文件时
+        直接创建欢迎页面，第一次绘制就显示欢迎页面而不是空白窗口。
+        """
         state = self.config_manager.load_state()
         
-        # 恢复保存的关键字分组
-        self.keyword_list.load_keywords(state["keyword_groups"])
-        
+        # 保存的关键字分组在关键字面板创建时载入
+        self._keyword_groups = state["keyword_groups"]
+        if not state["opened_files"]:
+            self.show_welcome_page()
+        self._restore_pending = True
+        self._pending_state = state
+        # 一般在第一次绘制后恢复；窗口一直没有绘制（如最小化启动）时由定时器兜底
+        QTimer.singleShot(RESTORE_FALLBACK_MS, self._schedule_restore)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._pending_state is not None:
+            self._schedule_restore()
+
+    def _schedule_restore(self):
+        """在下一轮事件循环中恢复打开的文件（只执行一次）"""
+        if self._pending_state is None:
+            return
+        state, self._pending_state = self._pending_state, None
+        QTimer.singleShot(0, lambda: self._restore_tabs(state))
+
+    def _restore_tabs(self, state: dict):
+        """恢复上次打开的文件"""
+        self._restore_pending = False
         # 恢复打开的文件
         if state["opened_files"]:
             valid_files = []  # 用于存储有效的文件
@@ -632,7 +851,7 @@ class SCMainWindow(QMainWindow):
                 current_tab = min(state["current_tab"], len(valid_files) - 1)
                 if current_tab >= 0:
                     tab, _ = self.tabs[current_tab]
-                    if isinstance(tab, SCLogTab):
+                    if _is_log_tab(tab):
                         self.switch_to_tab(tab)
             else:
                 # 如果没有有效的文件，显示欢迎页面
@@ -644,9 +863,16 @@ class SCMainWindow(QMainWindow):
         # 更新最近文件菜单
         self.update_recent_files_menu()
 
+        # 恢复期间收到的文件（命令行参数、其他实例转交）
+        queued_files, self._queued_files = self._queued_files, []
+        self.open_files(queued_files)
+
     def closeEvent(self, event):
         """程序关闭时保存状态"""
         self.save_state()
+        self.config_manager.flush()
+        if self._keyword_list is not None:
+            self._keyword_list.cancel_hit_count()
         super().closeEvent(event)
 
     def dragEnterEvent(self, event):
@@ -657,23 +883,38 @@ class SCMainWindow(QMainWindow):
     def dropEvent(self, event):
         """处理放下事件"""
         urls = event.mimeData().urls()
-        for url in urls:
-            # 获取文件路径
-            filepath = url.toLocalFile()
-            if os.path.isfile(filepath):
-                # 检查文件是否已经打开
-                for i in range(self.stack.count()):
-                    widget = self.stack.widget(i)
-                    if isinstance(widget, SCLogTab) and widget.filepath == filepath:
-                        self.switch_to_tab(widget)
-                        return
-                
+        self.open_files([url.toLocalFile() for url in urls if os.path.isfile(url.toLocalFile())])
+
+    def open_files(self, filepaths: list):
+        """打开多个文件（拖放、命令行参数或其他实例转交），已打开的文件切换到对应标签页"""
+        if self._restore_pending:
+            # 上次打开的文件恢复之后再打开，保持标签页顺序
+            self._queued_files.extend(filepaths)
+            return
+        if filepaths:
+            log_ui_event("open_files", "MainWindow", f"Files: {filepaths}")
+        for filepath in filepaths:
+            # 检查文件是否已经打开
+            tab = next((t for t, _ in self.tabs if _is_log_tab(t) and t.filepath == filepath), None)
+            if tab is None:
+                if not os.path.isfile(filepath):
+                    QMessageBox.critical(self, "错误", f"文件不存在：\n{filepath}")
+                    continue
                 # 更新最近文件列表
                 self.config_manager.update_recent_files(filepath)
-                
                 # 创建新标签页
                 self.add_new_tab(filepath)
                 self.save_state()
+            else:
+                self.switch_to_tab(tab)
+
+    def activate_and_open(self, filepaths: list):
+        """其他实例转交文件时：把窗口切换到前台并打开文件"""
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        self.open_files(filepaths)
 
     def create_new_tab(self):
         """创建新的标签页"""
@@ -696,8 +937,28 @@ class SCMainWindow(QMainWindow):
                 
         return new_tab
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SC Log Analysis Tool")
+    parser.add_argument("files", nargs="*", help="要打开的日志文件")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="启动新的窗口，不把文件交给已运行的窗口")
+    args, qt_args = parser.parse_known_args()
+    filepaths = [os.path.abspath(path) for path in args.files]
+
+    # 已有窗口在运行时把文件交给它打开，不再启动新的界面
+    if not args.new_instance and send_to_running_instance(filepaths):
+        return 0
+
+    app = QApplication(sys.argv[:1] + qt_args)
     window = SCMainWindow()
+    if not args.new_instance:
+        server = SingleInstanceServer(parent=window)
+        if server.listen():
+            server.filesReceived.connect(window.activate_and_open)
     window.show()
-    sys.exit(app.exec()) 
\ No newline at end of file
+    window.open_files(filepaths)
+    return app.exec()
+
+
+if __name__ == '__main__':
+    sys.exit(main()) 
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""SC Log Analysis Tool 命令行入口（不依赖 Qt）
+
+用法示例：
+    python -m src.cli filter -e "timeout" --opts case_sensitive,whole_word app.log
+    python -m src.cli filter --keywords caches/config.json --group 网络 --json logs/*.log
+    python -m src.cli stats --json app.log
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+from src.utils.batch_filter import BatchFilter, FilterRule, expand_search_paths
+from src.utils.keyword_repository import read_keyword_file
+from src.utils.log_statistics import TOKEN_SAMPLE_STRIDE, compute_file_statistics
+
+OPTION_NAMES = ("case_sensitive", "whole_word", "use_regex", "use_query")
+
+
+def parse_options(text: str) -> dict:
+    """解析 --opts：JSON 对象，或逗号分隔的选项名（如 case_sensitive,use_regex）"""
+    if not text:
+        return {}
+    text = text.strip()
+    if text.startswith("{"):
+        options = json.loads(text)
+    else:
+        options = {name.strip(): True for name in text.split(",") if name.strip()}
+    unknown = set(options) - set(OPTION_NAMES)
+    if unknown:
+        raise ValueError(f"未知的选项：{', '.join(sorted(unknown))}")
+    return {name: bool(options.get(name, False)) for name in OPTION_NAMES}
+
+
+def load_keyword_groups(path: str) -> Dict[str, List[dict]]:
+    """读取已保存的关键字，支持 keywords.json 和 caches/config.json 两种格式"""
+    return read_keyword_file(path)
+
+
+def collect_rules(args) -> List[FilterRule]:
+    """根据命令行参数收集过滤规则"""
+    options = parse_options(args.opts)
+    for name in OPTION_NAMES:
+        if getattr(args, name):
+            options[name] = True
+
+    rules = [(expression, dict(options)) for expression in args.expr or []]
+    if args.keywords:
+        groups = load_keyword_groups(args.keywords)
+        selected = args.group or list(groups)
+        for group, keywords in groups.items():
+            # 选择一个分组时同时包含其子分组
+            if not any(group == name or group.startswith(name + "/") for name in selected):
+                continue
+            for keyword in keywords:
+                if keyword.get("text"):
+                    rules.append((keyword["text"], keyword.get("options") or {}))
+    return rules
+
+
+def run_filter(args) -> int:
+    rules = collect_rules(args)
+    if not rules:
+        print("错误：请通过 --expr 或 --keywords 指定过滤条件", file=sys.stderr)
+        return 2
+
+    files = expand_search_paths(args.files, args.include)
+    if not files:
+        print("错误：没有找到要过滤的文件", file=sys.stderr)
+        return 2
+
+    batch_filter = BatchFilter(rules, jobs=args.jobs)
+    show_filename = len(files) > 1
+    out = sys.stdout
+    counts: Dict[str, int] = {filepath: 0 for filepath in files}
+    for record in batch_filter.iter_files(files):
+        counts[record.filepath] += 1
+        if args.count:
+            continue
+        if args.json:
+            out.write(json.dumps(record.to_dict(), ensure_ascii=False))
+        else:
+            prefix = f"{record.filepath}:" if show_filename else ""
+            if args.line_number:
+                prefix += f"{record.line_number + 1}:"
+            out.write(prefix + record.text)
+        out.write("\n")
+
+    if args.count:
+        for filepath, count in counts.items():
+            if args.json:
+                out.write(json.dumps({"file": filepath, "count": count}, ensure_ascii=False) + "\n")
+            else:
+                out.write(f"{filepath}:{count}\n" if show_filename else f"{count}\n")
+    out.flush()
+    return 0 if any(counts.values()) else 1
+
+
+def run_stats(args) -> int:
+    groups = load_keyword_groups(args.keywords) if args.keywords else None
+    for filepath in args.files:
+        stats = compute_file_statistics(filepath, groups, count_tokens=args.top > 0,
+                                        token_stride=1 if args.exact_tokens else TOKEN_SAMPLE_STRIDE)
+        result = stats.to_dict(bucket_seconds=args.bucket, top_n=args.top)
+        result["file"] = filepath
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+            continue
+        print(f"{filepath}: {result['lines']} 行")
+        for name, count in result["levels"].items():
+            if count:
+                print(f"  {name:<8}{count}")
+        approx = "≈" if result["top_tokens_sampled"] else ""
+        for token, count in result["top_tokens"]:
+            print(f"  {token}: {approx}{count}")
+        for group, keywords in result["keywords"].items():
+            for keyword, count in keywords.items():
+                print(f"  [{group}] {keyword}: {count}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="SC Log Analysis Tool 命令行模式")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    filter_parser = subparsers.add_parser("filter", help="使用与界面相同的匹配规则过滤日志")
+    filter_parser.add_argument("files", nargs="+", help="要过滤的日志文件、目录或通配符")
+    filter_parser.add_argument("--include", default="*", help="过滤目录时只包含匹配的文件名，如 *.log")
+    filter_parser.add_argument("-e", "--expr", action="append", help="过滤表达式，可指定多次")
+    filter_parser.add_argument("--opts", default="", help="匹配选项：JSON 或逗号分隔的 case_sensitive,whole_word,use_regex,use_query")
+    filter_parser.add_argument("-c", "--case-sensitive", dest="case_sensitive", action="store_true", help="区分大小写")
+    filter_parser.add_argument("-w", "--whole-word", dest="whole_word", action="store_true", help="全词匹配")
+    filter_parser.add_argument("-r", "--regex", dest="use_regex", action="store_true", help="使用正则表达式")
+    filter_parser.add_argument("-q", "--query", dest="use_query", action="store_true",
+                               help="按查询语法解析表达式（and/or/not、字段比较）")
+    filter_parser.add_argument("--keywords", help="已保存关键字文件（keywords.json 或 caches/config.json）")
+    filter_parser.add_argument("--group", action="append", help="只使用指定分组（含子分组）的关键字，可指定多次")
+    filter_parser.add_argument("--json", action="store_true", help="以 JSON Lines 输出匹配记录")
+    filter_parser.add_argument("-n", "--line-number", action="store_true", help="输出行号")
+    filter_parser.add_argument("--count", action="store_true", help="只输出每个文件的匹配行数")
+    filter_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="并行进程数，默认为 CPU 核数")
+    filter_parser.set_defaults(func=run_filter)
+
+    stats_parser = subparsers.add_parser("stats", help="统计日志级别、时间分布和高频词")
+    stats_parser.add_argument("files", nargs="+", help="要统计的日志文件")
+    stats_parser.add_argument("--keywords", help="同时统计已保存关键字的命中次数")
+    stats_parser.add_argument("--bucket", type=int, default=0, help="时间分布的粒度（秒），默认自动选择")
+    stats_parser.add_argument("--top", type=int, default=20, help="输出出现次数最多的单词个数，0 表示不统计")
+    stats_parser.add_argument("--exact-tokens", dest="exact_tokens", action="store_true",
+                              help="扫描全部数据统计单词的准确次数（默认采样估计，快数倍）")
+    stats_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    stats_parser.set_defaults(func=run_stats)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # 输出被 head 等命令提前关闭
+        return 0
+    except (ValueError, OSError) as e:
+        print(f"错误：{e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
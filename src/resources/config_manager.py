@@ -3,6 +3,8 @@ import os
 from typing import List, Dict, Set, Union
 from PyQt6.QtCore import QObject, pyqtSignal
 from functools import wraps
+from src.utils.logger import Logger
+from src.utils.state_writer import DebouncedJsonWriter
 
 def singleton(cls):
     """单例模式装饰器"""
@@ -35,67 +37,89 @@ class ConfigManager(QObject):
             self.config_dir = os.path.join(app_root, "caches")
             self.config_file = os.path.join(self.config_dir, "config.json")
             
-            # 检查是否存在旧的配置文件
-            old_config_dir = os.path.expanduser("~/.sc_log_tool")
-            old_config_file = os.path.join(old_config_dir, "config.json")
-            
-            # 确保新的配置目录存在
-            self._ensure_config_dir()
-            
-            # 如果存在旧的配置文件，迁移到新位置
-            if os.path.exists(old_config_file) and not os.path.exists(self.config_file):
-                try:
-                    import shutil
-                    shutil.copy2(old_config_file, self.config_file)
-                    # 迁移成功后删除旧的配置文件和目录
-                    os.remove(old_config_file)
-                    if not os.listdir(old_config_dir):  # 如果目录为空
-                        os.rmdir(old_config_dir)
-                except Exception as e:
-                    print(f"迁移配置文件时出错: {e}")
+            # 创建目录和迁移旧配置在第一次读写时进行，构造时不做文件操作
+            self._prepared = False
+            self._state = None   # 内存中的状态，第一次读写时从配置文件加载
+            self._writer = None  # 合并写入配置文件的后台写入器
             
             self._initialized = True
         
     def _ensure_config_dir(self):
-        """确保配置目录存在"""
+        """确保配置目录存在，并把旧位置的配置文件迁移过来（只在第一次读写配置时执行）"""
+        if self._prepared:
+            return
+        self._prepared = True
         if not os.path.exists(self.config_dir):
             os.makedirs(self.config_dir)
+        
+        # 检查是否存在旧的配置文件
+        old_config_dir = os.path.expanduser("~/.sc_log_tool")
+        old_config_file = os.path.join(old_config_dir, "config.json")
+        
+        # 如果存在旧的配置文件，迁移到新位置
+        if os.path.exists(old_config_file) and not os.path.exists(self.config_file):
+            try:
+                import shutil
+                shutil.copy2(old_config_file, self.config_file)
+                # 迁移成功后删除旧的配置文件和目录
+                os.remove(old_config_file)
+                if not os.listdir(old_config_dir):  # 如果目录为空
+                    os.rmdir(old_config_dir)
+            except Exception as e:
+                Logger.get_logger().warning(f"迁移配置文件时出错: {e}")
             
     def save_state(self, opened_files: List[str], current_tab: int, keyword_groups: Dict[str, List[Union[str, Dict]]], recent_files: List[str] = None):
-        """保存程序状态"""
+        """保存程序状态
+
+        只更新内存中的状态；和上次相同时不做任何事，否则标记为待写入，
+        由 DebouncedJsonWriter 合并后在后台线程中写入配置文件。
+        """
         # 过滤掉不存在的文件
         opened_files = [f for f in opened_files if os.path.exists(f)]
         if recent_files is not None:
             recent_files = [f for f in recent_files if os.path.exists(f)]
         
-        # 转换旧格式的关键字为新格式
-        converted_groups = {}
-        for group_name, keywords in keyword_groups.items():
-            converted_keywords = []
-            for keyword in keywords:
-                if isinstance(keyword, str):
-                    # 旧格式：直接是字符串
-                    converted_keywords.append({
-                        'text': keyword,
-                        'options': {}
-                    })
-                else:
-                    # 新格式：已经是字典
-                    converted_keywords.append(keyword)
-            converted_groups[group_name] = converted_keywords
-        
         state = {
             "opened_files": opened_files,
             "current_tab": current_tab,
-            "keyword_groups": converted_groups,
+            "keyword_groups": self._convert_keyword_groups(keyword_groups),
             "recent_files": recent_files if recent_files is not None else []
         }
-        
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
+        self._ensure_state()
+        if state == self._state:
+            return
+        self._state = state
+        # 每次保存都是新的对象，后台线程序列化时不会被修改
+        self._writer.schedule(state)
             
     def load_state(self) -> Dict:
-        """加载程序状态"""
+        """加载程序状态
+
+        第一次调用时读取配置文件，之后直接返回内存中的状态（不读磁盘）。
+        返回的列表是副本，可以修改；keyword_groups 与内部共享，只读。
+        """
+        self._ensure_state()
+        return {
+            "opened_files": list(self._state["opened_files"]),
+            "current_tab": self._state["current_tab"],
+            "keyword_groups": self._state["keyword_groups"],
+            "recent_files": list(self._state["recent_files"])
+        }
+
+    def flush(self):
+        """立即写入尚未保存的状态（程序退出前调用）"""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def _ensure_state(self):
+        """第一次使用时从配置文件读出状态"""
+        if self._state is not None:
+            return
+        self._ensure_config_dir()
+        self._writer = DebouncedJsonWriter(self.config_file)
+        self._state = self._read_state_file()
+
+    def _read_state_file(self) -> Dict:
         default_state = {
             "opened_files": [],
             "current_tab": 0,
@@ -109,33 +133,32 @@ class ConfigManager(QObject):
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 state = json.load(f)
-                # 确保包含最近文件字段
-                if "recent_files" not in state:
-                    state["recent_files"] = []
-                # 确保包含关键字分组字段
-                if "keyword_groups" not in state:
-                    state["keyword_groups"] = {"default": []}
-                    
-                # 转换旧格式的关键字为新格式
-                converted_groups = {}
-                for group_name, keywords in state["keyword_groups"].items():
-                    converted_keywords = []
-                    for keyword in keywords:
-                        if isinstance(keyword, str):
-                            # 旧格式：直接是字符串
-                            converted_keywords.append({
-                                'text': keyword,
-                                'options': {}
-                            })
-                        else:
-                            # 新格式：已经是字典
-                            converted_keywords.append(keyword)
-                    converted_groups[group_name] = converted_keywords
-                state["keyword_groups"] = converted_groups
-                
-                return state
+            # 确保包含所有字段
+            for key, value in default_state.items():
+                state.setdefault(key, value)
+            state["keyword_groups"] = self._convert_keyword_groups(state["keyword_groups"])
+            return state
         except Exception:
             return default_state
+
+    @staticmethod
+    def _convert_keyword_groups(keyword_groups: Dict[str, List[Union[str, Dict]]]) -> Dict[str, List[Dict]]:
+        """转换旧格式的关键字为新格式"""
+        converted_groups = {}
+        for group_name, keywords in keyword_groups.items():
+            converted_keywords = []
+            for keyword in keywords:
+                if isinstance(keyword, str):
+                    # 旧格式：直接是字符串
+                    converted_keywords.append({
+                        'text': keyword,
+                        'options': {}
+                    })
+                else:
+                    # 新格式：已经是字典
+                    converted_keywords.append(keyword)
+            converted_groups[group_name] = converted_keywords
+        return converted_groups
             
     def update_recent_files(self, filepath: str, is_close: bool = False) -> List[str]:
         """更新最近文件列表
@@ -144,7 +167,6 @@ class ConfigManager(QObject):
             filepath: 文件路径
             is_close: 是否是关闭文件操作
         """
-        print(f"update_recent_files called: filepath={filepath}, is_close={is_close}")
         state = self.load_state()
         recent_files = state.get("recent_files", [])
         opened_files = state.get("opened_files", [])
@@ -173,7 +195,6 @@ class ConfigManager(QObject):
         # 只保留除当前打开文件外的八条记录
         recent_files = [f for f in recent_files if f not in opened_files][:8]
         
-        print(f"Recent files before save: {recent_files}")
         
         # 更新状态
         state["recent_files"] = recent_files
@@ -185,7 +206,6 @@ class ConfigManager(QObject):
             recent_files
         )
         
-        print("Emitting recentFilesChanged signal")
         # 发送信号
         self.recentFilesChanged.emit()
         
@@ -225,7 +245,6 @@ class ConfigManager(QObject):
                 state.get("keyword_groups", {"default": []}),
                 recent_files
             )
-            print(f"recentFilesChanged: {recent_files}")
             # 发送信号
             self.recentFilesChanged.emit()
         return recent_files 
\ No newline at end of file
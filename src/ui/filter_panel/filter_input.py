@@ -2,24 +2,26 @@ from PyQt6.QtWidgets import (QWidget, QTextEdit, QVBoxLayout, QHBoxLayout,
                            QPushButton, QLineEdit, QMessageBox, QSplitter,
                            QListWidget, QListWidgetItem, QLabel, QTreeWidget,
                            QTreeWidgetItem, QInputDialog, QMenu, QDialog, QDialogButtonBox,
-                           QCheckBox)
+                           QCheckBox, QSpinBox)
 from PyQt6.QtCore import pyqtSignal, Qt, QSize, QPoint
 from PyQt6.QtGui import (QFont, QTextCursor, QIcon, QColor, QPalette, 
                       QTextCharFormat, QCursor, QKeySequence, QAction)
 from src.utils.highlighter import LogHighlighter
-from src.ui.filter_panel.filter_engine import FilterEngine
+from src.utils.filter_engine import FilterEngine
 from src.resources.theme import THEME
 from src.utils.logger import log_ui_event
-from typing import Dict, List, TYPE_CHECKING
+from typing import Dict, List, Tuple, TYPE_CHECKING
 import re
 import json
 import os
 from src.utils.expression_parser import FilterOptions
+from src.utils.context_lines import MAX_CONTEXT_LINES
 from src.ui.keyword_panel.keyword_dialog import SCKeywordDialog
 
 class SCFilterInput(QWidget):
     filterChanged = pyqtSignal(str)
     navigateToMatch = pyqtSignal(int)  # 新增信号，用于导航到指定匹配项
+    contextChanged = pyqtSignal(int, int)  # 上下文行数变化（匹配行之前、之后的行数）
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -30,6 +32,7 @@ class SCFilterInput(QWidget):
         self.case_sensitive = False  # 默认不区分大小写
         self.whole_word = False      # 默认不严格匹配单词
         self.use_regex = False       # 默认不使用正则表达式
+        self.use_query = False       # 默认不按查询语法解析
         self.setup_shortcuts()  # 添加快捷键设置
         
     def setup_shortcuts(self):
@@ -81,13 +84,6 @@ class SCFilterInput(QWidget):
                 target_group = dialog.get_selected_group()
                 
                 if keyword:
-                    # 创建关键字项
-                    keyword_item = QTreeWidgetItem([alias if alias else keyword])  # 显示文本
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole, "keyword")
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole + 1, options)  # 选项
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole + 2, keyword)  # 实际关键字
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole + 3, alias)  # 别名
-                    
                     # 添加到指定分组
                     keyword_list.add_keyword(keyword, target_group, options, alias)
 
@@ -99,6 +95,7 @@ class SCFilterInput(QWidget):
         # 创建输入框
         self.input = QLineEdit()
         self.input.setPlaceholderText('输入过滤表达式')
+        self.input.setToolTip('按原文搜索；开启「Q」后按查询语法解析：error or warning、level >= W and tag:Net and not "ok"、/time(out)?/i')
         
         # 连接回车键信号
         self.input.returnPressed.connect(self._on_apply)
@@ -127,6 +124,12 @@ class SCFilterInput(QWidget):
         self.regex_btn.setFixedSize(24, 24)
         self.regex_btn.setToolTip("使用正则表达式")
         
+        # 查询语法按钮
+        self.query_btn = QPushButton("Q")
+        self.query_btn.setCheckable(True)
+        self.query_btn.setFixedSize(24, 24)
+        self.query_btn.setToolTip("查询语法：and/or/not、字段比较（level >= W、tag:Net）、带标志的关键字")
+        
         # 设置按钮样式
         option_button_style = f"""
             QPushButton {{
@@ -149,11 +152,26 @@ class SCFilterInput(QWidget):
         self.case_btn.setStyleSheet(option_button_style)
         self.word_btn.setStyleSheet(option_button_style)
         self.regex_btn.setStyleSheet(option_button_style)
+        self.query_btn.setStyleSheet(option_button_style)
         
         # 添加按钮到选项布局
         options_layout.addWidget(self.case_btn)
         options_layout.addWidget(self.word_btn)
         options_layout.addWidget(self.regex_btn)
+        options_layout.addWidget(self.query_btn)
+        
+        # 上下文行数（与 grep -B/-A 相同），只改变过滤结果的显示，不需要重新过滤
+        self.before_spin = QSpinBox()
+        self.before_spin.setPrefix("-B ")
+        self.before_spin.setToolTip("过滤结果中显示匹配行之前的行数")
+        self.after_spin = QSpinBox()
+        self.after_spin.setPrefix("-A ")
+        self.after_spin.setToolTip("过滤结果中显示匹配行之后的行数")
+        for spin in (self.before_spin, self.after_spin):
+            spin.setRange(0, MAX_CONTEXT_LINES)
+            spin.setStyleSheet(f"color: {THEME['text']};")
+            spin.valueChanged.connect(self._on_context_changed)
+            options_layout.addWidget(spin)
         
         # 匹配计数标签
         self.match_count = QLabel("0/0")
@@ -221,6 +239,7 @@ class SCFilterInput(QWidget):
         self.case_btn.clicked.connect(self._on_case_option_changed)
         self.word_btn.clicked.connect(self._on_word_option_changed)
         self.regex_btn.clicked.connect(self._on_regex_option_changed)
+        self.query_btn.clicked.connect(self._on_query_option_changed)
         
     def _on_text_changed(self, text: str):
         """处理输入框文本变化"""
@@ -244,17 +263,29 @@ class SCFilterInput(QWidget):
         self.use_regex = checked
         self._on_option_changed()
         
+    def _on_query_option_changed(self, checked: bool):
+        """处理查询语法选项变化"""
+        log_ui_event("option_change", "QueryButton", f"Checked: {checked}")
+        self.use_query = checked
+        self._on_option_changed()
+        
+    def _on_context_changed(self):
+        """处理上下文行数变化"""
+        before, after = self.get_context_lines()
+        log_ui_event("option_change", "ContextSpinBox", f"Before: {before}, After: {after}")
+        self.contextChanged.emit(before, after)
+        
     def _on_option_changed(self):
         """处理任何选项变化"""
         # 如果输入框有内容，立即应用新的过滤选项
         if self.input.text().strip():
-            print(f"on_option_changed: {self.input.text().strip()}")
             self._on_apply()
             
     def _on_apply(self):
         """处理应用过滤"""
+        self.input.setPlaceholderText('输入过滤表达式')
         text = self.input.text()
-        log_ui_event("apply_filter", "FilterInput", f"Text: {text}, Options: case={self.case_sensitive}, word={self.whole_word}, regex={self.use_regex}")
+        log_ui_event("apply_filter", "FilterInput", f"Text: {text}, Options: case={self.case_sensitive}, word={self.whole_word}, regex={self.use_regex}, query={self.use_query}")
         self.filterChanged.emit(text)
         # 让输入框失去焦点
         self.input.clearFocus()
@@ -263,14 +294,19 @@ class SCFilterInput(QWidget):
         """处理清除过滤"""
         log_ui_event("clear_filter", "FilterInput")
         self.input.clear()
+        self.input.setPlaceholderText('输入过滤表达式')
         # 清除所有配置选项
         self.case_btn.setChecked(False)
         self.word_btn.setChecked(False)
         self.regex_btn.setChecked(False)
+        self.query_btn.setChecked(False)
+        self.before_spin.setValue(0)
+        self.after_spin.setValue(0)
         # 更新内部状态
         self.case_sensitive = False
         self.whole_word = False
         self.use_regex = False
+        self.use_query = False
         # 发送过滤器变化信号
         self.filterChanged.emit("")
         self.update_match_count(0, 0)
@@ -319,6 +355,12 @@ class SCFilterInput(QWidget):
         # 立即应用过滤
         self._on_apply()
         
+    def show_group(self, name: str, keyword_count: int):
+        """正在按关键字分组过滤：清空输入框，在提示文字中显示分组名"""
+        log_ui_event("show_group", "FilterInput", f"Group: {name}, Keywords: {keyword_count}")
+        self.input.clear()
+        self.input.setPlaceholderText(f"分组：{name}（{keyword_count} 个关键字）")
+        
     def set_filter_options(self, options: dict):
         """设置过滤选项"""
         if not options:
@@ -329,15 +371,16 @@ class SCFilterInput(QWidget):
         self.case_btn.setChecked(options.get('case_sensitive', False))
         self.word_btn.setChecked(options.get('whole_word', False))
         self.regex_btn.setChecked(options.get('use_regex', False))
+        self.query_btn.setChecked(options.get('use_query', False))
         
         # 更新内部状态
         self.case_sensitive = options.get('case_sensitive', False)
         self.whole_word = options.get('whole_word', False)
         self.use_regex = options.get('use_regex', False)
+        self.use_query = options.get('use_query', False)
         
         # 如果输入框有内容，重新应用过滤器
         if self.input.text().strip():
-            print(f"set_filter_options: {self.input.text().strip()}")
             self._on_apply()
             
     def get_filter_options(self) -> dict:
@@ -345,5 +388,10 @@ class SCFilterInput(QWidget):
         return {
             'case_sensitive': self.case_sensitive,
             'whole_word': self.whole_word,
-            'use_regex': self.use_regex
+            'use_regex': self.use_regex,
+            'use_query': self.use_query
         }
+
+    def get_context_lines(self) -> Tuple[int, int]:
+        """获取上下文行数 (匹配行之前的行数, 之后的行数)"""
+        return self.before_spin.value(), self.after_spin.value()
@@ -13,7 +13,6 @@ class SCGroupSelectorDialog(QDialog):
         
     def setup_ui(self):
         """设置UI"""
-        print("[DEBUG] Setting up group selector UI")
         self.setWindowTitle("选择分组")
         layout = QVBoxLayout(self)
         
@@ -93,29 +92,25 @@ class SCGroupSelectorDialog(QDialog):
         self.tree.addTopLevelItem(default_group)
         
         # 遍历顶级分组
-        for i in range(self.keyword_list.tree.topLevelItemCount()):
-            item = self.keyword_list.tree.topLevelItem(i)
-            if item.data(0, Qt.ItemDataRole.UserRole) == "group":
-                # 创建分组项
-                group_item = QTreeWidgetItem([item.text(0)])
-                group_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                self.tree.addTopLevelItem(group_item)
-                
-                # 递归添加子分组
-                self.add_subgroups(item, group_item)
+        for group in self.keyword_list.repository.root.subgroups:
+            # 创建分组项
+            group_item = QTreeWidgetItem([group.name])
+            group_item.setData(0, Qt.ItemDataRole.UserRole, "group")
+            self.tree.addTopLevelItem(group_item)
+            
+            # 递归添加子分组
+            self.add_subgroups(group, group_item)
                 
-    def add_subgroups(self, source_item, target_item):
+    def add_subgroups(self, source_group, target_item):
         """递归添加子分组"""
-        for i in range(source_item.childCount()):
-            child = source_item.child(i)
-            if child.data(0, Qt.ItemDataRole.UserRole) == "group":
-                # 创建子分组项
-                child_item = QTreeWidgetItem([child.text(0)])
-                child_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                target_item.addChild(child_item)
-                
-                # 递归添加子分组的子分组
-                self.add_subgroups(child, child_item)
+        for subgroup in source_group.subgroups:
+            # 创建子分组项
+            child_item = QTreeWidgetItem([subgroup.name])
+            child_item.setData(0, Qt.ItemDataRole.UserRole, "group")
+            target_item.addChild(child_item)
+            
+            # 递归添加子分组的子分组
+            self.add_subgroups(subgroup, child_item)
                 
     def on_item_clicked(self, item, column):
         """处理项目点击事件"""
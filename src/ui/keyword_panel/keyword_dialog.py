@@ -7,7 +7,7 @@ from PyQt6.QtCore import pyqtSignal, Qt, QSize, QPoint, QEvent
 from PyQt6.QtGui import (QFont, QTextCursor, QIcon, QColor, QPalette, 
                       QTextCharFormat, QCursor, QKeySequence, QAction)
 from src.utils.highlighter import LogHighlighter
-from src.ui.filter_panel.filter_engine import FilterEngine
+from src.utils.filter_engine import FilterEngine
 from src.resources.theme import THEME
 from typing import Dict, List, TYPE_CHECKING
 import re
@@ -18,14 +18,12 @@ from src.ui.keyword_panel.group_selector_dialog import SCGroupSelectorDialog
 class SCKeywordDialog(QDialog):
     def __init__(self, parent=None, initial_text="", initial_options=None, initial_alias="", keyword_list=None):
         super().__init__(parent)
-        print("[DEBUG] Initializing keyword dialog")  # 添加初始化调试打印
         self.initial_text = initial_text
         self.initial_options = initial_options or {}
         self.initial_alias = initial_alias
         self.keyword_list = keyword_list
         self.selected_group = None
         self.setup_ui()
-        print("[DEBUG] Keyword dialog initialized")  # 打印初始化完成状态
         # 设置对话框宽度为屏幕的1/3，高度自适应
         screen = self.screen()
         screen_size = screen.size()
@@ -100,7 +98,8 @@ class SCKeywordDialog(QDialog):
         checkboxes_layout.addWidget(self.case_sensitive)
         
         self.word_only = QCheckBox("全词匹配")
-        self.word_only.setChecked(self.initial_options.get("word_only", False))
+        # 旧版本保存的关键字中全词匹配叫 word_only
+        self.word_only.setChecked(self.initial_options.get("whole_word", self.initial_options.get("word_only", False)))
         self.word_only.setStyleSheet(f"color: {THEME['text']}")
         checkboxes_layout.addWidget(self.word_only)
         
@@ -137,32 +136,23 @@ class SCKeywordDialog(QDialog):
     def eventFilter(self, obj, event):
         """事件过滤器"""
         if obj == self.group_input and event.type() == QEvent.Type.MouseButtonPress:
-            print("[DEBUG] Group input clicked through event filter")
             self.show_group_selector(event)
             return True
         return super().eventFilter(obj, event)
 
     def show_group_selector(self, event=None):
         """显示分组选择器"""
-        print("[DEBUG] Show group selector called")
         
         # 获取关键字列表
         keyword_list = self.keyword_list
-        print(f"[DEBUG] Using keyword_list: {keyword_list}")
         
         if keyword_list:
             dialog = SCGroupSelectorDialog(keyword_list, self)
-            print("[DEBUG] Group selector dialog created")
-            print("[DEBUG] About to show dialog")
             result = dialog.exec()
-            print(f"[DEBUG] Dialog exec result: {result}")
             
             if result == QDialog.DialogCode.Accepted:
                 self.selected_group = dialog.get_selected_group()
                 self.group_input.setText(self.selected_group)
-                print(f"[DEBUG] Selected group: {self.selected_group}")
-        else:
-            print("[DEBUG] No keyword_list available")
         
     def get_keyword(self):
         """获取关键字"""
@@ -176,7 +166,7 @@ class SCKeywordDialog(QDialog):
         """获取匹配选项"""
         return {
             "case_sensitive": self.case_sensitive.isChecked(),
-            "word_only": self.word_only.isChecked(),
+            "whole_word": self.word_only.isChecked(),
             "use_regex": self.use_regex.isChecked()
         }
         
@@ -6,7 +6,7 @@ from PyQt6.QtCore import pyqtSignal, Qt, QSize, QPoint
 from PyQt6.QtGui import (QFont, QTextCursor, QIcon, QColor, QPalette, 
                       QTextCharFormat, QCursor, QKeySequence, QAction)
 from src.utils.highlighter import LogHighlighter
-from src.ui.filter_panel.filter_engine import FilterEngine
+from src.utils.filter_engine import FilterEngine
 from src.resources.theme import THEME
 from typing import Dict, List, TYPE_CHECKING
 import re
@@ -0,0 +1,165 @@
+from typing import Dict, Optional, Union
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PyQt6.QtGui import QColor, QIcon, QPixmap
+from src.utils.keyword_repository import Keyword, KeywordGroup, KeywordRepository
+
+# 与原来 QTreeWidgetItem 上的数据角色保持一致
+KIND_ROLE = Qt.ItemDataRole.UserRole           # "group" / "keyword"
+OPTIONS_ROLE = Qt.ItemDataRole.UserRole + 1     # 匹配选项
+TEXT_ROLE = Qt.ItemDataRole.UserRole + 2        # 实际关键字
+ALIAS_ROLE = Qt.ItemDataRole.UserRole + 3       # 别名
+
+
+class KeywordTreeModel(QAbstractItemModel):
+    """把 KeywordRepository 显示为树：分组在前，关键字在后
+
+    模型本身不保存数据，内部指针直接指向仓库中的分组和关键字对象；
+    仓库的修改事件转换为对应的 begin/end 调用，视图只更新受影响的行。
+    匹配次数（set_hit_counts）显示在名称后面，分组显示其下所有关键字的次数之和。
+    """
+
+    def __init__(self, repository: KeywordRepository, parent=None):
+        super().__init__(parent)
+        self.repository = repository
+        self.hit_counts: Dict[Union[KeywordGroup, Keyword], int] = {}  # 关键字/分组 -> 匹配次数
+        self.colors: Dict[Keyword, str] = {}  # 关键字 -> 高亮颜色
+        self._icons: Dict[str, QIcon] = {}
+        repository.add_listener(self._on_repository_event)
+
+    def set_hit_counts(self, counts: Dict[Keyword, int], colors: Optional[Dict[Keyword, str]] = None):
+        """设置关键字的匹配次数（替换之前的结果）和高亮颜色（为 None 时保持不变），只刷新受影响的行"""
+        hit_counts = dict(counts)
+        for keyword, count in counts.items():
+            group = keyword.group
+            while group is not None and group is not self.repository.root:
+                hit_counts[group] = hit_counts.get(group, 0) + count
+                group = group.parent
+        changed = {node for node in set(self.hit_counts) | set(hit_counts)
+                   if self.hit_counts.get(node) != hit_counts.get(node)}
+        if colors is not None:
+            changed |= set(self.colors) | set(colors)
+            self.colors = dict(colors)
+        self.hit_counts = hit_counts
+        self._emit_changed(changed)
+
+    def keyword_hit_counts(self) -> Dict[Keyword, int]:
+        """当前显示的关键字匹配次数（不含分组的合计）"""
+        return {node: count for node, count in self.hit_counts.items() if isinstance(node, Keyword)}
+
+    def _emit_changed(self, nodes):
+        """按父分组合并为每个分组一次 dataChanged（已从仓库中删除的节点跳过）"""
+        by_parent = {}
+        for node in nodes:
+            parent = node.group if isinstance(node, Keyword) else node.parent
+            if parent is not None:
+                by_parent.setdefault(parent, []).append(node)
+        for parent, children in by_parent.items():
+            if not self._is_attached(parent):
+                continue
+            rows = {id(child): row for row, child in enumerate(parent.subgroups)}
+            rows.update((id(child), len(parent.subgroups) + row) for row, child in enumerate(parent.keywords))
+            changed_rows = [rows[id(child)] for child in children if id(child) in rows]
+            if changed_rows:
+                parent_index = self.index_of(parent)
+                self.dataChanged.emit(self.index(min(changed_rows), 0, parent_index),
+                                      self.index(max(changed_rows), 0, parent_index))
+
+    def _is_attached(self, group: KeywordGroup) -> bool:
+        """分组是否仍在仓库中"""
+        while group.parent is not None:
+            if group.parent.subgroup(group.name) is not group:
+                return False
+            group = group.parent
+        return group is self.repository.root
+
+    def _color_icon(self, color: str) -> QIcon:
+        icon = self._icons.get(color)
+        if icon is None:
+            pixmap = QPixmap(10, 10)
+            pixmap.fill(QColor(color))
+            icon = self._icons[color] = QIcon(pixmap)
+        return icon
+
+    def node(self, index: QModelIndex) -> Union[KeywordGroup, Keyword]:
+        """索引对应的分组或关键字，无效索引对应根分组"""
+        if not index.isValid():
+            return self.repository.root
+        return index.internalPointer()
+
+    def index_of(self, node: Union[KeywordGroup, Keyword, None]) -> QModelIndex:
+        """分组或关键字对应的索引"""
+        parent = node.group if isinstance(node, Keyword) else (node.parent if node is not None else None)
+        if parent is None:
+            return QModelIndex()
+        return self.createIndex(parent.row_of(node), 0, node)
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        group = self.node(parent)
+        if column != 0 or not isinstance(group, KeywordGroup) or not 0 <= row < group.child_count():
+            return QModelIndex()
+        return self.createIndex(row, 0, group.child(row))
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        parent = node.group if isinstance(node, Keyword) else node.parent
+        if parent is None or parent is self.repository.root:
+            return QModelIndex()
+        return self.index_of(parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        node = self.node(parent)
+        return node.child_count() if isinstance(node, KeywordGroup) else 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return self.rowCount(parent) > 0
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if isinstance(node, KeywordGroup):
+            if role == Qt.ItemDataRole.DisplayRole:
+                count = self.hit_counts.get(node)
+                return node.name if count is None else f"{node.name} ({count})"
+            if role == KIND_ROLE:
+                return "group"
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            count = self.hit_counts.get(node)
+            return node.display_text if count is None else f"{node.display_text} ({count})"
+        if role == Qt.ItemDataRole.DecorationRole:
+            color = self.colors.get(node)
+            return self._color_icon(color) if color else None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return node.text if node.alias else None
+        if role == KIND_ROLE:
+            return "keyword"
+        if role == OPTIONS_ROLE:
+            return node.options
+        if role == TEXT_ROLE:
+            return node.text
+        if role == ALIAS_ROLE:
+            return node.alias
+        return None
+
+    def _on_repository_event(self, event: str, group: Optional[KeywordGroup], first: int, last: int):
+        if event == "before_reset":
+            self.beginResetModel()
+        elif event == "after_reset":
+            self.endResetModel()
+        elif event == "before_insert":
+            self.beginInsertRows(self.index_of(group), first, last)
+        elif event == "after_insert":
+            self.endInsertRows()
+        elif event == "before_remove":
+            self.beginRemoveRows(self.index_of(group), first, last)
+        elif event == "after_remove":
+            self.endRemoveRows()
+        elif event == "changed":
+            parent = self.index_of(group)
+            self.dataChanged.emit(self.index(first, 0, parent), self.index(last, 0, parent))
@@ -1,28 +1,76 @@
-from PyQt6.QtWidgets import (QWidget, QTextEdit, QVBoxLayout, QHBoxLayout,
-                           QPushButton, QLineEdit, QMessageBox, QSplitter,
-                           QListWidget, QListWidgetItem, QLabel, QTreeWidget,
-                           QTreeWidgetItem, QInputDialog, QMenu, QDialog, QDialogButtonBox)
-from PyQt6.QtCore import pyqtSignal, Qt, QSize, QPoint
-from PyQt6.QtGui import (QFont, QTextCursor, QIcon, QColor, QPalette, 
-                      QTextCharFormat, QCursor, QKeySequence, QAction)
-from src.utils.highlighter import LogHighlighter
-from src.ui.filter_panel.filter_engine import FilterEngine
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QMessageBox, QTreeView,
+                           QInputDialog, QMenu, QDialog, QFileDialog)
+from PyQt6.QtCore import pyqtSignal, Qt, QPoint, QModelIndex, QObject, QThread, QTimer
 from src.resources.theme import THEME
 from src.utils.const import KEYWORDS_FILE
+from src.utils.keyword_repository import (GROUP_SEPARATOR, Keyword, KeywordGroup,
+                                          KeywordRepository, read_keyword_file)
+from src.utils.highlighter import keyword_color
+from src.utils.hit_counter import HitCountCache, rule_key
+from src.utils.logger import Logger
+from src.utils.multi_pattern import normalize_options
+from src.utils.state_writer import DebouncedJsonWriter
 from src.ui.keyword_panel.keyword_dialog import SCKeywordDialog
-from typing import Dict, List, TYPE_CHECKING
-import re
-import json
+from src.ui.keyword_panel.keyword_model import KeywordTreeModel
+from typing import Dict, List
 import os
+
+# 关键字文件的写入器，所有关键字列表共用
+_keywords_writer = DebouncedJsonWriter(KEYWORDS_FILE)
+# 已保存关键字在各个文件中的匹配次数
+_hit_count_cache = HitCountCache()
+# 切换标签页或修改关键字后等待多久再开始统计（毫秒），连续的操作只统计一次
+HIT_COUNT_DELAY_MS = 300
+
+
+class HitCountWorker(QObject):
+    """在后台统计所有已保存关键字在文件中的匹配次数"""
+    finished = pyqtSignal(str, object)  # 文件路径, {rule_key: 次数}
+    error = pyqtSignal(str)
+    
+    def __init__(self, filepath: str, rules: list):
+        super().__init__()
+        self.filepath = filepath
+        self.rules = rules
+        self.is_cancelled = False
+        
+    def cancel(self):
+        self.is_cancelled = True
+        
+    def process(self):
+        try:
+            counts = _hit_count_cache.count(self.filepath, self.rules, lambda: self.is_cancelled)
+            if counts is not None and not self.is_cancelled:
+                self.finished.emit(self.filepath, counts)
+        except Exception as e:
+            if not self.is_cancelled:
+                self.error.emit(str(e))
+
 class SCSavedKeywordList(QWidget):
     keywordSelected = pyqtSignal(str, dict)  # 修改信号以包含选项
+    keywordGroupSelected = pyqtSignal(str, list)  # 运行整个分组（分组路径, [(关键字, 选项)]）
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.current_group = "default"  # 默认选中的分组
+        self.current_group = "default"  # 默认选中的分组（路径）
         self.last_selected_group = None  # 记录最后一次选中关键字所在的分组
         self.current_filter_text = ""  # 存储当前过滤框中的文本
         self.current_filter_options = None  # 存储当前过滤选项
+        self._group_run = None  # 最近一次运行的分组 (路径, [关键字])
+        self.active_file = ""  # 当前标签页的文件，统计其中每个关键字的匹配次数
+        self.hit_count_thread = None
+        self.hit_count_worker = None
+        self._hit_count_pending = False  # 统计进行中又有新的请求，结束后重新统计
+        self._hit_count_timer = QTimer(self)
+        self._hit_count_timer.setSingleShot(True)
+        self._hit_count_timer.setInterval(HIT_COUNT_DELAY_MS)
+        self._hit_count_timer.timeout.connect(self._start_hit_count)
+        
+        # 关键字数据保存在仓库中，树形视图只负责显示
+        self.repository = KeywordRepository()
+        self.model = KeywordTreeModel(self.repository, self)
+        # 关键字变化后重新统计（只有新增的关键字需要扫描文件）
+        self.repository.add_listener(self._on_repository_event)
         
         # 确保存储目录存在
         os.makedirs(os.path.dirname(KEYWORDS_FILE), exist_ok=True)
@@ -31,21 +79,14 @@ class SCSavedKeywordList(QWidget):
         self.load_from_file()  # 从文件加载保存的关键字
         
     def save_to_file(self):
-        """保存关键字到文件"""
-        try:
-            keywords = self.get_all_keywords()
-            with open(KEYWORDS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(keywords, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            QMessageBox.warning(self, "保存失败", f"保存关键字失败：{str(e)}")
+        """保存关键字到文件（短时间内的多次保存合并为一次，在后台线程中写入）"""
+        _keywords_writer.schedule(self.get_all_keywords())
             
     def load_from_file(self):
         """从文件加载关键字"""
         try:
             if os.path.exists(KEYWORDS_FILE):
-                with open(KEYWORDS_FILE, 'r', encoding='utf-8') as f:
-                    keywords = json.load(f)
-                self.load_keywords(keywords)
+                self.load_keywords(read_keyword_file(KEYWORDS_FILE))
             else:
                 # 如果文件不存在，创建默认分组
                 self.load_keywords({"default": []})
@@ -59,102 +100,76 @@ class SCSavedKeywordList(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         
         # 创建树形视图
-        self.tree = QTreeWidget()
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
         self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
         self.tree.setStyleSheet(f"""
-            QTreeWidget {{
+            QTreeView {{
                 background-color: {THEME['background']};
                 border: 1px solid {THEME['border']};
                 border-radius: 4px;
             }}
-            QTreeWidget::item {{
+            QTreeView::item {{
                 color: {THEME['text']};
                 padding: 4px;
             }}
-            QTreeWidget::item:selected {{
+            QTreeView::item:selected {{
                 background-color: {THEME['highlight_bg']};
             }}
-            QTreeWidget::item:hover {{
+            QTreeView::item:hover {{
                 background-color: {THEME['hover_bg']};
             }}
         """)
-        self.tree.itemClicked.connect(self._on_item_clicked)
+        self.tree.clicked.connect(self._on_item_clicked)
         self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self._show_context_menu)
         
         layout.addWidget(self.tree)
 
-    def _check_duplicate_group_name(self, parent_item: QTreeWidgetItem, name: str) -> bool:
-        """检查同级分组中是否存在相同名称
-        
-        Args:
-            parent_item: 父分组项，如果是顶级分组则为None
-            name: 要检查的分组名称
-            
-        Returns:
-            bool: 如果存在重名返回True，否则返回False
-        """
-        if parent_item is None:
-            # 检查顶级分组
-            for i in range(self.tree.topLevelItemCount()):
-                item = self.tree.topLevelItem(i)
-                if item.data(0, Qt.ItemDataRole.UserRole) == "group" and item.text(0) == name:
-                    return True
-        else:
-            # 检查子分组
-            for i in range(parent_item.childCount()):
-                child = parent_item.child(i)
-                if child.data(0, Qt.ItemDataRole.UserRole) == "group" and child.text(0) == name:
-                    return True
-        return False
-
-    def _add_sub_group(self, parent_item: QTreeWidgetItem):
-        """添加子分组"""
-        # 创建输入对话框
+    def _ask_group_name(self, title: str, label: str, text: str = "") -> str:
+        """弹出输入分组名称的对话框，取消时返回空字符串"""
         dialog = QInputDialog(self)
-        dialog.setWindowTitle("新建分组")
-        dialog.setLabelText("请输入分组名称：")
+        dialog.setWindowTitle(title)
+        dialog.setLabelText(label)
+        dialog.setTextValue(text)
         # 设置对话框大小为屏幕的1/3
         screen = dialog.screen()
         screen_size = screen.size()
-        dialog_width = screen_size.width() // 3
-        dialog_height = screen_size.height() // 3
-        dialog.resize(dialog_width, dialog_height)
+        dialog.resize(screen_size.width() // 3, screen_size.height() // 3)
         # 将对话框移动到屏幕中心
         dialog.move(screen.geometry().center() - dialog.frameGeometry().center())
-        
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            name = dialog.textValue()
-            if name:
-                if name == "default":
-                    QMessageBox.warning(self, "警告", "不能使用保留名称 'default'")
-                    return
-                # 检查是否已存在同名分组
-                if self._check_duplicate_group_name(parent_item, name):
-                    QMessageBox.warning(self, "警告", "该分组名称已存在于同级分组中")
-                    return
-                
-                # 创建新分组
-                group_item = QTreeWidgetItem([name])
-                group_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                
-                # 找到插入位置（在所有子分组之后，关键字之前）
-                insert_pos = 0
-                for i in range(parent_item.childCount()):
-                    child = parent_item.child(i)
-                    if child.data(0, Qt.ItemDataRole.UserRole) != "group":
-                        break
-                    insert_pos += 1
-                
-                # 在正确的位置插入新分组
-                parent_item.insertChild(insert_pos, group_item)
-                parent_item.setExpanded(True)
-                group_item.setExpanded(True)
-                
-                # 保存到文件
-                self.save_to_file()
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return ""
+        name = dialog.textValue().strip()
+        if name == "default":
+            QMessageBox.warning(self, "警告", "不能使用保留名称 'default'")
+            return ""
+        if GROUP_SEPARATOR in name:
+            QMessageBox.warning(self, "警告", f"分组名称不能包含 '{GROUP_SEPARATOR}'")
+            return ""
+        return name
+
+    def _expand(self, group: KeywordGroup):
+        """展开分组（包括其所有上级分组）"""
+        while group is not None and group is not self.repository.root:
+            self.tree.expand(self.model.index_of(group))
+            group = group.parent
+
+    def _add_sub_group(self, parent_group: KeywordGroup):
+        """添加子分组"""
+        name = self._ask_group_name("新建分组", "请输入分组名称：")
+        if not name:
+            return
+        group = self.repository.add_group(parent_group, name)
+        if group is None:
+            QMessageBox.warning(self, "警告", "该分组名称已存在于同级分组中")
+            return
+        self._expand(group)
+        # 保存到文件
+        self.save_to_file()
 
-    def _add_keyword_to_group(self, parent_item: QTreeWidgetItem):
+    def _add_keyword_to_group(self, group: KeywordGroup):
         """添加关键字到分组"""
         # 获取主窗口实例
         main_window = self.window()
@@ -176,170 +191,199 @@ class SCSavedKeywordList(QWidget):
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             keyword = dialog.get_keyword()
-            alias = dialog.get_alias()
-            options = dialog.get_options()
-            
             if keyword:
-                # 检查是否已存在
-                for i in range(parent_item.childCount()):
-                    child = parent_item.child(i)
-                    if (child.data(0, Qt.ItemDataRole.UserRole) != "group" and 
-                        child.data(0, Qt.ItemDataRole.UserRole + 2) == keyword):
-                        QMessageBox.warning(self, "警告", "该关键字已存在")
-                        return
-                
-                # 创建关键字项
-                keyword_item = QTreeWidgetItem([alias if alias else keyword])  # 显示文本
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole, "keyword")
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 1, options)  # 选项
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 2, keyword)  # 实际关键字
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 3, alias)  # 别名
-                
-                # 找到插入位置（在所有子分组之后）
-                insert_pos = 0
-                for i in range(parent_item.childCount()):
-                    child = parent_item.child(i)
-                    if child.data(0, Qt.ItemDataRole.UserRole) == "group":
-                        insert_pos += 1
-                    else:
-                        break
-                
-                # 在正确的位置插入关键字
-                parent_item.insertChild(insert_pos, keyword_item)
-                parent_item.setExpanded(True)
-                
+                if self.repository.add_keyword(group, keyword, dialog.get_alias(), dialog.get_options()) is None:
+                    QMessageBox.warning(self, "警告", "该关键字已存在")
+                    return
+                self._expand(group)
                 # 保存到文件
                 self.save_to_file()
 
     def add_group(self):
         """添加顶级分组"""
-        # 创建输入对话框
-        dialog = QInputDialog(self)
-        dialog.setWindowTitle("新建分组")
-        dialog.setLabelText("请输入分组名称：")
-        # 设置对话框大小为屏幕的1/3
-        screen = dialog.screen()
-        screen_size = screen.size()
-        dialog_width = screen_size.width() // 3
-        dialog_height = screen_size.height() // 3
-        dialog.resize(dialog_width, dialog_height)
-        # 将对话框移动到屏幕中心
-        dialog.move(screen.geometry().center() - dialog.frameGeometry().center())
-        
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            name = dialog.textValue()
-            if name:
-                if name == "default":
-                    QMessageBox.warning(self, "警告", "不能使用保留名称 'default'")
-                    return
-                # 检查是否已存在同名分组
-                if self._check_duplicate_group_name(None, name):
-                    QMessageBox.warning(self, "警告", "该分组名称已存在于顶级分组中")
-                    return
-                    
-                group_item = QTreeWidgetItem([name])
-                group_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                self.tree.addTopLevelItem(group_item)
-                group_item.setExpanded(True)
-                
-                # 保存到文件
-                self.save_to_file()
+        name = self._ask_group_name("新建分组", "请输入分组名称：")
+        if not name:
+            return
+        group = self.repository.add_group(self.repository.root, name)
+        if group is None:
+            QMessageBox.warning(self, "警告", "该分组名称已存在于顶级分组中")
+            return
+        # 保存到文件
+        self.save_to_file()
 
-    def delete_group(self, item: QTreeWidgetItem):
+    def delete_group(self, group: KeywordGroup):
         """删除分组"""
         reply = QMessageBox.question(self, "确认删除",
-                                   f"确定要删除分组 '{item.text(0)}' 及其所有内容吗？",
+                                   f"确定要删除分组 '{group.name}' 及其所有内容吗？",
                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            parent = item.parent()
-            if parent:
-                parent.removeChild(item)
-            else:
-                self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(item))
+            self.repository.remove_group(group)
             # 保存到文件
             self.save_to_file()
 
-    def delete_keyword(self, parent_item: QTreeWidgetItem, keyword_item: QTreeWidgetItem):
+    def delete_keyword(self, keyword: Keyword):
         """删除关键字"""
         reply = QMessageBox.question(self, "确认删除",
-                                   f"确定要删除关键字 '{keyword_item.text(0)}' 吗？",
+                                   f"确定要删除关键字 '{keyword.display_text}' 吗？",
                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            parent_item.removeChild(keyword_item)
+            self.repository.remove_keyword(keyword)
             # 保存到文件
             self.save_to_file()
 
-    def rename_group(self, item: QTreeWidgetItem):
+    def rename_group(self, group: KeywordGroup):
         """重命名分组"""
-        old_name = item.text(0)
-        # 创建输入对话框
-        dialog = QInputDialog(self)
-        dialog.setWindowTitle("重命名分组")
-        dialog.setLabelText("请输入新的分组名称：")
-        dialog.setTextValue(old_name)
-        # 设置对话框大小为屏幕的1/3
-        screen = dialog.screen()
-        screen_size = screen.size()
-        dialog_width = screen_size.width() // 3
-        dialog_height = screen_size.height() // 3
-        dialog.resize(dialog_width, dialog_height)
-        # 将对话框移动到屏幕中心
-        dialog.move(screen.geometry().center() - dialog.frameGeometry().center())
-        
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            new_name = dialog.textValue()
-            if new_name and new_name != old_name:
-                if new_name == "default":
-                    QMessageBox.warning(self, "警告", "不能使用保留名称 'default'")
-                    return
-                    
-                # 检查是否与同级分组重名
-                parent = item.parent()
-                if self._check_duplicate_group_name(parent, new_name):
-                    QMessageBox.warning(self, "警告", "该分组名称已存在于同级分组中")
-                    return
-                        
-                item.setText(0, new_name)
-                # 保存到文件
-                self.save_to_file()
+        old_name = group.name
+        new_name = self._ask_group_name("重命名分组", "请输入新的分组名称：", old_name)
+        if not new_name or new_name == old_name:
+            return
+        # 检查是否与同级分组重名
+        if not self.repository.rename_group(group, new_name):
+            QMessageBox.warning(self, "警告", "该分组名称已存在于同级分组中")
+            return
+        # 保存到文件
+        self.save_to_file()
 
-    def _edit_keyword(self, parent_item: QTreeWidgetItem, keyword_item: QTreeWidgetItem):
+    def _edit_keyword(self, keyword: Keyword):
         """修改关键字"""
-        # 获取当前关键字的文本、别名和选项
-        current_text = keyword_item.data(0, Qt.ItemDataRole.UserRole + 2) or keyword_item.text(0)  # 获取实际的关键字
-        current_alias = keyword_item.data(0, Qt.ItemDataRole.UserRole + 3) or ""  # 获取别名
-        current_options = keyword_item.data(0, Qt.ItemDataRole.UserRole + 1) or {}
-        
         # 创建修改关键字对话框
-        dialog = SCKeywordDialog(self, current_text, current_options, current_alias, keyword_list=self)
+        dialog = SCKeywordDialog(self, keyword.text, keyword.options, keyword.alias, keyword_list=self)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_text = dialog.get_keyword()
-            new_alias = dialog.get_alias()
-            new_options = dialog.get_options()
-            
             if new_text:
                 # 检查是否与其他关键字重名（排除自己）
-                for i in range(parent_item.childCount()):
-                    child = parent_item.child(i)
-                    if (child != keyword_item and 
-                        child.data(0, Qt.ItemDataRole.UserRole) != "group" and 
-                        child.data(0, Qt.ItemDataRole.UserRole + 2) == new_text):
-                        QMessageBox.warning(self, "警告", "该关键字已存在")
-                        return
-                
-                # 更新关键字文本、别名和选项
-                keyword_item.setText(0, new_alias if new_alias else new_text)  # 显示文本
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 2, new_text)  # 实际关键字
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 3, new_alias)  # 别名
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 1, new_options)  # 选项
-                
+                if not self.repository.update_keyword(keyword, new_text, dialog.get_alias(), dialog.get_options()):
+                    QMessageBox.warning(self, "警告", "该关键字已存在")
+                    return
                 # 保存到文件
                 self.save_to_file()
 
+    def run_group(self, group: KeywordGroup):
+        """把分组（包括子分组）中的所有关键字作为一个过滤条件运行"""
+        keywords = list(group.iter_keywords())
+        if not keywords:
+            QMessageBox.information(self, "提示", f"分组 '{group.path}' 中没有关键字")
+            return
+        self._group_run = (group.path, keywords)
+        # 先显示每个关键字的颜色，匹配次数在过滤完成后更新
+        self.model.set_hit_counts(self.model.keyword_hit_counts(),
+                                  {keyword: keyword_color(i) for i, keyword in enumerate(keywords)})
+        self.keywordGroupSelected.emit(group.path, [(keyword.text, keyword.options) for keyword in keywords])
+
+    def set_group_hit_counts(self, group_path: str, counts: List[int]):
+        """显示运行分组得到的每个关键字的匹配次数（顺序与 keywordGroupSelected 发出的一致）"""
+        if self._group_run is None:
+            return
+        path, keywords = self._group_run
+        if path != group_path or len(keywords) != len(counts):
+            return
+        # 其他关键字保留后台统计的次数
+        hit_counts = self.model.keyword_hit_counts()
+        hit_counts.update(zip(keywords, counts))
+        self.model.set_hit_counts(hit_counts, {keyword: keyword_color(i) for i, keyword in enumerate(keywords)})
+
+    def set_active_file(self, filepath: str):
+        """当前标签页的文件变化：在后台统计每个已保存关键字在其中的匹配次数"""
+        if filepath != self.active_file:
+            self.active_file = filepath
+            self.model.set_hit_counts({})
+        self._schedule_hit_count()
+
+    def _on_repository_event(self, event: str, group, first: int, last: int):
+        if event in ("after_insert", "after_remove", "changed", "after_reset"):
+            self._schedule_hit_count()
+
+    def _schedule_hit_count(self):
+        if self.active_file:
+            self._hit_count_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 隐藏期间不统计，显示时补上
+        self._schedule_hit_count()
+
+    def _start_hit_count(self):
+        """启动后台统计（面板隐藏时不统计）"""
+        if not self.active_file or not self.isVisible():
+            return
+        if self.hit_count_thread is not None:
+            # 不等待正在进行的统计，让它尽快结束后再重新开始
+            self.hit_count_worker.cancel()
+            self._hit_count_pending = True
+            return
+        rules = [(keyword.text, keyword.options) for keyword in self.repository.root.iter_keywords()]
+        if not rules:
+            return
+        self.hit_count_thread = QThread()
+        self.hit_count_worker = HitCountWorker(self.active_file, rules)
+        self.hit_count_worker.moveToThread(self.hit_count_thread)
+        self.hit_count_thread.started.connect(self.hit_count_worker.process)
+        self.hit_count_worker.finished.connect(self._on_hits_counted)
+        self.hit_count_worker.error.connect(self._on_hit_count_error)
+        self.hit_count_worker.finished.connect(self.hit_count_thread.quit)
+        self.hit_count_worker.error.connect(self.hit_count_thread.quit)
+        self.hit_count_thread.finished.connect(self._on_hit_count_thread_finished)
+        # 低优先级，不影响界面响应
+        self.hit_count_thread.start(QThread.Priority.LowestPriority)
+
+    def _on_hit_count_thread_finished(self):
+        self._cleanup_hit_count_thread()
+        if self._hit_count_pending:
+            self._hit_count_pending = False
+            self._start_hit_count()
+
+    def _on_hits_counted(self, filepath: str, counts: dict):
+        """在每个关键字后面显示匹配次数"""
+        if filepath != self.active_file:
+            return
+        hit_counts = {}
+        for keyword in self.repository.root.iter_keywords():
+            count = counts.get(rule_key(keyword.text, keyword.options))
+            if count is not None:
+                hit_counts[keyword] = count
+        self.model.set_hit_counts(hit_counts)
+
+    def _on_hit_count_error(self, error_message: str):
+        Logger.get_logger().warning(f"统计关键字匹配次数失败: {error_message}")
+
+    def cancel_hit_count(self):
+        """停止后台统计（关闭窗口时调用）"""
+        self._hit_count_timer.stop()
+        self._hit_count_pending = False
+        if self.hit_count_thread is not None:
+            self.hit_count_worker.cancel()
+            self.hit_count_thread.quit()
+            self.hit_count_thread.wait()
+            self._cleanup_hit_count_thread()
+
+    def _cleanup_hit_count_thread(self):
+        if self.hit_count_worker is not None:
+            self.hit_count_worker.deleteLater()
+            self.hit_count_worker = None
+        if self.hit_count_thread is not None:
+            self.hit_count_thread.deleteLater()
+            self.hit_count_thread = None
+
+    def import_keywords(self):
+        """从文件导入关键字（keywords.json 或 config.json），合并到已有分组中"""
+        filepath, _ = QFileDialog.getOpenFileName(self, "导入关键字", "", "JSON 文件 (*.json);;所有文件 (*.*)")
+        if not filepath:
+            return
+        try:
+            keyword_groups = read_keyword_file(filepath)
+        except (OSError, ValueError, AttributeError, TypeError, KeyError) as e:
+            QMessageBox.warning(self, "导入失败", f"读取关键字文件失败：{str(e)}")
+            return
+        added, skipped = self.repository.merge(keyword_groups)
+        self.tree.expandAll()
+        self.save_to_file()
+        QMessageBox.information(self, "导入完成", f"导入 {added} 个关键字，跳过 {skipped} 个已存在的关键字")
+
     def _show_context_menu(self, position: QPoint):
         """显示上下文菜单"""
-        item = self.tree.itemAt(position)
+        index = self.tree.indexAt(position)
+        node = self.model.node(index) if index.isValid() else None
         
         menu = QMenu()
         menu.setStyleSheet(f"""
@@ -353,238 +397,90 @@ class SCSavedKeywordList(QWidget):
             }}
         """)
         
-        if item:
-            # 如果点击的是分组（包括顶级分组和子分组）
-            if item.data(0, Qt.ItemDataRole.UserRole) == "group":
-                # 添加新建子分组选项
-                new_sub_group_action = menu.addAction("新建分组")
-                new_sub_group_action.triggered.connect(lambda: self._add_sub_group(item))
-                
-                # 添加添加关键字选项
-                add_keyword_action = menu.addAction("添加关键字")
-                add_keyword_action.triggered.connect(lambda: self._add_keyword_to_group(item))
-                
-                if item.text(0) != "default":
-                    menu.addSeparator()
-                    rename_action = menu.addAction("重命名分组")
-                    rename_action.triggered.connect(lambda: self.rename_group(item))
-                    delete_action = menu.addAction("删除分组")
-                    delete_action.triggered.connect(lambda: self.delete_group(item))
-            # 如果点击的是关键字
-            elif item.data(0, Qt.ItemDataRole.UserRole) == "keyword":
-                edit_action = menu.addAction("修改关键字")
-                edit_action.triggered.connect(lambda: self._edit_keyword(item.parent(), item))
+        # 如果点击的是分组（包括顶级分组和子分组）
+        if isinstance(node, KeywordGroup):
+            # 运行整个分组
+            run_action = menu.addAction("运行整个分组")
+            run_action.triggered.connect(lambda: self.run_group(node))
+            menu.addSeparator()
+            
+            # 添加新建子分组选项
+            new_sub_group_action = menu.addAction("新建分组")
+            new_sub_group_action.triggered.connect(lambda: self._add_sub_group(node))
+            
+            # 添加添加关键字选项
+            add_keyword_action = menu.addAction("添加关键字")
+            add_keyword_action.triggered.connect(lambda: self._add_keyword_to_group(node))
+            
+            if node.path != "default":
                 menu.addSeparator()
-                delete_action = menu.addAction("删除关键字")
-                delete_action.triggered.connect(lambda: self.delete_keyword(item.parent(), item))
+                rename_action = menu.addAction("重命名分组")
+                rename_action.triggered.connect(lambda: self.rename_group(node))
+                delete_action = menu.addAction("删除分组")
+                delete_action.triggered.connect(lambda: self.delete_group(node))
+        # 如果点击的是关键字
+        elif isinstance(node, Keyword):
+            edit_action = menu.addAction("修改关键字")
+            edit_action.triggered.connect(lambda: self._edit_keyword(node))
+            menu.addSeparator()
+            delete_action = menu.addAction("删除关键字")
+            delete_action.triggered.connect(lambda: self.delete_keyword(node))
         else:
-            # 如果点击的是空白区域，添加新建顶级分组选项
+            # 如果点击的是空白区域，添加新建顶级分组和导入选项
             new_group_action = menu.addAction("新建分组")
             new_group_action.triggered.connect(self.add_group)
+            import_action = menu.addAction("导入关键字...")
+            import_action.triggered.connect(self.import_keywords)
             
         if not menu.isEmpty():
             menu.exec(self.tree.viewport().mapToGlobal(position))
     
-    def _on_item_clicked(self, item: QTreeWidgetItem, column: int):
+    def _on_item_clicked(self, index: QModelIndex):
         """处理项目点击事件"""
+        node = self.model.node(index)
         # 如果点击的是分组（包括顶级分组和子分组）
-        if item.data(0, Qt.ItemDataRole.UserRole) == "group":
-            self.current_group = item.text(0)
+        if isinstance(node, KeywordGroup):
+            self.current_group = node.path
             # 清除最后选中的关键字分组记录
             self.last_selected_group = None
         # 如果点击的是关键字
-        elif item.data(0, Qt.ItemDataRole.UserRole) == "keyword":
+        elif isinstance(node, Keyword):
             # 记录该关键字所在的分组
-            self.last_selected_group = item.parent().text(0)
+            self.last_selected_group = node.group.path
             self.current_group = self.last_selected_group
             # 发送关键字和其匹配选项
-            keyword = item.data(0, Qt.ItemDataRole.UserRole + 2)  # 获取实际关键字
-            options = item.data(0, Qt.ItemDataRole.UserRole + 1) or {}
-            self.keywordSelected.emit(keyword, options)
+            self.keywordSelected.emit(node.text, normalize_options(node.options))
             
     def add_keyword(self, keyword: str, target_group: str = None, options=None, alias=""):
-        """添加关键字到指定分组"""
+        """添加关键字到指定分组（分组路径如 "网络/超时"，不存在时创建）"""
         # 如果没有指定目标分组，使用当前分组
         if not target_group:
             target_group = self.current_group or "default"
-            
-        # 解析分组路径
-        group_path = target_group.split("/")
-        current_item = None
-        
-        # 遍历分组路径
-        for i, group_name in enumerate(group_path):
-            if i == 0:  # 顶级分组
-                # 查找顶级分组
-                found = False
-                for j in range(self.tree.topLevelItemCount()):
-                    item = self.tree.topLevelItem(j)
-                    if item.text(0) == group_name:
-                        current_item = item
-                        found = True
-                        break
-                        
-                # 如果顶级分组不存在，创建它
-                if not found:
-                    current_item = QTreeWidgetItem([group_name])
-                    current_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                    self.tree.addTopLevelItem(current_item)
-            else:  # 子分组
-                # 查找子分组
-                found = False
-                for j in range(current_item.childCount()):
-                    child = current_item.child(j)
-                    if child.data(0, Qt.ItemDataRole.UserRole) == "group" and child.text(0) == group_name:
-                        current_item = child
-                        found = True
-                        break
-                        
-                # 如果子分组不存在，创建它
-                if not found:
-                    new_item = QTreeWidgetItem([group_name])
-                    new_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                    current_item.addChild(new_item)
-                    current_item = new_item
-                    
+        group = self.repository.ensure_group(target_group)
         # 检查关键字是否已存在
-        for i in range(current_item.childCount()):
-            child = current_item.child(i)
-            if (child.data(0, Qt.ItemDataRole.UserRole) == "keyword" and 
-                child.data(0, Qt.ItemDataRole.UserRole + 2) == keyword):
-                QMessageBox.warning(self, "警告", "该关键字已存在")
-                return
-                
-        # 创建关键字项
-        keyword_item = QTreeWidgetItem([alias if alias else keyword])  # 显示文本
-        keyword_item.setData(0, Qt.ItemDataRole.UserRole, "keyword")
-        keyword_item.setData(0, Qt.ItemDataRole.UserRole + 1, options)  # 选项
-        keyword_item.setData(0, Qt.ItemDataRole.UserRole + 2, keyword)  # 实际关键字
-        keyword_item.setData(0, Qt.ItemDataRole.UserRole + 3, alias)  # 别名
-        
-        # 找到插入位置（在所有子分组之后）
-        insert_pos = 0
-        for i in range(current_item.childCount()):
-            child = current_item.child(i)
-            if child.data(0, Qt.ItemDataRole.UserRole) == "group":
-                insert_pos += 1
-            else:
-                break
-                
-        # 在正确的位置插入关键字
-        current_item.insertChild(insert_pos, keyword_item)
-        current_item.setExpanded(True)
+        if self.repository.add_keyword(group, keyword, alias, options) is None:
+            QMessageBox.warning(self, "警告", "该关键字已存在")
+            return
+        self._expand(group)
         
         # 保存到文件
         self.save_to_file()
 
     def get_all_keywords(self) -> Dict[str, List[dict]]:
-        """获取所有分组及其关键字"""
-        result = {}
-        
-        def process_group(group_item: QTreeWidgetItem, path: str = ""):
-            group_name = path + group_item.text(0)
-            keywords = []
-            
-            # 处理所有子项
-            for i in range(group_item.childCount()):
-                child = group_item.child(i)
-                # 如果是子分组
-                if child.data(0, Qt.ItemDataRole.UserRole) == "group":
-                    sub_results = process_group(child, group_name + "/")
-                    result.update(sub_results)
-                # 如果是关键字
-                else:
-                    keywords.append({
-                        'text': child.data(0, Qt.ItemDataRole.UserRole + 2),  # 实际关键字
-                        'alias': child.data(0, Qt.ItemDataRole.UserRole + 3) or "",  # 别名
-                        'options': child.data(0, Qt.ItemDataRole.UserRole + 1) or {}
-                    })
-            
-            result[group_name] = keywords
-            return result
-        
-        # 处理所有顶级分组
-        for i in range(self.tree.topLevelItemCount()):
-            group_item = self.tree.topLevelItem(i)
-            process_group(group_item)
-        
-        return result
+        """获取所有分组及其关键字（结果在下一次修改前缓存，不要修改）"""
+        return self.repository.to_dict()
         
     def load_keywords(self, keyword_groups: Dict[str, List[dict]]):
         """加载关键字分组"""
-        self.tree.clear()
         self.last_selected_group = None  # 重置最后选中的分组
-        
-        def create_group_hierarchy(group_path: str) -> QTreeWidgetItem:
-            parts = group_path.split("/")
-            current_item = None
-            
-            # 查找或创建分组层级
-            for i, part in enumerate(parts):
-                if i == 0:
-                    # 查找顶级分组
-                    found = False
-                    for j in range(self.tree.topLevelItemCount()):
-                        if self.tree.topLevelItem(j).text(0) == part:
-                            current_item = self.tree.topLevelItem(j)
-                            found = True
-                            break
-                    if not found:
-                        current_item = QTreeWidgetItem([part])
-                        current_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                        self.tree.addTopLevelItem(current_item)
-                else:
-                    # 查找或创建子分组
-                    found = False
-                    for j in range(current_item.childCount()):
-                        child = current_item.child(j)
-                        if child.data(0, Qt.ItemDataRole.UserRole) == "group" and child.text(0) == part:
-                            current_item = child
-                            found = True
-                            break
-                    if not found:
-                        new_item = QTreeWidgetItem([part])
-                        new_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-                        current_item.addChild(new_item)
-                        current_item = new_item
-            
-            return current_item
-        
-        # 首先创建并填充default分组
-        if "default" in keyword_groups:
-            default_item = QTreeWidgetItem(["default"])
-            default_item.setData(0, Qt.ItemDataRole.UserRole, "group")
-            self.tree.addTopLevelItem(default_item)
-            for keyword_data in keyword_groups["default"]:
-                display_text = keyword_data.get('alias', '') or keyword_data['text']
-                keyword_item = QTreeWidgetItem([display_text])
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole, "keyword")
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 1, keyword_data.get('options', {}))
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 2, keyword_data['text'])  # 实际关键字
-                keyword_item.setData(0, Qt.ItemDataRole.UserRole + 3, keyword_data.get('alias', ''))  # 别名
-                default_item.addChild(keyword_item)
-            default_item.setExpanded(True)
-        
-        # 加载其他分组
-        for group_path, keywords in keyword_groups.items():
-            if group_path != "default":
-                group_item = create_group_hierarchy(group_path)
-                for keyword_data in keywords:
-                    display_text = keyword_data.get('alias', '') or keyword_data['text']
-                    keyword_item = QTreeWidgetItem([display_text])
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole, "keyword")
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole + 1, keyword_data.get('options', {}))
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole + 2, keyword_data['text'])  # 实际关键字
-                    keyword_item.setData(0, Qt.ItemDataRole.UserRole + 3, keyword_data.get('alias', ''))  # 别名
-                    group_item.addChild(keyword_item)
-                group_item.setExpanded(True)
+        self.repository.load(keyword_groups)
+        self.tree.expandAll()
         
         # 选中default分组
-        for i in range(self.tree.topLevelItemCount()):
-            if self.tree.topLevelItem(i).text(0) == "default":
-                self.tree.setCurrentItem(self.tree.topLevelItem(i))
-                self.current_group = "default"
-                break
+        default_group = self.repository.group("default")
+        if default_group is not None:
+            self.tree.setCurrentIndex(self.model.index_of(default_group))
+            self.current_group = "default"
 
     def set_current_filter_text(self, text: str):
         """设置当前过滤框中的文本"""
@@ -593,4 +489,3 @@ class SCSavedKeywordList(QWidget):
     def set_current_filter_options(self, options: dict):
         """设置当前过滤选项"""
         self.current_filter_options = options
-
@@ -0,0 +1,315 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel,
+                           QComboBox, QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox)
+from PyQt6.QtCore import pyqtSignal, Qt, QThread, QObject
+from PyQt6.QtGui import QColor
+from src.utils.batch_filter import BatchFilter, FileSearchResult, expand_search_paths
+from src.utils.logger import log_ui_event
+from src.resources.theme import THEME
+import os
+
+# 搜索范围
+SCOPE_OPEN_TABS = 0
+SCOPE_PATHS = 1
+
+class MultiFileSearchWorker(QObject):
+    fileFinished = pyqtSignal(object)  # 一个文件搜索完成，参数为 FileSearchResult
+    finished = pyqtSignal()  # 所有文件搜索完成
+    error = pyqtSignal(str)  # 错误信号
+
+    def __init__(self, batch_filter: BatchFilter, filepaths: list):
+        super().__init__()
+        self.batch_filter = batch_filter
+        self.filepaths = filepaths
+        self.is_cancelled = False
+
+    def cancel(self):
+        """取消处理"""
+        self.is_cancelled = True
+
+    def process(self):
+        """每个文件作为一个任务并行搜索，完成一个就发送一个"""
+        try:
+            for result in self.batch_filter.search_files(self.filepaths, is_cancelled=lambda: self.is_cancelled):
+                if self.is_cancelled:
+                    return
+                self.fileFinished.emit(result)
+            if not self.is_cancelled:
+                self.finished.emit()
+        except Exception as e:
+            if not self.is_cancelled:
+                self.error.emit(str(e))
+
+class SCMultiFileSearchPanel(QWidget):
+    """批量搜索：在所有打开的标签页或指定的目录/通配符中搜索同一个表达式"""
+    resultActivated = pyqtSignal(str, int, int, int)  # 文件路径、行号、匹配位置、匹配长度
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thread = None
+        self.worker = None
+        self.file_count = 0
+        self.finished_count = 0
+        self.line_count = 0
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.setSpacing(4)
+
+        # 表达式和匹配选项
+        input_layout = QHBoxLayout()
+        input_layout.setSpacing(2)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText('输入搜索表达式')
+        self.input.returnPressed.connect(self.start_search)
+        input_layout.addWidget(self.input)
+
+        option_button_style = f"""
+            QPushButton {{
+                background-color: transparent;
+                border: none;
+                color: {THEME['text']};
+                font-size: 12px;
+                padding: 2px;
+            }}
+            QPushButton:hover {{
+                background-color: {THEME['hover_bg']};
+                border-radius: 3px;
+            }}
+            QPushButton:checked {{
+                background-color: {THEME['highlight_bg']};
+                color: {THEME['highlight_text']};
+                border-radius: 3px;
+            }}
+        """
+        self.case_btn = self._create_option_button("Cc", "区分大小写", option_button_style)
+        self.word_btn = self._create_option_button("W", "全词匹配", option_button_style)
+        self.regex_btn = self._create_option_button(".*", "使用正则表达式", option_button_style)
+        self.query_btn = self._create_option_button("Q", "查询语法：and/or/not、字段比较、带标志的关键字",
+                                                    option_button_style)
+        input_layout.addWidget(self.case_btn)
+        input_layout.addWidget(self.word_btn)
+        input_layout.addWidget(self.regex_btn)
+        input_layout.addWidget(self.query_btn)
+        layout.addLayout(input_layout)
+
+        # 搜索范围
+        scope_layout = QHBoxLayout()
+        scope_layout.setSpacing(4)
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItem("所有打开的标签页")
+        self.scope_combo.addItem("目录或通配符")
+        self.scope_combo.currentIndexChanged.connect(self._on_scope_changed)
+        self.path_input = QLineEdit()
+        self.path_input.setPlaceholderText('目录或通配符，多个用 ; 分隔，如 logs/**/*.log')
+        self.path_input.returnPressed.connect(self.start_search)
+        self.browse_btn = QPushButton("...")
+        self.browse_btn.setFixedWidth(28)
+        self.browse_btn.setToolTip("选择目录")
+        self.browse_btn.clicked.connect(self._browse_directory)
+        scope_layout.addWidget(self.scope_combo)
+        scope_layout.addWidget(self.path_input, 1)
+        scope_layout.addWidget(self.browse_btn)
+        layout.addLayout(scope_layout)
+
+        # 搜索按钮和状态
+        action_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.search_btn = QPushButton("搜索")
+        self.search_btn.clicked.connect(self.start_search)
+        self.stop_btn = QPushButton("停止")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_search)
+        action_layout.addWidget(self.status_label, 1)
+        action_layout.addWidget(self.search_btn)
+        action_layout.addWidget(self.stop_btn)
+        layout.addLayout(action_layout)
+
+        # 搜索结果：按文件分组
+        self.result_tree = QTreeWidget()
+        self.result_tree.setColumnCount(2)
+        self.result_tree.setHeaderLabels(["行号", "内容"])
+        self.result_tree.setColumnWidth(0, 160)
+        self.result_tree.setUniformRowHeights(True)
+        self.result_tree.setWordWrap(False)
+        self.result_tree.setStyleSheet(f"""
+            QTreeWidget {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                border: none;
+            }}
+            QTreeWidget::item:hover {{
+                background-color: {THEME['hover_bg']};
+            }}
+            QHeaderView::section {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                padding: 4px;
+                border: none;
+                border-bottom: 1px solid {THEME['border']};
+            }}
+        """)
+        self.result_tree.itemActivated.connect(self._on_item_activated)
+        self.result_tree.itemClicked.connect(self._on_item_activated)
+        layout.addWidget(self.result_tree, 1)
+
+        self._on_scope_changed(self.scope_combo.currentIndex())
+
+    def _create_option_button(self, text: str, tooltip: str, style: str) -> QPushButton:
+        button = QPushButton(text)
+        button.setCheckable(True)
+        button.setFixedSize(24, 24)
+        button.setToolTip(tooltip)
+        button.setStyleSheet(style)
+        return button
+
+    def _on_scope_changed(self, index: int):
+        use_paths = index == SCOPE_PATHS
+        self.path_input.setEnabled(use_paths)
+        self.browse_btn.setEnabled(use_paths)
+
+    def _browse_directory(self):
+        directory = QFileDialog.getExistingDirectory(self, "选择搜索目录")
+        if directory:
+            self.path_input.setText(directory)
+
+    def set_expression(self, expression: str, options: dict = None):
+        """设置搜索表达式和匹配选项"""
+        self.input.setText(expression)
+        if options is not None:
+            self.case_btn.setChecked(options.get("case_sensitive", False))
+            self.word_btn.setChecked(options.get("whole_word", False))
+            self.regex_btn.setChecked(options.get("use_regex", False))
+            self.query_btn.setChecked(options.get("use_query", False))
+        self.input.setFocus()
+
+    def get_filter_options(self) -> dict:
+        return {
+            "case_sensitive": self.case_btn.isChecked(),
+            "whole_word": self.word_btn.isChecked(),
+            "use_regex": self.regex_btn.isChecked(),
+            "use_query": self.query_btn.isChecked(),
+        }
+
+    def _get_search_files(self) -> list:
+        """根据搜索范围获取要搜索的文件列表"""
+        if self.scope_combo.currentIndex() == SCOPE_OPEN_TABS:
+            main_window = self.window()
+            if main_window.__class__.__name__ == 'SCMainWindow':
+                return [tab.filepath for tab, _ in main_window.tabs if tab.filepath]
+            return []
+        paths = [path.strip() for path in self.path_input.text().split(";") if path.strip()]
+        return expand_search_paths(paths)
+
+    def start_search(self):
+        """开始搜索"""
+        expression = self.input.text().strip()
+        if not expression:
+            return
+        self.stop_search()
+
+        try:
+            batch_filter = BatchFilter([(expression, self.get_filter_options())])
+        except ValueError as e:
+            QMessageBox.warning(self, "表达式错误", str(e))
+            return
+        filepaths = self._get_search_files()
+        if not filepaths:
+            self.status_label.setText("没有要搜索的文件")
+            return
+        log_ui_event("multi_file_search", "SearchPanel", f"Expression: {expression}, Files: {len(filepaths)}")
+
+        self.result_tree.clear()
+        self.file_count = len(filepaths)
+        self.finished_count = 0
+        self.line_count = 0
+        self._update_status()
+        self.search_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+
+        self.thread = QThread()
+        self.worker = MultiFileSearchWorker(batch_filter, filepaths)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.process)
+        self.worker.fileFinished.connect(self._on_file_finished)
+        self.worker.finished.connect(self._on_search_finished)
+        self.worker.error.connect(self._on_search_error)
+        self.thread.start()
+
+    def stop_search(self):
+        """停止正在进行的搜索"""
+        if self.thread is None:
+            return
+        self._cleanup_thread()
+        self.status_label.setText(f"已停止，{self._summary()}")
+
+    def _summary(self) -> str:
+        return f"已搜索 {self.finished_count}/{self.file_count} 个文件，{self.line_count} 行匹配"
+
+    def _update_status(self):
+        self.status_label.setText(self._summary())
+
+    def _on_file_finished(self, result: FileSearchResult):
+        """一个文件搜索完成，添加该文件的结果分组"""
+        self.finished_count += 1
+        self.line_count += result.total
+        self._update_status()
+        if not result.total and not result.error:
+            return
+
+        file_item = QTreeWidgetItem()
+        name = os.path.basename(result.filepath)
+        if result.error:
+            file_item.setText(0, name)
+            file_item.setText(1, f"读取失败：{result.error}")
+            file_item.setForeground(1, QColor(THEME['error']))
+        else:
+            file_item.setText(0, f"{name} ({result.total})")
+            file_item.setText(1, result.filepath)
+            if result.truncated:
+                file_item.setText(1, f"{result.filepath}（仅显示前 {len(result.records)} 行）")
+        file_item.setForeground(0, QColor(THEME['keyword_text']))
+        file_item.setToolTip(0, result.filepath)
+
+        for record in result.records:
+            start, end, _ = record.matches[0]
+            item = QTreeWidgetItem([str(record.line_number + 1), record.text.strip()])
+            item.setTextAlignment(0, Qt.AlignmentFlag.AlignRight)
+            item.setData(0, Qt.ItemDataRole.UserRole, (record.filepath, record.line_number, start, end - start))
+            file_item.addChild(item)
+
+        self.result_tree.addTopLevelItem(file_item)
+        # 只有一个文件时直接展开
+        file_item.setExpanded(self.result_tree.topLevelItemCount() == 1)
+
+    def _on_search_finished(self):
+        self._cleanup_thread()
+        self.status_label.setText(f"完成，{self._summary()}")
+
+    def _on_search_error(self, message: str):
+        self._cleanup_thread()
+        QMessageBox.warning(self, "搜索错误", message)
+
+    def _on_item_activated(self, item: QTreeWidgetItem, column: int = 0):
+        data = item.data(0, Qt.ItemDataRole.UserRole)
+        if data is None:
+            return
+        filepath, line_number, position, length = data
+        self.resultActivated.emit(filepath, line_number, position, length)
+
+    def _cleanup_thread(self):
+        """清理线程资源"""
+        if self.thread is None:
+            return
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.deleteLater()
+            self.worker = None
+        if self.thread.isRunning():
+            self.thread.quit()
+            self.thread.wait()
+        self.thread.deleteLater()
+        self.thread = None
+        self.search_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
@@ -14,7 +14,6 @@ class SCWelcomePage(QWidget):
         super().__init__(parent)
         self.config_manager = ConfigManager()  # 这里会返回单例实例
         # 连接信号
-        print("Connecting signal...")
         self.config_manager.recentFilesChanged.connect(self._on_recent_files_changed)
         self.setup_ui()
         
@@ -127,16 +126,13 @@ class SCWelcomePage(QWidget):
         
     def _on_recent_files_changed(self):
         """处理最近文件列表变化的回调"""
-        print("Signal received: recentFilesChanged")
         self.update_recent_files()
         
     def update_recent_files(self):
         """更新最近文件列表"""
-        print("update_recent_files")
         self.recent_list.clear()
         state = self.config_manager.load_state()
         recent_files = state.get("recent_files", [])
-        print(f"update_recent_files: {recent_files}")
         for filepath in recent_files:
             item = QListWidgetItem(os.path.basename(filepath))
             item.setToolTip(filepath)
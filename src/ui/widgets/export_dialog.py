@@ -0,0 +1,273 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox, QSpinBox,
+                           QCheckBox, QLineEdit, QPushButton, QProgressBar, QLabel, QFileDialog, QMessageBox)
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from src.utils.exporter import EXPORT_FORMATS, export_lines, export_path_for, iter_file_lines
+from src.utils.filter_engine import FilterEngine
+from src.utils.logger import log_ui_event
+from typing import Optional
+import os
+
+FORMAT_NAMES = {
+    "text": "纯文本",
+    "jsonl": "JSON Lines（含行号和匹配位置）",
+    "csv": "CSV",
+}
+
+
+class ExportWorker(QObject):
+    """在后台把选中的行流式写入文件"""
+    finished = pyqtSignal(object)  # 写入的行数，取消时为 None
+    error = pyqtSignal(str)
+    progress = pyqtSignal(int)  # 已写入的行数
+
+    def __init__(self, lines_factory, output_path: str, fmt: str, compress: bool, engine: Optional[FilterEngine],
+                 source: str, with_line_numbers: bool):
+        super().__init__()
+        self.lines_factory = lines_factory  # is_cancelled -> 要导出的行
+        self.output_path = output_path
+        self.fmt = fmt
+        self.compress = compress
+        self.engine = engine
+        self.source = source
+        self.with_line_numbers = with_line_numbers
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def process(self):
+        try:
+            is_cancelled = lambda: self.is_cancelled
+            count = export_lines(self.lines_factory(is_cancelled), self.output_path, self.fmt, self.compress,
+                                 self.engine, self.source, self.with_line_numbers, is_cancelled,
+                                 self.progress.emit)
+            self.finished.emit(count)
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class SCExportDialog(QDialog):
+    """导出过滤结果、标记的行或一段行范围
+
+    文件未被编辑时直接从磁盘上的源文件流式读取选中的行，边读边写，
+    内存占用与导出的行数无关；编辑过的内容从编辑器的文档中取出选中的行。
+    """
+
+    def __init__(self, tab, parent=None):
+        super().__init__(parent)
+        self.tab = tab
+        self.thread = None
+        self.worker = None
+        self.output_path = ""
+        workspace_panel = tab.workspace_panel
+        filtered_view = workspace_panel.get_filtered_view()
+        mark_viewer = workspace_panel.get_mark_view()
+        self.match_lines = list(filtered_view.match_lines)  # 匹配的行
+        self.context_lines = list(filtered_view.line_mapping)  # 过滤结果中显示的行（含上下文）
+        self.marked_lines = list(mark_viewer.mark_manager.line_numbers(mark_viewer.current_filepath))
+        self.engine = filtered_view.filter_engine.copy_filter()
+        self.viewer = workspace_panel.log_viewer
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("导出")
+        self.resize(560, 0)
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.content_combo = QComboBox()
+        self.content_combo.addItem(f"过滤结果（{len(self.match_lines)} 行）", "filtered")
+        if len(self.context_lines) != len(self.match_lines):
+            self.content_combo.addItem(f"过滤结果及上下文（{len(self.context_lines)} 行）", "context")
+        self.content_combo.addItem(f"标记的行（{len(self.marked_lines)} 行）", "marks")
+        self.content_combo.addItem("行范围", "range")
+        self.content_combo.currentIndexChanged.connect(self._on_content_changed)
+        form.addRow("内容：", self.content_combo)
+
+        # 行范围（1-based，包含两端），默认为编辑器中选中的行，没有选中时为全部
+        line_count = self.viewer.line_count()
+        cursor = self.viewer.textCursor()
+        first, last = 1, line_count
+        if cursor.hasSelection():
+            document = self.viewer.document()
+            first = self.viewer.line_position(document.findBlock(cursor.selectionStart()).blockNumber())[0] + 1
+            last = self.viewer.line_position(document.findBlock(cursor.selectionEnd()).blockNumber())[0] + 1
+        range_layout = QHBoxLayout()
+        self.start_spin = QSpinBox()
+        self.end_spin = QSpinBox()
+        for spin, value in ((self.start_spin, first), (self.end_spin, last)):
+            spin.setRange(1, max(1, line_count))
+            spin.setValue(value)
+            range_layout.addWidget(spin)
+        range_layout.insertWidget(1, QLabel("到"))
+        range_layout.addStretch()
+        form.addRow("行范围：", range_layout)
+
+        self.format_combo = QComboBox()
+        for fmt in EXPORT_FORMATS:
+            self.format_combo.addItem(FORMAT_NAMES[fmt], fmt)
+        self.format_combo.currentIndexChanged.connect(self._on_format_changed)
+        form.addRow("格式：", self.format_combo)
+
+        self.line_number_check = QCheckBox("每行前加行号")
+        self.compress_check = QCheckBox("gzip 压缩")
+        self.compress_check.toggled.connect(self._update_path_extension)
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(self.line_number_check)
+        option_layout.addWidget(self.compress_check)
+        option_layout.addStretch()
+        form.addRow("选项：", option_layout)
+
+        path_layout = QHBoxLayout()
+        self.path_edit = QLineEdit()
+        base = os.path.splitext(self.tab.filepath)[0] if self.tab.filepath else os.path.join(os.getcwd(), "export")
+        self.path_edit.setText(base + "_export" + EXPORT_FORMATS["text"])
+        browse_button = QPushButton("浏览...")
+        browse_button.clicked.connect(self._browse)
+        path_layout.addWidget(self.path_edit, 1)
+        path_layout.addWidget(browse_button)
+        form.addRow("保存到：", path_layout)
+        layout.addLayout(form)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.export_button = QPushButton("导出")
+        self.export_button.setDefault(True)
+        self.export_button.clicked.connect(self.start_export)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.export_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+
+        # 默认导出过滤结果，没有时依次选择标记的行、行范围
+        default = "filtered" if self.match_lines else "marks" if self.marked_lines else "range"
+        self.content_combo.setCurrentIndex(self.content_combo.findData(default))
+        self._on_content_changed()
+        self._on_format_changed()
+
+    def _on_content_changed(self):
+        is_range = self.content_combo.currentData() == "range"
+        self.start_spin.setEnabled(is_range)
+        self.end_spin.setEnabled(is_range)
+
+    def _on_format_changed(self):
+        self.line_number_check.setEnabled(self.format_combo.currentData() == "text")
+        self._update_path_extension()
+
+    def _update_path_extension(self):
+        path = self.path_edit.text().strip()
+        if path:
+            self.path_edit.setText(export_path_for(path, self.format_combo.currentData(),
+                                                   self.compress_check.isChecked()))
+
+    def _browse(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出到", self.path_edit.text(), "所有文件 (*.*)")
+        if path:
+            self.path_edit.setText(path)
+            self._update_path_extension()
+
+    def _selected_lines(self):
+        """返回 (is_cancelled -> 要导出的行, 行数)"""
+        content = self.content_combo.currentData()
+        if content == "range":
+            start, end = self.start_spin.value() - 1, self.end_spin.value()
+            line_numbers = None
+            total = max(0, end - start)
+        else:
+            line_numbers = {"filtered": self.match_lines, "context": self.context_lines}.get(content, self.marked_lines)
+            start, end = 0, None
+            total = len(line_numbers)
+        filepath = self.tab.filepath
+        if filepath and os.path.isfile(filepath) and not self.tab.is_modified:
+            return lambda is_cancelled: iter_file_lines(filepath, line_numbers, start, end, is_cancelled), total
+        # 内容被编辑过，与磁盘上的文件不一致：只取出选中的行
+        numbers = line_numbers if line_numbers is not None else range(start, end)
+        line_count = self.viewer.line_count()
+        lines = [(n, self.viewer.line_text(n)) for n in numbers if n < line_count]
+        return lambda is_cancelled: lines, total
+
+    def start_export(self):
+        path = self.path_edit.text().strip()
+        if not path:
+            QMessageBox.warning(self, "导出", "请选择保存的文件")
+            return
+        if os.path.abspath(path) == os.path.abspath(self.tab.filepath or ""):
+            QMessageBox.warning(self, "导出", "不能导出到正在查看的文件")
+            return
+        if os.path.exists(path):
+            reply = QMessageBox.question(self, "导出", f"{path} 已存在，是否覆盖？",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        lines_factory, total = self._selected_lines()
+        if total == 0:
+            QMessageBox.information(self, "导出", "没有要导出的行")
+            return
+
+        fmt = self.format_combo.currentData()
+        log_ui_event("export", "ExportDialog", f"Content: {self.content_combo.currentData()}, Format: {fmt}, "
+                                               f"Lines: {total}")
+        self.output_path = path
+        self._set_running(True, total)
+        self.thread = QThread()
+        self.worker = ExportWorker(lines_factory, path, fmt, self.compress_check.isChecked(), self.engine,
+                                   self.tab.filepath, self.line_number_check.isChecked())
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.process)
+        self.worker.progress.connect(self.progress_bar.setValue)
+        self.worker.finished.connect(self._on_export_finished)
+        self.worker.error.connect(self._on_export_error)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(self.thread.quit)
+        self.thread.finished.connect(self._cleanup_thread)
+        self.thread.start()
+
+    def _set_running(self, running: bool, total: int = 0):
+        for widget in (self.content_combo, self.format_combo, self.line_number_check, self.compress_check,
+                       self.path_edit, self.export_button):
+            widget.setEnabled(not running)
+        self.start_spin.setEnabled(not running and self.content_combo.currentData() == "range")
+        self.end_spin.setEnabled(self.start_spin.isEnabled())
+        if running:
+            self.line_number_check.setEnabled(False)
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(0)
+            self.progress_bar.show()
+        else:
+            self.line_number_check.setEnabled(self.format_combo.currentData() == "text")
+            self.progress_bar.hide()
+
+    def _on_export_finished(self, count):
+        self._set_running(False)
+        if count is None:
+            return
+        QMessageBox.information(self, "导出完成", f"已导出 {count} 行到 {self.output_path}")
+        self.accept()
+
+    def _on_export_error(self, error_message: str):
+        self._set_running(False)
+        QMessageBox.critical(self, "导出失败", f"导出失败：{error_message}")
+
+    def reject(self):
+        """导出进行中时取消导出（已写入的临时文件会被删除），否则关闭对话框"""
+        if self.thread is not None:
+            self.worker.cancel()
+            self.thread.quit()
+            self.thread.wait()
+            self._cleanup_thread()
+            self._set_running(False)
+            return
+        super().reject()
+
+    def _cleanup_thread(self):
+        if self.worker is not None:
+            self.worker.deleteLater()
+            self.worker = None
+        if self.thread is not None:
+            self.thread.deleteLater()
+            self.thread = None
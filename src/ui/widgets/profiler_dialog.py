@@ -0,0 +1,126 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
+                           QPushButton, QCheckBox, QLabel, QFileDialog, QMessageBox)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QColor
+from src.utils.profiler import profiler, histogram_labels
+from src.resources.theme import THEME
+
+class SCProfilerDialog(QDialog):
+    """开发者面板：显示本次运行中各操作的耗时分布和计数器"""
+    COLUMNS = ["名称", "次数", "总计(ms)", "平均(ms)", "p50(ms)", "p95(ms)", "最大(ms)"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("性能统计")
+        self.resize(900, 520)
+        self.setup_ui()
+        # 打开期间每秒刷新一次
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        top_layout = QHBoxLayout()
+        self.enable_check = QCheckBox("启用统计")
+        self.enable_check.setChecked(profiler.enabled)
+        self.enable_check.toggled.connect(self._on_enable_toggled)
+        self.status_label = QLabel("")
+        top_layout.addWidget(self.enable_check)
+        top_layout.addWidget(self.status_label, 1)
+        layout.addLayout(top_layout)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(len(self.COLUMNS) + 1)
+        self.tree.setHeaderLabels(self.COLUMNS + ["耗时分布"])
+        self.tree.setColumnWidth(0, 220)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setStyleSheet(f"""
+            QTreeWidget {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                border: none;
+            }}
+            QHeaderView::section {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                padding: 4px;
+                border: none;
+                border-bottom: 1px solid {THEME['border']};
+            }}
+        """)
+        layout.addWidget(self.tree, 1)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        refresh_button = QPushButton("刷新")
+        refresh_button.clicked.connect(self.refresh)
+        reset_button = QPushButton("重置")
+        reset_button.clicked.connect(self._on_reset)
+        export_button = QPushButton("导出 JSON")
+        export_button.clicked.connect(self._on_export)
+        button_layout.addWidget(refresh_button)
+        button_layout.addWidget(reset_button)
+        button_layout.addWidget(export_button)
+        layout.addLayout(button_layout)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """用当前的统计结果重建列表"""
+        snapshot = profiler.snapshot()
+        self.status_label.setText(f"自 {snapshot['started']} 起" if snapshot["enabled"]
+                                  else "统计未启用（也可以设置环境变量 SC_LOG_PROFILE=1）")
+        expanded = not self.tree.topLevelItemCount() or self.tree.topLevelItem(0).isExpanded()
+        self.tree.clear()
+
+        timers_item = QTreeWidgetItem(["计时"])
+        labels = histogram_labels()
+        for name, stats in snapshot["timers"].items():
+            item = QTreeWidgetItem([
+                name, str(stats["count"]), f"{stats['total_ms']:.1f}", f"{stats['mean_ms']:.3f}",
+                f"{stats['p50_ms']:.3f}", f"{stats['p95_ms']:.3f}", f"{stats['max_ms']:.3f}",
+                "  ".join(f"{label}:{count}" for label, count in stats["histogram"].items() if count),
+            ])
+            for column in range(1, len(self.COLUMNS)):
+                item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight)
+            item.setToolTip(len(self.COLUMNS), "\n".join(
+                f"{label}: {stats['histogram'][label]}" for label in labels))
+            timers_item.addChild(item)
+        self.tree.addTopLevelItem(timers_item)
+        timers_item.setExpanded(expanded)
+
+        counters_item = QTreeWidgetItem(["计数"])
+        for name, value in snapshot["counters"].items():
+            item = QTreeWidgetItem([name, str(value)])
+            item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
+            counters_item.addChild(item)
+        self.tree.addTopLevelItem(counters_item)
+        counters_item.setExpanded(True)
+        for item in (timers_item, counters_item):
+            item.setForeground(0, QColor(THEME['keyword_text']))
+
+    def _on_enable_toggled(self, checked: bool):
+        profiler.set_enabled(checked)
+        self.refresh()
+
+    def _on_reset(self):
+        profiler.reset()
+        self.refresh()
+
+    def _on_export(self):
+        filepath, _ = QFileDialog.getSaveFileName(self, "导出性能统计", "profile.json", "JSON 文件 (*.json)")
+        if not filepath:
+            return
+        try:
+            profiler.dump_json(filepath)
+        except OSError as e:
+            QMessageBox.warning(self, "导出失败", str(e))
@@ -6,11 +6,15 @@ from PyQt6.QtCore import pyqtSignal, Qt, QSize, QPoint, QThread, QObject
 from PyQt6.QtGui import (QFont, QTextCursor, QIcon, QColor, QPalette, 
                       QTextCharFormat, QCursor, QKeySequence, QAction)
 from src.utils.highlighter import LogHighlighter
-from src.ui.filter_panel.filter_engine import FilterEngine
+from src.utils.filter_engine import FilterEngine
+from src.utils.logger import Logger
+from src.utils.profiler import profiled
+from src.utils.context_lines import context_lines
 from src.ui.filter_panel.filter_input import SCFilterInput
 from src.ui.workspace_panel.log_panel.log_viewer import SCLogViewer
 from src.resources.theme import THEME
 from typing import Dict, List, TYPE_CHECKING, Tuple
+from bisect import bisect_left
 import re
 import json
 import os
@@ -21,24 +25,24 @@ class TextWorker(QObject):
     error = pyqtSignal(str)  # 错误信号
     progress = pyqtSignal(int)  # 进度信号
     
-    def __init__(self, text: str, filter_engine: FilterEngine, filter_expression: str = None, filter_options: dict = None):
+    def __init__(self, text: str, filter_engine: FilterEngine, filter_expression: str = None, filter_options: dict = None,
+                 keyword_rules: list = None):
         super().__init__()
         self.text = text
         self.filter_engine = filter_engine
         self.filter_expression = filter_expression
         self.filter_options = filter_options
+        self.keyword_rules = keyword_rules  # 按分组过滤时的 [(关键字, 选项)]，filter_expression 为分组名
         self.is_cancelled = False
         
     def cancel(self):
         """取消处理"""
-        print("正在取消文本处理...")
         self.is_cancelled = True
         
     def process(self):
         """处理文本"""
         try:
             if self.is_cancelled:
-                print("处理已被取消")
                 return
                 
             filtered_lines = []
@@ -47,41 +51,39 @@ class TextWorker(QObject):
             # 如果有过滤表达式，执行过滤
             if self.filter_expression:
                 # 设置过滤表达式
-                result = self.filter_engine.set_filter_expression(self.filter_expression, self.filter_options)
+                if self.keyword_rules is not None:
+                    result = self.filter_engine.set_keyword_group(self.filter_expression, self.keyword_rules)
+                else:
+                    result = self.filter_engine.set_filter_expression(self.filter_expression, self.filter_options)
                 if not result["valid"]:
                     raise ValueError(result["message"])
                 
                 if self.is_cancelled:
-                    print("过滤表达式设置后被取消")
                     return
                 
                 # 执行过滤
                 filtered_lines, line_mapping = self.filter_engine.filter_text(self.text)
                 
                 if self.is_cancelled:
-                    print("过滤执行后被取消")
                     return
             
             # 发送处理完成的信号
             if not self.is_cancelled:
                 self.finished.emit(self.text, filtered_lines, line_mapping)
-            else:
-                print("发送结果前被取消")
             
         except Exception as e:
             if not self.is_cancelled:
-                print(f"处理文本时出错: {str(e)}")
                 self.error.emit(str(e))
-            else:
-                print("发生错误时已被取消")
 
 class SCFilteredLogViewer(QWidget):
     filterChanged = pyqtSignal(str)  # 添加过滤器变化信号
+    keywordGroupFiltered = pyqtSignal(str, list)  # 按分组过滤完成（分组名, 每个关键字的匹配次数）
     
     def __init__(self, filter_input: SCFilterInput = None, parent=None):
         super().__init__(parent)
         self.filter_engine = FilterEngine()
-        self.line_mapping = []  # 初始化行号映射
+        self.line_mapping = []  # 过滤结果中每一行对应的原始行号（升序，含上下文行）
+        self.match_lines = []  # 匹配的原始行号（升序）
         self.current_line_matches = []  # 当前行的所有匹配位置
         self.current_match_index = -1  # 当前匹配项在当前行中的索引
         self.current_line = -1  # 当前行号
@@ -149,6 +151,7 @@ class SCFilteredLogViewer(QWidget):
         self.filtered_viewer.cursorPositionChanged.connect(self._on_filtered_cursor_changed)
         self.filter_input.filterChanged.connect(self.apply_filter)
         self.filter_input.navigateToMatch.connect(self._on_navigate_to_match)
+        self.filter_input.contextChanged.connect(self._on_context_changed)
         self.original_viewer.filterRequested.connect(self._on_filter_requested)
         
         # 连接过滤器变化信号
@@ -227,28 +230,24 @@ class SCFilteredLogViewer(QWidget):
     def _on_filtered_viewer_double_click(self, event):
         """处理过滤视图的双击事件"""
         if event.button() == Qt.MouseButton.LeftButton:
-            print("\n=== 双击事件开始 ===")
             # 获取双击位置的光标
             cursor = self.filtered_viewer.cursorForPosition(event.pos())
-            line_number = cursor.blockNumber()
-            click_position = cursor.positionInBlock()  # 获取在行内的点击位置
-            print(f"双击位置 - 行号: {line_number}, 行内位置: {click_position}")
+            line_number, click_position = self.filtered_viewer.cursor_line(cursor)  # 行号和在行内的点击位置
             
             if line_number < len(self.line_mapping):
                 # 获取当前行对应的原始行号
                 original_line = self.line_mapping[line_number]
-                print(f"对应的原始行号: {original_line}")
                 
                 # 从缓存的匹配结果中找到当前行的所有匹配项
                 line_matches = []
-                print(f"cached_matches: {self.filter_engine.cached_matches}")
                 for match in self.filter_engine.cached_matches:
                     if match[3] == original_line:  # match[3] 是行号
                         line_matches.append(match)
                 
-                print(f"当前行的匹配项数量: {len(line_matches)}")
                 if not line_matches:
-                    print("没有找到匹配项，退出")
+                    # 上下文行：在原始视图中定位到这一行
+                    self.original_viewer.highlight_line(original_line, center_on_screen=True, select_whole_line=True)
+                    event.accept()
                     return
                     
                 # 找到点击位置对应的匹配项索引
@@ -259,12 +258,10 @@ class SCFilteredLogViewer(QWidget):
                     if start_pos <= click_position <= end_pos:
                         clicked_match_index = match[4]  # match[4] 是全局索引
                         clicked_match = match
-                        print(f"直接点击到匹配项 - 索引: {clicked_match_index}, 位置: {start_pos}-{end_pos}")
                         break
                 
                 # 如果没有点击在任何匹配项上，使用最近的匹配项
                 if clicked_match_index == -1:
-                    print("未直接点击到匹配项，寻找最近的匹配项")
                     # 找到最近的匹配项
                     min_distance = float('inf')
                     for match in line_matches:
@@ -274,40 +271,28 @@ class SCFilteredLogViewer(QWidget):
                             min_distance = distance
                             clicked_match_index = match[4]  # match[4] 是全局索引
                             clicked_match = match
-                            print(f"找到最近的匹配项 - 索引: {clicked_match_index}, 距离: {min_distance}")
                 
                 # 使用导航函数跳转到对应位置
                 if clicked_match_index != -1:
-                    print(f"准备高亮显示 - 全局索引: {clicked_match_index}")
                     # 高亮显示匹配项
                     keyword_pos = clicked_match[0]
                     keyword_length = clicked_match[1] - clicked_match[0]
-                    print(f"关键字信息 - 位置: {keyword_pos}, 长度: {keyword_length}")
                     
                     # 在过滤视图中高亮显示
-                    print("在过滤视图中高亮显示")
                     self.filtered_viewer.highlight_line(line_number, keyword_position=keyword_pos,
                                                     keyword_length=keyword_length, center_on_screen=False,select_whole_line=False)
                     # 在原始视图中高亮显示
-                    print(f"在原始视图中高亮显示 - 行号: {original_line}")
                     self.original_viewer.highlight_line(original_line, keyword_position=keyword_pos,
                                                     keyword_length=keyword_length, center_on_screen=True,select_whole_line=True)
                     
                     # 更新匹配计数显示
                     self.current_global_match = clicked_match_index
                     display_index = clicked_match_index + 1
-                    print(f"更新匹配计数 - 当前/总数: {display_index}/{self.total_matches}")
                     self.filter_input.update_match_count(display_index, self.total_matches)
-                else:
-                    print("未找到有效的匹配项")
-            else:
-                print(f"行号 {line_number} 超出映射范围 {len(self.line_mapping)}")
-            print("=== 双击事件结束 ===\n")
         event.accept()
 
     def _on_filter_requested(self, text: str, line_number: int, start_pos: int, end_pos: int):
         """处理过滤请求，记录选中文本的完整位置信息"""
-        print(f"on_filter_requested: {text}, {line_number}, {start_pos}, {end_pos}")
         if line_number >= 0:
             self.initial_filter_position = {
                 'line_number': line_number,
@@ -349,16 +334,32 @@ class SCFilteredLogViewer(QWidget):
 
     def apply_filter(self, expression: str):
         """应用过滤器"""
-        # 获取原始文本
-        text = self.original_viewer.toPlainText()
-        
         if not expression:
-            # 如果表达式为空，清除过滤
+            # 如果表达式为空，清除过滤（包括按分组过滤）
+            self.filter_engine.clear_filter()
             self.clear_filter()
             return
             
         # 获取过滤选项
-        filter_options = self.filter_input.get_filter_options()
+        self._start_filter(expression, self.filter_input.get_filter_options())
+        
+    def apply_keyword_group(self, name: str, rules: list):
+        """用一组关键字过滤（每个关键字使用自己的匹配选项），只扫描一遍文本
+        
+        Args:
+            name: 分组名，显示在过滤输入框中
+            rules: [(关键字, 匹配选项)]，完成后按相同顺序发出每个关键字的匹配次数
+        """
+        if not rules:
+            self.clear_filter()
+            return
+        self.filter_input.show_group(name, len(rules))
+        self._start_filter(name, {}, rules)
+        
+    def _start_filter(self, expression: str, filter_options: dict, keyword_rules: list = None):
+        """在工作线程中执行过滤"""
+        # 获取原始文本
+        text = self.original_viewer.toPlainText()
         
         # 如果有正在运行的线程，先停止它
         if hasattr(self, 'thread') and self.thread is not None:
@@ -369,7 +370,7 @@ class SCFilteredLogViewer(QWidget):
                     self.thread.quit()
                     self.thread.wait()  # 等待线程结束
             except Exception as e:
-                print(f"停止线程时出错: {str(e)}")
+                Logger.get_logger().warning(f"停止线程时出错: {str(e)}")
                 # 确保清理资源
                 if hasattr(self, 'worker') and self.worker is not None:
                     self.worker = None
@@ -377,7 +378,7 @@ class SCFilteredLogViewer(QWidget):
         
         # 创建工作线程
         self.thread = QThread()
-        self.worker = TextWorker(text, self.filter_engine, expression, filter_options)
+        self.worker = TextWorker(text, self.filter_engine, expression, filter_options, keyword_rules)
         
         # 将worker移动到线程
         self.worker.moveToThread(self.thread)
@@ -391,6 +392,7 @@ class SCFilteredLogViewer(QWidget):
         # 启动线程
         self.thread.start()
         
+    @profiled("render.filter_result")
     def _on_filter_processed(self, text: str, filtered_lines: list, line_mapping: list):
         """处理过滤完成"""
         try:
@@ -398,13 +400,20 @@ class SCFilteredLogViewer(QWidget):
             filter_options = self.filter_input.get_filter_options()
             
             # 获取过滤关键字并设置给高亮器
-            keywords = self.filter_engine.get_keywords()
-            self.original_viewer.highlighter.set_keywords(keywords, filter_options)
-            self.filtered_viewer.highlighter.set_keywords(keywords, filter_options)
+            group_matcher = self.filter_engine.group_matcher
+            if group_matcher is not None:
+                # 按分组过滤：每个关键字使用自己的颜色
+                self.original_viewer.highlighter.set_keyword_group(group_matcher)
+                self.filtered_viewer.highlighter.set_keyword_group(group_matcher)
+            else:
+                keywords = self.filter_engine.get_keywords()
+                self.original_viewer.highlighter.set_keywords(keywords, filter_options)
+                self.filtered_viewer.highlighter.set_keywords(keywords, filter_options)
             
             # 更新过滤后的查看器
-            self.line_mapping = line_mapping
-            self.filtered_viewer.setPlainText('\n'.join(filtered_lines))
+            self.match_lines = line_mapping
+            self._show_filtered_lines(filtered_lines)
+            self.original_viewer.set_hit_lines(line_mapping)
             
             # 计算总匹配数
             self.total_matches = self._calculate_total_matches()
@@ -417,7 +426,6 @@ class SCFilteredLogViewer(QWidget):
                 if self.initial_filter_position:
                     line_number, position = self.initial_filter_position['line_number'], self.initial_filter_position['start_pos']
                     match_index = self._find_match_index_for_position(line_number, position)
-                    print(f"match_index: {match_index}")
                     if match_index >= 0:
                         self._on_navigate_to_match(match_index)
                     else:
@@ -426,6 +434,12 @@ class SCFilteredLogViewer(QWidget):
                     # 否则显示第一个匹配项
                     self._on_navigate_to_match(0)
                 self.initial_filter_position = None  # 清除初始位置
+            else:
+                self.filter_input.update_match_count(0, 0)
+                
+            if group_matcher is not None:
+                self.keywordGroupFiltered.emit(self.filter_engine.current_expression,
+                                               list(self.filter_engine.keyword_counts))
         except Exception as e:
             QMessageBox.warning(self, "过滤错误", str(e))
             
@@ -433,8 +447,11 @@ class SCFilteredLogViewer(QWidget):
         # 清除过滤后的查看器
         self.filtered_viewer.clear()
         self.filtered_viewer.hide()  # 隐藏过滤视图
+        self.filtered_viewer.set_separator_rows([])
         self.line_mapping = []
+        self.match_lines = []
         self.filter_input.update_match_count(0, 0)
+        self.original_viewer.set_hit_lines([])
         # 清除高亮器的关键字
         self.original_viewer.highlighter.set_keywords(set(), {})
         self.filtered_viewer.highlighter.set_keywords(set(), {})
@@ -454,7 +471,7 @@ class SCFilteredLogViewer(QWidget):
                     self.thread.quit()
                     self.thread.wait()  # 等待线程结束
             except Exception as e:
-                print(f"停止线程时出错: {str(e)}")
+                Logger.get_logger().warning(f"停止线程时出错: {str(e)}")
                 # 确保清理资源
                 if hasattr(self, 'worker') and self.worker is not None:
                     self.worker = None
@@ -462,12 +479,18 @@ class SCFilteredLogViewer(QWidget):
         
         # 创建工作线程
         self.thread = QThread()
-        self.worker = TextWorker(
-            text,
-            self.filter_engine,
-            self.filter_input.input.text() if self.filter_input else None,
-            self.filter_input.get_filter_options() if self.filter_input else None
-        )
+        group_matcher = self.filter_engine.group_matcher
+        if group_matcher is not None:
+            # 正在按分组过滤，重新加载后继续使用同一组关键字
+            self.worker = TextWorker(text, self.filter_engine, self.filter_engine.current_expression, {},
+                                     list(group_matcher.rules))
+        else:
+            self.worker = TextWorker(
+                text,
+                self.filter_engine,
+                self.filter_input.input.text() if self.filter_input else None,
+                self.filter_input.get_filter_options() if self.filter_input else None
+            )
         
         # 将worker移动到线程
         self.worker.moveToThread(self.thread)
@@ -481,21 +504,61 @@ class SCFilteredLogViewer(QWidget):
         # 启动线程
         self.thread.start()
         
+    @profiled("render.load_text")
     def _on_text_processed(self, text: str, filtered_lines: list, line_mapping: list):
         """处理文本加载完成"""
         self.original_viewer.setPlainText(text)
         if filtered_lines:
-            self.filtered_viewer.setPlainText('\n'.join(filtered_lines))
-            self.line_mapping = line_mapping
+            self.match_lines = line_mapping
+            self._show_filtered_lines(filtered_lines)
             self.filtered_viewer.show()
+            self.original_viewer.set_hit_lines(line_mapping)
             
             # 更新匹配计数
             self.total_matches = self._calculate_total_matches()
             if self.total_matches > 0:
                 self._on_navigate_to_match(0)
+            if self.filter_engine.group_matcher is not None:
+                self.keywordGroupFiltered.emit(self.filter_engine.current_expression,
+                                               list(self.filter_engine.keyword_counts))
         else:
             self.clear_filter()
             
+    def _show_filtered_lines(self, filtered_lines: List[str] = None):
+        """按上下文行数显示匹配行及其前后的行，不相连的段之间画分隔线
+
+        上下文段由排好序的匹配行号向量化地合并得到，显示的内容直接取过滤时已分好的行，不重新扫描文本。
+
+        Args:
+            filtered_lines: 没有上下文时显示的匹配行，为 None 时按行号取
+        """
+        before, after = self.filter_input.get_context_lines() if self.filter_input else (0, 0)
+        lines = self.filter_engine.cached_lines
+        separators = []
+        if before or after:
+            rows, range_rows = context_lines(self.match_lines, before, after, len(lines))
+            self.line_mapping = rows.tolist()
+            separators = range_rows[1:].tolist()
+            filtered_lines = None
+        else:
+            self.line_mapping = list(self.match_lines)
+        if filtered_lines is None:
+            filtered_lines = [lines[row] for row in self.line_mapping]
+        self.filtered_viewer.setPlainText('\n'.join(filtered_lines))
+        self.filtered_viewer.set_separator_rows(separators)
+
+    def _on_context_changed(self, before: int, after: int):
+        """上下文行数变化：用已有的匹配结果重新生成显示内容"""
+        if not self.match_lines:
+            return
+        self._show_filtered_lines()
+        if self.total_matches > 0:
+            self._on_navigate_to_match(self.current_global_match)
+
+    def _filtered_row(self, original_line: int) -> int:
+        """原始行在过滤结果中的行号"""
+        return bisect_left(self.line_mapping, original_line)
+
     def _on_processing_error(self, error_message: str):
         """处理错误"""
         QMessageBox.warning(self, "处理错误", error_message)
@@ -511,6 +574,7 @@ class SCFilteredLogViewer(QWidget):
                 return match 
         return None
 
+    @profiled("navigate.match")
     def _on_navigate_to_match(self, global_match_index: int):
         """处理导航到指定匹配项
         Args:
@@ -519,7 +583,6 @@ class SCFilteredLogViewer(QWidget):
         if self.total_matches == 0:  # 使用已经计算好的总数
             return
             
-        print(f"on_navigate_to_match: {global_match_index} / {self.total_matches}")
         
         # 获取目标匹配
         match = self._get_match_at_index(global_match_index)
@@ -530,14 +593,13 @@ class SCFilteredLogViewer(QWidget):
         self.current_line = match[3]
         self.current_match_index = match[4]
         self.current_global_match = global_match_index
-        print(f"current_line: {self.current_line}, current_line_matches: {self.current_line_matches}, current_match_index: {self.current_match_index}, current_global_match: {self.current_global_match}")
 
         # 获取当前匹配项的位置和长度
         keyword_pos = match[0]
         keyword_length = match[1] - match[0]
 
         # 在过滤后的视图中高亮并定位
-        self.filtered_viewer.highlight_line(self.current_match_index, keyword_position=keyword_pos,
+        self.filtered_viewer.highlight_line(self._filtered_row(self.current_line), keyword_position=keyword_pos,
                                         keyword_length=keyword_length, center_on_screen=True,
                                         select_whole_line=False)
         # 在原始视图中执行相同操作
@@ -575,9 +637,9 @@ class SCFilteredLogViewer(QWidget):
                         self.thread.quit()
                         # 最多等待3秒
                         if not self.thread.wait(3000):
-                            print("警告：线程未能在3秒内结束")
+                            Logger.get_logger().warning("线程未能在3秒内结束")
                 except Exception as e:
-                    print(f"停止线程时出错: {str(e)}")
+                    Logger.get_logger().warning(f"停止线程时出错: {str(e)}")
 
                 try:
                     self.thread.deleteLater()
@@ -585,7 +647,7 @@ class SCFilteredLogViewer(QWidget):
                     pass
                 self.thread = None
         except Exception as e:
-            print(f"清理线程资源时出错: {str(e)}")
+            Logger.get_logger().warning(f"清理线程资源时出错: {str(e)}")
             # 确保引用被清除
             self.worker = None
             self.thread = None
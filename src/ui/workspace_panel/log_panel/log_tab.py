@@ -3,7 +3,9 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QKeySequence, QShortcut
 from src.ui.workspace_panel.workspace_panel import SCWorkspacePanel
 from src.utils.logger import log_ui_event
-from src.utils.file_utils import read_file_with_encoding
+from src.utils.file_utils import detect_encoding, read_file_with_encoding
+from src.utils.result_cache import ResultCache
+from src.utils.compressed_file import compression_type
 import os
 
 class SCLogTab(QWidget):
@@ -88,7 +90,15 @@ class SCLogTab(QWidget):
         
     def load_file(self, filename: str) -> bool:
         try:
-            content = read_file_with_encoding(filename)
+            # 同一文件内容之前打开过时，编码、字段索引和过滤结果直接从缓存读取
+            cache = ResultCache.for_file(filename)
+            encoding = cache.encoding if cache is not None else None
+            if encoding is None:
+                encoding = detect_encoding(filename)
+                if cache is not None:
+                    cache.set_encoding(encoding)
+            content = read_file_with_encoding(filename, encoding=encoding)
+            self.workspace_panel.set_result_cache(cache, content)
             self.workspace_panel.get_filtered_view().load_text(content)
             self.workspace_panel.set_filepath(filename)
             self.filepath = filename
@@ -105,12 +115,12 @@ class SCLogTab(QWidget):
     def save_file(self) -> bool:
         """保存文件"""
         try:
-            # 如果没有路径，弹出保存对话框
-            if not self.filepath:
+            # 如果没有路径，或者原文件是压缩文件（不能以纯文本覆盖），弹出保存对话框
+            if not self.filepath or compression_type(self.filepath):
                 filepath, _ = QFileDialog.getSaveFileName(
                     self,
                     "保存文件",
-                    "",
+                    os.path.splitext(self.filepath)[0] if self.filepath else "",
                     "日志文件 (*.log);;文本文件 (*.txt);;所有文件 (*.*)"
                 )
                 if not filepath:  # 用户取消了保存
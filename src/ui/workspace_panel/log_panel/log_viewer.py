@@ -2,19 +2,23 @@ from PyQt6.QtWidgets import (QWidget, QTextEdit, QVBoxLayout, QHBoxLayout,
                            QPushButton, QLineEdit, QMessageBox, QSplitter,
                            QListWidget, QListWidgetItem, QLabel, QTreeWidget,
                            QTreeWidgetItem, QInputDialog, QMenu, QDialog, QDialogButtonBox,
-                           QPlainTextEdit)
+                           QPlainTextEdit, QScrollBar, QStyle, QStyleOptionSlider)
 from PyQt6.QtCore import pyqtSignal, Qt, QSize, QPoint, QRect, QCoreApplication
 from PyQt6.QtGui import (QFont, QTextCursor, QIcon, QColor, QPalette, 
                       QTextCharFormat, QCursor, QKeySequence, QAction,
-                      QPainter, QFontMetrics)
+                      QPainter, QFontMetrics, QTextBlock)
 from src.utils.highlighter import LogHighlighter
-from src.ui.filter_panel.filter_engine import FilterEngine
+from src.utils.filter_engine import FilterEngine
+from src.utils.profiler import profiled, profiler
+from src.utils.line_density import LineDensity
+from src.utils.long_lines import LineSegments, split_long_lines
 from src.resources.theme import THEME
-from typing import Dict, List, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from bisect import bisect_left
+import numpy as np
 import re
 import json
 import os
-import traceback
 
 class LineNumberArea(QWidget):
     def __init__(self, viewer):
@@ -27,6 +31,16 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.viewer.line_number_area_paint_event(event)
 
+class SCOverviewScrollBar(QScrollBar):
+    """在垂直滚动条上绘制标记和过滤命中分布的概览标尺"""
+    def __init__(self, viewer):
+        super().__init__(Qt.Orientation.Vertical, viewer)
+        self.viewer = viewer
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        self.viewer.overview_paint_event(self)
+
 class SCLogViewer(QPlainTextEdit):
     markRequested = pyqtSignal(int, str)  # 请求添加标记的信号
     filterRequested = pyqtSignal(str, int, int, int)  # 请求过滤的信号，包含选中文本、行号和位置
@@ -34,6 +48,15 @@ class SCLogViewer(QPlainTextEdit):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.marked_lines: List[int] = []    # 已标记的行号（升序）
+        self.mark_density = LineDensity()    # 标记在文件中的分布
+        self.hit_density = LineDensity()     # 过滤命中行在文件中的分布
+        self.folded_runs = None              # 折叠的行段 (起始行号数组, 行数数组)，每段只显示第一行
+        self.separator_rows: List[int] = []  # 在这些行（升序）之前绘制分隔线，如过滤结果中不相连的上下文段
+        self.segments: Optional[LineSegments] = None  # 超长行拆分为多个块时行与块的对应关系
+        self._source_text: Optional[str] = None       # 拆分前的文本
+        self._source_revision = None                  # 拆分后文档的版本，之后没有编辑时直接返回拆分前的文本
+        self.setVerticalScrollBar(SCOverviewScrollBar(self))
         self.setup_ui()
         self.current_highlighted_line = -1
         self._text_change_connected = False
@@ -49,9 +72,6 @@ class SCLogViewer(QPlainTextEdit):
         # 初始化行号区域宽度
         self.update_line_number_area_width(0)
         
-        # 导入 traceback 模块
-        self.traceback = traceback
-        
         # 连接滚动条值变化信号
         self.verticalScrollBar().valueChanged.connect(self._on_vertical_scroll)
     def set_filter_type(self, filter_type: str):
@@ -86,6 +106,7 @@ class SCLogViewer(QPlainTextEdit):
         cr = self.contentsRect()
         self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), self.line_number_area_width(), cr.height()))
 
+    @profiled("render.line_numbers")
     def line_number_area_paint_event(self, event):
         painter = QPainter(self.line_number_area)
         painter.fillRect(event.rect(), QColor(THEME['background']))
@@ -99,9 +120,27 @@ class SCLogViewer(QPlainTextEdit):
         font = self.font()
         painter.setFont(font)
 
+        # 标记行号有序，从第一个可见行开始随绘制顺序前移
+        marked_lines = self.marked_lines
+        line_number, column = self.line_position(block_number)
+        mark_index = bisect_left(marked_lines, line_number)
+        mark_color = QColor(THEME['warning'])
+        mark_size = max(self.fontMetrics().height() // 3, 4)
+
         while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
+            line_number, column = self.line_position(block_number)
+            while mark_index < len(marked_lines) and marked_lines[mark_index] < line_number:
+                mark_index += 1
+            # 超长行拆分出的后续段不显示行号
+            if block.isVisible() and bottom >= event.rect().top() and column == 0:
+                if mark_index < len(marked_lines) and marked_lines[mark_index] == line_number:
+                    # 在行号右侧的空白处画一个圆点
+                    painter.setPen(Qt.PenStyle.NoPen)
+                    painter.setBrush(mark_color)
+                    painter.drawEllipse(self.line_number_area.width() - 4 - mark_size - 2,
+                                        int(top) + (self.fontMetrics().height() - mark_size) // 2,
+                                        mark_size, mark_size)
+                number = str(line_number + 1)
                 painter.setPen(QColor(THEME['text']))
                 # 使用右对齐，但是不要完全贴右，留出右边距
                 right_margin = 15  # 与line_number_area_width中的right_padding相同
@@ -115,6 +154,166 @@ class SCLogViewer(QPlainTextEdit):
             bottom = top + self.blockBoundingRect(block).height()
             block_number += 1
             
+    def setPlainText(self, text: str):
+        """设置文本；超长的行拆分为多个块显示（见 split_long_lines），排版和高亮都只处理可见的段"""
+        display_text, self.segments = split_long_lines(text)
+        self._source_text = text if self.segments is not None else None
+        super().setPlainText(display_text)
+        self._source_revision = self.document().revision()
+
+    def toPlainText(self) -> str:
+        """文本内容，超长行拆分出的段合并回原来的一行"""
+        segments = self._active_segments()
+        if segments is None:
+            return super().toPlainText()
+        if self.document().revision() == self._source_revision:
+            return self._source_text
+        return segments.join(super().toPlainText())
+
+    def _active_segments(self) -> Optional[LineSegments]:
+        """当前有效的拆分信息；文档被清空或编辑时增删了行，块与行无法再对应，之后按块作为行处理"""
+        segments = self.segments
+        if segments is not None and self.document().blockCount() != segments.block_count:
+            self.segments = segments = None
+            self._source_text = None
+        return segments
+
+    def line_count(self) -> int:
+        """行数（超长行拆分出的多个块算一行）"""
+        segments = self._active_segments()
+        return segments.line_count if segments is not None else self.blockCount()
+
+    def line_block_number(self, line_number: int) -> int:
+        """行的第一个块号"""
+        segments = self._active_segments()
+        return segments.first_block(line_number) if segments is not None else line_number
+
+    def line_block(self, line_number: int) -> QTextBlock:
+        """行的第一个块（超长行只有第一段）"""
+        return self.document().findBlockByNumber(self.line_block_number(line_number))
+
+    def line_text(self, line_number: int) -> str:
+        """一整行的文本"""
+        segments = self._active_segments()
+        if segments is None:
+            return self.document().findBlockByNumber(line_number).text()
+        first, count = segments.block_span(line_number)
+        block = self.document().findBlockByNumber(first)
+        parts = []
+        for _ in range(count):
+            parts.append(block.text())
+            block = block.next()
+        return "".join(parts)
+
+    def line_position(self, block_number: int, position_in_block: int = 0) -> Tuple[int, int]:
+        """块内的位置对应的 (行号, 行内的列)"""
+        segments = self._active_segments()
+        if segments is None:
+            return block_number, position_in_block
+        line_number, column = segments.line_of_block(block_number)
+        return line_number, column + position_in_block
+
+    def cursor_line(self, cursor: QTextCursor) -> Tuple[int, int]:
+        """光标所在的 (行号, 行内的列)"""
+        return self.line_position(cursor.blockNumber(), cursor.positionInBlock())
+
+    def set_marked_lines(self, lines: List[int]):
+        """设置已标记的行号（0 起始、升序），列表可以被调用方继续修改，修改后再次调用即可"""
+        self.marked_lines = lines
+        self.mark_density.set_lines(lines)
+        self.line_number_area.update()
+        self.verticalScrollBar().update()
+
+    def set_separator_rows(self, rows: List[int]):
+        """设置需要在上方绘制分隔线的行号（0 起始、升序）"""
+        self.separator_rows = rows
+        self.viewport().update()
+
+    def _paint_separators(self, event):
+        """在可见的分隔行上方画一条虚线，只处理当前可见的行"""
+        rows = self.separator_rows
+        block = self.firstVisibleBlock()
+        index = bisect_left(rows, self.line_position(block.blockNumber())[0])
+        if index >= len(rows):
+            return
+        painter = QPainter(self.viewport())
+        pen = painter.pen()
+        pen.setColor(QColor(THEME['border']))
+        pen.setStyle(Qt.PenStyle.DashLine)
+        painter.setPen(pen)
+        offset = self.contentOffset()
+        bottom = event.rect().bottom()
+        while index < len(rows):
+            block = self.line_block(rows[index])
+            if not block.isValid():
+                break
+            top = int(self.blockBoundingGeometry(block).translated(offset).top())
+            if top > bottom:
+                break
+            painter.drawLine(0, top, self.viewport().width(), top)
+            index += 1
+
+    def fold_lines(self, starts: np.ndarray, lengths: np.ndarray):
+        """折叠行段：每段只显示第一行，其余行隐藏（如连续重复的同一消息模板）"""
+        self.unfold_lines()
+        self._set_runs_visible(starts, lengths, False)
+        self.folded_runs = (starts, lengths)
+
+    def unfold_lines(self):
+        """取消折叠，显示所有行"""
+        if self.folded_runs is None:
+            return
+        starts, lengths = self.folded_runs
+        self.folded_runs = None
+        self._set_runs_visible(starts, lengths, True)
+
+    def folded_line_count(self) -> int:
+        """被折叠隐藏的行数"""
+        if self.folded_runs is None:
+            return 0
+        return int(self.folded_runs[1].sum()) - len(self.folded_runs[1])
+
+    def _set_runs_visible(self, starts: np.ndarray, lengths: np.ndarray, visible: bool):
+        document = self.document()
+        for start, length in zip(starts.tolist(), lengths.tolist()):
+            # 行段中第一行之后的所有块（超长行拆分出的段一起隐藏）
+            first = self.line_block_number(start + 1)
+            block = document.findBlockByNumber(first)
+            for _ in range(self.line_block_number(start + length) - first):
+                if not block.isValid():
+                    break
+                block.setVisible(visible)
+                block = block.next()
+        # 隐藏的块高度为 0，需要重新布局
+        document.markContentsDirty(0, document.characterCount())
+        self.viewport().update()
+        self.line_number_area.update()
+
+    def set_hit_lines(self, lines: List[int]):
+        """设置过滤命中的行号（0 起始），显示在概览标尺上"""
+        self.hit_density.set_lines(lines)
+        self.verticalScrollBar().update()
+
+    def overview_paint_event(self, scrollbar: QScrollBar):
+        """在滚动条的滑槽上绘制标记（左半边）和命中（右半边）的分布"""
+        if not len(self.mark_density) and not len(self.hit_density):
+            return
+        option = QStyleOptionSlider()
+        scrollbar.initStyleOption(option)
+        groove = scrollbar.style().subControlRect(QStyle.ComplexControl.CC_ScrollBar, option,
+                                                  QStyle.SubControl.SC_ScrollBarGroove, scrollbar)
+        if groove.height() <= 0:
+            return
+        total_lines = self.line_count()
+        half = groove.width() // 2
+        painter = QPainter(scrollbar)
+        for density, color, left in ((self.hit_density, THEME['keyword_text'], groove.left() + half),
+                                     (self.mark_density, THEME['warning'], groove.left())):
+            counts = density.buckets(total_lines, groove.height())
+            for y in np.flatnonzero(counts):
+                painter.fillRect(left, groove.top() + int(y), half, 2, QColor(color))
+        painter.end()
+
     def setFont(self, font):
         """重写setFont方法以更新行号区域宽度"""
         super().setFont(font)
@@ -160,16 +359,17 @@ class SCLogViewer(QPlainTextEdit):
                     
                     if selected_text:
                         # 获取选中文本的行号和位置
-                        line_number = cursor.blockNumber()
-                        position = cursor.positionInBlock()
+                        line_number, position = self.cursor_line(cursor)
                         
                         # 重置过滤选项为默认值
                         filter_input.case_btn.setChecked(False)
                         filter_input.word_btn.setChecked(False)
                         filter_input.regex_btn.setChecked(False)
+                        filter_input.query_btn.setChecked(False)
                         filter_input.case_sensitive = False
                         filter_input.whole_word = False
                         filter_input.use_regex = False
+                        filter_input.use_query = False
                         
                         # 发出过滤请求信号
                         self.filterRequested.emit(selected_text, line_number, position, position)
@@ -270,7 +470,7 @@ class SCLogViewer(QPlainTextEdit):
         # 获取当前行
         cursor = self.cursorForPosition(pos)
         cursor.movePosition(QTextCursor.MoveOperation.StartOfLine)
-        line_number = self.document().findBlock(cursor.position()).blockNumber()
+        line_number = self.line_position(self.document().findBlock(cursor.position()).blockNumber())[0]
         line_text = cursor.block().text()
         
         # 添加标记选项
@@ -299,16 +499,28 @@ class SCLogViewer(QPlainTextEdit):
         # 清除之前的高亮
         if self.current_highlighted_line >= 0:
             self.clear_line_highlight(self.current_highlighted_line)
-            
-        # 获取目标行的块
-        block = self.document().findBlockByLineNumber(line_number)
+
+        # 获取目标行的块：超长行按列定位到所在的段，只排版这一段；
+        # 折叠时隐藏的块不占行，按块号查找，目标行被折叠时先展开
+        segments = self._active_segments()
+        block_number = line_number
+        if segments is not None:
+            block_number, keyword_position = segments.locate(line_number, keyword_position)
+        if self.folded_runs is not None or segments is not None:
+            block = self.document().findBlockByNumber(block_number)
+            if block.isValid() and not block.isVisible():
+                self.unfold_lines()
+        else:
+            block = self.document().findBlockByLineNumber(line_number)
         if not block.isValid():
             return
+        if segments is not None:
+            # 跨段的关键字只选中在这一段中的部分
+            keyword_length = min(keyword_length, block.length() - 1 - keyword_position)
             
         # 创建光标并移动到目标行
         cursor = QTextCursor(block)
         if not select_whole_line and keyword_length > 0:
-            print(f"line_number: {line_number}, keyword_position: {keyword_position}, keyword_length: {keyword_length}")
             cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.MoveAnchor, keyword_position)
             cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor, keyword_length)
         else:
@@ -337,7 +549,7 @@ class SCLogViewer(QPlainTextEdit):
 
     def get_current_line_number(self) -> int:
         """获取当前行号"""
-        return self.textCursor().blockNumber()
+        return self.cursor_line(self.textCursor())[0]
         
     def mouseDoubleClickEvent(self, event):
         # 获取点击位置的光标
@@ -376,11 +588,14 @@ class SCLogViewer(QPlainTextEdit):
         cursor = self.textCursor()
         if cursor.hasSelection():
             selected_text = cursor.selectedText()
-            block_number = cursor.blockNumber()
             block = cursor.block()
             # 获取选中文本在当前行的起始和结束位置
             start_pos = cursor.selectionStart() - block.position()
             end_pos = cursor.selectionEnd() - block.position()
+            # 超长行拆分出的段中的位置换算为行内的列
+            block_number, column = self.line_position(cursor.blockNumber())
+            start_pos += column
+            end_pos += column
             # 发送包含完整位置信息的信号
             self.filterRequested.emit(selected_text, block_number, start_pos, end_pos)
         else:
@@ -454,7 +669,10 @@ class SCLogViewer(QPlainTextEdit):
 
     def _on_vertical_scroll(self, value):
         """处理垂直滚动条值变化"""
-        print(f"\n滚动条值变化: {value}, 最大值: {self.verticalScrollBar().maximum()}")
-        print("调用栈:")
-        for line in self.traceback.format_stack()[:-1]:  # 排除当前函数的调用
-            print(line.strip())
+        profiler.count("render.scroll")
+
+    def paintEvent(self, event):
+        with profiler.timer("render.paint"):
+            super().paintEvent(event)
+            if self.separator_rows:
+                self._paint_separators(event)
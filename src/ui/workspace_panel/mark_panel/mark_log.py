@@ -1,8 +1,79 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTreeWidget, QTreeWidgetItem, QMenu, QMessageBox, QHeaderView)
-from PyQt6.QtCore import pyqtSignal, Qt
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableView, QMenu, QMessageBox, QHeaderView,
+                           QAbstractItemView)
+from PyQt6.QtCore import pyqtSignal, Qt, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QAction
 from src.utils.mark_manager import MarkManager
 from src.resources.theme import THEME
+from bisect import bisect_left
+
+class MarkTableModel(QAbstractTableModel):
+    """标记列表的表格模型：直接读取 MarkManager 中有序的行号，增删时只插入或移除对应的行"""
+    HEADERS = ["行号", "内容"]
+
+    def __init__(self, mark_manager: MarkManager, parent=None):
+        super().__init__(parent)
+        self.mark_manager = mark_manager
+        self.filepath = ""
+
+    def set_filepath(self, filepath: str):
+        self.beginResetModel()
+        self.filepath = filepath
+        self.endResetModel()
+
+    def line_number(self, row: int) -> int:
+        """表格中的行对应的日志行号"""
+        return self.mark_manager.line_numbers(self.filepath)[row]
+
+    def add_mark(self, line_number: int, content: str) -> bool:
+        lines = self.mark_manager.line_numbers(self.filepath)
+        row = bisect_left(lines, line_number)
+        if row < len(lines) and lines[row] == line_number:
+            return False
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.mark_manager.add_mark(self.filepath, line_number, content)
+        self.endInsertRows()
+        return True
+
+    def remove_mark(self, line_number: int) -> bool:
+        lines = self.mark_manager.line_numbers(self.filepath)
+        row = bisect_left(lines, line_number)
+        if row >= len(lines) or lines[row] != line_number:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.mark_manager.remove_mark(self.filepath, line_number)
+        self.endRemoveRows()
+        return True
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or not self.filepath:
+            return 0
+        return self.mark_manager.mark_count(self.filepath)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        line_number = self.line_number(index.row())
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(line_number)
+            # 只有可见的行才会被请求，过长的内容由视图在绘制时省略
+            return self.mark_manager.get_mark(self.filepath, line_number)["content"].strip()
+        if role == Qt.ItemDataRole.ToolTipRole and column == 1:
+            return self.mark_manager.get_mark(self.filepath, line_number)["content"].strip()
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if column == 0:
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        return None
 
 class SCMarkLogViewer(QWidget):
     markClicked = pyqtSignal(int)
@@ -16,51 +87,40 @@ class SCMarkLogViewer(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         
-        # 创建树形视图
-        self.mark_tree = QTreeWidget()
-        self.mark_tree.setColumnCount(2)  # 设置2列：行号、内容
-        self.mark_tree.setHeaderLabels(["行号", "内容"])
-        
-        # 设置列宽和调整模式
-        header = self.mark_tree.header()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)  # 行号列可以手动调整宽度
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)  # 内容列固定宽度，不自动扩展
+        # 创建表格视图，只绘制可见的行
+        self.model = MarkTableModel(self.mark_manager, self)
+        self.mark_table = QTableView()
+        self.mark_table.setModel(self.model)
+        self.mark_table.setShowGrid(False)
+        self.mark_table.setWordWrap(False)
+        self.mark_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.mark_table.setTextElideMode(Qt.TextElideMode.ElideRight)
+        self.mark_table.verticalHeader().hide()
+        # 固定行高，避免为计算行高读取所有行
+        self.mark_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.mark_table.verticalHeader().setDefaultSectionSize(self.mark_table.fontMetrics().height() + 10)
         
-        # 设置行号列的最小和默认宽度
-        self.mark_tree.setColumnWidth(0, 100)  # 设置行号列默认宽度为100像素
-        header.setMinimumSectionSize(60)  # 设置行号列最小宽度
+        # 行号列可以手动调整宽度，内容列填满剩余宽度
+        header = self.mark_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        header.setMinimumSectionSize(60)
+        self.mark_table.setColumnWidth(0, 100)
         
-        # 设置内容列宽度
-        self.mark_tree.setColumnWidth(1, 1000)  # 设置内容列宽度为1000像素
-        
-        # 启用水平滚动条
-        self.mark_tree.setHorizontalScrollMode(QTreeWidget.ScrollMode.ScrollPerPixel)
-        self.mark_tree.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        
-        # 启用垂直滚动条
-        self.mark_tree.setVerticalScrollMode(QTreeWidget.ScrollMode.ScrollPerPixel)
-        self.mark_tree.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        
-        # 设置文本不换行，允许水平滚动
-        self.mark_tree.setWordWrap(False)
-        self.mark_tree.setUniformRowHeights(True)  # 统一行高
-        self.mark_tree.setTextElideMode(Qt.TextElideMode.ElideNone)  # 不省略文本
-        
-        # 设置样式
-        self.mark_tree.setStyleSheet(f"""
-            QTreeWidget {{
+        self.mark_table.setStyleSheet(f"""
+            QTableView {{
                 background-color: {THEME['background']};
                 color: {THEME['text']};
                 border: none;
                 padding: 0px;
                 margin: 0px;
             }}
-            QTreeWidget::item {{
+            QTableView::item {{
                 padding: 5px;
                 border-bottom: 1px solid {THEME['border']};
                 margin: 0px;
             }}
-            QTreeWidget::item:hover {{
+            QTableView::item:hover {{
                 background-color: {THEME['hover_bg']};
             }}
             QHeaderView::section {{
@@ -115,57 +175,26 @@ class SCMarkLogViewer(QWidget):
             }}
         """)
         
-        self.mark_tree.itemDoubleClicked.connect(self._on_mark_double_clicked)
-        self.mark_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.mark_tree.customContextMenuRequested.connect(self._show_context_menu)
-        layout.addWidget(self.mark_tree)
-
-    def refresh_marks(self):
-        self.mark_tree.clear()
-        if not self.current_filepath:
-            return
-        marks = self.mark_manager.get_marks(self.current_filepath)
-        marks.sort(key=lambda x: x["line_number"])
-        
-        # 计算最长内容的宽度
-        font_metrics = self.mark_tree.fontMetrics()
-        max_content_width = 0
-        
-        for mark in marks:
-            item = QTreeWidgetItem()
-            item.setText(0, str(mark["line_number"]))  # 行号
-            content = mark["content"].strip()
-            item.setText(1, content)  # 内容，去除首尾空白
-            item.setData(0, Qt.ItemDataRole.UserRole, mark["line_number"])
-            # 设置文本对齐方式
-            item.setTextAlignment(0, Qt.AlignmentFlag.AlignRight)  # 行号右对齐
-            item.setTextAlignment(1, Qt.AlignmentFlag.AlignLeft)  # 内容左对齐
-            self.mark_tree.addTopLevelItem(item)
-            
-            # 计算当前内容的宽度
-            content_width = font_metrics.horizontalAdvance(content)
-            max_content_width = max(max_content_width, content_width)
-        
-        # 设置内容列的宽度为最长内容的宽度加上一些padding
-        padding = 20  # 添加一些padding，避免文字紧贴边缘
-        self.mark_tree.setColumnWidth(1, max_content_width + padding)
+        self.mark_table.doubleClicked.connect(self._on_mark_double_clicked)
+        self.mark_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.mark_table.customContextMenuRequested.connect(self._show_context_menu)
+        layout.addWidget(self.mark_table)
 
-    def _on_mark_double_clicked(self, item: QTreeWidgetItem, column: int):
-        line_number = item.data(0, Qt.ItemDataRole.UserRole)
-        self.markClicked.emit(line_number)
+    def _on_mark_double_clicked(self, index: QModelIndex):
+        self.markClicked.emit(self.model.line_number(index.row()))
 
     def _show_context_menu(self, pos):
-        item = self.mark_tree.itemAt(pos)
-        if not item:
+        index = self.mark_table.indexAt(pos)
+        if not index.isValid():
             return
+        line_number = self.model.line_number(index.row())
         menu = QMenu(self)
         remove_action = QAction("删除标记", self)
-        remove_action.triggered.connect(lambda: self._remove_mark(item))
+        remove_action.triggered.connect(lambda: self._remove_mark(line_number))
         menu.addAction(remove_action)
-        menu.exec(self.mark_tree.mapToGlobal(pos))
+        menu.exec(self.mark_table.viewport().mapToGlobal(pos))
 
-    def _remove_mark(self, item: QTreeWidgetItem):
-        line_number = item.data(0, Qt.ItemDataRole.UserRole)
+    def _remove_mark(self, line_number: int):
         reply = QMessageBox.question(self, "确认删除", "确定要删除这个标记吗？", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             self.remove_mark(line_number)
@@ -173,20 +202,14 @@ class SCMarkLogViewer(QWidget):
     def set_filepath(self, filepath: str):
         self.current_filepath = filepath
         self.mark_manager.load_marks(filepath)
-        self.refresh_marks()
+        self.model.set_filepath(filepath)
 
     def add_mark(self, line_number: int, content: str):
         if not self.current_filepath:
             return
-        if self.mark_manager.is_marked(self.current_filepath, line_number):
-            return
-        if self.mark_manager.add_mark(self.current_filepath, line_number, content):
-            self.refresh_marks()
-            self.mark_manager.save_marks(self.current_filepath)
+        self.model.add_mark(line_number, content)
 
     def remove_mark(self, line_number: int):
         if not self.current_filepath:
             return
-        if self.mark_manager.remove_mark(self.current_filepath, line_number):
-            self.refresh_marks()
-            self.mark_manager.save_marks(self.current_filepath) 
\ No newline at end of file
+        self.model.remove_mark(line_number)
@@ -0,0 +1,303 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
+                           QHeaderView, QMessageBox, QAbstractItemView)
+from PyQt6.QtCore import pyqtSignal, Qt, QThread, QObject, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor, QFont
+from src.ui.filter_panel.filter_input import SCFilterInput
+from src.utils.merged_log import MergedLog
+from src.utils.filter_engine import FilterEngine
+from src.utils.logger import log_ui_event
+from src.resources.theme import THEME
+import os
+
+# 用于区分来源文件的颜色（循环使用）
+SOURCE_COLORS = [THEME['keyword_text'], THEME['info'], THEME['warning'], THEME['success'],
+                 THEME['brightest_blue'], THEME['error']]
+
+class MergedIndexWorker(QObject):
+    finished = pyqtSignal()  # 索引和合并完成
+    error = pyqtSignal(str)  # 错误信号
+    progress = pyqtSignal(int)  # 进度信号（百分比）
+
+    def __init__(self, merged_log: MergedLog):
+        super().__init__()
+        self.merged_log = merged_log
+        self.is_cancelled = False
+
+    def cancel(self):
+        """取消处理"""
+        self.is_cancelled = True
+
+    def process(self):
+        try:
+            completed = self.merged_log.build(
+                lambda done, total: self.progress.emit(done * 100 // max(total, 1)),
+                lambda: self.is_cancelled)
+            if completed and not self.is_cancelled:
+                self.finished.emit()
+        except Exception as e:
+            if not self.is_cancelled:
+                self.error.emit(str(e))
+
+class MergedFilterWorker(QObject):
+    finished = pyqtSignal(object)  # 过滤完成，参数为命中行号数组
+    error = pyqtSignal(str)  # 错误信号
+    progress = pyqtSignal(int)  # 进度信号（百分比）
+
+    def __init__(self, merged_log: MergedLog, expression: str, options: dict):
+        super().__init__()
+        self.merged_log = merged_log
+        self.expression = expression
+        self.options = options
+        self.is_cancelled = False
+
+    def cancel(self):
+        """取消处理"""
+        self.is_cancelled = True
+
+    def process(self):
+        try:
+            engine = FilterEngine()
+            result = engine.set_filter_expression(self.expression, self.options)
+            if not result["valid"]:
+                raise ValueError(result["message"])
+            rows = self.merged_log.filter(
+                engine,
+                lambda done, total: self.progress.emit(done * 100 // max(total, 1)),
+                lambda: self.is_cancelled)
+            if rows is not None and not self.is_cancelled:
+                self.finished.emit(rows)
+        except Exception as e:
+            if not self.is_cancelled:
+                self.error.emit(str(e))
+
+class MergedLogModel(QAbstractTableModel):
+    """合并日志的表格模型：只在视图请求时读取对应行"""
+    HEADERS = ["来源", "行号", "内容"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.merged_log = None
+        self.rows = None  # 过滤后显示的行（合并视图中的行号），None 表示显示全部
+
+    def set_merged_log(self, merged_log: MergedLog):
+        self.beginResetModel()
+        self.merged_log = merged_log
+        self.rows = None
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def merged_row(self, row: int) -> int:
+        """表格中的行对应的合并视图行号"""
+        return int(self.rows[row]) if self.rows is not None else row
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.merged_log is None:
+            return 0
+        return len(self.rows) if self.rows is not None else self.merged_log.line_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self.merged_log is None:
+            return None
+        row = self.merged_row(index.row())
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            source, line_number = self.merged_log.source_of(row)
+            if column == 0:
+                return source.name
+            if column == 1:
+                return str(line_number + 1)
+            return self.merged_log.get_line(row)
+        if role == Qt.ItemDataRole.ForegroundRole and column == 0:
+            source_index = int(self.merged_log.line_sources[row])
+            return QColor(SOURCE_COLORS[source_index % len(SOURCE_COLORS)])
+        if role == Qt.ItemDataRole.ToolTipRole and column == 0:
+            return self.merged_log.source_of(row)[0].filepath
+        if role == Qt.ItemDataRole.TextAlignmentRole and column == 1:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+class SCMergedLogTab(QWidget):
+    """多个日志文件按时间合并显示的标签页"""
+
+    def __init__(self, filepaths: list, parent=None):
+        super().__init__(parent)
+        self.filepath = ""  # 合并视图不对应单个文件，也不会被保存
+        self.filepaths = list(filepaths)
+        self.is_modified = False
+        self.merged_log = MergedLog(self.filepaths)
+        self.thread = None
+        self.worker = None
+        self.setup_ui()
+        self.load()
+
+    @property
+    def title(self) -> str:
+        return f"合并({len(self.filepaths)})"
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        self.filter_input = SCFilterInput()
+        self.filter_input.filterChanged.connect(self.apply_filter)
+        self.filter_input.navigateToMatch.connect(self._on_navigate_to_match)
+        layout.addWidget(self.filter_input)
+
+        self.model = MergedLogModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setFont(QFont("Courier New", 12))
+        self.table.setShowGrid(False)
+        self.table.setWordWrap(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().hide()
+        # 固定行高，避免为计算行高读取所有行
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.table.fontMetrics().height() + 4)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        self.table.setColumnWidth(0, 160)
+        self.table.setColumnWidth(1, 80)
+        self.table.setStyleSheet(f"""
+            QTableView {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                border: none;
+                selection-background-color: {THEME['highlight_bg']};
+                selection-color: {THEME['highlight_text']};
+            }}
+            QHeaderView::section {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                padding: 4px;
+                border: none;
+                border-bottom: 1px solid {THEME['border']};
+            }}
+        """)
+        self.table.doubleClicked.connect(self._on_row_double_clicked)
+        layout.addWidget(self.table, 1)
+
+        status_layout = QHBoxLayout()
+        status_layout.setContentsMargins(5, 2, 5, 2)
+        self.status_label = QLabel("")
+        self.status_label.setToolTip("\n".join(self.filepaths))
+        status_layout.addWidget(self.status_label, 1)
+        layout.addLayout(status_layout)
+
+    def load(self):
+        """在后台为所有文件建立索引并按时间合并"""
+        self.status_label.setText("正在建立索引...")
+        self._start_worker(MergedIndexWorker(self.merged_log), self._on_index_finished)
+
+    def _start_worker(self, worker: QObject, on_finished):
+        self._cleanup_thread()
+        self.thread = QThread()
+        self.worker = worker
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.process)
+        self.worker.finished.connect(on_finished)
+        self.worker.error.connect(self._on_worker_error)
+        self.worker.progress.connect(self._on_progress)
+        self.thread.start()
+
+    def _on_progress(self, percent: int):
+        self.status_label.setText(f"处理中... {percent}%")
+
+    def _on_index_finished(self):
+        self._cleanup_thread()
+        self.model.set_merged_log(self.merged_log)
+        self._update_status()
+        # 索引期间输入的过滤条件
+        if self.filter_input.input.text().strip():
+            self.apply_filter(self.filter_input.input.text())
+
+    def _on_worker_error(self, message: str):
+        self._cleanup_thread()
+        self._update_status()
+        QMessageBox.warning(self, "合并日志错误", message)
+
+    def _update_status(self):
+        names = "、".join(os.path.basename(filepath) for filepath in self.filepaths)
+        text = f"{len(self.filepaths)} 个文件（{names}），共 {self.merged_log.line_count} 行"
+        if self.model.rows is not None:
+            text += f"，过滤后 {len(self.model.rows)} 行"
+        self.status_label.setText(text)
+
+    def apply_filter(self, expression: str):
+        """在后台过滤合并后的所有行"""
+        log_ui_event("apply_filter", "MergedLogView", f"Expression: {expression}")
+        if self.model.merged_log is None:
+            return  # 索引完成后再应用
+        if not expression.strip():
+            self._cleanup_thread()
+            self.model.set_rows(None)
+            self.filter_input.update_match_count(0, 0)
+            self._update_status()
+            return
+        worker = MergedFilterWorker(self.merged_log, expression, self.filter_input.get_filter_options())
+        self._start_worker(worker, self._on_filter_finished)
+
+    def _on_filter_finished(self, rows):
+        self._cleanup_thread()
+        self.model.set_rows(rows)
+        self._update_status()
+        self.filter_input.update_match_count(1 if len(rows) else 0, len(rows))
+        if len(rows):
+            self._on_navigate_to_match(0)
+
+    def _on_navigate_to_match(self, index: int):
+        """选中过滤结果中的第 index 行"""
+        if self.model.rows is None or not 0 <= index < len(self.model.rows):
+            return
+        self.table.selectRow(index)
+        self.table.scrollTo(self.model.index(index, 0), QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def _on_row_double_clicked(self, index: QModelIndex):
+        """在源文件的标签页中打开这一行"""
+        source, line_number = self.merged_log.source_of(self.model.merged_row(index.row()))
+        main_window = self.window()
+        if main_window.__class__.__name__ == 'SCMainWindow':
+            main_window.open_file_at(source.filepath, line_number)
+
+    def set_read_only(self, read_only: bool):
+        """合并视图始终只读"""
+        pass
+
+    def show_save_dialog(self) -> int:
+        """合并视图没有需要保存的内容"""
+        return QMessageBox.StandardButton.Discard
+
+    def closeEvent(self, event):
+        """处理窗口关闭事件"""
+        self._cleanup_thread()
+        self.merged_log.close()
+        super().closeEvent(event)
+
+    def _cleanup_thread(self):
+        """清理线程资源"""
+        if self.thread is None:
+            return
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.deleteLater()
+            self.worker = None
+        if self.thread.isRunning():
+            self.thread.quit()
+            self.thread.wait()
+        self.thread.deleteLater()
+        self.thread = None
@@ -0,0 +1,276 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget,
+                           QTreeWidgetItem, QSplitter, QPushButton, QHeaderView)
+from PyQt6.QtCore import pyqtSignal, Qt, QThread, QObject, QFileSystemWatcher, QRectF
+from PyQt6.QtGui import QPainter, QColor
+from src.utils.log_statistics import LogStatistics
+from src.utils.file_utils import get_content_size
+from src.resources.theme import THEME
+from datetime import datetime, timezone
+import os
+
+# 每个级别在图表中使用的颜色
+LEVEL_COLORS = {
+    "VERBOSE": THEME['tab_text'],
+    "DEBUG": THEME['info'],
+    "INFO": THEME['success'],
+    "WARN": THEME['warning'],
+    "ERROR": THEME['error'],
+    "FATAL": THEME['delete_hover'],
+    "UNKNOWN": THEME['border'],
+}
+
+class StatisticsWorker(QObject):
+    finished = pyqtSignal(bool)  # 统计完成信号，参数表示是否有新数据
+    error = pyqtSignal(str)  # 错误信号
+    progress = pyqtSignal(int)  # 进度信号（已读取的字节数）
+
+    def __init__(self, statistics: LogStatistics, filepath: str):
+        super().__init__()
+        self.statistics = statistics
+        self.filepath = filepath
+        self.is_cancelled = False
+
+    def cancel(self):
+        """取消处理"""
+        self.is_cancelled = True
+
+    def process(self):
+        """从上次读取的位置继续统计"""
+        try:
+            updated = self.statistics.update_from_file(
+                self.filepath, self.progress.emit, lambda: self.is_cancelled)
+            if not self.is_cancelled:
+                self.finished.emit(updated)
+        except Exception as e:
+            if not self.is_cancelled:
+                self.error.emit(str(e))
+
+class SCTimeHistogram(QWidget):
+    """时间分布柱状图"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.starts = []
+        self.counts = []
+        self.bucket_seconds = 0
+        self.setMinimumHeight(120)
+
+    def set_data(self, starts, counts):
+        self.starts = list(starts)
+        self.counts = list(counts)
+        self.bucket_seconds = self.starts[1] - self.starts[0] if len(self.starts) > 1 else 0
+        if self.starts:
+            first = datetime.fromtimestamp(self.starts[0], timezone.utc).strftime("%m-%d %H:%M:%S")
+            last = datetime.fromtimestamp(self.starts[-1], timezone.utc).strftime("%m-%d %H:%M:%S")
+            self.setToolTip(f"{first} ~ {last}，每柱 {self.bucket_seconds} 秒，峰值 {max(self.counts)} 行")
+        else:
+            self.setToolTip("")
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(THEME['background']))
+        if not self.counts:
+            painter.setPen(QColor(THEME['tab_text']))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "没有可识别的时间戳")
+            return
+
+        peak = max(self.counts) or 1
+        width = self.width() / len(self.counts)
+        height = self.height() - 4
+        color = QColor(THEME['bright_blue'])
+        for i, count in enumerate(self.counts):
+            bar_height = height * count / peak
+            painter.fillRect(QRectF(i * width, self.height() - bar_height, max(width - 1, 1), bar_height), color)
+
+class SCStatisticsViewer(QWidget):
+    """日志统计视图：级别统计、时间分布、高频词和已保存关键字的命中数"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.current_filepath = ""
+        self.statistics = None
+        self.thread = None
+        self.worker = None
+        self.pending_update = False  # 统计进行中文件又发生变化
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self._on_file_changed)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # 顶部状态栏
+        header = QHBoxLayout()
+        header.setContentsMargins(5, 2, 5, 2)
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(f"color: {THEME['text']};")
+        self.refresh_btn = QPushButton("重新统计")
+        self.refresh_btn.clicked.connect(self.recompute)
+        header.addWidget(self.status_label, 1)
+        header.addWidget(self.refresh_btn)
+        layout.addLayout(header)
+
+        # 时间分布图
+        self.histogram = SCTimeHistogram()
+        layout.addWidget(self.histogram)
+
+        # 下方三列：级别、高频词、关键字
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.level_tree = self._create_tree(["级别", "行数", "占比"])
+        self.token_tree = self._create_tree(["单词", "次数"])
+        self.keyword_tree = self._create_tree(["关键字", "命中次数"])
+        splitter.addWidget(self.level_tree)
+        splitter.addWidget(self.token_tree)
+        splitter.addWidget(self.keyword_tree)
+        layout.addWidget(splitter, 1)
+
+    def _create_tree(self, labels):
+        tree = QTreeWidget()
+        tree.setColumnCount(len(labels))
+        tree.setHeaderLabels(labels)
+        tree.setRootIsDecorated(False)
+        tree.setUniformRowHeights(True)
+        tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        tree.setStyleSheet(f"""
+            QTreeWidget {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                border: none;
+            }}
+            QHeaderView::section {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                padding: 4px;
+                border: none;
+                border-bottom: 1px solid {THEME['border']};
+            }}
+        """)
+        return tree
+
+    def set_filepath(self, filepath: str):
+        """切换统计的文件，统计会在视图显示时进行"""
+        if self.current_filepath:
+            self.file_watcher.removePath(self.current_filepath)
+        self.current_filepath = filepath
+        self.statistics = None
+        if filepath:
+            self.file_watcher.addPath(filepath)
+        if self.isVisible():
+            self.update_statistics()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 显示时才进行统计，避免打开文件时的额外开销；已有结果时只统计新增部分
+        self.update_statistics()
+
+    def hideEvent(self, event):
+        self._cleanup_thread()
+        super().hideEvent(event)
+
+    def _get_keyword_groups(self) -> dict:
+        """获取已保存的关键字分组"""
+        main_window = self.window()
+        if main_window.__class__.__name__ == 'SCMainWindow':
+            return main_window.keyword_list.get_all_keywords()
+        return {}
+
+    def recompute(self):
+        """丢弃已有结果，重新统计整个文件"""
+        self._cleanup_thread()
+        self.statistics = None
+        self.update_statistics()
+
+    def update_statistics(self):
+        """统计文件中尚未统计的部分（首次为整个文件）"""
+        if not self.current_filepath or not os.path.exists(self.current_filepath):
+            return
+        if self.thread is not None:
+            self.pending_update = True
+            return
+        # 文件被截断或替换（例如日志轮转）时重新统计
+        if self.statistics is not None:
+            size = get_content_size(self.current_filepath)
+            if size is not None and size < self.statistics.file_offset:
+                self.statistics = None
+        if self.statistics is None:
+            self.statistics = LogStatistics(self._get_keyword_groups())
+            self.status_label.setText("正在统计...")
+
+        self.thread = QThread()
+        self.worker = StatisticsWorker(self.statistics, self.current_filepath)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.process)
+        self.worker.finished.connect(self._on_statistics_finished)
+        self.worker.error.connect(self._on_statistics_error)
+        self.thread.start()
+
+    def _on_file_changed(self, path: str):
+        """文件内容变化（例如被追加）时增量更新"""
+        # 某些编辑器保存时会替换文件，需要重新监听
+        if path not in self.file_watcher.files() and os.path.exists(path):
+            self.file_watcher.addPath(path)
+        if self.statistics is not None and self.isVisible():
+            self.update_statistics()
+
+    def _on_statistics_finished(self, updated: bool):
+        self._cleanup_thread()
+        if updated or not self.level_tree.topLevelItemCount():
+            self.refresh_view()
+        if self.pending_update:
+            self.pending_update = False
+            self.update_statistics()
+
+    def _on_statistics_error(self, message: str):
+        self._cleanup_thread()
+        self.status_label.setText(f"统计失败：{message}")
+
+    def refresh_view(self):
+        """把统计结果显示到界面"""
+        if self.statistics is None:
+            return
+        stats = self.statistics
+        self.status_label.setText(f"共 {stats.line_count} 行")
+
+        total = max(stats.line_count, 1)
+        self.level_tree.clear()
+        for name, count in stats.level_counts().items():
+            if not count:
+                continue
+            item = QTreeWidgetItem([name, str(count), f"{count * 100 / total:.1f}%"])
+            item.setForeground(0, QColor(LEVEL_COLORS[name]))
+            item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
+            item.setTextAlignment(2, Qt.AlignmentFlag.AlignRight)
+            self.level_tree.addTopLevelItem(item)
+
+        self.token_tree.clear()
+        self.token_tree.setHeaderLabels(["单词", "次数（采样估计）" if stats.tokens_sampled else "次数"])
+        for token, count in stats.top_tokens(50):
+            item = QTreeWidgetItem([token, str(count)])
+            item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
+            self.token_tree.addTopLevelItem(item)
+
+        self.keyword_tree.clear()
+        for group, keywords in stats.keyword_counts().items():
+            for keyword, count in sorted(keywords.items(), key=lambda item: -item[1]):
+                item = QTreeWidgetItem([f"{group} / {keyword}", str(count)])
+                item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
+                self.keyword_tree.addTopLevelItem(item)
+
+        starts, counts = stats.time_histogram()
+        self.histogram.set_data(starts.tolist(), counts.tolist())
+
+    def _cleanup_thread(self):
+        """清理线程资源"""
+        if self.thread is None:
+            return
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.deleteLater()
+            self.worker = None
+        if self.thread.isRunning():
+            self.thread.quit()
+            self.thread.wait()
+        self.thread.deleteLater()
+        self.thread = None
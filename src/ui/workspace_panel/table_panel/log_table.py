@@ -0,0 +1,338 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit, QPushButton,
+                           QTableView, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QObject, QThread, Qt, pyqtSignal
+from PyQt6.QtGui import QColor
+from src.utils.filter_engine import FilterEngine
+from src.utils.log_fields import PARSER_PRESETS, LineParser, LogFields
+from src.utils.log_index import LEVEL_NAMES
+from src.utils.logger import log_ui_event
+from src.ui.workspace_panel.stats_panel.stats_view import LEVEL_COLORS
+from src.resources.theme import THEME
+from datetime import datetime, timezone
+from typing import Optional
+import numpy as np
+
+# 列标题和对应的字段（None 表示不是字段列）
+COLUMNS = [("行号", None), ("时间", "time"), ("PID", "pid"), ("TID", "tid"), ("级别", "level"),
+           ("标签", "tag"), ("消息", None)]
+MESSAGE_COLUMN = len(COLUMNS) - 1
+
+
+class LogTableModel(QAbstractTableModel):
+    """按字段分列显示日志行
+
+    模型只保存要显示的行号数组，单元格内容在显示时从字段列和文档中取出，
+    行数很多时也不需要为每行创建对象；排序由 numpy 对整列排序完成。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fields: Optional[LogFields] = None
+        self.viewer = None
+        self.rows = np.empty(0, dtype=np.int64)  # 显示的行号（0-based）
+
+    def set_rows(self, fields: Optional[LogFields], viewer, rows: np.ndarray):
+        self.beginResetModel()
+        self.fields = fields
+        self.viewer = viewer
+        self.rows = rows
+        self.endResetModel()
+
+    def line_number(self, row: int) -> int:
+        return int(self.rows[row])
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self.fields is None:
+            return None
+        line = int(self.rows[index.row()])
+        column = index.column()
+        fields = self.fields
+        in_fields = line < fields.line_count
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(line + 1)
+            if column == MESSAGE_COLUMN:
+                # 超长行只显示拆分后的第一段
+                text = self.viewer.line_block(line).text()
+                return text[int(fields.message_starts[line]):] if in_fields else text
+            if not in_fields:
+                return ""
+            name = COLUMNS[column][1]
+            if name == "time":
+                timestamp = fields.timestamps[line]
+                if np.isnan(timestamp):
+                    return ""
+                moment = datetime.fromtimestamp(float(timestamp), timezone.utc)
+                return moment.strftime("%m-%d %H:%M:%S.") + f"{moment.microsecond // 1000:03d}"
+            if name == "level":
+                level = int(fields.levels[line])
+                return LEVEL_NAMES[level] if level >= 0 else ""
+            if name == "tag":
+                code = int(fields.tags[line])
+                return fields.tag_names[code] if code >= 0 else ""
+            value = int(fields.column(name)[line])
+            return str(value) if value >= 0 else ""
+        if role == Qt.ItemDataRole.ForegroundRole and COLUMNS[column][1] == "level" and in_fields:
+            level = int(fields.levels[line])
+            return QColor(LEVEL_COLORS[LEVEL_NAMES[level]]) if level >= 0 else None
+        if role == Qt.ItemDataRole.TextAlignmentRole and (column == 0 or COLUMNS[column][1] in ("pid", "tid")):
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """按列排序（稳定排序，相同值保持行号顺序）；消息列不参与排序"""
+        if self.fields is None or column == MESSAGE_COLUMN or not len(self.rows):
+            return
+        self.layoutAboutToBeChanged.emit()
+        rows = np.sort(self.rows)
+        name = COLUMNS[column][1]
+        if name is not None:
+            fields = self.fields
+            values = fields.tag_ranks() if name == "tag" else fields.column(name)
+            # 文档末尾没有字段的行按无效值处理
+            keys = np.full(len(rows), -1, dtype=np.float64)
+            inside = rows < len(values)
+            keys[inside] = values[rows[inside]]
+            rows = rows[np.argsort(keys, kind="stable")]
+        if order == Qt.SortOrder.DescendingOrder:
+            rows = rows[::-1].copy()
+        self.rows = rows
+        self.layoutChanged.emit()
+
+
+class FieldIndexWorker(QObject):
+    """在后台扫描文本，提取每行的字段"""
+    finished = pyqtSignal(object)  # LogFields，取消时不发出
+    error = pyqtSignal(str)
+
+    def __init__(self, engine: FilterEngine, text: str):
+        super().__init__()
+        self.engine = engine
+        self.text = text
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def process(self):
+        try:
+            fields = self.engine.field_index(self.text, lambda: self.is_cancelled)
+            if fields is not None and not self.is_cancelled:
+                self.finished.emit(fields)
+        except Exception as e:
+            if not self.is_cancelled:
+                self.error.emit(str(e))
+
+
+class SCLogTableViewer(QWidget):
+    """表格视图：把日志行解析为时间、PID、TID、级别、标签和消息列，可以按列排序和按字段过滤
+
+    字段在视图显示时于后台提取一次（文档或解析器变化后重新提取），
+    之后的排序和字段过滤都是对整列的 numpy 运算。过滤框使用与过滤栏相同的语法，
+    例如 tag == "Net" and tid == 1234、level >= W and "timeout"。
+    """
+
+    def __init__(self, filtered_view, parent=None):
+        super().__init__(parent)
+        self.filtered_view = filtered_view
+        self.engine = FilterEngine()
+        self.fields: Optional[LogFields] = None
+        self.text = ""
+        self.revision = None  # 提取字段时文档的版本
+        self.thread = None
+        self.worker = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        toolbar = QHBoxLayout()
+        toolbar.setContentsMargins(5, 2, 5, 2)
+        self.parser_combo = QComboBox()
+        self.parser_combo.addItem("自动", "")
+        for name in PARSER_PRESETS:
+            self.parser_combo.addItem(name, name)
+        self.parser_combo.addItem("自定义", "custom")
+        self.parser_combo.currentIndexChanged.connect(self._on_parser_changed)
+        self.pattern_edit = QLineEdit()
+        self.pattern_edit.setPlaceholderText("解析正则，命名分组：timestamp pid tid level tag message")
+        self.pattern_edit.setEnabled(False)
+        self.pattern_edit.returnPressed.connect(self.apply_parser)
+        self.parse_btn = QPushButton("解析")
+        self.parse_btn.clicked.connect(self.apply_parser)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText('过滤，例如 level >= W and tag == "Net"')
+        self.query_edit.returnPressed.connect(self.apply_query)
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(f"color: {THEME['text']};")
+        toolbar.addWidget(QLabel("格式："))
+        toolbar.addWidget(self.parser_combo)
+        toolbar.addWidget(self.pattern_edit, 1)
+        toolbar.addWidget(self.parse_btn)
+        toolbar.addWidget(self.query_edit, 1)
+        toolbar.addWidget(self.status_label)
+        layout.addLayout(toolbar)
+
+        self.model = LogTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 4)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        for column, width in enumerate((70, 150, 60, 60, 70, 160)):
+            self.table.setColumnWidth(column, width)
+        self.table.doubleClicked.connect(self._on_double_clicked)
+        self.table.setStyleSheet(f"""
+            QTableView {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                border: none;
+            }}
+            QHeaderView::section {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                padding: 4px;
+                border: none;
+                border-bottom: 1px solid {THEME['border']};
+            }}
+        """)
+        layout.addWidget(self.table, 1)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 显示时才提取字段，文档内容没有变化时直接使用上次的结果
+        self.update_fields()
+
+    def hideEvent(self, event):
+        self._cleanup_thread()
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        self._cleanup_thread()
+        super().closeEvent(event)
+
+    def _on_parser_changed(self):
+        is_custom = self.parser_combo.currentData() == "custom"
+        self.pattern_edit.setEnabled(is_custom)
+        if not is_custom:
+            self.apply_parser()
+
+    def _selected_parser(self) -> Optional[LineParser]:
+        """界面上选择的解析器，自动时为 None
+
+        Raises:
+            ValueError: 自定义的正则无效
+        """
+        name = self.parser_combo.currentData()
+        if name == "custom":
+            return LineParser(self.pattern_edit.text(), "自定义")
+        return LineParser.preset(name) if name else None
+
+    def apply_parser(self):
+        """用选择的解析器重新提取字段"""
+        try:
+            parser = self._selected_parser()
+        except ValueError as e:
+            self.status_label.setText(str(e))
+            return
+        log_ui_event("set_parser", "LogTableViewer", f"Parser: {parser.name if parser else 'auto'}")
+        self._cleanup_thread()
+        self.engine.set_line_parser(parser)
+        self.fields = None
+        self.revision = None
+        if self.isVisible():
+            self.update_fields()
+
+    def update_fields(self):
+        """文档变化后在后台重新提取字段"""
+        document = self.filtered_view.original_viewer.document()
+        if self.thread is not None or (self.fields is not None and self.revision == document.revision()):
+            return
+        self.revision = document.revision()
+        self.text = self.filtered_view.original_viewer.toPlainText()
+        self.status_label.setText("正在解析...")
+        self.thread = QThread()
+        self.worker = FieldIndexWorker(self.engine, self.text)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.process)
+        self.worker.finished.connect(self._on_fields_ready)
+        self.worker.error.connect(self._on_fields_error)
+        self.thread.start()
+
+    def _on_fields_ready(self, fields: LogFields):
+        self._cleanup_thread()
+        self.fields = fields
+        viewer = self.filtered_view.original_viewer
+        self.model.set_rows(fields, viewer, np.arange(viewer.line_count(), dtype=np.int64))
+        # 过滤栏中的字段查询使用相同的解析器和已提取的字段
+        self.filtered_view.filter_engine.set_line_parser(self.engine.line_parser, fields, self.text)
+        self.apply_query()
+
+    def _on_fields_error(self, message: str):
+        self._cleanup_thread()
+        self.status_label.setText(f"解析失败：{message}")
+
+    def apply_query(self):
+        """按过滤框中的表达式筛选表格中的行，为空时显示所有行"""
+        if self.fields is None:
+            return
+        expression = self.query_edit.text().strip()
+        line_count = self.filtered_view.original_viewer.line_count()
+        if expression:
+            result = self.engine.set_filter_expression(expression, {"use_query": True})
+            if not result["valid"]:
+                self.status_label.setText(result["message"])
+                return
+            try:
+                _, line_mapping = self.engine.filter_text(self.text)
+            except ValueError as e:
+                self.status_label.setText(str(e))
+                return
+            rows = np.asarray(line_mapping, dtype=np.int64)
+        else:
+            self.engine.clear_filter()
+            rows = np.arange(line_count, dtype=np.int64)
+        self.model.set_rows(self.fields, self.filtered_view.original_viewer, rows)
+        header = self.table.horizontalHeader()
+        self.model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+        parser_name = self.fields.parser_name or "未识别格式"
+        self.status_label.setText(f"{parser_name}，{len(rows)} / {line_count} 行")
+
+    def _on_double_clicked(self, index: QModelIndex):
+        """双击跳转到原文中的行"""
+        if index.isValid():
+            self.filtered_view.original_viewer.highlight_line(self.model.line_number(index.row()),
+                                                              select_whole_line=True)
+
+    def _cleanup_thread(self):
+        """清理线程资源"""
+        if self.thread is None:
+            return
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.deleteLater()
+            self.worker = None
+        if self.thread.isRunning():
+            self.thread.quit()
+            self.thread.wait()
+        self.thread.deleteLater()
+        self.thread = None
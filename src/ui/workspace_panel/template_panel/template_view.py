@@ -0,0 +1,248 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem,
+                           QPushButton, QCheckBox, QHeaderView)
+from PyQt6.QtCore import pyqtSignal, Qt, QThread, QObject, QFileSystemWatcher
+from src.utils.log_templates import LogTemplates
+from src.utils.file_utils import get_content_size
+from src.utils.logger import log_ui_event
+from src.resources.theme import THEME
+from typing import Dict
+import os
+
+# 列表中显示的模板数
+MAX_DISPLAY_TEMPLATES = 1000
+TEMPLATE_ROLE = Qt.ItemDataRole.UserRole  # 模板编号
+
+
+class TemplateWorker(QObject):
+    finished = pyqtSignal(bool)  # 归类完成信号，参数表示是否有新数据
+    error = pyqtSignal(str)
+
+    def __init__(self, templates: LogTemplates, filepath: str):
+        super().__init__()
+        self.templates = templates
+        self.filepath = filepath
+        self.is_cancelled = False
+
+    def cancel(self):
+        """取消处理"""
+        self.is_cancelled = True
+
+    def process(self):
+        """从上次读取的位置继续归类"""
+        try:
+            updated = self.templates.update_from_file(self.filepath, is_cancelled=lambda: self.is_cancelled)
+            if not self.is_cancelled:
+                self.finished.emit(updated)
+        except Exception as e:
+            if not self.is_cancelled:
+                self.error.emit(str(e))
+
+
+class SCTemplateViewer(QWidget):
+    """消息模板视图：把数字、十六进制、UUID、路径等可变部分替换后归类，按出现次数列出模板
+
+    「新增」列是上次刷新之后每个模板增加的行数，文件持续写入时可以看出哪类消息突然变多。
+    双击模板依次跳转到它在原文中的出现位置；「折叠连续重复」在原文中把连续的同一模板只显示第一行。
+    """
+
+    def __init__(self, log_viewer, parent=None):
+        super().__init__(parent)
+        self.log_viewer = log_viewer
+        self.current_filepath = ""
+        self.templates = None
+        self.thread = None
+        self.worker = None
+        self.pending_update = False  # 归类进行中文件又发生变化
+        self.previous_counts: Dict[int, int] = {}  # 上次刷新时每个模板的次数
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self._on_file_changed)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        header.setContentsMargins(5, 2, 5, 2)
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet(f"color: {THEME['text']};")
+        self.fold_check = QCheckBox("折叠连续重复")
+        self.fold_check.setStyleSheet(f"color: {THEME['text']};")
+        self.fold_check.toggled.connect(self._on_fold_toggled)
+        self.refresh_btn = QPushButton("重新归类")
+        self.refresh_btn.clicked.connect(self.recompute)
+        header.addWidget(self.status_label, 1)
+        header.addWidget(self.fold_check)
+        header.addWidget(self.refresh_btn)
+        layout.addLayout(header)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(4)
+        self.tree.setHeaderLabels(["次数", "占比", "新增", "模板"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setStretchLastSection(True)
+        self.tree.header().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.tree.itemDoubleClicked.connect(self._on_item_double_clicked)
+        self.tree.setStyleSheet(f"""
+            QTreeWidget {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                border: none;
+            }}
+            QHeaderView::section {{
+                background-color: {THEME['background']};
+                color: {THEME['text']};
+                padding: 4px;
+                border: none;
+                border-bottom: 1px solid {THEME['border']};
+            }}
+        """)
+        layout.addWidget(self.tree, 1)
+
+    def set_filepath(self, filepath: str):
+        """切换归类的文件，归类会在视图显示时进行"""
+        if self.current_filepath:
+            self.file_watcher.removePath(self.current_filepath)
+        self.current_filepath = filepath
+        self.templates = None
+        self.previous_counts = {}
+        self.fold_check.setChecked(False)
+        if filepath:
+            self.file_watcher.addPath(filepath)
+        if self.isVisible():
+            self.update_templates()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 显示时才归类，避免打开文件时的额外开销；已有结果时只处理新增部分
+        self.update_templates()
+
+    def hideEvent(self, event):
+        self._cleanup_thread()
+        super().hideEvent(event)
+
+    def recompute(self):
+        """丢弃已有结果，重新归类整个文件"""
+        self._cleanup_thread()
+        self.templates = None
+        self.previous_counts = {}
+        self.update_templates()
+
+    def update_templates(self):
+        """归类文件中尚未处理的部分（首次为整个文件）"""
+        if not self.current_filepath or not os.path.exists(self.current_filepath):
+            return
+        if self.thread is not None:
+            self.pending_update = True
+            return
+        # 文件被截断或替换（例如日志轮转）时重新归类
+        if self.templates is not None:
+            size = get_content_size(self.current_filepath)
+            if size is not None and size < self.templates.file_offset:
+                self.templates = None
+                self.previous_counts = {}
+        if self.templates is None:
+            self.templates = LogTemplates()
+            self.status_label.setText("正在归类...")
+
+        self.thread = QThread()
+        self.worker = TemplateWorker(self.templates, self.current_filepath)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.process)
+        self.worker.finished.connect(self._on_templates_finished)
+        self.worker.error.connect(self._on_templates_error)
+        self.thread.start()
+
+    def _on_file_changed(self, path: str):
+        """文件内容变化（例如被追加）时增量更新"""
+        # 某些编辑器保存时会替换文件，需要重新监听
+        if path not in self.file_watcher.files() and os.path.exists(path):
+            self.file_watcher.addPath(path)
+        if self.templates is not None and self.isVisible():
+            self.update_templates()
+
+    def _on_templates_finished(self, updated: bool):
+        self._cleanup_thread()
+        if updated or not self.tree.topLevelItemCount():
+            self.refresh_view()
+            if self.fold_check.isChecked():
+                self._fold_repeats()
+        if self.pending_update:
+            self.pending_update = False
+            self.update_templates()
+
+    def _on_templates_error(self, message: str):
+        self._cleanup_thread()
+        self.status_label.setText(f"归类失败：{message}")
+
+    def refresh_view(self):
+        """把归类结果显示到界面"""
+        if self.templates is None:
+            return
+        templates = self.templates
+        self.status_label.setText(f"共 {templates.line_count} 行，{templates.template_count} 个模板")
+        total = max(templates.line_count, 1)
+        top = templates.top_templates(MAX_DISPLAY_TEMPLATES)
+        self.tree.clear()
+        items = []
+        for template_id, count in top:
+            added = count - self.previous_counts.get(template_id, 0) if self.previous_counts else 0
+            item = QTreeWidgetItem([str(count), f"{count * 100 / total:.1f}%", f"+{added}" if added else "",
+                                    templates.template_text(template_id)])
+            item.setData(0, TEMPLATE_ROLE, template_id)
+            for column in range(3):
+                item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight)
+            items.append(item)
+        if templates.other_count:
+            item = QTreeWidgetItem([str(templates.other_count), f"{templates.other_count * 100 / total:.1f}%", "",
+                                    "（模板过多，其余的行）"])
+            item.setData(0, TEMPLATE_ROLE, None)
+            items.append(item)
+        self.tree.addTopLevelItems(items)
+        self.previous_counts = dict(top)
+
+    def _on_item_double_clicked(self, item: QTreeWidgetItem, column: int):
+        """跳转到该模板在当前行之后的下一次出现"""
+        template_id = item.data(0, TEMPLATE_ROLE)
+        if template_id is None or self.templates is None:
+            return
+        line = self.templates.next_line(template_id, self.log_viewer.get_current_line_number())
+        if line >= 0:
+            log_ui_event("jump_to_template", "TemplateViewer", f"Template: {template_id}, Line: {line}")
+            self.log_viewer.highlight_line(line, select_whole_line=True)
+
+    def _on_fold_toggled(self, checked: bool):
+        log_ui_event("fold_repeats", "TemplateViewer", f"Checked: {checked}")
+        if checked:
+            self._fold_repeats()
+        else:
+            self.log_viewer.unfold_lines()
+            self.refresh_view()
+
+    def _fold_repeats(self):
+        """在原文中折叠连续重复的同一模板"""
+        if self.templates is None:
+            return
+        # 归类结果与编辑器内容不一致（如内容被编辑过）时不折叠，避免隐藏错误的行
+        if abs(self.log_viewer.line_count() - self.templates.line_count) > 1:
+            self.status_label.setText("原文与文件内容不一致，无法折叠")
+            return
+        starts, lengths = self.templates.repeat_runs()
+        self.log_viewer.fold_lines(starts, lengths)
+        self.status_label.setText(f"共 {self.templates.line_count} 行，{self.templates.template_count} 个模板，"
+                                  f"折叠了 {self.log_viewer.folded_line_count()} 行")
+
+    def _cleanup_thread(self):
+        """清理线程资源"""
+        if self.thread is None:
+            return
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.deleteLater()
+            self.worker = None
+        if self.thread.isRunning():
+            self.thread.quit()
+            self.thread.wait()
+        self.thread.deleteLater()
+        self.thread = None
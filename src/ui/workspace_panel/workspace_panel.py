@@ -2,6 +2,9 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QLis
 from src.ui.workspace_panel.log_panel.log_viewer import SCLogViewer
 from src.ui.workspace_panel.log_panel.filter_log_viewer import SCFilteredLogViewer
 from src.ui.workspace_panel.mark_panel.mark_log import SCMarkLogViewer
+from src.ui.workspace_panel.stats_panel.stats_view import SCStatisticsViewer
+from src.ui.workspace_panel.table_panel.log_table import SCLogTableViewer
+from src.ui.workspace_panel.template_panel.template_view import SCTemplateViewer
 from src.ui.filter_panel.filter_input import SCFilterInput
 from PyQt6.QtCore import Qt
 from src.resources.theme import THEME
@@ -108,12 +111,25 @@ class SCWorkspacePanel(QWidget):
         self.vsplitter.setStretchFactor(0, 3)  # 日志面板占比
         self.vsplitter.setStretchFactor(1, 2)  # 底部面板占比
 
-        # 下方内容：过滤结果和标记列表
+        # 下方内容：过滤结果、标记列表、统计、表格和模板
         self.mark_viewer = SCMarkLogViewer()
+        # 标记增删后更新日志视图的行号标记和概览标尺
+        for signal in (self.mark_viewer.model.rowsInserted, self.mark_viewer.model.rowsRemoved,
+                       self.mark_viewer.model.modelReset):
+            signal.connect(self._on_marks_changed)
+        self.stats_viewer = SCStatisticsViewer()
+        self.table_viewer = SCLogTableViewer(self.filtered_viewer)
+        self.template_viewer = SCTemplateViewer(self.log_viewer)
         self.stack.addWidget(self.filtered_viewer.filtered_viewer)  # 只加过滤结果区
         self.stack.addWidget(self.mark_viewer)
+        self.stack.addWidget(self.stats_viewer)
+        self.stack.addWidget(self.table_viewer)
+        self.stack.addWidget(self.template_viewer)
         self.tab_list.addItem(QListWidgetItem("过滤"))
         self.tab_list.addItem(QListWidgetItem("标记"))
+        self.tab_list.addItem(QListWidgetItem("统计"))
+        self.tab_list.addItem(QListWidgetItem("表格"))
+        self.tab_list.addItem(QListWidgetItem("模板"))
         self.tab_list.setCurrentRow(0)
 
         # 信号联动
@@ -124,6 +140,8 @@ class SCWorkspacePanel(QWidget):
 
     def set_filepath(self, filepath: str):
         self.mark_viewer.set_filepath(filepath)
+        self.stats_viewer.set_filepath(filepath)
+        self.template_viewer.set_filepath(filepath)
         # 日志内容加载到log_viewer和filtered_viewer
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
@@ -133,12 +151,26 @@ class SCWorkspacePanel(QWidget):
         except Exception:
             pass
 
+    def set_result_cache(self, cache, text: str):
+        """设置当前文件的结果缓存，text 为从文件读取的文本"""
+        self.filtered_viewer.filter_engine.set_result_cache(cache, text)
+        self.table_viewer.engine.set_result_cache(cache, text)
+
     def get_filtered_view(self):
         return self.filtered_viewer
 
     def get_mark_view(self):
         return self.mark_viewer
 
+    def get_stats_view(self):
+        return self.stats_viewer
+
+    def get_table_view(self):
+        return self.table_viewer
+
+    def get_template_view(self):
+        return self.template_viewer
+
     def add_mark(self, line_number: int, content: str):
         self.mark_viewer.add_mark(line_number, content)
 
@@ -148,6 +180,10 @@ class SCWorkspacePanel(QWidget):
     def is_marked(self, line_number: int) -> bool:
         return self.mark_viewer.mark_manager.is_marked(self.mark_viewer.current_filepath, line_number)
 
+    def _on_marks_changed(self, *args):
+        mark_manager = self.mark_viewer.mark_manager
+        self.log_viewer.set_marked_lines(mark_manager.line_numbers(self.mark_viewer.current_filepath))
+
     def _on_tab_changed(self, index: int):
         self.stack.setCurrentIndex(index)
         # 更新菜单项的勾选状态
@@ -0,0 +1,333 @@
+import fnmatch
+import glob
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.bytes_search import ByteSearcher, SearchHit, head_sample, iter_file_segments
+from src.utils.file_utils import detect_encoding, open_log_file
+from src.utils.filter_engine import FilterEngine
+from src.utils.log_fields import SAMPLE_LINES
+
+# 每个任务处理的行数
+BATCH_LINES = 20000
+
+# 批量搜索时每个文件最多返回的匹配行数，超出部分只计数
+MAX_FILE_RESULTS = 10000
+
+# 工作进程的启动方式。进程池可能在界面的 QThread 中创建，fork 会把 Qt 的状态和其它线程持有的锁
+# 一起复制到子进程，可能死锁或崩溃；spawn 启动全新的解释器，不继承这些状态
+PROCESS_CONTEXT = multiprocessing.get_context("spawn")
+
+# 过滤规则：(表达式, 选项)，选项格式与界面和已保存关键字相同
+FilterRule = Tuple[str, dict]
+
+
+@dataclass
+class MatchRecord:
+    """一行匹配结果"""
+    filepath: str
+    line_number: int                      # 0-based 行号，与界面中的行号映射一致
+    text: str
+    matches: List[Tuple[int, int, str]]   # (start_pos, end_pos, matched_keyword)
+
+    def to_dict(self) -> dict:
+        return {
+            "file": self.filepath,
+            "line": self.line_number + 1,
+            "text": self.text,
+            "matches": [{"start": start, "end": end, "keyword": keyword}
+                        for start, end, keyword in self.matches],
+        }
+
+
+@dataclass
+class FileSearchResult:
+    """一个文件的搜索结果"""
+    filepath: str
+    records: List[MatchRecord] = field(default_factory=list)
+    total: int = 0      # 匹配行总数，可能大于 records 的数量
+    error: str = ""     # 读取失败时的错误信息
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.records)
+
+
+def create_engines(rules: Iterable[FilterRule]) -> List[FilterEngine]:
+    """为每条规则创建一个 FilterEngine，匹配语义与界面完全一致
+
+    Raises:
+        ValueError: 表达式无效时抛出
+    """
+    engines = []
+    for expression, options in rules:
+        engine = FilterEngine()
+        result = engine.set_filter_expression(expression, options)
+        if not result["valid"]:
+            raise ValueError(f"表达式无效：{expression}，{result['message']}")
+        engines.append(engine)
+    return engines
+
+
+def begin_source(engines: List[FilterEngine], sample: str):
+    """开始匹配一个新的文件，sample 为文件开头的若干行，见 FilterEngine.begin_source()"""
+    for engine in engines:
+        engine.begin_source(sample)
+
+
+def match_lines(engines: List[FilterEngine], first_line: int, lines: List[str]) -> List[SearchHit]:
+    """用所有规则匹配一批行，任意规则命中即视为匹配（所属的文件见 begin_source()）"""
+    results = []
+    for offset, line in enumerate(lines):
+        matches = []
+        for engine in engines:
+            matches.extend(engine.match_line(line))
+        if matches:
+            results.append((first_line + offset, line, matches))
+    return results
+
+
+# 工作进程中的过滤引擎，由 _init_worker 创建，避免每个任务重复传递和编译
+_worker_engines: List[FilterEngine] = []
+# 工作进程中按编码缓存的字节搜索器
+_worker_searchers: Dict[str, ByteSearcher] = {}
+
+
+def _init_worker(rules: List[FilterRule]):
+    global _worker_engines
+    _worker_engines = create_engines(rules)
+    _worker_searchers.clear()
+
+
+def _match_lines_in_worker(sample: str, first_line: int, lines: List[str]):
+    # 同一个工作进程会处理不同文件的批次，每个批次都按所属文件的开头重新选择解析器
+    begin_source(_worker_engines, sample)
+    return match_lines(_worker_engines, first_line, lines)
+
+
+def _search_segment_in_worker(encoding: str, sample: bytes, data: Optional[bytes], filepath: str, start: int,
+                              end: int, at_file_start: bool) -> Tuple[List[SearchHit], int]:
+    """在字节数据段中搜索，行号从 0 开始；data 为 None 时从普通文件中读取 [start, end)
+
+    sample 为所属文件开头的若干行（见 head_sample()），每个数据段都按它重新选择解析器。
+    """
+    searcher = _worker_searchers.get(encoding)
+    if searcher is None:
+        searcher = _worker_searchers[encoding] = ByteSearcher(_worker_engines, encoding)
+    searcher.begin_source(sample)
+    if data is None:
+        with open(filepath, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+    if at_file_start:
+        data = searcher.strip_bom(data)
+    return searcher.search_buffer(data)
+
+
+def _search_file_in_worker(filepath: str, max_results: int) -> FileSearchResult:
+    return search_file(_worker_engines, filepath, max_results)
+
+
+def iter_file_matches(engines: List[FilterEngine], filepath: str,
+                      is_cancelled: Optional[Callable[[], bool]] = None) -> Iterator[SearchHit]:
+    """按行号顺序返回文件中的所有匹配行
+
+    兼容 ASCII 的编码直接在未解码的字节上搜索，只解码候选行；其它编码（如 UTF-16）逐行解码后匹配。
+    """
+    searcher = ByteSearcher.for_file(engines, filepath)
+    if searcher is not None:
+        yield from searcher.search_file(filepath, is_cancelled)
+        return
+    for first_line, lines in iter_line_batches(filepath):
+        if is_cancelled and is_cancelled():
+            return
+        if first_line == 0:
+            begin_source(engines, "\n".join(lines[:SAMPLE_LINES]))
+        yield from match_lines(engines, first_line, lines)
+
+
+def search_file(engines: List[FilterEngine], filepath: str, max_results: int = MAX_FILE_RESULTS,
+                is_cancelled: Optional[Callable[[], bool]] = None) -> FileSearchResult:
+    """搜索整个文件，最多保留 max_results 条匹配记录，但统计全部匹配行数"""
+    result = FileSearchResult(filepath)
+    try:
+        for line_number, text, matches in iter_file_matches(engines, filepath, is_cancelled):
+            result.total += 1
+            if len(result.records) < max_results:
+                result.records.append(MatchRecord(filepath, line_number, text, matches))
+    except OSError as e:
+        result.error = str(e)
+    return result
+
+
+def expand_search_paths(paths: Iterable[str], pattern: str = "*") -> List[str]:
+    """把文件、目录和通配符展开为文件列表（去重并保持顺序）
+
+    Args:
+        paths: 文件路径、目录或 glob 通配符（支持 **）
+        pattern: 目录中文件名需要匹配的通配符，如 "*.log"
+    """
+    result = []
+    seen = set()
+
+    def add(filepath: str):
+        key = os.path.abspath(filepath)
+        if key not in seen:
+            seen.add(key)
+            result.append(filepath)
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if fnmatch.fnmatch(name, pattern):
+                        add(os.path.join(root, name))
+        elif os.path.exists(path) or not glob.has_magic(path):
+            add(path)
+        else:
+            for filepath in sorted(glob.glob(path, recursive=True)):
+                if os.path.isfile(filepath):
+                    add(filepath)
+    return result
+
+
+def iter_line_batches(filepath: str, batch_lines: int = BATCH_LINES) -> Iterator[Tuple[int, List[str]]]:
+    """流式读取文件，按批次返回 (第一行的行号, 行列表)
+
+    换行处理与 read_file_with_encoding 相同（通用换行模式），解码失败的字节按 replace 处理。
+    """
+    encoding = detect_encoding(filepath)
+    with open_log_file(filepath, 'r', encoding=encoding, errors='replace') as f:
+        first_line = 0
+        batch = []
+        for line in f:
+            batch.append(line[:-1] if line.endswith('\n') else line)
+            if len(batch) >= batch_lines:
+                yield first_line, batch
+                first_line += len(batch)
+                batch = []
+        if batch:
+            yield first_line, batch
+
+
+class BatchFilter:
+    """不依赖 Qt 的批量过滤器
+
+    文件被流式地切分为数据段（兼容 ASCII 的编码，在字节上搜索）或行批次（其它编码），
+    分发到多个进程并行匹配，结果按行号顺序返回。
+    同时在途的任务数量有上限，因此内存占用与文件大小无关。
+    """
+
+    def __init__(self, rules: List[FilterRule], jobs: Optional[int] = None,
+                 batch_lines: int = BATCH_LINES):
+        self.rules = list(rules)
+        self.engines = create_engines(self.rules)  # 同时用于校验表达式
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.batch_lines = batch_lines
+
+    def create_executor(self) -> Optional[Executor]:
+        """创建工作进程池，单进程模式下返回 None"""
+        if self.jobs <= 1:
+            return None
+        return ProcessPoolExecutor(max_workers=self.jobs, mp_context=PROCESS_CONTEXT,
+                                   initializer=_init_worker, initargs=(self.rules,))
+
+    def iter_file(self, filepath: str, executor: Optional[Executor] = None) -> Iterator[MatchRecord]:
+        """按行号顺序返回一个文件中的所有匹配行"""
+        if executor is None:
+            for line_number, text, matches in iter_file_matches(self.engines, filepath):
+                yield MatchRecord(filepath, line_number, text, matches)
+            return
+
+        searcher = ByteSearcher.for_file(self.engines, filepath)
+        if searcher is not None:
+            yield from self._iter_file_segments(filepath, searcher.encoding, executor)
+            return
+
+        pending = deque()
+        sample = ""
+        for first_line, lines in iter_line_batches(filepath, self.batch_lines):
+            if first_line == 0:
+                sample = "\n".join(lines[:SAMPLE_LINES])
+            pending.append(executor.submit(_match_lines_in_worker, sample, first_line, lines))
+            # 限制在途批次数量，保证流式处理
+            if len(pending) >= self.jobs * 2:
+                for line_number, text, matches in pending.popleft().result():
+                    yield MatchRecord(filepath, line_number, text, matches)
+        while pending:
+            for line_number, text, matches in pending.popleft().result():
+                yield MatchRecord(filepath, line_number, text, matches)
+
+    def _iter_file_segments(self, filepath: str, encoding: str, executor: Executor) -> Iterator[MatchRecord]:
+        """按数据段并行地在字节上搜索
+
+        普通文件只把段的偏移发给工作进程，由工作进程自己读取；压缩文件发送解压后的数据。
+        每段的行号从 0 开始，按顺序累加各段的行数得到文件中的行号。
+        """
+        first_line = 0
+
+        def drain(future) -> Iterator[MatchRecord]:
+            nonlocal first_line
+            hits, line_count = future.result()
+            for line_number, text, matches in hits:
+                yield MatchRecord(filepath, first_line + line_number, text, matches)
+            first_line += line_count
+
+        pending = deque()
+        sample = b""
+        for index, (data, start, end) in enumerate(iter_file_segments(filepath)):
+            if index == 0:
+                sample = head_sample(data, start, end)
+            segment = data[start:end] if isinstance(data, bytes) else None
+            pending.append(executor.submit(_search_segment_in_worker, encoding, sample, segment,
+                                           filepath, start, end, index == 0))
+            if len(pending) >= self.jobs * 2:
+                yield from drain(pending.popleft())
+        while pending:
+            yield from drain(pending.popleft())
+
+    def iter_files(self, filepaths: Iterable[str]) -> Iterator[MatchRecord]:
+        """依次返回多个文件中的匹配行，所有文件共用一个进程池"""
+        executor = self.create_executor()
+        try:
+            for filepath in filepaths:
+                yield from self.iter_file(filepath, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def search_files(self, filepaths: Iterable[str], max_results: int = MAX_FILE_RESULTS,
+                     is_cancelled: Optional[Callable[[], bool]] = None) -> Iterator[FileSearchResult]:
+        """并行搜索多个文件，每个文件是进程池中的一个独立任务，按完成的先后顺序返回
+
+        与 iter_files() 不同，小文件不会被排在大文件之后等待，适合在界面中流式显示结果。
+        """
+        filepaths = list(filepaths)
+        jobs = min(self.jobs, len(filepaths))
+        if jobs <= 1:
+            for filepath in filepaths:
+                if is_cancelled and is_cancelled():
+                    return
+                yield search_file(self.engines, filepath, max_results, is_cancelled)
+            return
+
+        executor = ProcessPoolExecutor(max_workers=jobs, mp_context=PROCESS_CONTEXT,
+                                       initializer=_init_worker, initargs=(self.rules,))
+        try:
+            pending = {executor.submit(_search_file_in_worker, filepath, max_results)
+                       for filepath in filepaths}
+            while pending:
+                # 定时返回以便及时响应取消
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if is_cancelled and is_cancelled():
+                    return
+                for future in done:
+                    yield future.result()
+        finally:
+            # 取消时不等待正在运行的任务
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,472 @@
+import codecs
+import mmap
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.utils.compressed_file import compression_type
+from src.utils.file_utils import detect_encoding, read_file_bytes_chunks
+from src.utils.filter_engine import FilterEngine
+from src.utils.log_fields import SAMPLE_LINES
+
+# 搜索结果：(0-based 行号, 解码后的行, [(start_pos, end_pos, matched_keyword)])，位置按字符计算
+SearchHit = Tuple[int, str, List[Tuple[int, int, str]]]
+
+# 每次调用正则扫描的数据段大小，段之间检查取消并报告进度
+SEGMENT_SIZE = 16 * 1024 * 1024
+# 一个非 ASCII 字符的字节形式。各分支不会以多种方式切分同一段字节（占有量词），
+# 放在重复中也不会引起回溯爆炸
+_UTF8_CHAR = rb"(?:[\xc0-\xff][\x80-\xbf]*+|[\x80-\xbf]++)"
+_SINGLE_BYTE_CHAR = rb"[\x80-\xff]"
+_DOUBLE_BYTE_CHAR = rb"(?:[\x80-\xff][\x30-\xfe]?+)"  # GBK、GB18030、Big5 等：首字节 >= 0x80
+# 单独的 \r 在通用换行模式中也是换行
+_LONE_CR = re.compile(rb"\r(?!\n)")
+# 正则中分组、断言和内联标志的开头部分，原样保留
+_GROUP_HEADER = re.compile(r"\(\?(?:P<\w+>|P=\w+\)|#[^)]*\)|[aiLmsux]*(?:-[imsx]+)?[:)]|<=|<!|[=!>]|\(\w+\))")
+_INLINE_IGNORECASE = re.compile(r"\(\?[aLmsux]*i")
+_INLINE_VERBOSE = re.compile(r"\(\?[aiLmsu]*x")
+
+
+def head_sample(data, start: int = 0, end: Optional[int] = None) -> bytes:
+    """data[start:end] 开头的 SAMPLE_LINES 行，用于自动选择行解析器（见 FilterEngine.begin_source()）"""
+    end = len(data) if end is None else end
+    pos = start
+    for _ in range(SAMPLE_LINES):
+        pos = data.find(b"\n", pos, end) + 1
+        if not pos:
+            pos = end
+            break
+    return bytes(data[start:pos])
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """ASCII 字符和换行在该编码中是否保持单字节原样（UTF-8、GBK、Latin-1 等）"""
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return False
+    if name.startswith(("utf-16", "utf-32", "utf-7", "iso2022", "hz")):
+        return False
+    try:
+        return "\r\n\x7f".encode(encoding) == b"\r\n\x7f"
+    except UnicodeEncodeError:
+        return False
+
+
+def non_ascii_char_pattern(encoding: str) -> bytes:
+    """匹配一个非 ASCII 字符的字节正则片段"""
+    name = codecs.lookup(encoding).name
+    if name.startswith("utf-8"):
+        return _UTF8_CHAR
+    if len(bytes(range(0x80, 0x100)).decode(encoding, errors="replace")) == 0x80:
+        return _SINGLE_BYTE_CHAR
+    return _DOUBLE_BYTE_CHAR
+
+
+@lru_cache(maxsize=1)
+def _case_index() -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+    """基本多文种平面中每个字符出现在哪些字符的小写/大写形式里
+
+    str.lower() 可能把一个字符变成多个字符（如 İ），其中每个字符都要记录；
+    re.IGNORECASE 只使用单字符的大小写映射，因此大写形式只记录单字符的情况。
+    """
+    lower: Dict[str, Set[str]] = {}
+    upper: Dict[str, Set[str]] = {}
+    for code in range(0x10000):
+        char = chr(code)
+        folded = char.lower()
+        if folded != char:
+            for part in folded:
+                lower.setdefault(part, set()).add(char)
+        folded = char.upper()
+        if folded != char and len(folded) == 1:
+            upper.setdefault(folded, set()).add(char)
+    return lower, upper
+
+
+def case_variants(char: str) -> Set[str]:
+    """忽略大小写时可能与 char 匹配的所有字符
+
+    同时覆盖 str.lower() 比较（FilterEngine 的普通文本模式）和 re.IGNORECASE
+    （正则模式）的语义，例如 k 与开尔文符号 K、s 与长 s ſ。结果可能略多于实际匹配的字符。
+    """
+    variants = {char}
+    lower, upper = _case_index()
+    for folded, index in ((char.lower(), lower), (char.upper(), upper)):
+        if len(folded) == 1:
+            variants.add(folded)
+            variants |= index.get(folded, set())
+    return variants
+
+
+def _encode_char(char: str, encoding: str, ignore_case: bool) -> Optional[bytes]:
+    """把一个字面字符转换为字节正则片段，无法在字节上表示时返回 None"""
+    if char == "\ufffd":
+        return None  # 解码失败产生的替换字符在原始字节中没有固定形式
+    variants = case_variants(char) if ignore_case else {char}
+    if all(variant.isascii() for variant in variants):
+        return re.escape(char.encode(encoding))  # ASCII 的大小写由 re.IGNORECASE 处理
+    encoded = set()
+    for variant in variants:
+        try:
+            encoded.add(re.escape(variant.encode(encoding)))
+        except UnicodeEncodeError:
+            continue  # 文件编码中不存在的字符不会出现在文件里
+    if ignore_case and len(char.lower()) > 1:
+        # 如 İ 的小写是 i 加组合附加点，行中的这两个字符也会匹配
+        parts = [_encode_char(part, encoding, ignore_case) for part in char.lower()]
+        if None not in parts:
+            encoded.add(b"".join(parts))
+    if not encoded:
+        return None
+    return b"(?:" + b"|".join(sorted(encoded)) + b")"
+
+
+def keyword_to_bytes_pattern(keyword: str, encoding: str, ignore_case: bool) -> Optional[bytes]:
+    """普通文本关键字的字节正则
+
+    全词匹配的边界不在字节层判断，候选行解码后再由 FilterEngine 确认。
+    """
+    parts = []
+    for char in keyword:
+        part = _encode_char(char, encoding, ignore_case)
+        if part is None:
+            return None
+        parts.append(part)
+    return b"".join(parts)
+
+
+# 字符类转义在字节正则中的两种写法：(只匹配 ASCII 的部分, 把每个非 ASCII 字节都当作一个字符的写法)
+_ESCAPE_CLASSES = {
+    "d": (rb"\d", rb"[0-9\x80-\xff]"),
+    "w": (rb"\w", rb"[\w\x80-\xff]"),
+    "s": (rb"[\s\x1c-\x1f]", rb"[\s\x1c-\x1f\x80-\xff]"),
+    "D": (rb"[^\d\x80-\xff]", rb"\D"),
+    "W": (rb"[^\w\x80-\xff]", rb"\W"),
+    "S": (rb"[^\s\x1c-\x1f\x80-\xff]", rb"[^\s\x1c-\x1f]"),
+}
+# 没有上限的量词
+_UNBOUNDED_QUANTIFIER = re.compile(r"[*+]|\{\d*,\}")
+
+
+def _with_high_bytes(body: bytes) -> bytes:
+    """在字符类中加入（取反时为排除）所有 >= 0x80 的字节"""
+    negate = body.startswith(b"^")
+    rest = body[1:] if negate else body
+    if rest.startswith(b"]"):
+        # 开头的 ] 是字面字符，不能在它前面插入
+        high = rb"[\x80-\xff]"
+        return (b"(?!" + high + b")[" if negate else b"(?:" + high + b"|[") + body + (b"]" if negate else b"])")
+    return b"[" + (b"^" if negate else b"") + rb"\x80-\xff" + rest + b"]"
+
+
+def regex_to_bytes_pattern(pattern: str, encoding: str, ignore_case: bool) -> Optional[bytes]:
+    """把 str 正则转换为字节正则，匹配的行是原正则匹配行的超集
+
+    与 Unicode 相关的部分被放宽：\\b、\\B 被去掉；\\w、\\d、\\s、.、它们的取反形式和取反字符类
+    额外匹配任意一个非 ASCII 字符；$ 允许行尾的 \\r。无法安全转换的写法（\\x、\\u 转义、
+    包含非 ASCII 字符的字符类、verbose 模式等）返回 None。
+    """
+    if _INLINE_VERBOSE.search(pattern):
+        return None
+    ignore_case = ignore_case or bool(_INLINE_IGNORECASE.search(pattern))
+    non_ascii = non_ascii_char_pattern(encoding)
+
+    def char_class(ascii_part: bytes, byte_class: bytes, next_pos: int) -> bytes:
+        # 后面是 *、+、{m,} 时把每个非 ASCII 字节当作一个字符，这样的单个字符类比分支快得多；
+        # 否则按字符匹配，保证 {m,n} 等有上限的重复次数不变
+        if _UNBOUNDED_QUANTIFIER.match(pattern, next_pos):
+            return byte_class
+        return b"(?:" + ascii_part + b"|" + non_ascii + b")"
+
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 >= n:
+                return None
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped in "bB":
+                continue
+            if escaped in _ESCAPE_CLASSES:
+                out.append(char_class(*_ESCAPE_CLASSES[escaped], i))
+            elif escaped == "A":
+                out.append(b"^")
+            elif escaped == "Z":
+                out.append(rb"(?=\r?$)")
+            elif escaped in "xuUN0" or (escaped.isdigit() and i < n and pattern[i].isdigit()):
+                return None
+            elif escaped.isascii():
+                out.append(b"\\" + escaped.encode())
+            else:
+                part = _encode_char(escaped, encoding, ignore_case)
+                if part is None:
+                    return None
+                out.append(part)
+        elif char == "[":
+            end = i + 1
+            if end < n and pattern[end] == "^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            while end < n and pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            if end >= n:
+                return None
+            body = pattern[i + 1:end].encode() if pattern[i + 1:end].isascii() else None
+            i = end + 1
+            if body is None or re.search(rb"\\[DSW]", body):
+                return None
+            if body.startswith(b"^"):
+                out.append(char_class(_with_high_bytes(body), b"[" + body + b"]", i))
+            elif ignore_case or re.search(rb"\\[dsw]", body):
+                out.append(char_class(b"[" + body + b"]", _with_high_bytes(body), i))
+            else:
+                out.append(b"[" + body + b"]")
+        elif char == "(" and pattern.startswith("(?", i):
+            header = _GROUP_HEADER.match(pattern, i)
+            if header is None:
+                return None
+            out.append(header.group().encode())
+            i = header.end()
+        elif char == ".":
+            i += 1
+            out.append(char_class(rb"[^\n\x80-\xff]", b".", i))
+        elif char == "$":
+            out.append(rb"(?=\r?$)")
+            i += 1
+        elif char in "^|()*+?{},":
+            out.append(char.encode())
+            i += 1
+        else:
+            part = _encode_char(char, encoding, ignore_case)
+            if part is None:
+                return None
+            out.append(part)
+            i += 1
+    return b"".join(out)
+
+
+def compile_engine_patterns(engine: FilterEngine, encoding: str) -> Optional[List[re.Pattern]]:
+    """为 FilterEngine 的每个关键字编译预筛选用的字节正则
+
+    Returns:
+        Optional[List[re.Pattern]]: 字节正则列表；有关键字无法转换、或者查询无法只靠关键字筛选时
+        （见 FilterEngine.prefilter_terms()）返回 None，此时需要逐行检查
+    """
+    terms = engine.prefilter_terms()
+    if terms is None:
+        return None
+    patterns = []
+    for keyword, case_sensitive, use_regex in terms:
+        ignore_case = not case_sensitive
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        if use_regex:
+            raw = regex_to_bytes_pattern(keyword, encoding, ignore_case)
+        else:
+            raw = keyword_to_bytes_pattern(keyword, encoding, ignore_case)
+        if raw is None:
+            return None
+        try:
+            patterns.append(re.compile(raw, flags))
+        except re.error:
+            return None
+    return patterns
+
+
+class ByteSearcher:
+    """在未解码的字节上查找 FilterEngine 的匹配行
+
+    关键字被编译为字节正则，直接在 mmap 或原始数据块上扫描；只有字节正则命中的候选行
+    才会被解码，再用 FilterEngine.match_line 确认并得到按字符计算的匹配位置。
+    因此匹配结果（包括全词匹配、忽略大小写和 highlight_line 使用的列位置）与
+    逐行解码后匹配完全一致，而不命中的行不需要解码。
+
+    只适用于 UTF-8、GBK、Latin-1 等兼容 ASCII 的编码，见 is_ascii_compatible()。
+    """
+
+    def __init__(self, engines: List[FilterEngine], encoding: str):
+        self.engines = [engine for engine in engines if engine._matchers or engine.query is not None]
+        self.encoding = encoding
+        # BOM 只在文件开头出现，其余行按不带 BOM 的编码解码
+        self.line_encoding = "utf-8" if codecs.lookup(encoding).name.startswith("utf-8") else encoding
+        self.patterns: List[re.Pattern] = []
+        for engine in self.engines:
+            patterns = compile_engine_patterns(engine, encoding)
+            if patterns is None:
+                # 无法转换时退化为逐行检查：每个行首都是候选位置
+                self.patterns = [re.compile(rb"^", re.MULTILINE)]
+                break
+            self.patterns.extend(patterns)
+
+    @classmethod
+    def for_file(cls, engines: List[FilterEngine], filepath: str,
+                 encoding: Optional[str] = None) -> Optional["ByteSearcher"]:
+        """为文件创建搜索器，文件编码不兼容 ASCII 时返回 None"""
+        encoding = encoding or detect_encoding(filepath)
+        if not is_ascii_compatible(encoding):
+            return None
+        return cls(engines, encoding)
+
+    def strip_bom(self, data):
+        """去掉文件开头的 UTF-8 BOM，使 ^ 等锚点在第一行生效"""
+        if data[:3] == codecs.BOM_UTF8 and self.line_encoding == "utf-8":
+            return data[3:]
+        return data
+
+    def begin_source(self, sample: bytes):
+        """开始搜索一个新的文件，sample 为文件开头的若干行（见 head_sample()）"""
+        text = self.strip_bom(sample).decode(self.line_encoding, errors="replace").replace("\r\n", "\n")
+        for engine in self.engines:
+            engine.begin_source(text)
+
+    def match_line(self, line: str) -> List[Tuple[int, int, str]]:
+        matches = []
+        for engine in self.engines:
+            matches.extend(engine.match_line(line))
+        return matches
+
+    def _candidate_positions(self, data, pos: int, end: int, limit: int) -> Optional[List[int]]:
+        """字节正则命中的位置，每个正则在每行中最多取一个
+
+        命中数超过 limit 时返回 None，此时逐个跳到下一行的开销已经超过直接检查所有行。
+        """
+        positions = []
+        for pattern in self.patterns:
+            start = pos
+            while start < end:
+                match = pattern.search(data, start, end)
+                if match is None:
+                    break
+                if len(positions) >= limit:
+                    return None
+                positions.append(match.start())
+                line_end = data.find(b"\n", match.start(), end)
+                if line_end == -1:
+                    break
+                start = line_end + 1
+        return positions
+
+    def scan(self, data, first_line: int = 0, pos: int = 0, end: Optional[int] = None):
+        """扫描 data[pos:end] 中的完整行（pos 必须位于行首）
+
+        data 可以是 bytes 或 mmap。这是一个生成器，依次产生 SearchHit，
+        结束时返回 end 处的行号（即 first_line 加上扫描范围内的换行数）。
+        """
+        end = len(data) if end is None else end
+        if pos >= end:
+            return first_line
+        newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8, count=end - pos, offset=pos) == 10)
+        line_starts = np.concatenate(([0], newlines + 1)) + pos
+        line_ends = np.append(newlines, end - pos) + pos
+        positions = self._candidate_positions(data, pos, end, len(line_starts) // 16 + 1)
+        if positions is None:
+            line_indexes = np.arange(len(line_starts))
+        elif positions:
+            # 命中位置之前的换行数就是所在行在这段数据中的序号
+            line_indexes = np.unique(np.searchsorted(newlines, np.asarray(positions) - pos))
+        else:
+            return first_line + len(newlines)
+        if line_starts[-1] == end:
+            # 以换行结束时，最后一个换行之后没有内容
+            line_indexes = line_indexes[line_indexes < len(newlines)]
+
+        lines = None
+        if len(line_indexes) * 8 > len(line_starts):
+            # 候选行较密集时整段解码一次，比逐行解码快
+            lines = data[pos:end].decode(self.line_encoding, errors="replace").split("\n")
+        for index in line_indexes.tolist():
+            if lines is not None:
+                line = lines[index]
+            else:
+                line = data[line_starts[index]:line_ends[index]].decode(self.line_encoding, errors="replace")
+            if line.endswith("\r"):
+                line = line[:-1]
+            matches = self.match_line(line)
+            if matches:
+                yield first_line + index, line, matches
+        return first_line + len(newlines)
+
+    def search_buffer(self, data: bytes, first_line: int = 0,
+                      universal_newlines: bool = True) -> Tuple[List[SearchHit], int]:
+        """搜索一段由完整行组成的数据（数据属于哪个文件由调用方通过 begin_source() 指定）
+
+        Returns:
+            Tuple[List[SearchHit], int]: (匹配结果, 数据结束处的行号)
+        """
+        if universal_newlines and _LONE_CR.search(data):
+            data = _LONE_CR.sub(b"\n", data)
+        hits: List[SearchHit] = []
+        scanner = self.scan(data, first_line)
+        while True:
+            try:
+                hits.append(next(scanner))
+            except StopIteration as stop:
+                return hits, stop.value
+
+    def search_file(self, filepath: str, is_cancelled: Optional[Callable[[], bool]] = None,
+                    progress_callback: Optional[Callable[[int], None]] = None,
+                    universal_newlines: bool = True) -> Iterator[SearchHit]:
+        """按行号顺序返回文件中的所有匹配行
+
+        普通文件通过 mmap 扫描，压缩文件按解压后的数据块扫描。
+
+        Args:
+            is_cancelled: 每扫描完一段数据检查一次，返回 True 时停止
+            progress_callback: 每扫描完一段数据调用一次，参数为已扫描的行数
+            universal_newlines: 是否像文本模式一样把单独的 \\r 也当作换行，
+                与 read_file_with_encoding 的行号保持一致；为 False 时只按 \\n 分行（与 LogIndex 一致）
+        """
+        line_number = 0
+        for index, (data, start, end) in enumerate(iter_file_segments(filepath)):
+            if is_cancelled and is_cancelled():
+                return
+            if index == 0 and data[:3] == codecs.BOM_UTF8:
+                data, start = self.strip_bom(data[:end]), 0
+                end = len(data)
+            if universal_newlines and _LONE_CR.search(data, start, end):
+                data, start, end = _LONE_CR.sub(b"\n", data[start:end]), 0, end - start
+            if index == 0:
+                self.begin_source(head_sample(data, start, end))
+            line_number = yield from self.scan(data, line_number, start, end)
+            if progress_callback:
+                progress_callback(line_number)
+
+
+def iter_file_segments(filepath: str, segment_size: int = SEGMENT_SIZE) -> Iterator[Tuple[object, int, int]]:
+    """把文件切分为以换行结束的数据段，返回 (数据, 开始偏移, 结束偏移)
+
+    普通文件返回同一个 mmap 上的不同区间，不复制数据；压缩文件返回解压后的数据块。
+    """
+    if compression_type(filepath) is not None:
+        carry = b""
+        for chunk, _ in read_file_bytes_chunks(filepath, max(segment_size // (1024 * 1024), 1)):
+            data = carry + chunk
+            cut = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            if cut:
+                yield data, 0, cut
+        if carry:
+            yield carry, 0, len(carry)
+        return
+
+    with open(filepath, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # 空文件不能映射
+        with mapped:
+            size = len(mapped)
+            start = 0
+            while start < size:
+                end = min(start + segment_size, size)
+                if end < size:
+                    newline = mapped.find(b"\n", end - 1)
+                    end = size if newline == -1 else newline + 1
+                yield mapped, start, end
+                start = end
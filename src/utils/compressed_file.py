@@ -0,0 +1,331 @@
+import bz2
+import hashlib
+import io
+import json
+import lzma
+import os
+import threading
+import zlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖，只有打开 .zst 文件时需要
+    zstandard = None
+
+from src.utils.const import CACHE_DIR
+
+# 各压缩格式的魔数
+_MAGICS = {
+    "gzip": (b"\x1f\x8b",),
+    "zstd": (b"\x28\xb5\x2f\xfd",),
+    "bz2": (b"BZh",),
+    "xz": (b"\xfd7zXZ\x00",),
+}
+# zstd 可跳过帧（例如 seekable 格式的跳转表）的魔数为 0x184D2A50 ~ 0x184D2A5F
+_ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+
+# 两个检查点之间解压后数据的间隔
+CHECKPOINT_SPACING = 8 * 1024 * 1024
+# 每次送给解压器的压缩数据大小
+_INPUT_CHUNK = 64 * 1024
+# 检查点索引的缓存目录
+INDEX_CACHE_DIR = os.path.join(CACHE_DIR, "compressed_index")
+
+
+def compression_type(filepath: str) -> Optional[str]:
+    """根据文件头的魔数判断压缩格式，不是压缩文件时返回 None"""
+    try:
+        with open(filepath, "rb") as f:
+            head = f.read(6)
+    except OSError:
+        return None
+    for kind, magics in _MAGICS.items():
+        if head.startswith(magics):
+            return kind
+    return None
+
+
+def _new_decompressor(kind: str):
+    if kind == "gzip":
+        return zlib.decompressobj(wbits=31)
+    if kind == "bz2":
+        return bz2.BZ2Decompressor()
+    if kind == "xz":
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+    if zstandard is None:
+        raise ValueError("打开 .zst 文件需要安装 zstandard：pip install zstandard")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+@dataclass
+class Checkpoint:
+    """可以从这里开始解压的位置"""
+    out_offset: int     # 解压后数据中的偏移
+    in_offset: int      # 压缩文件中继续读取的偏移
+    state: object = None  # 解压器状态快照；None 表示位于 gzip 成员/zstd 帧/bz2、xz 流的起点
+
+
+class CheckpointIndex:
+    """一个压缩文件的检查点索引，同一文件的所有读取器共享
+
+    检查点在第一次顺序解压时记录：
+      - gzip 成员、zstd 帧、bz2/xz 流的起点可以直接新建解压器，这些检查点会保存到磁盘；
+      - gzip 另外每隔 CHECKPOINT_SPACING 保存一份解压器状态的快照（包含 32KB 窗口），
+        效果与 zlib 的 zran 示例相同，但 Python 的 zlib 不能从任意比特位置恢复，
+        因此快照只在本次运行中有效。
+    """
+
+    def __init__(self, kind: str, spacing: int = CHECKPOINT_SPACING):
+        self.kind = kind
+        self.spacing = spacing
+        self.checkpoints: List[Checkpoint] = [Checkpoint(0, 0)]
+        self.size: Optional[int] = None  # 解压后的总大小，完整读过一次后才知道
+        self._lock = threading.Lock()
+
+    @property
+    def last_offset(self) -> int:
+        return self.checkpoints[-1].out_offset
+
+    def add(self, checkpoint: Checkpoint):
+        """记录新的检查点（只接受比已有检查点更靠后的位置）"""
+        with self._lock:
+            last = self.checkpoints[-1]
+            if checkpoint.out_offset > last.out_offset:
+                self.checkpoints.append(checkpoint)
+            elif checkpoint.out_offset == last.out_offset and checkpoint.state is None:
+                # 同一位置优先使用可以持久化的边界检查点
+                self.checkpoints[-1] = checkpoint
+
+    def wants_snapshot(self, out_offset: int) -> bool:
+        return self.kind == "gzip" and out_offset >= self.last_offset + self.spacing
+
+    def find(self, out_offset: int) -> Checkpoint:
+        """不晚于 out_offset 的最后一个检查点"""
+        with self._lock:
+            keys = [checkpoint.out_offset for checkpoint in self.checkpoints]
+            return self.checkpoints[max(bisect_right(keys, out_offset) - 1, 0)]
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "size": self.size,
+            "checkpoints": [[c.out_offset, c.in_offset] for c in self.checkpoints if c.state is None],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CheckpointIndex":
+        index = cls(data["kind"])
+        index.checkpoints = [Checkpoint(out_offset, in_offset) for out_offset, in_offset in data["checkpoints"]]
+        index.size = data.get("size")
+        return index
+
+
+# 本次运行中已建立的索引：(绝对路径, 文件大小, 修改时间) -> 索引
+_indexes: Dict[Tuple[str, int, int], CheckpointIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_key(filepath: str) -> Tuple[str, int, int]:
+    stat = os.stat(filepath)
+    return os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns
+
+
+def _index_cache_file(key: Tuple[str, int, int]) -> str:
+    return os.path.join(INDEX_CACHE_DIR, hashlib.sha1(key[0].encode("utf-8")).hexdigest() + ".json")
+
+
+def get_checkpoint_index(filepath: str, kind: str) -> CheckpointIndex:
+    """获取文件的检查点索引，优先使用内存中或磁盘上的缓存"""
+    key = _index_key(filepath)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            return index
+        index = None
+        try:
+            with open(_index_cache_file(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("file_size") == key[1] and data.get("mtime_ns") == key[2] and data.get("kind") == kind:
+                index = CheckpointIndex.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        if index is None:
+            index = CheckpointIndex(kind)
+        _indexes[key] = index
+        return index
+
+
+def save_checkpoint_index(filepath: str, index: CheckpointIndex):
+    """把可以持久化的检查点保存到磁盘，下次打开时不需要从头解压"""
+    key = _index_key(filepath)
+    data = index.to_dict()
+    data.update(file_size=key[1], mtime_ns=key[2])
+    try:
+        os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+        with open(_index_cache_file(key), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError:
+        pass
+
+
+class CompressedFile(io.RawIOBase):
+    """可随机访问的解压文件（只读）
+
+    seek() 会从不晚于目标位置的最近检查点开始解压，而不是从文件开头解压。
+    通常通过 file_utils.open_log_file() 使用，外面会再包一层缓冲和文本解码。
+    """
+
+    def __init__(self, filepath: str, kind: Optional[str] = None):
+        super().__init__()
+        self.filepath = filepath
+        self.kind = kind or compression_type(filepath)
+        if self.kind is None:
+            raise ValueError(f"不是支持的压缩文件：{filepath}")
+        if self.kind == "zstd" and zstandard is None:
+            raise ValueError("打开 .zst 文件需要安装 zstandard：pip install zstandard")
+        self.index = get_checkpoint_index(filepath, self.kind)
+        self._file = open(filepath, "rb")
+        self._pos = 0
+        self._restore(self.index.checkpoints[0])
+
+    def _restore(self, checkpoint: Checkpoint):
+        """从检查点恢复解压状态"""
+        self._file.seek(checkpoint.in_offset)
+        self._in_pos = checkpoint.in_offset       # 文件中下一个要读取的位置
+        self._pending = b""                       # 已读取但还没有送给解压器的数据
+        self._decompressor = checkpoint.state.copy() if checkpoint.state is not None else None
+        self._buffer = bytearray()                # 已解压但还没有被读取的数据
+        self._out_pos = checkpoint.out_offset     # _buffer 末尾对应的解压后偏移
+        self._eof = False
+
+    def _fill_input(self, size: int) -> bool:
+        """确保 _pending 中至少有 size 字节（文件结束时可能不足）"""
+        while len(self._pending) < size:
+            data = self._file.read(_INPUT_CHUNK)
+            if not data:
+                return False
+            self._in_pos += len(data)
+            self._pending += data
+        return True
+
+    def _start_member(self) -> bool:
+        """在成员/帧/流的边界上新建解压器，没有后续数据时返回 False"""
+        while True:
+            # 跳过 gzip 和 xz 允许的末尾填充
+            if self.kind in ("gzip", "xz"):
+                while self._fill_input(1) and not self._pending.lstrip(b"\0"):
+                    self._pending = b""
+                self._pending = self._pending.lstrip(b"\0")
+            if not self._fill_input(8) and not self._pending:
+                return False
+            # 跳过 zstd 的可跳过帧
+            if self.kind == "zstd" and len(self._pending) >= 8:
+                magic = int.from_bytes(self._pending[:4], "little")
+                if magic & 0xFFFFFFF0 == _ZSTD_SKIPPABLE_MAGIC:
+                    skip = 8 + int.from_bytes(self._pending[4:8], "little")
+                    if not self._fill_input(skip):
+                        return False
+                    self._pending = self._pending[skip:]
+                    continue
+            if not self._pending.startswith(_MAGICS[self.kind]):
+                return False  # 末尾的无关数据
+            break
+
+        start = self._in_pos - len(self._pending)
+        self.index.add(Checkpoint(self._out_pos, start))
+        self._decompressor = _new_decompressor(self.kind)
+        return True
+
+    def _decode_more(self) -> bool:
+        """继续解压一部分数据追加到 _buffer，没有更多数据时返回 False"""
+        while True:
+            if self._decompressor is None and not self._start_member():
+                return self._finish()
+            if not self._pending and not self._fill_input(1):
+                # 压缩数据被截断（例如仍在写入），按文件结束处理
+                return self._finish()
+            data = self._decompressor.decompress(self._pending)
+            self._pending = b""
+            if self._decompressor.eof:
+                self._pending = self._decompressor.unused_data
+                self._decompressor = None
+            if not data:
+                continue
+            self._buffer += data
+            self._out_pos += len(data)
+            # 解压器已消耗了所有输入，此时的状态对应文件位置 _in_pos
+            if self._decompressor is not None and self.index.wants_snapshot(self._out_pos):
+                self.index.add(Checkpoint(self._out_pos, self._in_pos, self._decompressor.copy()))
+            return True
+
+    def _finish(self) -> bool:
+        if not self._eof:
+            self._eof = True
+            if self.index.size is None:
+                self.index.size = self._out_pos
+                save_checkpoint_index(self.filepath, self.index)
+        return False
+
+    def size(self) -> int:
+        """解压后的总大小（未知时会解压到末尾）"""
+        if self.index.size is None:
+            position = self._pos
+            last = self.index.checkpoints[-1]
+            if last.out_offset > self._out_pos:
+                self._restore(last)
+            while self._decode_more():
+                self._buffer.clear()
+            self.seek(position)
+        return self.index.size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size()
+        target = max(offset, 0)
+
+        buffer_start = self._out_pos - len(self._buffer)
+        if not buffer_start <= target <= self._out_pos:
+            # 目标在当前位置之前，或者之后还有更近的检查点时，从检查点开始解压
+            checkpoint = self.index.find(target)
+            if target < buffer_start or checkpoint.out_offset > self._out_pos:
+                self._restore(checkpoint)
+            self._buffer.clear()
+            while self._out_pos < target and self._decode_more():
+                if self._out_pos < target:
+                    self._buffer.clear()
+            buffer_start = self._out_pos - len(self._buffer)
+
+        del self._buffer[:max(min(target, self._out_pos) - buffer_start, 0)]
+        self._pos = target
+        return self._pos
+
+    def readinto(self, b) -> int:
+        if not self._buffer and not self._decode_more():
+            return 0
+        # 被截断到末尾之后的位置不返回数据
+        if self._pos > self._out_pos:
+            return 0
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        del self._buffer[:size]
+        self._pos += size
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
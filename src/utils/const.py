@@ -3,3 +3,5 @@ import json
 import os
 # 定义保存文件的路径
 KEYWORDS_FILE = os.path.join(os.path.expanduser('~'), '.sc_log_analysis', 'keywords.json')
+# 缓存目录（与配置文件同在程序根目录下的 caches 中）
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'caches')
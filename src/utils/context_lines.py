@@ -0,0 +1,48 @@
+from typing import Tuple
+
+import numpy as np
+
+# 匹配行前后最多显示的上下文行数
+MAX_CONTEXT_LINES = 99
+
+
+def context_ranges(match_lines: np.ndarray, before: int, after: int,
+                   line_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """匹配行加上前后的上下文后合并得到的行段（与 grep -B/-A 相同，重叠或相邻的段合并为一段）
+
+    Args:
+        match_lines: 匹配的行号（升序）
+        before, after: 每个匹配行之前、之后显示的行数
+        line_count: 文本的总行数
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (每段的起始行号, 每段的结束行号（不含）)
+    """
+    match_lines = np.asarray(match_lines, dtype=np.int64)
+    if not len(match_lines):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.maximum(match_lines - before, 0)
+    ends = np.minimum(match_lines + after + 1, line_count)
+    # 行号升序、前后行数固定，所以结束行号也是升序，只需与前一段比较
+    new_range = np.empty(len(starts), dtype=bool)
+    new_range[0] = True
+    np.greater(starts[1:], ends[:-1], out=new_range[1:])
+    last_of_range = np.append(new_range[1:], True)
+    return starts[new_range], ends[last_of_range]
+
+
+def context_lines(match_lines: np.ndarray, before: int, after: int,
+                  line_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """过滤结果中显示的所有行（匹配行及其上下文）
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (显示的行号（升序）, 每一段第一行在结果中的位置)，
+        除第一段外，每段之前显示一条分隔线
+    """
+    starts, ends = context_ranges(match_lines, before, after, line_count)
+    lengths = ends - starts
+    range_rows = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else lengths
+    # 每行的行号 = 所在段的起始行号 + 在段内的位置
+    rows = np.arange(int(lengths.sum()), dtype=np.int64)
+    rows += np.repeat(starts - range_rows, lengths)
+    return rows, range_rows
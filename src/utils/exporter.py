@@ -0,0 +1,155 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.utils.batch_filter import MatchRecord, iter_line_batches
+from src.utils.filter_engine import FilterEngine
+
+# 导出格式 -> 默认扩展名
+EXPORT_FORMATS = {
+    "text": ".log",
+    "jsonl": ".jsonl",
+    "csv": ".csv",
+}
+# 每攒够这么多行写入一次文件并报告进度
+WRITE_CHUNK_LINES = 5000
+# gzip 压缩级别：默认的 9 比 6 慢数倍，压缩率相差很小
+GZIP_LEVEL = 6
+
+# 复用同一个编码器，省去每行创建编码器的开销（输出与 json.dumps(ensure_ascii=False) 相同）
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, check_circular=False)
+
+# 要导出的一行：(0-based 行号, 内容)
+ExportLine = Tuple[int, str]
+
+
+def export_path_for(path: str, fmt: str, compress: bool) -> str:
+    """按导出格式替换文件的扩展名（压缩时追加 .gz）"""
+    base = path[:-3] if path.endswith(".gz") else path
+    root, ext = os.path.splitext(base)
+    if ext in EXPORT_FORMATS.values() or ext == ".txt":
+        base = root
+    return base + EXPORT_FORMATS[fmt] + (".gz" if compress else "")
+
+
+def iter_file_lines(filepath: str, line_numbers: Optional[Sequence[int]] = None,
+                    start: int = 0, end: Optional[int] = None,
+                    is_cancelled: Optional[Callable[[], bool]] = None) -> Iterator[ExportLine]:
+    """流式读取文件中需要导出的行，只保留选中的行，读到最后一个选中的行就停止
+
+    Args:
+        line_numbers: 升序的行号（如过滤结果的行号映射、标记的行），为 None 时按范围选择
+        start, end: 行号范围 [start, end)，end 为 None 表示到文件末尾
+        is_cancelled: 每读取一批行检查一次，返回 True 时停止（选中的行很稀疏时可能很久才写入一次）
+    """
+    if line_numbers is not None and not line_numbers:
+        return
+    last = line_numbers[-1] if line_numbers is not None else end
+    for first_line, lines in iter_line_batches(filepath):
+        if is_cancelled and is_cancelled():
+            return
+        batch_end = first_line + len(lines)
+        if line_numbers is not None:
+            # 在升序行号中二分出落在这一批的部分
+            left = bisect_left(line_numbers, first_line)
+            right = bisect_left(line_numbers, batch_end, left)
+            for line_number in line_numbers[left:right]:
+                yield line_number, lines[line_number - first_line]
+        else:
+            for line_number in range(max(start, first_line), min(batch_end, end if end is not None else batch_end)):
+                yield line_number, lines[line_number - first_line]
+        if last is not None and batch_end > last:
+            return
+
+
+def _open_output(path: str, compress: bool) -> io.TextIOBase:
+    if compress:
+        return io.TextIOWrapper(gzip.open(path, "wb", compresslevel=GZIP_LEVEL), encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="", buffering=1024 * 1024)
+
+
+class _CsvBuffer:
+    """csv.writer 的写入目标：收集格式化后的行，由调用方按块写入文件"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+
+    def write(self, text: str):
+        self.parts.append(text)
+
+
+def export_lines(lines: Iterable[ExportLine], output_path: str, fmt: str = "text", compress: bool = False,
+                 engine: Optional[FilterEngine] = None, source: str = "", with_line_numbers: bool = False,
+                 is_cancelled: Optional[Callable[[], bool]] = None,
+                 progress: Optional[Callable[[int], None]] = None) -> Optional[int]:
+    """把行流式地写入文件，不在内存中拼接整个结果
+
+    先写入同目录下的临时文件，完成后替换目标文件；取消或出错时删除临时文件，不会留下写了一半的结果。
+
+    Args:
+        lines: 要导出的 (行号, 内容)，通常来自 iter_file_lines()
+        fmt: "text"（每行原文，with_line_numbers 时加 "行号:" 前缀）、
+             "jsonl"（与命令行 --json 相同的匹配记录，包含行号和匹配位置）、
+             "csv"（line, text, matches 三列）
+        engine: 用于计算匹配位置的过滤引擎，为 None 时不输出匹配位置
+        source: jsonl 记录中的文件名
+        progress: 每写入一块调用一次，参数为已写入的行数
+
+    Returns:
+        Optional[int]: 写入的行数，取消时返回 None
+
+    Raises:
+        OSError: 无法写入时抛出
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式：{fmt}")
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_file = tempfile.mkstemp(prefix=os.path.basename(output_path) + ".", suffix=".tmp", dir=directory)
+    os.close(fd)
+    count = 0
+    try:
+        with _open_output(temp_file, compress) as f:
+            buffer = _CsvBuffer()
+            writer = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+            if writer is not None:
+                writer.writerow(["line", "text", "matches"])
+            parts = buffer.parts
+            for line_number, text in lines:
+                if fmt == "text":
+                    parts.append(f"{line_number + 1}:{text}\n" if with_line_numbers else text + "\n")
+                else:
+                    matches = engine.match_line(text) if engine is not None else []
+                    if fmt == "jsonl":
+                        record = MatchRecord(source, line_number, text, sorted(matches))
+                        parts.append(_JSON_ENCODER.encode(record.to_dict()) + "\n")
+                    else:
+                        spans = " ".join(f"{start}-{end}" for start, end, _ in sorted(matches))
+                        writer.writerow([line_number + 1, text, spans])
+                count += 1
+                if count % WRITE_CHUNK_LINES == 0:
+                    f.write("".join(parts))
+                    parts.clear()
+                    if is_cancelled and is_cancelled():
+                        break
+                    if progress:
+                        progress(count)
+            else:
+                f.write("".join(parts))
+        if is_cancelled and is_cancelled():
+            os.remove(temp_file)
+            return None
+        os.replace(temp_file, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        raise
+    if progress:
+        progress(count)
+    return count
@@ -1,19 +1,30 @@
-from typing import List, Dict, Set, Union, Optional, Tuple
+from typing import Callable, List, Dict, Set, Union, Optional, Tuple
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from functools import lru_cache
+import numpy as np
+from src.utils.log_fields import COMPARE_OPS, FIELD_NAMES, QueryContext, level_value, parse_time_value
+
+# 按查询字符串缓存的执行计划数量
+QUERY_CACHE_SIZE = 128
 
 class TokenType(Enum):
     KEYWORD = "KEYWORD"
     AND = "AND"
     OR = "OR"
+    NOT = "NOT"
     LEFT_PAREN = "LEFT_PAREN"
     RIGHT_PAREN = "RIGHT_PAREN"
+    FIELD = "FIELD"
 
 @dataclass
 class Token:
     type: TokenType
     value: str
+    field: str = ""  # FIELD：字段名
+    op: str = ""     # FIELD：比较符；KEYWORD：匹配标志
+    quoted: bool = False  # KEYWORD：是否带引号或斜杠
 
 @dataclass
 class FilterOptions:
@@ -21,36 +32,221 @@ class FilterOptions:
     whole_word: bool = False
     use_regex: bool = False
 
+# 关键字后面的匹配标志："Foo"c、/fo+/i
+TERM_FLAGS = {
+    "c": {"case_sensitive": True},
+    "i": {"case_sensitive": False},
+    "w": {"whole_word": True},
+    "r": {"use_regex": True},
+}
+
+# 单行求值时判断叶子节点（关键字、字段比较）是否满足的函数
+LeafTest = Callable[["ExpressionNode", str], bool]
+
 class ExpressionNode:
-    pass
+    def evaluate(self, line: str, test: LeafTest) -> bool:
+        """逐行求值（短路）：叶子节点交给 test 判断"""
+        return test(self, line)
+
+    def mask(self, context: QueryContext, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """向量化求值：返回每行是否满足的布尔数组，只保证 candidates 为 True 的行正确（见 QueryContext）"""
+        raise NotImplementedError
+
+    def iter_nodes(self):
+        yield self
 
 class KeywordNode(ExpressionNode):
-    def __init__(self, keyword: str):
+    def __init__(self, keyword: str, flags: str = ""):
         self.keyword = keyword
+        self.flags = flags  # TERM_FLAGS 中的字母，覆盖过滤栏的选项
+
+    def options(self, defaults: FilterOptions) -> FilterOptions:
+        """按关键字自己的标志调整后的匹配选项"""
+        for flag in self.flags:
+            defaults = replace(defaults, **TERM_FLAGS[flag])
+        return defaults
+
+    def mask(self, context: QueryContext, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        return context.keyword_mask(self, candidates)
+
+class FieldNode(ExpressionNode):
+    """字段比较，如 tag == "Net"、tag:Net（包含）、tid == 1234、level >= WARN"""
+    def __init__(self, field: str, op: str, value: str):
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def mask(self, context: QueryContext, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        result = context.field_mask(self.field, self.op, self.value)
+        return result if candidates is None else result & candidates
 
-    def evaluate(self, line: str) -> bool:
-        return self.keyword in line
+class NotNode(ExpressionNode):
+    def __init__(self, operand: ExpressionNode):
+        self.operand = operand
+
+    def evaluate(self, line: str, test: LeafTest) -> bool:
+        return not self.operand.evaluate(line, test)
+
+    def mask(self, context: QueryContext, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        result = ~self.operand.mask(context, candidates)
+        return result if candidates is None else result & candidates
+
+    def iter_nodes(self):
+        yield self
+        yield from self.operand.iter_nodes()
 
 class AndNode(ExpressionNode):
     def __init__(self, left: ExpressionNode, right: ExpressionNode):
         self.left = left
         self.right = right
 
-    def evaluate(self, line: str) -> bool:
-        return self.left.evaluate(line) and self.right.evaluate(line)
+    def evaluate(self, line: str, test: LeafTest) -> bool:
+        return self.left.evaluate(line, test) and self.right.evaluate(line, test)
+
+    def mask(self, context: QueryContext, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        left = self.left.mask(context, candidates)
+        # 右侧只需要在左侧满足的行上求值
+        return left & self.right.mask(context, left)
+
+    def iter_nodes(self):
+        yield self
+        yield from self.left.iter_nodes()
+        yield from self.right.iter_nodes()
 
 class OrNode(ExpressionNode):
     def __init__(self, left: ExpressionNode, right: ExpressionNode):
         self.left = left
         self.right = right
 
-    def evaluate(self, line: str) -> bool:
-        return self.left.evaluate(line) or self.right.evaluate(line)
+    def evaluate(self, line: str, test: LeafTest) -> bool:
+        return self.left.evaluate(line, test) or self.right.evaluate(line, test)
+
+    def mask(self, context: QueryContext, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        left = self.left.mask(context, candidates)
+        # 右侧只需要在左侧不满足的行上求值
+        rest = ~left if candidates is None else candidates & ~left
+        return left | self.right.mask(context, rest)
+
+    def iter_nodes(self):
+        yield self
+        yield from self.left.iter_nodes()
+        yield from self.right.iter_nodes()
 
 class ParserError(Exception):
     pass
 
+# 估算的单行求值代价：字段比较是整列运算，远低于逐行的文本匹配；正则最贵
+_FIELD_COST = {"level": 1, "time": 1, "pid": 1, "tid": 1, "tag": 2}
+_LITERAL_COST = 10
+_WHOLE_WORD_COST = 20
+_REGEX_COST = 40
+
+def estimate_cost(node: ExpressionNode) -> int:
+    """估算节点的求值代价，用于安排 and/or 中操作数的顺序"""
+    if isinstance(node, FieldNode):
+        return _FIELD_COST[node.field]
+    if isinstance(node, KeywordNode):
+        if "r" in node.flags:
+            return _REGEX_COST
+        return _WHOLE_WORD_COST if "w" in node.flags else _LITERAL_COST
+    if isinstance(node, NotNode):
+        return estimate_cost(node.operand)
+    return estimate_cost(node.left) + estimate_cost(node.right)
+
+def _flatten(node: ExpressionNode, node_type: type) -> List[ExpressionNode]:
+    if isinstance(node, node_type):
+        return _flatten(node.left, node_type) + _flatten(node.right, node_type)
+    return [node]
+
+def plan_query(node: ExpressionNode) -> ExpressionNode:
+    """重排 and/or 的操作数，代价低的先求值
+
+    and 先求值的操作数会缩小后面操作数需要检查的行，or 先满足的行后面不再检查，
+    所以时间范围、级别等字段比较排在文本匹配之前，普通关键字排在正则之前。
+    结果与原表达式等价（排序是稳定的，代价相同时保持原来的顺序）。
+    """
+    if isinstance(node, NotNode):
+        return NotNode(plan_query(node.operand))
+    for node_type in (AndNode, OrNode):
+        if isinstance(node, node_type):
+            operands = sorted((plan_query(item) for item in _flatten(node, node_type)), key=estimate_cost)
+            result = operands[0]
+            for operand in operands[1:]:
+                result = node_type(result, operand)
+            return result
+    return node
+
+@dataclass
+class QueryPlan:
+    """编译后的查询：重排后的表达式和执行时需要的信息
+
+    Attributes:
+        root: 重排后的表达式
+        is_plain_keyword: 整个表达式只是一个没有标志的关键字，按原来的方式当作普通关键字搜索
+        needs_fields: 包含字段比较，向量化求值前需要提取字段
+        terms: 需要高亮的关键字（不在 not 之下）
+        prefilter: 匹配的行至少包含其中一个关键字；无法由关键字推出时为 None（例如含 not 或字段比较的 or）
+    """
+    root: ExpressionNode
+    is_plain_keyword: bool = False
+    needs_fields: bool = False
+    terms: List[KeywordNode] = field(default_factory=list)
+    prefilter: Optional[List[KeywordNode]] = None
+
+def _positive_terms(node: ExpressionNode) -> List[KeywordNode]:
+    if isinstance(node, KeywordNode):
+        return [node]
+    if isinstance(node, (AndNode, OrNode)):
+        return _positive_terms(node.left) + _positive_terms(node.right)
+    return []
+
+def _prefilter_terms(node: ExpressionNode) -> Optional[List[KeywordNode]]:
+    if isinstance(node, KeywordNode):
+        return [node]
+    if isinstance(node, AndNode):
+        # 任意一侧都是必要条件，取关键字较少的一侧
+        candidates = [terms for terms in (_prefilter_terms(node.left), _prefilter_terms(node.right))
+                      if terms is not None]
+        return min(candidates, key=len) if candidates else None
+    if isinstance(node, OrNode):
+        left, right = _prefilter_terms(node.left), _prefilter_terms(node.right)
+        return left + right if left is not None and right is not None else None
+    return None
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(expression: str) -> QueryPlan:
+    """解析并规划查询，结果按查询字符串缓存（计划不包含匹配选项，可以在不同选项间共用）
+
+    Raises:
+        ParserError: 表达式无效
+    """
+    parser = ExpressionParser()
+    node = parser.parse(expression)
+    if node is None:
+        raise ParserError(parser.error_message)
+    is_plain = (isinstance(node, KeywordNode) and not node.flags and
+                not any(token.quoted for token in parser.tokens))
+    root = plan_query(node)
+    return QueryPlan(
+        root=root,
+        is_plain_keyword=is_plain,
+        needs_fields=ExpressionParser.has_fields(root),
+        terms=_positive_terms(root),
+        prefilter=_prefilter_terms(root),
+    )
+
 class ExpressionParser:
+    """查询语法：
+
+    - 关键字：bareword、"带 空格"、/正则/；引号或斜杠后可以跟标志 c（区分大小写）、i（忽略大小写）、
+      w（全词）、r（正则），如 "Timeout"cw、/conn(ect)?ed/i
+    - 字段比较：level >= WARN、pid == 1234、tid != 5、tag == "Net"、tag:Net（标签包含 Net）、
+      time >= "01-02 03:04:05"、time:"01-02 03:04:05".."01-02 03:05:00"（任意一端可以省略）
+    - 逻辑运算：not/!、and/&&、or/||、括号；优先级 not > and > or
+    """
+    # 关键字中不能出现的字符（遇到时关键字结束）
+    _WORD_DELIMITERS = set('()"')
+
     def __init__(self):
         self.tokens: List[Token] = []
         self.current = 0
@@ -60,7 +256,12 @@ class ExpressionParser:
         try:
             self.tokens = self._tokenize(expression)
             self.current = 0
-            return self._parse_expression()
+            if not self.tokens:
+                raise ParserError("表达式为空")
+            node = self._parse_expression()
+            if self.current < len(self.tokens):
+                raise ParserError(f"非法表达式：{self.tokens[self.current].value}")
+            return node
         except ParserError as e:
             self.error_message = str(e)
             return None
@@ -70,36 +271,74 @@ class ExpressionParser:
         i = 0
         while i < len(expression):
             char = expression[i]
-            
+
             # 跳过空白字符
             if char.isspace():
                 i += 1
                 continue
-                
+
             # 处理关键字
             if char == '"':
                 keyword, new_i = self._extract_keyword(expression, i)
                 if keyword is None:
                     raise ParserError("关键字格式错误：缺少闭合的双引号")
-                tokens.append(Token(TokenType.KEYWORD, keyword))
+                flags, new_i = self._extract_flags(expression, new_i)
+                tokens.append(Token(TokenType.KEYWORD, keyword, op=flags, quoted=True))
                 i = new_i
                 continue
-                
+
+            # 正则：/pattern/flags
+            if char == '/':
+                pattern, new_i = self._extract_regex(expression, i)
+                if pattern is None:
+                    raise ParserError("正则格式错误：缺少闭合的 /")
+                flags, new_i = self._extract_flags(expression, new_i)
+                flags = flags.replace("r", "") + "r"
+                try:
+                    re.compile(pattern, 0 if "c" in flags else re.IGNORECASE)
+                except re.error as e:
+                    raise ParserError(f"正则表达式无效：{pattern}，{e}")
+                tokens.append(Token(TokenType.KEYWORD, pattern, op=flags, quoted=True))
+                i = new_i
+                continue
+
+            # 字段比较：字段名 比较符 值
+            field_token = self._extract_field(expression, i)
+            if field_token is not None:
+                token, i = field_token
+                tokens.append(token)
+                continue
+
             # 处理操作符和括号
             if char == '(':
                 tokens.append(Token(TokenType.LEFT_PAREN, char))
+                i += 1
             elif char == ')':
                 tokens.append(Token(TokenType.RIGHT_PAREN, char))
-            elif expression[i:i+3].lower() == 'and':
+                i += 1
+            elif expression.startswith('&&', i):
                 tokens.append(Token(TokenType.AND, 'and'))
                 i += 2
-            elif expression[i:i+2].lower() == 'or':
+            elif expression.startswith('||', i):
                 tokens.append(Token(TokenType.OR, 'or'))
+                i += 2
+            elif char == '!' and not expression.startswith('!=', i):
+                tokens.append(Token(TokenType.NOT, 'not'))
                 i += 1
             else:
-                raise ParserError(f"非法字符: {char}")
-            i += 1
-            
+                # 不带引号的关键字：到空白或括号为止，整个单词是 and/or/not 时才是运算符
+                end = i
+                while end < len(expression) and not expression[end].isspace() \
+                        and expression[end] not in self._WORD_DELIMITERS:
+                    end += 1
+                word = expression[i:end]
+                operator = {"and": TokenType.AND, "or": TokenType.OR, "not": TokenType.NOT}.get(word.lower())
+                if operator is not None:
+                    tokens.append(Token(operator, word.lower()))
+                else:
+                    tokens.append(Token(TokenType.KEYWORD, word))
+                i = end
+
         return tokens
 
     def _extract_keyword(self, expression: str, start: int) -> tuple[Union[str, None], int]:
@@ -111,46 +350,144 @@ class ExpressionParser:
             i += 1
         return None, start
 
+    def _extract_regex(self, expression: str, start: int) -> tuple[Union[str, None], int]:
+        """/pattern/ 中的正则，\\/ 表示斜杠本身"""
+        i = start + 1
+        while i < len(expression):
+            if expression[i] == '\\':
+                i += 2
+                continue
+            if expression[i] == '/':
+                return expression[start+1:i].replace('\\/', '/'), i + 1
+            i += 1
+        return None, start
+
+    def _extract_flags(self, expression: str, start: int) -> Tuple[str, int]:
+        """紧跟在引号或斜杠后的匹配标志"""
+        end = start
+        while end < len(expression) and expression[end] in TERM_FLAGS:
+            end += 1
+        if end < len(expression) and not expression[end].isspace() and expression[end] != ')':
+            raise ParserError(f"无效的匹配标志：{expression[start:end + 1]}")
+        return expression[start:end], end
+
+    _FIELD_PATTERN = re.compile(r'(' + '|'.join(FIELD_NAMES) + r')\s*(' +
+                                '|'.join(re.escape(op) for op in COMPARE_OPS) + r'|:)\s*((?:"[^"]*"|[^\s()"])+)',
+                                re.IGNORECASE)
+
+    @staticmethod
+    def _unquote(value: str) -> str:
+        return value[1:-1] if len(value) >= 2 and value.startswith('"') and value.endswith('"') else value
+
+    @classmethod
+    def _extract_field(cls, expression: str, start: int) -> Optional[Tuple[Token, int]]:
+        """在 start 处识别字段比较（字段名前后不能紧接字母数字），返回 (Token, 新的索引)
+
+        字段名后的 ":" 对 tag 表示包含，对 time 表示范围（开始..结束），其余字段等同于 ==。
+        """
+        if start > 0 and (expression[start - 1].isalnum() or expression[start - 1] == '_'):
+            return None
+        match = cls._FIELD_PATTERN.match(expression, start)
+        if match is None:
+            return None
+        field, op, value = match.group(1).lower(), match.group(2), match.group(3)
+        if op == ":" and field == "time":
+            if ".." not in value:
+                raise ParserError("时间需要写成范围：time:开始..结束")
+            bounds = [cls._unquote(part) for part in value.split("..", 1)]
+            if not any(bounds):
+                raise ParserError("时间范围的开始和结束不能都省略")
+            value = "..".join(bounds)
+            op = ".."
+        else:
+            value = cls._unquote(value)
+            if op == ":" and field != "tag":
+                op = "=="
+            bounds = [value] if field == "time" else []
+        # 值在解析时就检查，时间按任意年份检查格式（求值时使用日志中的年份）
+        try:
+            if field == "level":
+                level_value(value)
+            elif field in ("pid", "tid"):
+                int(value)
+            for bound in bounds:
+                if bound:
+                    parse_time_value(bound, 2000)
+        except ValueError:
+            raise ParserError(f"{field} 的值无效：{value}")
+        if field == "tag" and op not in ("==", "!=", ":"):
+            raise ParserError("标签只支持 ==、!= 和 : 比较")
+        return Token(TokenType.FIELD, value, field, op), match.end()
+
+    @staticmethod
+    def has_fields(node: Optional[ExpressionNode]) -> bool:
+        """表达式中是否包含字段比较"""
+        return node is not None and any(isinstance(item, FieldNode) for item in node.iter_nodes())
+
+    @staticmethod
+    def keywords(node: Optional[ExpressionNode]) -> List[str]:
+        """表达式中需要高亮的关键字（not 之下的关键字除外）"""
+        if node is None:
+            return []
+        return [item.keyword for item in _positive_terms(node)]
+
     def _parse_expression(self) -> ExpressionNode:
         return self._parse_or()
 
     def _parse_or(self) -> ExpressionNode:
         expr = self._parse_and()
-        
+
         while self.current < len(self.tokens) and self.tokens[self.current].type == TokenType.OR:
             self.current += 1
             right = self._parse_and()
             expr = OrNode(expr, right)
-            
+
         return expr
 
     def _parse_and(self) -> ExpressionNode:
-        expr = self._parse_primary()
-        
+        expr = self._parse_not()
+
         while self.current < len(self.tokens) and self.tokens[self.current].type == TokenType.AND:
             self.current += 1
-            right = self._parse_primary()
+            right = self._parse_not()
             expr = AndNode(expr, right)
-            
+
         return expr
 
+    def _parse_not(self) -> ExpressionNode:
+        if self.current < len(self.tokens) and self.tokens[self.current].type == TokenType.NOT:
+            self.current += 1
+            return NotNode(self._parse_not())
+        return self._parse_primary()
+
     def _parse_primary(self) -> ExpressionNode:
+        if self.current >= len(self.tokens):
+            raise ParserError("表达式不完整")
         token = self.tokens[self.current]
-        
+
         if token.type == TokenType.LEFT_PAREN:
             self.current += 1
             expr = self._parse_expression()
-            
+
             if self.current >= len(self.tokens) or self.tokens[self.current].type != TokenType.RIGHT_PAREN:
                 raise ParserError("括号不匹配：缺少右括号")
-                
+
             self.current += 1
             return expr
-            
+
         elif token.type == TokenType.KEYWORD:
             self.current += 1
-            return KeywordNode(token.value)
-            
+            return KeywordNode(token.value, token.op)
+
+        elif token.type == TokenType.FIELD:
+            self.current += 1
+            if token.op == "..":
+                # 时间范围拆成两个比较，省略的一端不限制
+                start, end = token.value.split("..", 1)
+                bounds = [FieldNode("time", op, value) for op, value in ((">=", start), ("<=", end)) if value]
+                return bounds[0] if len(bounds) == 1 else AndNode(*bounds)
+            return FieldNode(token.field, token.op, token.value)
+
         raise ParserError(f"非法表达式：{token.value}")
 
     def validate_expression(self, expression: str) -> Dict[str, Union[bool, str]]:
@@ -170,4 +507,4 @@ class ExpressionParser:
             return {
                 "valid": False,
                 "message": str(e)
-            } 
\ No newline at end of file
+            }
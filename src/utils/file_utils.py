@@ -1,7 +1,47 @@
 import codecs
+import io
 import os
 from typing import Optional, List, Callable, Generator, Tuple
+from src.utils.compressed_file import CompressedFile, compression_type
+from src.utils.profiler import profiled
 
+def open_log_file(filepath: str, mode: str = 'rb', encoding: Optional[str] = None,
+                  errors: Optional[str] = None):
+    """
+    打开日志文件，.gz/.zst/.bz2/.xz 压缩文件会被透明解压。
+    
+    压缩文件返回的对象同样支持 seek()，会从最近的检查点开始解压，
+    因此按偏移读取文件中间的内容不需要从头解压。
+    
+    Args:
+        filepath: 文件路径
+        mode: 'rb' 或 'r'
+        encoding: 文本模式下的编码
+        errors: 文本模式下的解码错误处理方式
+    """
+    kind = compression_type(filepath)
+    if kind is None:
+        if 'b' in mode:
+            return open(filepath, mode)
+        return open(filepath, mode, encoding=encoding, errors=errors)
+    buffered = io.BufferedReader(CompressedFile(filepath, kind), buffer_size=1024 * 1024)
+    if 'b' in mode:
+        return buffered
+    return io.TextIOWrapper(buffered, encoding=encoding, errors=errors)
+
+def get_content_size(filepath: str) -> Optional[int]:
+    """
+    获取文件内容的大小（压缩文件为解压后的大小）。
+    
+    Returns:
+        Optional[int]: 字节数；压缩文件尚未完整解压过一次时返回 None
+    """
+    if compression_type(filepath) is None:
+        return os.path.getsize(filepath)
+    with CompressedFile(filepath) as f:
+        return f.index.size
+
+@profiled("load.detect_encoding")
 def detect_encoding(filepath: str, fallback_encodings: Optional[List[str]] = None) -> str:
     """
     检测文件编码。
@@ -39,7 +79,7 @@ def detect_encoding(filepath: str, fallback_encodings: Optional[List[str]] = Non
             return False
             
     # 读取文件头部来检测编码
-    with open(filepath, 'rb') as f:
+    with open_log_file(filepath) as f:
         raw = f.read(4096)  # 读取前4KB
         if not raw:
             return 'utf-8'  # 空文件默认使用UTF-8
@@ -64,11 +104,13 @@ def detect_encoding(filepath: str, fallback_encodings: Optional[List[str]] = Non
         # 如果都失败，返回第一个备选编码
         return fallback_encodings[0]
 
+@profiled("load.read_file_with_encoding")
 def read_file_with_encoding(
     filepath: str,
     fallback_encodings: Optional[List[str]] = None,
     chunk_callback: Optional[Callable[[str], None]] = None,
-    chunk_size_mb: int = 8
+    chunk_size_mb: int = 8,
+    encoding: Optional[str] = None
 ) -> str:
     """
     使用分块加载方式读取文件，支持多种编码。
@@ -78,6 +120,7 @@ def read_file_with_encoding(
         fallback_encodings: 备选编码列表，如果为None则使用默认列表
         chunk_callback: 分块读取回调函数，用于实时处理读取的内容
         chunk_size_mb: 分块大小（MB），默认8MB
+        encoding: 已知的文件编码（例如缓存中记录的），为None时自动检测
         
     Returns:
         str: 文件内容
@@ -90,13 +133,14 @@ def read_file_with_encoding(
         raise FileNotFoundError(f"文件不存在：{filepath}")
         
     # 检测文件编码
-    encoding = detect_encoding(filepath, fallback_encodings)
+    if encoding is None:
+        encoding = detect_encoding(filepath, fallback_encodings)
     chunk_size = chunk_size_mb * 1024 * 1024  # 转换为字节
     
     # 分块读取文件
     result = []
     try:
-        with open(filepath, 'r', encoding=encoding) as f:
+        with open_log_file(filepath, 'r', encoding=encoding) as f:
             while True:
                 chunk = f.read(chunk_size)
                 if not chunk:
@@ -110,7 +154,7 @@ def read_file_with_encoding(
         
     except UnicodeDecodeError:
         # 如果解码失败，尝试使用replace模式
-        with open(filepath, 'r', encoding=encoding, errors='replace') as f:
+        with open_log_file(filepath, 'r', encoding=encoding, errors='replace') as f:
             content = f.read()
             if chunk_callback:
                 chunk_callback(content)
@@ -143,7 +187,7 @@ def read_file_chunks(
     chunk_size = chunk_size_mb * 1024 * 1024  # 转换为字节
     
     try:
-        with open(filepath, 'r', encoding=encoding) as f:
+        with open_log_file(filepath, 'r', encoding=encoding) as f:
             chunk_index = 0
             while True:
                 chunk = f.read(chunk_size)
@@ -154,9 +198,40 @@ def read_file_chunks(
                 
     except UnicodeDecodeError:
         # 如果解码失败，尝试使用replace模式
-        with open(filepath, 'r', encoding=encoding, errors='replace') as f:
+        with open_log_file(filepath, 'r', encoding=encoding, errors='replace') as f:
             while True:
                 chunk = f.read(chunk_size)
                 if not chunk:
                     break
-                yield chunk, 0  # 在replace模式下，只返回一个块
\ No newline at end of file
+                yield chunk, 0  # 在replace模式下，只返回一个块
+
+
+def read_file_bytes_chunks(
+    filepath: str,
+    chunk_size_mb: int = 8,
+    start_offset: int = 0
+) -> Generator[Tuple[bytes, int], None, None]:
+    """
+    生成器函数，逐块读取文件的原始字节，不做解码。
+    
+    Args:
+        filepath: 文件路径
+        chunk_size_mb: 分块大小（MB），默认8MB
+        start_offset: 开始读取的字节偏移（压缩文件为解压后的偏移），用于只读取文件新追加的部分
+        
+    Yields:
+        Tuple[bytes, int]: (块内容, 块在文件中的起始偏移)
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"文件不存在：{filepath}")
+        
+    chunk_size = chunk_size_mb * 1024 * 1024  # 转换为字节
+    with open_log_file(filepath) as f:
+        f.seek(start_offset)
+        offset = start_offset
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk, offset
+            offset += len(chunk)
@@ -0,0 +1,581 @@
+from typing import Callable, List, Dict, Set, Tuple, Optional
+import numpy as np
+from src.utils.expression_parser import (ExpressionNode, ExpressionParser, FilterOptions, KeywordNode,
+                                        ParserError, QueryPlan, compile_query)
+from src.utils.log_fields import (PARSER_PRESETS, LineParser, LogFields, QueryContext, build_log_fields,
+                                  iter_text_chunks, line_field_test)
+from src.utils.multi_pattern import MultiPatternMatcher, PatternRule
+from src.utils.profiler import profiled, profiler
+from src.utils.result_cache import MAX_CACHED_MATCHES, ResultCache
+import json
+import re
+
+class FilterEngine:
+    def __init__(self):
+        self.parser = ExpressionParser()
+        self.current_expression: Optional[str] = None
+        self.keywords: Set[str] = set()
+        self.case_sensitive = False
+        self.whole_word = False
+        self.use_regex = False
+        self.use_query = False    # 按查询语法解析表达式，见 set_filter_expression()
+        self.cached_matches = []  # 缓存匹配结果
+        self.cached_text = None   # 缓存搜索的文本
+        self.cached_options = {}  # 缓存搜索选项
+        self.cached_lines = []    # 缓存分割后的行
+        self.total_count = 0
+        self._matchers = []       # 预编译的匹配器 (关键字, 搜索关键字, 正则)
+        self.group_matcher: Optional[MultiPatternMatcher] = None  # 按分组过滤时的合并匹配器
+        self.keyword_counts: List[int] = []  # 按分组过滤时每个关键字的匹配次数
+        self.query: Optional[QueryPlan] = None  # 查询表达式（含 and/or/not、字段比较或关键字标志）
+        self._term_matchers: List[Tuple[KeywordNode, re.Pattern]] = []  # 查询中需要高亮的关键字
+        self._term_predicates: Dict[int, Callable[[str], bool]] = {}  # id(关键字节点) -> 判断一行是否匹配
+        self.line_parser: Optional[LineParser] = None  # 提取字段的行解析器，None 表示自动选择
+        self._detected_parser: Optional[LineParser] = None  # 逐行比较字段时自动选择的解析器，见 begin_source()
+        self.fields: Optional[LogFields] = None  # 最近一次提取的字段
+        self._fields_text: Optional[str] = None  # fields 对应的文本
+        self.result_cache: Optional[ResultCache] = None  # 文件的结果缓存，见 set_result_cache()
+        self._cache_text: Optional[str] = None  # result_cache 对应的文本
+
+    def set_filter_expression(self, expression: str, options: dict = None) -> dict:
+        """设置过滤表达式和选项
+
+        默认把整个表达式当作一个普通关键字（"not found"、"tag:bar" 都按原文搜索）；
+        选项 use_query 为 True 时才按查询语法解析（and/or/not、字段比较、带标志的关键字），
+        语法错误作为无效表达式返回。
+        """
+        if options is None:
+            options = {}
+            
+        # 清除缓存，因为表达式或选项改变了
+        self.cached_matches = []
+        self.cached_text = None
+        self.cached_options = {}
+        self.group_matcher = None
+        self.keyword_counts = []
+        self.query = None
+        self._term_matchers = []
+        self._term_predicates = {}
+            
+        self.case_sensitive = options.get("case_sensitive", False)
+        self.whole_word = options.get("whole_word", False)
+        self.use_regex = options.get("use_regex", False)
+        self.use_query = options.get("use_query", False)
+        
+        if self.use_query and not self.use_regex and expression:
+            try:
+                plan = compile_query(expression)
+            except ParserError as e:
+                return {"valid": False, "message": str(e)}
+            # 只有一个不带标志的关键字时与普通搜索相同，走原来的路径
+            if not plan.is_plain_keyword:
+                self.current_expression = expression
+                self.query = plan
+                self.keywords = {node.keyword for node in plan.terms}
+                self._matchers = []
+                self._compile_terms()
+                return {"valid": True, "message": ""}
+        
+        try:
+            if self.use_regex:
+                # 在正则表达式模式下，尝试编译表达式
+                try:
+                    # 先尝试直接编译
+                    re.compile(expression)
+                    self.current_expression = expression
+                except re.error:
+                    # 如果失败，尝试转义后再编译
+                    escaped_expr = re.escape(expression)
+                    re.compile(escaped_expr)
+                    self.current_expression = escaped_expr
+                
+                self.keywords = {self.current_expression}
+            else:
+                # 非正则表达式模式下，直接使用输入的内容
+                self.current_expression = expression
+                self.keywords = {expression} if expression else set()
+                
+            self._compile_matchers()
+            return {"valid": True, "message": ""}
+        except Exception as e:
+            return {"valid": False, "message": str(e)}
+
+    def set_keyword_group(self, name: str, rules: List[PatternRule]) -> dict:
+        """用一组关键字过滤，每个关键字使用自己的匹配选项
+
+        所有关键字合并为一个匹配器，扫描一遍即可得到匹配行和每个关键字的匹配次数
+        （见 keyword_counts，顺序与 rules 相同）。
+        """
+        self.cached_matches = []
+        self.cached_options = {}
+        self._matchers = []
+        self.query = None
+        try:
+            self.group_matcher = MultiPatternMatcher(rules)
+        except re.error as e:
+            self.group_matcher = None
+            return {"valid": False, "message": str(e)}
+        self.keyword_counts = [0] * len(self.group_matcher)
+        self.current_expression = name
+        self.keywords = {keyword for keyword, _ in self.group_matcher.rules if keyword}
+        return {"valid": True, "message": ""}
+
+    def _match_keyword(self, text: str, keyword: str) -> bool:
+        """根据选项匹配关键字"""
+        if not keyword:
+            return False
+            
+        if self.use_regex:
+            try:
+                pattern = re.compile(keyword, flags=0 if self.case_sensitive else re.IGNORECASE)
+                return bool(pattern.search(text))
+            except re.error:
+                # 如果正则表达式无效，将其作为普通文本处理
+                if not self.case_sensitive:
+                    text = text.lower()
+                    keyword = keyword.lower()
+                return keyword in text
+        else:
+            # 非正则表达式模式下的简单文本匹配
+            if not self.case_sensitive:
+                text = text.lower()
+                keyword = keyword.lower()
+                
+            if self.whole_word:
+                # 使用单词边界匹配
+                pattern = r'\b' + re.escape(keyword) + r'\b'
+                return bool(re.search(pattern, text))
+            else:
+                return keyword in text
+
+    @profiled("filter.filter_text")
+    def filter_text(self, text: str, expression: str = None) -> Tuple[List[str], List[int]]:
+        """根据表达式过滤文本"""
+        if expression is not None:
+            self.set_filter_expression(expression)
+            
+        if not self.current_expression:
+            return [], []
+
+        # 设置文本并预处理
+        self.set_text(text)
+        
+        # 检查是否需要重新搜索
+        current_options = {
+            "case_sensitive": self.case_sensitive,
+            "whole_word": self.whole_word,
+            "use_regex": self.use_regex,
+            "use_query": self.use_query
+        }
+        
+        if current_options != self.cached_options:
+            # 需要重新搜索并缓存结果；同一文件之前用相同条件过滤过时直接读取磁盘上的结果
+            cache = self._cache_for(self.cached_text)
+            matches = self._load_cached_matches(cache) if cache is not None else None
+            if matches is None:
+                matches = self.find_keyword_matches(text)
+                if cache is not None:
+                    self._save_cached_matches(cache, matches)
+            self.cached_matches = matches
+            self.cached_options = current_options.copy()
+            
+        # 使用缓存的行
+        filtered_lines = []
+        line_mapping = []
+        
+        # 根据缓存的匹配结果构建过滤后的行列表
+        matched_lines = set()
+        for _, _, _, line_number, _ in self.cached_matches:
+            if line_number not in matched_lines:
+                matched_lines.add(line_number)
+                filtered_lines.append(self.cached_lines[line_number])
+                line_mapping.append(line_number)
+                
+        return filtered_lines, line_mapping
+
+    def get_keywords(self) -> Set[str]:
+        """获取当前的关键字集合"""
+        return self.keywords
+
+    def _compile_matchers(self):
+        """按当前选项预编译每个关键字的匹配器，避免逐行重复编译"""
+        self._matchers = []
+        for keyword in self.keywords:
+            if not keyword:
+                continue
+            if self.use_regex:
+                try:
+                    pattern = re.compile(keyword, flags=0 if self.case_sensitive else re.IGNORECASE)
+                except re.error:
+                    continue
+                self._matchers.append((keyword, keyword, pattern))
+            else:
+                search_keyword = keyword if self.case_sensitive else keyword.lower()
+                pattern = re.compile(r'\b' + re.escape(search_keyword) + r'\b') if self.whole_word else None
+                self._matchers.append((keyword, search_keyword, pattern))
+
+    def match_line(self, line: str) -> List[Tuple[int, int, str]]:
+        """查找一行中所有关键字的匹配位置
+        返回一个列表，每个元素是一个元组 (start_pos, end_pos, matched_keyword)
+        """
+        if self.group_matcher is not None:
+            rules = self.group_matcher.rules
+            return [(start, end, rules[index][0]) for start, end, index in self.group_matcher.match_line(line)]
+        if self.query is not None:
+            # 逐行短路求值；只由字段条件或 not 满足的行整行作为一个匹配项
+            if not self.query.root.evaluate(line, self._test_leaf):
+                return []
+            return self._term_matches(line) or [(0, len(line), "")]
+
+        matches = []
+        search_line = None
+        for keyword, search_keyword, pattern in self._matchers:
+            if self.use_regex:
+                for match in pattern.finditer(line):
+                    matches.append((match.start(), match.end(), match.group()))
+                continue
+
+            if search_line is None:
+                search_line = line if self.case_sensitive else line.lower()
+            if pattern is not None:
+                # 全词匹配
+                for match in pattern.finditer(search_line):
+                    matches.append((match.start(), match.start() + len(keyword), keyword))
+            else:
+                pos = 0
+                while True:
+                    pos = search_line.find(search_keyword, pos)
+                    if pos == -1:
+                        break
+                    matches.append((pos, pos + len(keyword), keyword))
+                    pos += 1
+        return matches
+
+    @profiled("filter.find_keyword_matches")
+    def find_keyword_matches(self, text: str) -> List[Tuple[int, int, str, int, int]]:
+        """在文本中查找所有关键字的匹配位置
+        返回一个列表，每个元素是一个元组 (start_pos, end_pos, matched_keyword, line_number, index)
+        其中start_pos和end_pos是在该行中的位置
+        按照index排序
+        """
+        matches = []
+        index = 0  # 用于记录匹配项的顺序
+        if self.query is not None:
+            # 查询：向量化求出匹配的行，再在这些行中查找关键字的位置用于高亮和跳转；
+            # 只由字段条件或 not 满足的行整行作为一个匹配项
+            for line_number in np.flatnonzero(self.query_mask(text)).tolist():
+                line = self.cached_lines[line_number]
+                for start, end, keyword in self._term_matches(line) or [(0, len(line), "")]:
+                    matches.append((start, end, keyword, line_number, index))
+                    index += 1
+            self.set_total_count(index)
+            profiler.count("filter.lines_scanned", len(self.cached_lines))
+            profiler.count("filter.matches", index)
+            return matches
+        if self.group_matcher is not None:
+            # 按分组过滤：同时统计每个关键字的匹配次数
+            rules = self.group_matcher.rules
+            counts = [0] * len(rules)
+            for line_number, line in enumerate(self.cached_lines):
+                for start, end, rule_index in self.group_matcher.match_line(line):
+                    matches.append((start, end, rules[rule_index][0], line_number, index))
+                    counts[rule_index] += 1
+                    index += 1
+            self.keyword_counts = self.group_matcher.fill_duplicate_counts(counts)
+            self.set_total_count(index)
+            profiler.count("filter.lines_scanned", len(self.cached_lines))
+            profiler.count("filter.matches", index)
+            return matches
+
+        # 使用缓存的行
+        for line_number, line in enumerate(self.cached_lines):
+            for start, end, keyword in self.match_line(line):
+                # 使用行内的匹配位置
+                matches.append((start, end, keyword, line_number, index))
+                index += 1
+                        
+        # 按照索引排序
+        self.set_total_count(index)
+        profiler.count("filter.lines_scanned", len(self.cached_lines))
+        profiler.count("filter.matches", index)
+        return matches
+
+    def set_text(self, text: str):
+        """设置文本并进行预处理"""
+        if text != self.cached_text:
+            self.cached_text = text
+            self.cached_lines = text.split('\n')
+            # 清除之前的匹配缓存
+            self.cached_matches = []
+            
+    def set_total_count(self, count: int) -> int:
+        self.total_count = count
+
+    def get_keyword_total_count(self) -> int:
+        return self.total_count
+
+    def get_keyword_matches(self, text: str) -> List[Tuple[int, int, str, int, int]]:
+        """获取文本中所有关键字的匹配位置
+        返回一个列表，每个元素是一个元组 (start_pos, end_pos, matched_keyword, line_number, index)
+        """ 
+        # 从缓存结果中提取需要的信息
+        return [(start, end, keyword, line_number, index) for start, end, keyword, line_number, index in self.cached_matches]
+
+    def clear_filter(self):
+        """清除当前过滤器"""
+        self.current_expression = None
+        self.keywords.clear()
+        self._matchers = []
+        self.group_matcher = None
+        self.keyword_counts = []
+        self.query = None
+        self._term_matchers = []
+        self._term_predicates = {}
+
+    def set_line_parser(self, parser: Optional[LineParser], fields: Optional[LogFields] = None,
+                        text: Optional[str] = None):
+        """设置提取字段的行解析器（None 表示自动选择预设），之前提取的字段作废
+
+        Args:
+            fields, text: 已经用该解析器从 text 中提取的字段（例如表格视图的结果），可以直接复用
+        """
+        self.line_parser = parser
+        self._detected_parser = None
+        self.fields = fields
+        self._fields_text = text if fields is not None else None
+        self.cached_options = {}
+
+    def begin_source(self, sample: str = ""):
+        """开始逐行匹配一个新的文件（或文件的一段），sample 为文件开头的若干行
+
+        逐行比较字段时按 sample 自动选择解析器，与向量化求值时 build_log_fields() 按第一块文本
+        选择的结果一致；同一个引擎依次匹配多个文件时每个文件都要调用，否则会沿用上一个文件的解析器。
+        """
+        self._detected_parser = None
+        if self.line_parser is None and sample and self.query is not None and self.query.needs_fields:
+            self._detected_parser = LineParser.detect(sample)
+
+    def field_index(self, text: str, is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[LogFields]:
+        """文本中每行的字段，文本不变时直接返回上次的结果，取消时返回 None（可以在工作线程中调用）"""
+        fields, fields_text = self.fields, self._fields_text
+        if fields is not None and (fields_text is text or fields_text == text):
+            return fields
+        if text == self.cached_text:
+            text = self.cached_text  # 与过滤的文本共用同一个字符串，不额外占用内存
+        cache = self._cache_for(text)
+        fields = self._load_cached_fields(cache) if cache is not None else None
+        if fields is None:
+            fields = build_log_fields(iter_text_chunks(text), self.line_parser, is_cancelled)
+            if fields is not None and cache is not None:
+                self._save_cached_fields(cache, fields)
+        if fields is not None:
+            self.fields, self._fields_text = fields, text
+        return fields
+
+    def set_result_cache(self, cache: Optional[ResultCache], text: Optional[str] = None):
+        """设置文件的结果缓存，text 为从该文件读取的文本
+
+        之后过滤或提取字段的文本与 text 相同时才读写缓存，文本被编辑过就不再使用。
+        """
+        self.result_cache = cache if text is not None else None
+        self._cache_text = text if cache is not None else None
+
+    def _cache_for(self, text: str) -> Optional[ResultCache]:
+        """text 可以使用的结果缓存"""
+        source = self._cache_text
+        if self.result_cache is None or source is None:
+            return None
+        return self.result_cache if text is source or text == source else None
+
+    def _result_key(self) -> str:
+        """当前过滤条件的文本描述，作为结果缓存的键"""
+        if self.group_matcher is not None:
+            condition = ["group", self.group_matcher.rules]
+        else:
+            condition = ["filter", self.current_expression, self.case_sensitive, self.whole_word, self.use_regex,
+                         self.use_query]
+        if self.query is not None and self.query.needs_fields:
+            condition.append(self._parser_key())
+        return json.dumps(condition, ensure_ascii=False, sort_keys=True)
+
+    def _parser_key(self) -> str:
+        return self.line_parser.regex.pattern if self.line_parser is not None else ""
+
+    def _load_cached_matches(self, cache: ResultCache) -> Optional[List[Tuple[int, int, str, int, int]]]:
+        loaded = cache.load_filter(self._result_key())
+        if loaded is None:
+            return None
+        info, arrays = loaded
+        lines = arrays["lines"].tolist()
+        if lines and lines[-1] >= len(self.cached_lines):
+            return None
+        keywords = info.get("keywords", [])
+        matched = [keywords[index] for index in arrays["keywords"].tolist()]
+        if self.group_matcher is not None:
+            self.keyword_counts = info.get("keyword_counts", [])
+        self.set_total_count(len(lines))
+        profiler.count("filter.cache_hits", 1)
+        return list(zip(arrays["starts"].tolist(), arrays["ends"].tolist(), matched, lines, range(len(lines))))
+
+    def _save_cached_matches(self, cache: ResultCache, matches: List[Tuple[int, int, str, int, int]]):
+        count = len(matches)
+        if count > MAX_CACHED_MATCHES:
+            return
+        keywords: Dict[str, int] = {}
+        arrays = {
+            "lines": np.fromiter((match[3] for match in matches), dtype=np.int64, count=count),
+            "starts": np.fromiter((match[0] for match in matches), dtype=np.int64, count=count),
+            "ends": np.fromiter((match[1] for match in matches), dtype=np.int64, count=count),
+            "keywords": np.fromiter((keywords.setdefault(match[2], len(keywords)) for match in matches),
+                                    dtype=np.int32, count=count),
+        }
+        cache.save_filter(self._result_key(), arrays,
+                          {"keywords": list(keywords), "keyword_counts": list(self.keyword_counts)})
+
+    def _load_cached_fields(self, cache: ResultCache) -> Optional[LogFields]:
+        loaded = cache.load("fields", self._parser_key())
+        if loaded is None:
+            return None
+        info, arrays = loaded
+        profiler.count("fields.cache_hits", 1)
+        return LogFields(parser_name=info.get("parser_name", ""), tag_names=info.get("tag_names", []),
+                         default_year=info.get("default_year", 0), **arrays)
+
+    def _save_cached_fields(self, cache: ResultCache, fields: LogFields):
+        arrays = {name: getattr(fields, name) for name in ("timestamps", "pids", "tids", "levels", "tags",
+                                                           "message_starts")}
+        cache.save("fields", self._parser_key(), arrays, {"parser_name": fields.parser_name,
+                                                          "tag_names": fields.tag_names,
+                                                          "default_year": fields.default_year})
+
+    def query_mask(self, text: str) -> np.ndarray:
+        """查询匹配的行（布尔数组，下标为行号）；只有包含字段比较时才提取字段
+
+        Raises:
+            ValueError: 字段或值无效，或者日志格式无法识别
+        """
+        self.set_text(text)
+        fields = self.field_index(text) if self.query.needs_fields else None
+        if fields is not None and not fields.parser_name:
+            # 没有解析器时字段列基本为空，字段比较会静默地不匹配任何行
+            raise ValueError("无法识别日志格式，不能按字段过滤；可以在「表格」页输入解析正则")
+        context = QueryContext(fields, len(self.cached_lines), self._keyword_mask)
+        return self.query.root.mask(context)
+
+    def _term_options(self, node: KeywordNode) -> FilterOptions:
+        """关键字的匹配选项：过滤栏的选项，再按关键字自己的标志调整"""
+        return node.options(FilterOptions(self.case_sensitive, self.whole_word, False))
+
+    def _term_pattern(self, node: KeywordNode) -> re.Pattern:
+        options = self._term_options(node)
+        pattern = node.keyword if options.use_regex else re.escape(node.keyword)
+        if options.whole_word:
+            pattern = r'\b' + pattern + r'\b' if not options.use_regex else r'\b(?:' + pattern + r')\b'
+        return re.compile(pattern, 0 if options.case_sensitive else re.IGNORECASE)
+
+    def _compile_terms(self):
+        """预编译查询中每个关键字的匹配函数和高亮用的正则"""
+        self._term_predicates = {}
+        for node in self.query.root.iter_nodes():
+            if not isinstance(node, KeywordNode):
+                continue
+            options = self._term_options(node)
+            if not node.keyword:
+                predicate = lambda line: False
+            elif options.use_regex or options.whole_word:
+                predicate = lambda line, search=self._term_pattern(node).search: search(line) is not None
+            elif options.case_sensitive:
+                predicate = lambda line, keyword=node.keyword: keyword in line
+            else:
+                predicate = lambda line, keyword=node.keyword.lower(): keyword in line.lower()
+            self._term_predicates[id(node)] = predicate
+        self._term_matchers = [(node, self._term_pattern(node)) for node in self.query.terms if node.keyword]
+
+    def _term_matches(self, line: str) -> List[Tuple[int, int, str]]:
+        """查询中需要高亮的关键字在一行中的位置"""
+        matches = []
+        for node, pattern in self._term_matchers:
+            is_regex = "r" in node.flags
+            for match in pattern.finditer(line):
+                if match.end() > match.start():
+                    matches.append((match.start(), match.end(), match.group() if is_regex else node.keyword))
+        return matches
+
+    def _keyword_mask(self, node: KeywordNode, candidates: Optional[np.ndarray]) -> np.ndarray:
+        """匹配关键字的行，只检查 candidates 中的行"""
+        lines = self.cached_lines
+        result = np.zeros(len(lines), dtype=bool)
+        predicate = self._term_predicates[id(node)]
+        rows = range(len(lines)) if candidates is None else np.flatnonzero(candidates).tolist()
+        hits = [row for row in rows if predicate(lines[row])]
+        result[hits] = True
+        return result
+
+    def _test_leaf(self, node: ExpressionNode, line: str) -> bool:
+        """逐行求值时判断关键字或字段比较；字段由行解析器从这一行中拆出"""
+        if isinstance(node, KeywordNode):
+            return self._term_predicates[id(node)](line)
+        parser = self.line_parser or self._detected_parser
+        if parser is None:
+            return False  # 文件格式无法识别（或没有调用 begin_source()）
+        return line_field_test(parser, line, node.field, node.op, node.value)
+
+    def prefilter_terms(self) -> Optional[List[Tuple[str, bool, bool]]]:
+        """匹配的行至少包含其中一个的关键字 [(关键字, 区分大小写, 正则)]，用于在字节层预筛选候选行；
+        无法只靠关键字筛选时（查询中有 not 或字段比较）返回 None"""
+        if self.query is None:
+            return [(keyword, self.case_sensitive, self.use_regex) for keyword, _, _ in self._matchers]
+        if self.query.prefilter is None:
+            return None
+        terms = []
+        for node in self.query.prefilter:
+            options = self._term_options(node)
+            terms.append((node.keyword, options.case_sensitive, options.use_regex))
+        return terms
+
+    def copy_filter(self) -> Optional["FilterEngine"]:
+        """复制当前的过滤条件（不含缓存的文本和匹配结果），供其它线程单独使用；没有过滤时返回 None"""
+        if not self.current_expression:
+            return None
+        engine = FilterEngine()
+        engine.line_parser = self.line_parser
+        if self.fields is not None and self.fields.parser_name in PARSER_PRESETS:
+            # 沿用本文件提取字段时自动选择的解析器，逐行求值（如导出匹配位置）与过滤结果一致
+            engine._detected_parser = LineParser.preset(self.fields.parser_name)
+        if self.group_matcher is not None:
+            engine.set_keyword_group(self.current_expression, self.group_matcher.rules)
+        else:
+            engine.set_filter_expression(self.current_expression, {
+                "case_sensitive": self.case_sensitive,
+                "whole_word": self.whole_word,
+                "use_regex": self.use_regex,
+                "use_query": self.use_query,
+            })
+        return engine
+
+    def _find_matches(self, text: str) -> List[Tuple[int, int]]:
+        """在文本中查找所有匹配的位置
+        
+        Args:
+            text: 要搜索的文本
+            
+        Returns:
+            List[Tuple[int, int]]: 匹配位置的列表，每个元素是(开始位置, 结束位置)
+        """
+        matches = []
+        for keyword in self.keywords:
+            if not keyword:
+                continue
+                
+            # 根据大小写敏感设置进行匹配
+            if self.case_sensitive:
+                pattern = re.compile(re.escape(keyword))
+            else:
+                pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+            
+            # 查找所有匹配
+            for match in pattern.finditer(text):
+                matches.append((match.start(), match.end()))
+        
+        # 按位置排序
+        return sorted(matches) 
\ No newline at end of file
@@ -2,10 +2,21 @@ from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 import re
-from typing import Set
+from typing import List, Optional, Set
 
 # 从theme.py导入主题颜色
 from src.resources.theme import THEME
+from src.utils.multi_pattern import MultiPatternMatcher
+from src.utils.profiler import profiled
+
+# 按分组过滤时每个关键字使用的颜色（按关键字顺序循环使用）
+KEYWORD_COLORS = [THEME['keyword_text'], THEME['warning'], THEME['info'], THEME['error'],
+                  THEME['success'], THEME['brightest_blue'], THEME['delete_hover']]
+
+
+def keyword_color(index: int) -> str:
+    """分组中第 index 个关键字的颜色"""
+    return KEYWORD_COLORS[index % len(KEYWORD_COLORS)]
 
 class LogHighlighter(QSyntaxHighlighter):
     def __init__(self, parent=None):
@@ -24,9 +35,18 @@ class LogHighlighter(QSyntaxHighlighter):
         self.keyword_format.setProperty(QTextCharFormat.Property.FullWidthSelection, False)
         # 强制使用前景色
         self.keyword_format.setFontWeight(QFont.Weight.Bold)  # 加粗
+        
+        # 按分组高亮时使用的合并匹配器和每种颜色的格式
+        self.group_matcher: Optional[MultiPatternMatcher] = None
+        self.group_formats: List[QTextCharFormat] = []
+        for color in KEYWORD_COLORS:
+            group_format = QTextCharFormat(self.keyword_format)
+            group_format.setForeground(QColor(color))
+            self.group_formats.append(group_format)
 
     def set_keywords(self, keywords: set, options: dict = None):
         """设置要高亮的关键字和选项"""
+        self.group_matcher = None
         self.keywords = keywords
         if options:
             self.case_sensitive = options.get("case_sensitive", False)
@@ -34,11 +54,24 @@ class LogHighlighter(QSyntaxHighlighter):
             self.use_regex = options.get("use_regex", False)
         self.rehighlight()
 
+    def set_keyword_group(self, matcher: MultiPatternMatcher):
+        """按分组高亮：每个关键字使用自己的选项和颜色（见 keyword_color）"""
+        self.group_matcher = matcher
+        self.keywords = {keyword for keyword, _ in matcher.rules if keyword}
+        self.rehighlight()
+
+    @profiled("highlight.block")
     def highlightBlock(self, text: str):
         """高亮文本块中的关键字"""
         if not text or not self.keywords:
             return
             
+        if self.group_matcher is not None:
+            formats = self.group_formats
+            for start, end, index in self.group_matcher.match_line(text):
+                self.setFormat(start, end - start, formats[index % len(formats)])
+            return
+            
         for keyword in self.keywords:
             if not keyword:
                 continue
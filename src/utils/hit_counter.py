@@ -0,0 +1,265 @@
+import codecs
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.batch_filter import PROCESS_CONTEXT, iter_line_batches
+from src.utils.bytes_search import is_ascii_compatible
+from src.utils.compressed_file import compression_type
+from src.utils.file_utils import detect_encoding
+from src.utils.multi_pattern import MultiPatternMatcher, PatternRule, normalize_options
+
+# 每个计数任务处理的数据量
+SHARD_BYTES = 4 * 1024 * 1024
+# 需要计数的数据超过这个大小时才分片到多个进程（进程启动和传递规则的开销在小文件上不划算）
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+# 用于确认文件只是在末尾追加的数据长度：比较已计数部分最后这么多字节的摘要
+TAIL_CHECK_BYTES = 4096
+# 最多缓存多少个文件的计数结果
+MAX_CACHED_FILES = 32
+
+# 规则的缓存键：(关键字, 区分大小写, 全词匹配, 正则)
+RuleKey = Tuple[str, bool, bool, bool]
+
+
+def rule_key(keyword: str, options: Optional[dict]) -> RuleKey:
+    options = normalize_options(options)
+    return keyword, options["case_sensitive"], options["whole_word"], options["use_regex"]
+
+
+def _key_rule(key: RuleKey) -> PatternRule:
+    keyword, case_sensitive, whole_word, use_regex = key
+    return keyword, {"case_sensitive": case_sensitive, "whole_word": whole_word, "use_regex": use_regex}
+
+
+def _split_lines(text: str) -> List[str]:
+    """按通用换行拆分，与界面中加载文件时的换行处理一致"""
+    return text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+
+@dataclass
+class _FileCounts:
+    """一个文件已经计数的结果"""
+    identity: Tuple[int, int]         # (st_dev, st_ino)，文件被替换（如日志轮转）时变化
+    size: int
+    mtime_ns: int
+    encoding: str
+    appendable: bool                  # 是否支持只计数追加的部分（普通文件且编码兼容 ASCII）
+    scanned: int = 0                  # 已计数的完整行在文件中的结束偏移
+    tail_digest: bytes = b""          # scanned 之前 TAIL_CHECK_BYTES 字节的摘要
+    counts: Dict[RuleKey, int] = field(default_factory=dict)   # 完整行中的匹配次数
+    partial: Dict[RuleKey, int] = field(default_factory=dict)  # 末尾没有换行的最后一行中的匹配次数
+
+
+# 工作进程中的匹配器，由 _init_worker 创建
+_worker_matcher: Optional[MultiPatternMatcher] = None
+
+
+def _init_worker(rules: List[PatternRule]):
+    global _worker_matcher
+    # 后台统计，不与界面和前台搜索争抢 CPU
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+    _worker_matcher = MultiPatternMatcher(rules)
+
+
+def _count_range_in_worker(filepath: str, encoding: str, start: int, end: int) -> List[int]:
+    return _count_range(_worker_matcher, filepath, encoding, start, end)
+
+
+def _count_range(matcher: MultiPatternMatcher, filepath: str, encoding: str, start: int, end: int) -> List[int]:
+    """统计文件 [start, end) 中的匹配次数（区间按行对齐）"""
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if start == 0 and data.startswith(codecs.BOM_UTF8):
+        data = data[len(codecs.BOM_UTF8):]
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    return matcher.count_lines(_split_lines(data.decode(encoding, errors="replace")))
+
+
+def _iter_shards(filepath: str, start: int, end: int, shard_bytes: int = SHARD_BYTES) -> Iterator[Tuple[int, int]]:
+    """把 [start, end) 切分为以换行结束的区间（end 必须在换行之后）"""
+    with open(filepath, "rb") as f:
+        while start < end:
+            cut = min(start + shard_bytes, end)
+            if cut < end:
+                f.seek(cut - 1)
+                while True:
+                    chunk = f.read(64 * 1024)
+                    newline = chunk.find(b"\n")
+                    if newline != -1 or not chunk:
+                        cut = end if newline == -1 else min(f.tell() - len(chunk) + newline + 1, end)
+                        break
+            yield start, cut
+            start = cut
+
+
+def _tail_digest(filepath: str, end: int) -> bytes:
+    start = max(0, end - TAIL_CHECK_BYTES)
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).digest()
+
+
+def _last_line_end(filepath: str, start: int, size: int) -> int:
+    """[start, size) 中最后一个换行之后的偏移，没有换行时返回 start"""
+    with open(filepath, "rb") as f:
+        pos = size
+        while pos > start:
+            read_start = max(start, pos - 64 * 1024)
+            f.seek(read_start)
+            newline = f.read(pos - read_start).rfind(b"\n")
+            if newline != -1:
+                return read_start + newline + 1
+            pos = read_start
+    return start
+
+
+class HitCountCache:
+    """统计已保存关键字在文件中的匹配次数，按 (文件, 关键字, 选项) 缓存
+
+    文件大小和修改时间不变时直接返回缓存；文件只是在末尾追加了数据时（如正在写入的日志），
+    只统计追加的部分并累加；新增的关键字只对新关键字扫描一遍文件。
+    数据量较大时按行对齐分片，分发到多个进程并行统计。不依赖 Qt，可以在后台线程中调用。
+    """
+
+    def __init__(self, jobs: Optional[int] = None):
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self._files: "OrderedDict[str, _FileCounts]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self, filepath: Optional[str] = None):
+        with self._lock:
+            if filepath is None:
+                self._files.clear()
+            else:
+                self._files.pop(os.path.abspath(filepath), None)
+
+    def count(self, filepath: str, rules: Iterable[PatternRule],
+              is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[Dict[RuleKey, int]]:
+        """返回每条规则的匹配次数 {rule_key: 次数}，取消时返回 None
+
+        Raises:
+            OSError: 文件无法读取时抛出
+        """
+        path = os.path.abspath(filepath)
+        keys = list(dict.fromkeys(rule_key(keyword, options) for keyword, options in rules if keyword))
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._files.get(path)
+        entry = self._update(path, stat, entry, keys, is_cancelled)
+        if entry is None:
+            return None
+        with self._lock:
+            self._files[path] = entry
+            self._files.move_to_end(path)
+            while len(self._files) > MAX_CACHED_FILES:
+                self._files.popitem(last=False)
+        return {key: entry.counts[key] + entry.partial.get(key, 0) for key in keys}
+
+    def _update(self, path: str, stat: os.stat_result, entry: Optional[_FileCounts], keys: List[RuleKey],
+                is_cancelled: Optional[Callable[[], bool]]) -> Optional[_FileCounts]:
+        identity = (stat.st_dev, stat.st_ino)
+        unchanged = entry is not None and entry.identity == identity and \
+            entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns
+        if unchanged:
+            missing = [key for key in keys if key not in entry.counts]
+            if not missing:
+                return entry
+            entry = replace(entry, counts=dict(entry.counts), partial=dict(entry.partial))
+            return entry if self._scan(path, entry, missing, 0, is_cancelled) else None
+
+        if (entry is not None and entry.appendable and entry.identity == identity
+                and stat.st_size >= entry.size and _tail_digest(path, entry.scanned) == entry.tail_digest):
+            # 只在末尾追加了数据：已计数的关键字只统计新增的部分
+            old_keys = [key for key in keys if key in entry.counts]
+            missing = [key for key in keys if key not in entry.counts]
+            # 这次没有用到的关键字不再累加，结果会过时，直接丢弃
+            entry = _FileCounts(identity, stat.st_size, stat.st_mtime_ns, entry.encoding, True,
+                                entry.scanned, entry.tail_digest, {key: entry.counts[key] for key in old_keys})
+            if old_keys and not self._scan(path, entry, old_keys, entry.scanned, is_cancelled, accumulate=True):
+                return None
+            if missing and not self._scan(path, entry, missing, 0, is_cancelled):
+                return None
+            return entry
+
+        # 新文件或文件被修改：全部重新统计
+        encoding = detect_encoding(path)
+        appendable = compression_type(path) is None and is_ascii_compatible(encoding)
+        entry = _FileCounts(identity, stat.st_size, stat.st_mtime_ns, encoding, appendable)
+        return entry if self._scan(path, entry, keys, 0, is_cancelled) else None
+
+    def _scan(self, path: str, entry: _FileCounts, keys: List[RuleKey], start: int,
+              is_cancelled: Optional[Callable[[], bool]], accumulate: bool = False) -> bool:
+        """统计 keys 在文件 start 之后的匹配次数，写入 entry；取消时返回 False"""
+        rules = [_key_rule(key) for key in keys]
+        matcher = MultiPatternMatcher(rules)
+
+        if not entry.appendable:
+            counts = [0] * len(keys)
+            for _, lines in iter_line_batches(path):
+                if is_cancelled and is_cancelled():
+                    return False
+                for index, count in enumerate(matcher.count_lines(lines)):
+                    counts[index] += count
+            entry.counts.update(zip(keys, counts))
+            entry.scanned = entry.size
+            return True
+
+        line_end = _last_line_end(path, start, entry.size)
+        counts = self._count_ranges(matcher, rules, path, entry.encoding, start, line_end, is_cancelled)
+        if counts is None:
+            return False
+        for key, count in zip(keys, counts):
+            entry.counts[key] = entry.counts.get(key, 0) + count if accumulate else count
+        # 末尾没有换行的最后一行可能还没写完，单独统计，不计入已计数部分
+        partial = _count_range(matcher, path, entry.encoding, line_end, entry.size) \
+            if line_end < entry.size else [0] * len(keys)
+        entry.partial.update(zip(keys, partial))
+        if line_end != entry.scanned or not entry.tail_digest:
+            entry.scanned = line_end
+            entry.tail_digest = _tail_digest(path, line_end)
+        return True
+
+    def _count_ranges(self, matcher: MultiPatternMatcher, rules: List[PatternRule], path: str, encoding: str,
+                      start: int, end: int, is_cancelled: Optional[Callable[[], bool]]) -> Optional[List[int]]:
+        counts = [0] * len(rules)
+        shards = list(_iter_shards(path, start, end))
+        if self.jobs <= 1 or end - start < PARALLEL_MIN_BYTES:
+            for shard_start, shard_end in shards:
+                if is_cancelled and is_cancelled():
+                    return None
+                for index, count in enumerate(_count_range(matcher, path, encoding, shard_start, shard_end)):
+                    counts[index] += count
+            return counts
+
+        # 在界面的后台线程中创建，用 spawn 而不是 fork 启动工作进程（见 PROCESS_CONTEXT）
+        executor = ProcessPoolExecutor(max_workers=min(self.jobs, len(shards)), mp_context=PROCESS_CONTEXT,
+                                       initializer=_init_worker, initargs=(rules,))
+        try:
+            futures = [executor.submit(_count_range_in_worker, path, encoding, shard_start, shard_end)
+                       for shard_start, shard_end in shards]
+            for future in futures:
+                while True:
+                    if is_cancelled and is_cancelled():
+                        return None
+                    try:
+                        shard_counts = future.result(timeout=0.2)
+                        break
+                    except FutureTimeoutError:
+                        continue
+                for index, count in enumerate(shard_counts):
+                    counts[index] += count
+            return counts
+        finally:
+            # 取消时不等待正在运行的任务
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,265 @@
+import json
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_GROUP = "default"
+GROUP_SEPARATOR = "/"
+
+
+class Keyword:
+    """一个保存的关键字"""
+    __slots__ = ("text", "alias", "options", "group")
+
+    def __init__(self, text: str, alias: str = "", options: Optional[dict] = None,
+                 group: Optional["KeywordGroup"] = None):
+        self.text = text
+        self.alias = alias or ""
+        self.options = options or {}
+        self.group = group
+
+    @property
+    def display_text(self) -> str:
+        return self.alias or self.text
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "alias": self.alias, "options": self.options}
+
+
+class KeywordGroup:
+    """关键字分组：子分组按名称索引，关键字按文本索引（用于判断重复）
+
+    子项的顺序为先子分组、后关键字，与界面上的显示顺序一致。
+    """
+
+    def __init__(self, name: str, parent: Optional["KeywordGroup"] = None):
+        self.name = name
+        self.parent = parent
+        self.subgroups: List[KeywordGroup] = []
+        self.keywords: List[Keyword] = []
+        self._subgroup_by_name: Dict[str, KeywordGroup] = {}
+        self._keyword_by_text: Dict[str, Keyword] = {}
+
+    @property
+    def path(self) -> str:
+        """分组路径，如 "网络/超时"；根节点为空字符串"""
+        if self.parent is None or self.parent.parent is None:
+            return self.name
+        return self.parent.path + GROUP_SEPARATOR + self.name
+
+    def subgroup(self, name: str) -> Optional["KeywordGroup"]:
+        return self._subgroup_by_name.get(name)
+
+    def keyword(self, text: str) -> Optional[Keyword]:
+        return self._keyword_by_text.get(text)
+
+    def child_count(self) -> int:
+        return len(self.subgroups) + len(self.keywords)
+
+    def child(self, row: int):
+        """第 row 个子项（子分组或关键字）"""
+        if row < len(self.subgroups):
+            return self.subgroups[row]
+        return self.keywords[row - len(self.subgroups)]
+
+    def row_of(self, child) -> int:
+        """子项在本分组中的行号"""
+        if isinstance(child, KeywordGroup):
+            return self.subgroups.index(child)
+        return len(self.subgroups) + self.keywords.index(child)
+
+    def iter_keywords(self, recursive: bool = True) -> Iterator[Keyword]:
+        """本分组（以及所有子分组）中的关键字"""
+        yield from self.keywords
+        if recursive:
+            for subgroup in self.subgroups:
+                yield from subgroup.iter_keywords(True)
+
+    def iter_groups(self) -> Iterator["KeywordGroup"]:
+        """本分组及所有子分组（先序）"""
+        yield self
+        for subgroup in self.subgroups:
+            yield from subgroup.iter_groups()
+
+
+class KeywordRepository:
+    """保存的关键字库，与界面无关
+
+    分组按路径组织成树，每个分组内按关键字文本建立字典，查找分组和判断重复都不需要
+    遍历兄弟节点。修改时通知监听者，事件与 Qt 的模型接口一一对应：
+        listener(event, group, first, last)
+        event: "before_insert" / "after_insert" / "before_remove" / "after_remove"
+               （group 中 [first, last] 行）、"changed"（group 中第 first 行的内容）、
+               "before_reset" / "after_reset"（整体替换，group 为 None）
+    to_dict() 的结果会缓存到下一次修改，保存状态时不需要重复序列化。
+    """
+
+    def __init__(self):
+        self.root = KeywordGroup("")
+        self._listeners: List[Callable] = []
+        self._snapshot: Optional[Dict[str, List[dict]]] = None
+        self.version = 0  # 每次修改加一
+
+    def add_listener(self, listener: Callable):
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, group: Optional[KeywordGroup] = None, first: int = 0, last: int = 0):
+        for listener in self._listeners:
+            listener(event, group, first, last)
+
+    def _changed(self):
+        self._snapshot = None
+        self.version += 1
+
+    # 查询
+
+    def group(self, path: str) -> Optional[KeywordGroup]:
+        """按路径查找分组"""
+        group = self.root
+        for name in path.split(GROUP_SEPARATOR):
+            group = group.subgroup(name)
+            if group is None:
+                return None
+        return group
+
+    def keyword_count(self) -> int:
+        return sum(1 for _ in self.root.iter_keywords())
+
+    def to_dict(self) -> Dict[str, List[dict]]:
+        """分组路径 -> 关键字列表（保存格式），不要修改返回的结果"""
+        if self._snapshot is None:
+            self._snapshot = {
+                group.path: [keyword.to_dict() for keyword in group.keywords]
+                for group in self.root.iter_groups() if group is not self.root
+            }
+        return self._snapshot
+
+    # 修改
+
+    def add_group(self, parent: KeywordGroup, name: str) -> Optional[KeywordGroup]:
+        """在 parent 下添加子分组（排在已有子分组之后），同名分组已存在时返回 None"""
+        if parent.subgroup(name) is not None:
+            return None
+        row = len(parent.subgroups)
+        self._notify("before_insert", parent, row, row)
+        group = KeywordGroup(name, parent)
+        parent.subgroups.append(group)
+        parent._subgroup_by_name[name] = group
+        self._changed()
+        self._notify("after_insert", parent, row, row)
+        return group
+
+    def ensure_group(self, path: str) -> KeywordGroup:
+        """按路径查找分组，不存在的层级依次创建"""
+        group = self.root
+        for name in path.split(GROUP_SEPARATOR):
+            group = group.subgroup(name) or self.add_group(group, name)
+        return group
+
+    def add_keyword(self, group: KeywordGroup, text: str, alias: str = "",
+                    options: Optional[dict] = None) -> Optional[Keyword]:
+        """添加关键字到分组末尾，分组中已有相同文本的关键字时返回 None"""
+        if group.keyword(text) is not None:
+            return None
+        row = group.child_count()
+        self._notify("before_insert", group, row, row)
+        keyword = Keyword(text, alias, options, group)
+        group.keywords.append(keyword)
+        group._keyword_by_text[text] = keyword
+        self._changed()
+        self._notify("after_insert", group, row, row)
+        return keyword
+
+    def update_keyword(self, keyword: Keyword, text: str, alias: str, options: dict) -> bool:
+        """修改关键字，与同一分组中的其他关键字重复时返回 False"""
+        group = keyword.group
+        existing = group.keyword(text)
+        if existing is not None and existing is not keyword:
+            return False
+        del group._keyword_by_text[keyword.text]
+        keyword.text, keyword.alias, keyword.options = text, alias or "", options or {}
+        group._keyword_by_text[text] = keyword
+        self._changed()
+        row = group.row_of(keyword)
+        self._notify("changed", group, row, row)
+        return True
+
+    def rename_group(self, group: KeywordGroup, name: str) -> bool:
+        """重命名分组，与同级分组重名时返回 False"""
+        parent = group.parent
+        if parent.subgroup(name) is not None:
+            return False
+        del parent._subgroup_by_name[group.name]
+        group.name = name
+        parent._subgroup_by_name[name] = group
+        self._changed()
+        row = parent.row_of(group)
+        self._notify("changed", parent, row, row)
+        return True
+
+    def remove_group(self, group: KeywordGroup):
+        """删除分组及其所有内容"""
+        parent = group.parent
+        row = parent.row_of(group)
+        self._notify("before_remove", parent, row, row)
+        parent.subgroups.pop(row)
+        del parent._subgroup_by_name[group.name]
+        self._changed()
+        self._notify("after_remove", parent, row, row)
+
+    def remove_keyword(self, keyword: Keyword):
+        group = keyword.group
+        row = group.row_of(keyword)
+        self._notify("before_remove", group, row, row)
+        group.keywords.pop(row - len(group.subgroups))
+        del group._keyword_by_text[keyword.text]
+        self._changed()
+        self._notify("after_remove", group, row, row)
+
+    def load(self, keyword_groups: Dict[str, List[dict]]):
+        """用保存的分组替换全部内容"""
+        self._bulk_merge(keyword_groups, replace=True)
+
+    def merge(self, keyword_groups: Dict[str, List[dict]]) -> Tuple[int, int]:
+        """导入分组，合并到已有内容中，已存在的关键字跳过
+
+        Returns:
+            Tuple[int, int]: (新增的关键字数, 因重复而跳过的关键字数)
+        """
+        return self._bulk_merge(keyword_groups, replace=False)
+
+    def _bulk_merge(self, keyword_groups: Dict[str, List[dict]], replace: bool) -> Tuple[int, int]:
+        """批量添加：只通知一次整体替换，不逐条通知（default 分组排在最前）"""
+        self._notify("before_reset")
+        listeners, self._listeners = self._listeners, []
+        added = skipped = 0
+        try:
+            if replace:
+                self.root = KeywordGroup("")
+                self._changed()
+            paths = sorted(keyword_groups, key=lambda path: path != DEFAULT_GROUP)
+            for path in paths:
+                group = self.ensure_group(path)
+                for keyword in keyword_groups[path]:
+                    if isinstance(keyword, str):  # 旧格式：直接是字符串
+                        keyword = {"text": keyword}
+                    if self.add_keyword(group, keyword["text"], keyword.get("alias", ""),
+                                        keyword.get("options", {})) is None:
+                        skipped += 1
+                    else:
+                        added += 1
+        finally:
+            self._listeners = listeners
+            self._notify("after_reset")
+        return added, skipped
+
+
+def read_keyword_file(path: str) -> Dict[str, List[dict]]:
+    """读取关键字文件，支持 keywords.json 和 caches/config.json 两种格式"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    groups = data.get("keyword_groups", data)
+    if not isinstance(groups, dict):
+        raise ValueError("文件中没有关键字分组")
+    # 兼容旧格式：关键字直接是字符串
+    return {group: [keyword if isinstance(keyword, dict) else {"text": keyword, "options": {}}
+                    for keyword in keywords]
+            for group, keywords in groups.items()}
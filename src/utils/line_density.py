@@ -0,0 +1,38 @@
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+
+class LineDensity:
+    """一组行号在文件上的分布，用于在滚动条上绘制概览标尺
+
+    行号集合变化时只保存一份数组；每种 (总行数, 区间数) 的分桶计数计算一次后缓存，
+    重绘时直接复用，不需要逐行扫描。
+    """
+
+    def __init__(self):
+        self._lines = np.empty(0, dtype=np.int64)
+        self._cache: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def set_lines(self, lines: Sequence[int]):
+        """设置行号（0 起始）"""
+        self._lines = np.asarray(lines, dtype=np.int64)
+        self._cache.clear()
+
+    def buckets(self, total_lines: int, count: int) -> np.ndarray:
+        """把 [0, total_lines) 等分为 count 个区间，返回每个区间中的行数"""
+        count = max(count, 1)
+        key = (total_lines, count)
+        result = self._cache.get(key)
+        if result is None:
+            if not len(self._lines) or total_lines <= 0:
+                result = np.zeros(count, dtype=np.int64)
+            else:
+                index = np.clip(self._lines * count // total_lines, 0, count - 1)
+                result = np.bincount(index, minlength=count)
+            # 只保留最近一种尺寸，窗口大小改变时重新计算
+            self._cache = {key: result}
+        return result
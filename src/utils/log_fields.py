@@ -0,0 +1,369 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from src.utils.log_index import (LEVEL_NAMES, LEVEL_UNKNOWN, TIMESTAMP_LAYOUTS, LogIndex, LogLayout,
+                                 parse_timestamps)
+
+# 解析器可以提取的字段（正则中的命名分组），其它命名分组会被忽略
+PARSER_GROUPS = ("timestamp", "pid", "tid", "level", "tag", "message")
+
+# 常见格式的行解析器
+PARSER_PRESETS = {
+    # 01-02 03:04:05.678  1234  5678 I Tag: message
+    "logcat": r"^(?P<timestamp>\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}) +(?P<pid>\d+) +(?P<tid>\d+) +"
+              r"(?P<level>[VDIWEFA]) (?P<tag>.*?) *: (?P<message>.*)$",
+    # I/Tag( 1234): message
+    "logcat_brief": r"^(?P<level>[VDIWEFA])/(?P<tag>[^(\n]*?) *\( *(?P<pid>\d+)\): (?P<message>.*)$",
+    # Jan  2 03:04:05 host tag[1234]: message
+    "syslog": r"^(?P<timestamp>[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}) \S+ (?P<tag>[^\s\[:]+)"
+              r"(?:\[(?P<pid>\d+)\])?: (?P<message>.*)$",
+}
+# 自动选择预设时，需要匹配的采样行比例
+_DETECT_RATIO = 0.6
+# 自动选择预设时采样的行数（文件开头）
+SAMPLE_LINES = 200
+
+# 每次处理的文本长度（按行对齐）
+CHUNK_CHARS = 4 * 1024 * 1024
+
+# 字段名 -> 可比较的列
+FIELD_NAMES = ("time", "pid", "tid", "level", "tag")
+COMPARE_OPS = ("==", "!=", ">=", "<=", ">", "<")
+
+# 级别名称（含单字母和别名） -> 级别下标
+_LEVEL_VALUES = {name: index for index, name in enumerate(LEVEL_NAMES)}
+_LEVEL_VALUES.update({"V": 0, "TRACE": 0, "D": 1, "I": 2, "W": 3, "WARNING": 3, "E": 4, "F": 5, "A": 5,
+                      "CRITICAL": 5})
+
+
+def level_value(text: str) -> int:
+    """级别名称（如 WARN、W）转换为级别下标
+
+    Raises:
+        ValueError: 无法识别的级别
+    """
+    value = _LEVEL_VALUES.get(text.strip().upper())
+    if value is None:
+        raise ValueError(f"无法识别的级别：{text}")
+    return value
+
+
+def parse_time_value(text: str, default_year: int) -> float:
+    """把时间文本解析为与日志时间戳相同的秒数，支持日志中出现的几种时间戳格式（毫秒可选）
+
+    Raises:
+        ValueError: 无法识别的时间
+    """
+    text = text.strip()
+    raw = text.encode("ascii", errors="replace")
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    starts = np.zeros(1, dtype=np.int64)
+    ends = np.full(1, len(raw), dtype=np.int64)
+    for name, spec in TIMESTAMP_LAYOUTS.items():
+        match = spec["pattern"].fullmatch(raw[:spec["width"]])
+        if match is None:
+            continue
+        seconds = parse_timestamps(buf, starts, ends, LogLayout(name, 0, None, default_year))[0]
+        if not np.isnan(seconds):
+            return float(seconds)
+    raise ValueError(f"无法识别的时间：{text}")
+
+
+class LineParser:
+    """用带命名分组的正则把一行拆分为字段
+
+    命名分组见 PARSER_GROUPS，都是可选的；没有 timestamp/level 分组时使用 LogIndex 自动识别的结果。
+    """
+
+    def __init__(self, pattern: str, name: str = ""):
+        """
+        Raises:
+            ValueError: 正则无效或没有任何可用的命名分组
+        """
+        try:
+            self.regex = re.compile(pattern, re.MULTILINE)
+        except re.error as e:
+            raise ValueError(f"解析正则无效：{e}")
+        self.groups = [group for group in PARSER_GROUPS if group in self.regex.groupindex]
+        if not self.groups:
+            raise ValueError("解析正则中没有可用的命名分组：" + ", ".join(PARSER_GROUPS))
+        self.pattern = pattern
+        self.name = name or "custom"
+
+    @classmethod
+    def preset(cls, name: str) -> "LineParser":
+        return cls(PARSER_PRESETS[name], name)
+
+    @classmethod
+    def detect(cls, sample: str) -> Optional["LineParser"]:
+        """根据开头若干行选择匹配最多的预设，都不满足时返回 None"""
+        lines = [line for line in sample.split("\n", SAMPLE_LINES)[:SAMPLE_LINES] if line.strip()]
+        best, best_count = None, 0
+        for name in PARSER_PRESETS:
+            parser = cls.preset(name)
+            count = sum(1 for line in lines if parser.regex.match(line))
+            if count > best_count and count >= len(lines) * _DETECT_RATIO:
+                best, best_count = parser, count
+        return best
+
+
+@dataclass
+class LogFields:
+    """按列存储的每行字段，行号即数组下标
+
+    标签按出现顺序编号（tag_names[code]），数值列中无法解析的值为 -1（时间为 NaN）。
+    """
+    parser_name: str = ""
+    timestamps: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    pids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    tids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    levels: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int8))
+    tags: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    message_starts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))  # 消息在行内的字符偏移
+    tag_names: List[str] = field(default_factory=list)
+    default_year: int = 0
+
+    @property
+    def line_count(self) -> int:
+        return len(self.levels)
+
+    def column(self, name: str) -> np.ndarray:
+        return {"time": self.timestamps, "pid": self.pids, "tid": self.tids,
+                "level": self.levels, "tag": self.tags}[name]
+
+    def tag_ranks(self) -> np.ndarray:
+        """每个标签编号按名称排序后的名次，用于按标签排序（没有标签的行排在最前）"""
+        order = sorted(range(len(self.tag_names)), key=self.tag_names.__getitem__)
+        ranks = np.empty(len(order) + 1, dtype=np.int32)
+        ranks[0] = -1
+        ranks[np.asarray(order, dtype=np.int64) + 1] = np.arange(len(order), dtype=np.int32)
+        return ranks[self.tags + 1]
+
+    def mask(self, name: str, op: str, value: str, line_count: Optional[int] = None) -> np.ndarray:
+        """对一列做向量化比较，返回每行是否满足的布尔数组
+
+        Args:
+            name: FIELD_NAMES 中的字段
+            op: COMPARE_OPS 中的比较符；tag 只支持 ==、!= 和 :（包含）
+            value: 比较的值：级别名称、数字、时间文本或标签名
+            line_count: 结果的长度（文本末尾没有索引的空行补 False）
+
+        Raises:
+            ValueError: 字段、比较符或值无效
+        """
+        if name == "tag":
+            if op == ":":
+                # 包含（忽略大小写）：先在标签名中查找，再按编号筛选行
+                needle = value.lower()
+                codes = [code for code, tag in enumerate(self.tag_names) if needle in tag.lower()]
+                return pad_mask(np.isin(self.tags, np.asarray(codes, dtype=np.int32)), line_count)
+            if op not in ("==", "!="):
+                raise ValueError("标签只支持 ==、!= 和 : 比较")
+            try:
+                code = self.tag_names.index(value)
+            except ValueError:
+                code = -2  # 不存在的标签
+            result = self.tags == code
+            if op == "!=":
+                result = ~result & (self.tags >= 0)
+        else:
+            if name == "level":
+                target = level_value(value)
+            elif name == "time":
+                target = parse_time_value(value, self.default_year)
+            elif name in ("pid", "tid"):
+                try:
+                    target = int(value)
+                except ValueError:
+                    raise ValueError(f"{name} 需要是整数：{value}")
+            else:
+                raise ValueError(f"未知的字段：{name}")
+            column = self.column(name)
+            result = _COMPARE[op](column, target)
+            # 没有解析出值的行不满足任何比较（包括 !=）
+            if name == "level":
+                result &= column != LEVEL_UNKNOWN
+            elif name == "time":
+                result &= ~np.isnan(column)
+            else:
+                result &= column >= 0
+        return pad_mask(result, line_count)
+
+
+# 单行比较时间时使用的年份（只要两边相同即可，闰年可以解析 02-29）
+_LINE_YEAR = 2000
+
+
+@lru_cache(maxsize=256)
+def _compare_target(name: str, value: str):
+    """比较值转换为与字段相同的类型（单行比较时使用，按值缓存）"""
+    if name == "level":
+        return level_value(value)
+    if name == "time":
+        return parse_time_value(value, _LINE_YEAR)
+    return int(value)
+
+
+def line_field_test(parser: LineParser, line: str, name: str, op: str, value: str) -> bool:
+    """用解析器拆分一行并比较一个字段，用于逐行过滤（例如多文件搜索、命令行）；
+    与 LogFields.mask 的结果一致：无法解析出字段值的行不满足任何比较
+
+    Raises:
+        ValueError: 比较的值无效
+    """
+    match = parser.regex.match(line)
+    group = "timestamp" if name == "time" else name
+    if match is None or group not in parser.groups:
+        return False
+    text = match.group(group)
+    if text is None:
+        return False
+    if name == "tag":
+        if op == ":":
+            return value.lower() in text.lower()
+        return (text == value) if op == "==" else (text != value)
+    try:
+        if name == "level":
+            actual = level_value(text)
+        elif name == "time":
+            actual = parse_time_value(text, _LINE_YEAR)
+        else:
+            actual = int(text)
+    except ValueError:
+        return False
+    return bool(_COMPARE[op](actual, _compare_target(name, value)))
+
+
+_COMPARE: Dict[str, Callable[[np.ndarray, object], np.ndarray]] = {
+    "==": np.equal, "!=": np.not_equal, ">=": np.greater_equal,
+    "<=": np.less_equal, ">": np.greater, "<": np.less,
+}
+
+
+class QueryContext:
+    """计算查询结果时需要的数据：字段列，以及按关键字匹配行的函数
+
+    keyword_mask(node, candidates) 对关键字节点求值，只需要对 candidates 为 True 的行给出正确结果
+    （candidates 为 None 表示所有行），这样 and 右侧的关键字只在左侧已经满足的行上匹配。
+    """
+
+    def __init__(self, fields: Optional[LogFields], line_count: int,
+                 keyword_mask: Callable[[object, Optional[np.ndarray]], np.ndarray]):
+        self.fields = fields
+        self.line_count = line_count
+        self.keyword_mask = keyword_mask
+
+    def field_mask(self, name: str, op: str, value: str) -> np.ndarray:
+        if self.fields is None:
+            raise ValueError("没有可用的字段：无法识别日志格式")
+        return self.fields.mask(name, op, value, self.line_count)
+
+
+def pad_mask(mask: np.ndarray, line_count: Optional[int]) -> np.ndarray:
+    """把布尔数组补齐或截断到 line_count"""
+    if line_count is None or len(mask) == line_count:
+        return mask
+    if len(mask) > line_count:
+        return mask[:line_count]
+    return np.concatenate([mask, np.zeros(line_count - len(mask), dtype=bool)])
+
+
+def iter_text_chunks(text: str, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """把文本按行对齐切分成块，每块（除最后一块外）以换行结束"""
+    pos = 0
+    while pos < len(text):
+        end = text.find("\n", pos + chunk_chars)
+        end = len(text) if end == -1 else end + 1
+        yield text[pos:end]
+        pos = end
+
+
+def build_log_fields(chunks: Iterable[str], parser: Optional[LineParser] = None,
+                     is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[LogFields]:
+    """扫描一遍文本，提取每行的字段，取消时返回 None
+
+    Args:
+        chunks: 按行对齐的文本块，见 iter_text_chunks()
+        parser: 行解析器，为 None 时根据第一块自动选择预设（都不匹配时只有时间和级别）
+
+    时间戳和级别由 LogIndex 向量化解析；pid、tid、标签和消息位置由解析正则在整块文本上
+    一次 finditer 得到，匹配之间的行号用 str.count 计算，不逐行调用 Python 代码。
+    """
+    index = LogIndex()
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in ("pids", "tids", "levels", "tags", "message_starts")}
+    tag_codes: Dict[str, int] = {}
+    tag_names: List[str] = []
+    first = True
+    for chunk in chunks:
+        if is_cancelled and is_cancelled():
+            return None
+        if first and parser is None:
+            parser = LineParser.detect(chunk)
+        first = False
+        pieces = [index.feed(chunk.encode("utf-8"))]
+        if chunk and not chunk.endswith("\n"):
+            # 最后一块末尾没有换行的一行
+            pieces.append(index.finish())
+        pieces = [piece for piece in pieces if piece is not None]
+        line_count = sum(piece.line_count for piece in pieces)
+        levels = np.concatenate([piece.levels for piece in pieces]) if pieces else np.empty(0, dtype=np.int8)
+
+        pids = np.full(line_count, -1, dtype=np.int32)
+        tids = np.full(line_count, -1, dtype=np.int32)
+        tags = np.full(line_count, -1, dtype=np.int32)
+        message_starts = np.zeros(line_count, dtype=np.int32)
+        if parser is not None and line_count:
+            groups = parser.groups
+            rows, pid_values, tid_values, tag_values, level_values, message_values = [], [], [], [], [], []
+            row, pos = 0, 0
+            for match in parser.regex.finditer(chunk):
+                start = match.start()
+                row += chunk.count("\n", pos, start)
+                pos = start
+                rows.append(row)
+                if "pid" in groups:
+                    pid_values.append(int(match.group("pid") or -1))
+                if "tid" in groups:
+                    tid_values.append(int(match.group("tid") or -1))
+                if "tag" in groups:
+                    tag = match.group("tag") or ""
+                    code = tag_codes.get(tag)
+                    if code is None:
+                        code = tag_codes[tag] = len(tag_names)
+                        tag_names.append(tag)
+                    tag_values.append(code)
+                if "level" in groups:
+                    level_values.append(_LEVEL_VALUES.get((match.group("level") or "").upper(), LEVEL_UNKNOWN))
+                if "message" in groups:
+                    message_start = match.start("message")
+                    message_values.append(message_start - start if message_start >= 0 else 0)
+            if rows:
+                rows = np.asarray(rows, dtype=np.int64)
+                for column, values in ((pids, pid_values), (tids, tid_values), (tags, tag_values),
+                                       (levels, level_values), (message_starts, message_values)):
+                    if values:
+                        column[rows] = values
+        parts["pids"].append(pids)
+        parts["tids"].append(tids)
+        parts["levels"].append(levels)
+        parts["tags"].append(tags)
+        parts["message_starts"].append(message_starts)
+
+    def concat(name: str, dtype) -> np.ndarray:
+        return np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=dtype)
+
+    return LogFields(
+        parser_name=parser.name if parser is not None else "",
+        timestamps=index.timestamps,
+        pids=concat("pids", np.int32),
+        tids=concat("tids", np.int32),
+        levels=concat("levels", np.int8),
+        tags=concat("tags", np.int32),
+        message_starts=concat("message_starts", np.int32),
+        tag_names=tag_names,
+        default_year=index.layout.default_year if index.layout is not None else 0,
+    )
@@ -0,0 +1,344 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 日志级别（按严重程度升序排列），数组中保存的是级别在此列表中的下标
+LEVEL_NAMES = ["VERBOSE", "DEBUG", "INFO", "WARN", "ERROR", "FATAL"]
+LEVEL_UNKNOWN = -1
+
+# 单字母级别（logcat 风格）查找表：字节值 -> 级别下标
+_LEVEL_CHAR_LUT = np.full(256, LEVEL_UNKNOWN, dtype=np.int8)
+for _level, _char in enumerate(b"VDIWEF"):
+    _LEVEL_CHAR_LUT[_char] = _level
+_LEVEL_CHAR_LUT[ord("A")] = LEVEL_NAMES.index("FATAL")  # logcat 的 Assert 归入 FATAL
+
+# 完整单词形式的级别
+_LEVEL_WORDS = {
+    b"VERBOSE": 0, b"TRACE": 0,
+    b"DEBUG": 1,
+    b"INFO": 2,
+    b"WARN": 3, b"WARNING": 3,
+    b"ERROR": 4,
+    b"FATAL": 5, b"CRITICAL": 5,
+}
+
+# 通用级别匹配（在无法确定固定列时使用）：
+#   1. 单词形式：INFO / ERROR ...
+#   2. logcat brief 格式：行首的 "E/Tag"
+#   3. logcat threadtime 格式：tid 之后的 " E "
+_LEVEL_PATTERN = re.compile(
+    rb"(?<![A-Za-z0-9_])(VERBOSE|TRACE|DEBUG|INFO|WARNING|WARN|ERROR|FATAL|CRITICAL)(?![A-Za-z0-9_])"
+    rb"|^([VDIWEFA])(?=/)"
+    rb"|(?<=\d )([VDIWEFA])(?= )",
+    re.MULTILINE
+)
+
+# 用于探测格式的采样行数
+_SAMPLE_LINES = 200
+# 探测到的格式需要覆盖的采样行比例
+_DETECT_RATIO = 0.6
+
+_MONTH_NAMES = [b"Jan", b"Feb", b"Mar", b"Apr", b"May", b"Jun",
+                b"Jul", b"Aug", b"Sep", b"Oct", b"Nov", b"Dec"]
+_MONTH_KEYS = np.array([(m[0] << 16) | (m[1] << 8) | m[2] for m in _MONTH_NAMES], dtype=np.int64)
+_MONTH_ORDER = np.argsort(_MONTH_KEYS)
+
+# 支持的时间戳格式。fields 中为 (相对偏移, 宽度)，millis 为毫秒分隔符的相对偏移
+TIMESTAMP_LAYOUTS = {
+    # 2024-01-02 03:04:05.678 / 2024-01-02T03:04:05,678
+    "iso": {
+        "pattern": re.compile(rb"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}"),
+        "fields": {"year": (0, 4), "month": (5, 2), "day": (8, 2),
+                   "hour": (11, 2), "minute": (14, 2), "second": (17, 2)},
+        "width": 19,
+        "millis": 19,
+    },
+    # logcat: 01-02 03:04:05.678
+    "logcat": {
+        "pattern": re.compile(rb"\d{2}-\d{2} \d{2}:\d{2}:\d{2}"),
+        "fields": {"month": (0, 2), "day": (3, 2),
+                   "hour": (6, 2), "minute": (9, 2), "second": (12, 2)},
+        "width": 14,
+        "millis": 14,
+    },
+    # syslog: Jan  2 03:04:05
+    "syslog": {
+        "pattern": re.compile(rb"[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}"),
+        "fields": {"month_name": (0, 3), "day": (4, 2),
+                   "hour": (7, 2), "minute": (10, 2), "second": (13, 2)},
+        "width": 15,
+        "millis": None,
+    },
+}
+
+
+@dataclass
+class LogLayout:
+    """探测到的日志行布局"""
+    timestamp_format: Optional[str] = None  # TIMESTAMP_LAYOUTS 中的键
+    timestamp_column: int = 0               # 时间戳在行内的字节偏移
+    level_column: Optional[int] = None      # 单字母级别所在的固定列，None 表示使用通用匹配
+    default_year: int = 0                   # 时间戳不带年份时使用的年份
+
+
+@dataclass
+class ChunkIndex:
+    """一个数据块（只包含完整行）的索引结果"""
+    data: bytes              # 本块的原始字节
+    base_offset: int         # 本块在文件中的起始字节偏移
+    first_line: int          # 本块第一行的行号（0-based）
+    starts: np.ndarray       # 每行相对本块的起始偏移
+    ends: np.ndarray         # 每行相对本块的结束偏移（不含换行符）
+    levels: np.ndarray       # 每行的级别下标，未知为 LEVEL_UNKNOWN
+    timestamps: np.ndarray   # 每行的时间戳（秒），无法解析为 NaN
+
+    @property
+    def line_count(self) -> int:
+        return len(self.starts)
+
+
+def split_lines(buf: np.ndarray):
+    """计算缓冲区中每一行的起止偏移（结束偏移不含换行符和回车符）"""
+    newlines = np.flatnonzero(buf == 10)
+    if len(buf) and buf[-1] != 10:
+        ends = np.append(newlines, len(buf))
+    else:
+        ends = newlines
+    starts = np.empty(len(ends), dtype=np.int64)
+    if len(ends):
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+    ends = ends.astype(np.int64)
+    # 去掉 Windows 换行的 \r
+    if len(ends):
+        has_cr = (ends > starts) & (buf[np.maximum(ends - 1, 0)] == 13)
+        ends = ends - has_cr
+    return starts, ends
+
+
+def detect_layout(data: bytes) -> LogLayout:
+    """根据开头若干行探测时间戳格式和级别所在的列"""
+    layout = LogLayout(default_year=datetime.now().year)
+    lines = [line for line in data.split(b"\n", _SAMPLE_LINES)[:_SAMPLE_LINES] if line.strip()]
+    if not lines:
+        return layout
+
+    # 探测时间戳：要求格式和列位置在大部分采样行中一致
+    best_count = 0
+    for name, spec in TIMESTAMP_LAYOUTS.items():
+        columns: Dict[int, int] = {}
+        for line in lines:
+            match = spec["pattern"].search(line, 0, 32 + spec["width"])
+            if match:
+                columns[match.start()] = columns.get(match.start(), 0) + 1
+        if columns:
+            column, count = max(columns.items(), key=lambda item: item[1])
+            if count > best_count and count >= len(lines) * _DETECT_RATIO:
+                best_count = count
+                layout.timestamp_format = name
+                layout.timestamp_column = column
+
+    # 探测单字母级别列：前后均为空格（threadtime）或后面紧跟 '/'（brief）
+    columns = {}
+    for line in lines:
+        match = re.search(rb"(?:^|(?<=\d) )([VDIWEFA])(?=[ /])", line)
+        if match:
+            columns[match.start(1)] = columns.get(match.start(1), 0) + 1
+    if columns:
+        column, count = max(columns.items(), key=lambda item: item[1])
+        if count >= len(lines) * _DETECT_RATIO:
+            layout.level_column = column
+
+    return layout
+
+
+def _at(buf: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    """按位置取字节，越界的位置（只会出现在已判定无效的行上）截断到末尾"""
+    return buf[np.minimum(pos, len(buf) - 1)]
+
+
+def _gather_number(buf: np.ndarray, pos: np.ndarray, width: int, valid: np.ndarray) -> np.ndarray:
+    """从每个位置读取定宽十进制数字，非数字的行在 valid 中置为 False（空格视为 0）"""
+    value = np.zeros(len(pos), dtype=np.int64)
+    for k in range(width):
+        byte = _at(buf, pos + k).astype(np.int64)
+        digit = np.where(byte == 32, 0, byte - 48)
+        valid &= (digit >= 0) & (digit <= 9)
+        value = value * 10 + digit
+    return value
+
+
+def _days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """公历日期转换为 1970-01-01 起的天数（向量化）"""
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def parse_timestamps(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                     layout: LogLayout) -> np.ndarray:
+    """按探测到的布局向量化地解析每行的时间戳，无法解析的行为 NaN"""
+    result = np.full(len(starts), np.nan)
+    if layout.timestamp_format is None or not len(starts):
+        return result
+
+    spec = TIMESTAMP_LAYOUTS[layout.timestamp_format]
+    width = spec["width"]
+    valid = (ends - starts) >= layout.timestamp_column + width
+    # 对过短的行使用 0 作为占位位置，避免越界，结果会被 valid 过滤
+    base = np.where(valid, starts + layout.timestamp_column, 0)
+
+    values = {}
+    for field, (offset, size) in spec["fields"].items():
+        if field == "month_name":
+            key = ((_at(buf, base + offset).astype(np.int64) << 16)
+                   | (_at(buf, base + offset + 1).astype(np.int64) << 8)
+                   | _at(buf, base + offset + 2).astype(np.int64))
+            sorted_keys = _MONTH_KEYS[_MONTH_ORDER]
+            pos = np.clip(np.searchsorted(sorted_keys, key), 0, len(sorted_keys) - 1)
+            valid &= sorted_keys[pos] == key
+            values["month"] = _MONTH_ORDER[pos] + 1
+        else:
+            values[field] = _gather_number(buf, base + offset, size, valid)
+
+    year = values.get("year", np.full(len(starts), layout.default_year, dtype=np.int64))
+    month, day = values["month"], values["day"]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    valid &= (values["hour"] < 24) & (values["minute"] < 60) & (values["second"] < 61)
+
+    seconds = (_days_from_civil(year, month, day) * 86400
+               + values["hour"] * 3600 + values["minute"] * 60 + values["second"]).astype(np.float64)
+
+    # 可选的毫秒部分：".678" 或 ",678"
+    if spec["millis"] is not None:
+        millis_at = base + spec["millis"]
+        has_millis = valid & ((ends - starts) >= layout.timestamp_column + spec["millis"] + 4)
+        millis_at = np.where(has_millis, millis_at, 0)
+        separator = _at(buf, millis_at)
+        has_millis &= (separator == ord(".")) | (separator == ord(","))
+        millis = _gather_number(buf, millis_at + 1, 3, has_millis)
+        seconds += np.where(has_millis, millis / 1000.0, 0.0)
+
+    result[valid] = seconds[valid]
+    return result
+
+
+def parse_levels(data: bytes, buf: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                 layout: LogLayout) -> np.ndarray:
+    """解析每行的日志级别，无法识别的行为 LEVEL_UNKNOWN"""
+    if not len(starts):
+        return np.empty(0, dtype=np.int8)
+
+    if layout.level_column is not None:
+        # 固定列：直接按列取字节查表，并校验前后分隔符
+        column = layout.level_column
+        valid = (ends - starts) > column + 1
+        pos = np.where(valid, starts + column, 0)
+        after = _at(buf, pos + 1)
+        valid &= (after == 32) | (after == ord("/"))
+        if column > 0:
+            valid &= buf[np.maximum(pos - 1, 0)] == 32
+        levels = _LEVEL_CHAR_LUT[buf[pos]]
+        return np.where(valid, levels, LEVEL_UNKNOWN).astype(np.int8)
+
+    # 通用匹配：只遍历匹配项，再按行取第一个命中
+    positions: List[int] = []
+    values: List[int] = []
+    for match in _LEVEL_PATTERN.finditer(data):
+        word = match.group(match.lastindex)
+        positions.append(match.start())
+        values.append(_LEVEL_WORDS[word] if len(word) > 1 else int(_LEVEL_CHAR_LUT[word[0]]))
+
+    levels = np.full(len(starts), LEVEL_UNKNOWN, dtype=np.int8)
+    if positions:
+        line_numbers = np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side="right") - 1
+        first_lines, first_indexes = np.unique(line_numbers, return_index=True)
+        levels[first_lines] = np.asarray(values, dtype=np.int8)[first_indexes]
+    return levels
+
+
+class LogIndex:
+    """日志的行偏移、级别和时间戳索引
+
+    以流式方式构建：通过 feed() 依次传入文件字节块（块边界不要求对齐到行），
+    最后调用 finish() 处理末尾不完整的行。文件追加内容后可以继续 feed()。
+    keep_lines 为 False 时只返回每块的结果，不保留整个文件的每行数据（offsets 等为空），
+    适合只做汇总统计的调用方。
+    """
+
+    def __init__(self, layout: Optional[LogLayout] = None, keep_lines: bool = True):
+        self.layout = layout
+        self.keep_lines = keep_lines
+        self.line_count = 0
+        self.byte_count = 0          # 已索引的字节数
+        self._pending = b""          # 上一块末尾不完整的行
+        self._offsets: List[np.ndarray] = []
+        self._levels: List[np.ndarray] = []
+        self._timestamps: List[np.ndarray] = []
+
+    def feed(self, chunk: bytes) -> Optional[ChunkIndex]:
+        """传入一块数据，返回其中完整行的索引结果"""
+        data = self._pending + chunk
+        cut = data.rfind(b"\n") + 1
+        self._pending = data[cut:]
+        return self._index(data[:cut])
+
+    def finish(self) -> Optional[ChunkIndex]:
+        """处理末尾没有换行符的最后一行"""
+        data, self._pending = self._pending, b""
+        return self._index(data)
+
+    def _index(self, data: bytes) -> Optional[ChunkIndex]:
+        if not data:
+            return None
+        if self.layout is None:
+            self.layout = detect_layout(data)
+
+        buf = np.frombuffer(data, dtype=np.uint8)
+        starts, ends = split_lines(buf)
+        chunk = ChunkIndex(
+            data=data,
+            base_offset=self.byte_count,
+            first_line=self.line_count,
+            starts=starts,
+            ends=ends,
+            levels=parse_levels(data, buf, starts, ends, self.layout),
+            timestamps=parse_timestamps(buf, starts, ends, self.layout),
+        )
+
+        if self.keep_lines:
+            self._offsets.append(starts + self.byte_count)
+            self._levels.append(chunk.levels)
+            self._timestamps.append(chunk.timestamps)
+        self.line_count += chunk.line_count
+        self.byte_count += len(data)
+        return chunk
+
+    @staticmethod
+    def _concat(parts: List[np.ndarray], dtype) -> np.ndarray:
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        if len(parts) > 1:
+            parts[:] = [np.concatenate(parts)]
+        return parts[0]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """每行在文件中的起始字节偏移"""
+        return self._concat(self._offsets, np.int64)
+
+    @property
+    def levels(self) -> np.ndarray:
+        """每行的级别下标"""
+        return self._concat(self._levels, np.int8)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """每行的时间戳（秒），无法解析为 NaN"""
+        return self._concat(self._timestamps, np.float64)
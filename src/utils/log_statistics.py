@@ -0,0 +1,282 @@
+import codecs
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.file_utils import detect_encoding, read_file_bytes_chunks
+from src.utils.log_index import LogIndex, ChunkIndex, LEVEL_NAMES, LEVEL_UNKNOWN
+
+# 统计词频时使用的单词模式（至少3个字符，以字母或下划线开头）
+_TOKEN_PATTERN = re.compile(rb"[A-Za-z_][A-Za-z0-9_]{2,}")
+# 不参与词频统计的单词（日志级别本身）
+_STOP_TOKENS = {b"VERBOSE", b"TRACE", b"DEBUG", b"INFO", b"WARN", b"WARNING",
+                b"ERROR", b"FATAL", b"CRITICAL"}
+# 词频表保留的单词数：超过两倍时只保留出现次数最多的这么多个，内存占用有上限
+# （近似的 top-k：被淘汰的单词之后再出现时重新计数，排在前面的单词不受影响）
+TOKEN_TABLE_SIZE = 20000
+# 单词最多按前这么多个字节统计（numpy 定长字节数组）
+MAX_TOKEN_BYTES = 32
+# 词频按采样统计：每 TOKEN_SAMPLE_STRIDE 个 TOKEN_SAMPLE_BLOCK 字节的数据块取一块，次数按比例放大。
+# 正则提取单词和计数占了逐块统计的大部分时间，采样后只有级别和时间的解析按全部数据进行
+TOKEN_SAMPLE_STRIDE = 32
+TOKEN_SAMPLE_BLOCK = 64 * 1024
+# 时间分布图的默认最大柱数
+MAX_TIME_BUCKETS = 120
+_BUCKET_STEPS = [1, 5, 10, 30, 60, 300, 600, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400]
+
+
+def compile_keyword_pattern(keyword: str, options: dict = None, encoding: str = "utf-8") -> Optional[re.Pattern]:
+    """把关键字按过滤选项编译为字节正则，匹配语义与 FilterEngine 一致
+
+    同一个关键字的匹配互不重叠（"AA" 在 "AAA" 中计一次），与按分组过滤时的计数一致。
+    encoding 需要与被搜索的字节的编码相同。
+    """
+    if not keyword:
+        return None
+    options = options or {}
+    flags = 0 if options.get("case_sensitive", False) else re.IGNORECASE
+    raw = keyword.encode(encoding, errors="replace")
+    if options.get("use_regex", False):
+        try:
+            return re.compile(raw, flags)
+        except re.error:
+            return re.compile(re.escape(raw), flags)
+    if options.get("whole_word", False):
+        return re.compile(rb"\b" + re.escape(raw) + rb"\b", flags)
+    return re.compile(re.escape(raw), flags)
+
+
+def suggest_bucket_seconds(span: float, max_buckets: int = MAX_TIME_BUCKETS) -> int:
+    """根据时间跨度选择合适的时间分布粒度（秒）"""
+    for step in _BUCKET_STEPS:
+        if span / step <= max_buckets:
+            return step
+    return int(np.ceil(span / max_buckets / 86400)) * 86400
+
+
+class LogStatistics:
+    """日志统计：级别数量、时间分布、高频词和已保存关键字的命中数
+
+    所有统计都在一次流式扫描中完成：每个数据块先由 LogIndex 向量化地解析出
+    行级别和时间戳，再用 numpy 累加计数，不保留每行的数据。文件追加内容后调用 update_from_file()
+    只扫描新增的部分，统计结果随之增量更新。
+
+    高频词默认按采样估计（token_stride 见 TOKEN_SAMPLE_STRIDE），token_stride 为 1 时统计全部数据。
+    """
+
+    def __init__(self, keyword_groups: Dict[str, List[dict]] = None, encoding: str = "utf-8",
+                 count_tokens: bool = True, token_stride: int = TOKEN_SAMPLE_STRIDE):
+        self.encoding = encoding
+        self.count_tokens = count_tokens
+        self.token_stride = max(1, token_stride)
+        self.index = LogIndex(keep_lines=False)
+        self._level_counts = np.zeros(len(LEVEL_NAMES) + 1, dtype=np.int64)  # 最后一项为未知级别
+        self._second_counts: Dict[int, int] = {}  # 每秒的行数
+        self._token_words = np.empty(0, dtype=f"S{MAX_TOKEN_BYTES}")  # 词频表：单词
+        self._token_counts = np.empty(0, dtype=np.int64)                # 词频表：出现次数
+        self._tokens_sampled = False  # 是否有数据块只统计了采样部分
+        self._keyword_groups: Dict[str, List[dict]] = {}
+        self._keywords: List[Tuple[str, str, re.Pattern]] = []  # (分组, 关键字, 模式)
+        self._keyword_counts = np.zeros(0, dtype=np.int64)
+        self._decoder = None
+        self._file_offset = 0  # update_from_file() 已读取到的文件位置
+        self.set_keyword_groups(keyword_groups or {})
+
+    def set_keyword_groups(self, keyword_groups: Dict[str, List[dict]]):
+        """设置需要统计的关键字分组（只对之后扫描的数据生效），关键字按文件的编码转为字节"""
+        self._keyword_groups = keyword_groups
+        self._keywords = []
+        for group, keywords in keyword_groups.items():
+            for keyword_data in keywords:
+                text = keyword_data.get("text", "")
+                pattern = compile_keyword_pattern(text, keyword_data.get("options") or {}, self.encoding)
+                if pattern is not None:
+                    self._keywords.append((group, text, pattern))
+        self._keyword_counts = np.zeros(len(self._keywords), dtype=np.int64)
+
+    @property
+    def line_count(self) -> int:
+        return self.index.line_count
+
+    @property
+    def file_offset(self) -> int:
+        """update_from_file() 已读取到的文件位置"""
+        return self._file_offset
+
+    def feed(self, chunk: bytes):
+        """传入一块原始字节（UTF-8 或其他兼容 ASCII 的编码）"""
+        self._consume(self.index.feed(chunk))
+
+    def finish(self):
+        """处理末尾没有换行符的最后一行"""
+        self._consume(self.index.finish())
+
+    def _consume(self, chunk: Optional[ChunkIndex]):
+        if chunk is None or not chunk.line_count:
+            return
+
+        levels = chunk.levels.astype(np.int64)
+        levels[levels == LEVEL_UNKNOWN] = len(LEVEL_NAMES)
+        self._level_counts += np.bincount(levels, minlength=len(self._level_counts))
+
+        timestamps = chunk.timestamps[~np.isnan(chunk.timestamps)]
+        if len(timestamps):
+            seconds, counts = np.unique(np.floor(timestamps).astype(np.int64), return_counts=True)
+            for second, count in zip(seconds.tolist(), counts.tolist()):
+                self._second_counts[second] = self._second_counts.get(second, 0) + count
+
+        if self.count_tokens:
+            data = chunk.data
+            if self.token_stride > 1:
+                # 均匀地取一部分数据块（块边界截断的单词只影响块两端，对高频词可以忽略）
+                step = TOKEN_SAMPLE_BLOCK * self.token_stride
+                data = b"\n".join(data[pos:pos + TOKEN_SAMPLE_BLOCK] for pos in range(0, len(data), step))
+            # 块内先用哈希表计数（C 实现），再把不同的单词合并到有上限的词频表
+            chunk_counts = Counter(_TOKEN_PATTERN.findall(data))
+            if chunk_counts:
+                words = np.array(list(chunk_counts), dtype=self._token_words.dtype)
+                counts = np.fromiter(chunk_counts.values(), dtype=np.int64, count=len(chunk_counts))
+                if len(data) < len(chunk.data):
+                    counts = np.rint(counts * (len(chunk.data) / len(data))).astype(np.int64)
+                    self._tokens_sampled = True
+                self._merge_tokens(words, counts)
+
+        for i, (_, _, pattern) in enumerate(self._keywords):
+            self._keyword_counts[i] += len(pattern.findall(chunk.data))
+
+    def _merge_tokens(self, words: np.ndarray, counts: np.ndarray):
+        """把一块数据的词频合并到词频表，表太大时淘汰出现次数少的单词"""
+        if len(words) > TOKEN_TABLE_SIZE:
+            # 块内只合并次数最多的单词（线性的 argpartition），避免对大量只出现一次的单词排序
+            keep = np.argpartition(counts, -TOKEN_TABLE_SIZE)[-TOKEN_TABLE_SIZE:]
+            words, counts = words[keep], counts[keep]
+        words = np.concatenate((self._token_words, words))
+        counts = np.concatenate((self._token_counts, counts))
+        words, inverse = np.unique(words, return_inverse=True)
+        counts = np.bincount(inverse, weights=counts, minlength=len(words)).astype(np.int64)
+        if len(words) > 2 * TOKEN_TABLE_SIZE:
+            keep = np.argpartition(counts, -TOKEN_TABLE_SIZE)[-TOKEN_TABLE_SIZE:]
+            keep.sort()
+            words, counts = words[keep], counts[keep]
+        self._token_words, self._token_counts = words, counts
+
+    def update_from_file(self, filepath: str, progress_callback: Optional[Callable[[int], None]] = None,
+                         is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """从上次读取的位置继续读取文件，增量更新统计
+
+        末尾尚未写完换行符的行会等到下一次更新时再计入。
+
+        Returns:
+            bool: 是否读取到了新数据
+        """
+        if self._decoder is None:
+            encoding = detect_encoding(filepath)
+            # UTF-16/32 不兼容 ASCII，需要先转码为 UTF-8 再扫描
+            if encoding.startswith(("utf-16", "utf-32")):
+                self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            else:
+                self._decoder = False
+                if encoding != self.encoding:
+                    # 关键字需要按文件的编码重新转为字节（此时还没有扫描任何数据）
+                    self.encoding = encoding
+                    self.set_keyword_groups(self._keyword_groups)
+
+        updated = False
+        for chunk, offset in read_file_bytes_chunks(filepath, start_offset=self._file_offset):
+            if is_cancelled and is_cancelled():
+                break
+            self._file_offset = offset + len(chunk)
+            if self._decoder:
+                chunk = self._decoder.decode(chunk).encode("utf-8")
+            self.feed(chunk)
+            updated = True
+            if progress_callback:
+                progress_callback(self._file_offset)
+        return updated
+
+    def level_counts(self) -> Dict[str, int]:
+        """每个级别的行数，'UNKNOWN' 为无法识别级别的行"""
+        result = {name: int(count) for name, count in zip(LEVEL_NAMES, self._level_counts)}
+        result["UNKNOWN"] = int(self._level_counts[-1])
+        return result
+
+    def time_range(self) -> Tuple[Optional[int], Optional[int]]:
+        """带时间戳的行的最早和最晚时间（秒）"""
+        if not self._second_counts:
+            return None, None
+        return min(self._second_counts), max(self._second_counts)
+
+    def time_histogram(self, bucket_seconds: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """按时间段统计行数
+
+        Args:
+            bucket_seconds: 每个时间段的秒数，0 表示根据时间跨度自动选择
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (每个时间段的起始时间, 每个时间段的行数)，时间段连续
+        """
+        if not self._second_counts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        seconds = np.fromiter(self._second_counts.keys(), dtype=np.int64, count=len(self._second_counts))
+        counts = np.fromiter(self._second_counts.values(), dtype=np.int64, count=len(self._second_counts))
+        if bucket_seconds <= 0:
+            bucket_seconds = suggest_bucket_seconds(float(seconds.max() - seconds.min()))
+        first = seconds.min() // bucket_seconds * bucket_seconds
+        buckets = (seconds - first) // bucket_seconds
+        histogram = np.bincount(buckets, weights=counts).astype(np.int64)
+        return first + np.arange(len(histogram), dtype=np.int64) * bucket_seconds, histogram
+
+    @property
+    def tokens_sampled(self) -> bool:
+        """高频词的次数是否为采样估计值（数据块小于一个采样间隔时全部统计，不是估计值）"""
+        return self._tokens_sampled
+
+    def top_tokens(self, n: int = 20) -> List[Tuple[str, int]]:
+        """出现次数最多的 n 个单词（tokens_sampled 为 True 时次数为估计值）"""
+        result = []
+        # 出现次数从多到少，次数相同时按单词排序
+        order = np.lexsort((self._token_words, -self._token_counts))
+        for token, count in zip(self._token_words[order[:n + len(_STOP_TOKENS)]].tolist(),
+                                self._token_counts[order[:n + len(_STOP_TOKENS)]].tolist()):
+            if token in _STOP_TOKENS:
+                continue
+            result.append((token.decode(self.encoding, errors="replace"), count))
+            if len(result) >= n:
+                break
+        return result
+
+    def keyword_counts(self) -> Dict[str, Dict[str, int]]:
+        """已保存关键字的命中次数：{分组: {关键字: 次数}}"""
+        result: Dict[str, Dict[str, int]] = {}
+        for (group, text, _), count in zip(self._keywords, self._keyword_counts):
+            result.setdefault(group, {})[text] = int(count)
+        return result
+
+    def to_dict(self, bucket_seconds: int = 0, top_n: int = 20) -> dict:
+        """导出为可以直接序列化为 JSON 的字典"""
+        starts, counts = self.time_histogram(bucket_seconds)
+        return {
+            "lines": self.line_count,
+            "levels": self.level_counts(),
+            "time_histogram": {
+                "bucket_seconds": int(starts[1] - starts[0]) if len(starts) > 1 else bucket_seconds,
+                "starts": starts.tolist(),
+                "counts": counts.tolist(),
+            },
+            "top_tokens": self.top_tokens(top_n),
+            "top_tokens_sampled": self.tokens_sampled,
+            "keywords": self.keyword_counts(),
+        }
+
+
+def compute_file_statistics(filepath: str, keyword_groups: Dict[str, List[dict]] = None,
+                            count_tokens: bool = True,
+                            progress_callback: Optional[Callable[[int], None]] = None,
+                            token_stride: int = TOKEN_SAMPLE_STRIDE) -> LogStatistics:
+    """统计整个文件（不依赖 Qt，可在命令行或脚本中使用）"""
+    stats = LogStatistics(keyword_groups, count_tokens=count_tokens, token_stride=token_stride)
+    stats.update_from_file(filepath, progress_callback)
+    stats.finish()
+    return stats
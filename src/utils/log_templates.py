@@ -0,0 +1,318 @@
+import codecs
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.batch_filter import PROCESS_CONTEXT
+from src.utils.file_utils import detect_encoding, get_content_size, read_file_bytes_chunks
+
+# 需要处理的数据超过这个大小时才分块交给多个进程（进程启动和传递数据的开销在小文件上不划算）
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+# 显示用的模板：可变部分 -> 占位符，按顺序替换（先替换路径和十六进制，最后是数字和多余的空格）
+_PATH_PATTERN = re.compile(rb"[/\\][\w.\-]+(?:[/\\][\w.\-]+)+[/\\]?")
+# 数据中没有反斜杠时路径只能以 "/" 开头，以字面字符开头的正则查找起来快得多
+_SLASH_PATH_PATTERN = re.compile(rb"/[\w.\-]+(?:[/\\][\w.\-]+)+[/\\]?")
+# 0x 开头的数字、至少 6 位的十六进制串和 UUID；纯数字和纯字母的单词由 _mask_hex 原样保留
+_HEX_PATTERN = re.compile(rb"\b(?:0[xX][0-9a-fA-F]+|[0-9a-fA-F]{6,}(?:-[0-9a-fA-F]{4,})*)\b")
+# 写法与 \d+、[ \t]{2,} 等价，但 re 对这种写法的匹配更快
+TEMPLATE_MASKS: List[Tuple[re.Pattern, bytes]] = [
+    (re.compile(rb"[0-9]+(?:[.:\-][0-9]+)*"), b"<NUM>"),
+    (re.compile(rb"[ \t][ \t]+"), b" "),
+]
+# 最多记录的模板数，超出后新出现的模板都归入 OTHER_TEMPLATE，内存占用有上限
+MAX_TEMPLATES = 50000
+OTHER_TEMPLATE = -1
+
+
+def _mask_hex(match: re.Match) -> bytes:
+    token = match.group()
+    if token.isdigit() or token.isalpha():
+        return token
+    return b"<UUID>" if token.count(b"-") == 4 else b"<HEX>"
+
+
+def _mask_ids(data: bytes) -> bytes:
+    path_pattern = _PATH_PATTERN if b"\\" in data else _SLASH_PATH_PATTERN
+    data = path_pattern.sub(b"<PATH>", data)
+    return _HEX_PATTERN.sub(_mask_hex, data)
+
+
+def _mask_numbers_and_spaces(data: bytes) -> bytes:
+    """依次替换 TEMPLATE_MASKS，结果相同，但用 numpy 一次处理整块数据（两次正则替换是最慢的部分）"""
+    if len(data) < 2 or b"\x00" in data:
+        # 用 0 字节标记数字的位置，数据中本身有 0 字节时用正则
+        for pattern, placeholder in TEMPLATE_MASKS:
+            data = pattern.sub(placeholder, data)
+        return data
+    buf = np.frombuffer(data, dtype=np.uint8)
+    digit = (buf - 48) < 10
+    # 数字，以及两侧都是数字的 "."、":"、"-"
+    in_number = digit.copy()
+    separator = (buf[1:-1] == 46) | (buf[1:-1] == 58) | (buf[1:-1] == 45)
+    in_number[1:-1] |= separator & digit[:-2] & digit[2:]
+    # 每段数字只保留第一个字节（替换为 0 字节，最后换成 <NUM>），其余删除
+    drop = np.zeros(len(buf), dtype=bool)
+    np.logical_and(in_number[1:], in_number[:-1], out=drop[1:])
+    out = buf.copy()
+    out[in_number & ~drop] = 0
+    # 连续的空白只保留第一个，替换为空格
+    space = (buf == 32) | (buf == 9)
+    space_drop = np.zeros(len(buf), dtype=bool)
+    np.logical_and(space[1:], space[:-1], out=space_drop[1:])
+    out[:-1][space_drop[1:] & ~space_drop[:-1]] = 32
+    drop |= space_drop
+    return out[~drop].tobytes().replace(b"\x00", b"<NUM>")
+
+
+def mask_text(data: bytes) -> bytes:
+    """把文本中的路径、十六进制、UUID 和数字替换为占位符，用于显示模板"""
+    return _mask_numbers_and_spaces(_mask_ids(data))
+
+
+def template_keys(data: bytes) -> List[bytes]:
+    """整块数据中每行的模板键，即 mask_text() 的结果
+
+    只替换可变部分，单词之间的空白保留（"foobar" 和 "foo bar" 是不同的模板），连续的空白合并为一个
+    （对齐用的空格数随数字宽度变化）；整块数据一起替换，不会跨行，返回的行数等于换行数加一。
+    """
+    return mask_text(data).split(b"\n")
+
+
+def _chunk_templates(data: bytes) -> Tuple[List[bytes], np.ndarray, np.ndarray]:
+    """计算一块数据中每行的模板，不依赖已有的模板表，可以在工作进程中运行
+
+    Returns:
+        Tuple[List[bytes], np.ndarray, np.ndarray]: (块内出现的模板键，按第一次出现的顺序,
+        每行的块内编号, 每个模板键第一次出现的行号)
+    """
+    lines = template_keys(data)
+    ids: Dict[bytes, int] = {}
+    setdefault = ids.setdefault
+    local_ids = np.fromiter((setdefault(line, len(ids)) for line in lines), dtype=np.int32, count=len(lines))
+    # 编号按出现顺序分配，每个编号第一次出现的位置就是它的第一行
+    first_rows = np.unique(local_ids, return_index=True)[1]
+    return list(ids), local_ids, first_rows
+
+
+class LogTemplates:
+    """把日志行归类为消息模板，统计每个模板的出现次数
+
+    每块数据先整体计算模板键（整块一起替换，见 template_keys()）和块内编号（见 _chunk_templates()，
+    可以在工作进程中进行），再按块的顺序合并到模板表得到模板编号；
+    每行只保存一个 int32 的模板编号，模板表的大小有上限（MAX_TEMPLATES），
+    所以内存占用与文件大小成正比且很小。文件追加内容后调用 update_from_file() 只处理新增的部分。
+    """
+
+    def __init__(self, encoding: str = "utf-8", max_templates: int = MAX_TEMPLATES, jobs: Optional[int] = None):
+        self.encoding = encoding
+        self.max_templates = max_templates
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self._ids: Dict[bytes, int] = {}   # 模板键 -> 模板编号
+        self._templates: List[bytes] = []  # 模板编号 -> 显示用的模板（即模板键）
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._first_lines = np.zeros(0, dtype=np.int64)  # 模板第一次出现的行号
+        self._line_parts: List[np.ndarray] = []
+        self._line_templates: Optional[np.ndarray] = None  # 合并后的每行模板编号（缓存）
+        self.other_count = 0  # 归入 OTHER_TEMPLATE 的行数
+        self.line_count = 0
+        self._pending = b""
+        self._decoder = None
+        self._file_offset = 0
+
+    @property
+    def file_offset(self) -> int:
+        """update_from_file() 已读取到的文件位置"""
+        return self._file_offset
+
+    @property
+    def template_count(self) -> int:
+        return len(self._templates)
+
+    def feed(self, chunk: bytes):
+        """传入一块原始字节（UTF-8 或其他兼容 ASCII 的编码），处理其中的完整行"""
+        data = self._pending + chunk
+        cut = data.rfind(b"\n") + 1
+        self._pending = data[cut:]
+        if cut:
+            self._consume(data[:cut - 1])
+
+    def finish(self):
+        """处理末尾没有换行符的最后一行"""
+        data, self._pending = self._pending, b""
+        if data:
+            self._consume(data)
+
+    def _consume(self, data: bytes):
+        self._merge(*_chunk_templates(data))
+
+    def _merge(self, keys: List[bytes], local_ids: np.ndarray, first_rows: np.ndarray):
+        """把一块数据的结果（见 _chunk_templates()）合并到模板表，块必须按文件中的顺序合并"""
+        ids = self._ids
+        templates = self._templates
+        first_new = len(templates)
+        # 块内编号 -> 模板编号；块内编号按第一次出现的顺序分配，新模板的编号也按出现顺序
+        mapping = np.empty(len(keys), dtype=np.int32)
+        for local_id, key in enumerate(keys):
+            template_id = ids.get(key)
+            if template_id is None:
+                if len(ids) >= self.max_templates:
+                    # 超出上限的模板不记录，这些行归入 OTHER_TEMPLATE
+                    template_id = OTHER_TEMPLATE
+                else:
+                    template_id = ids[key] = len(templates)
+                    templates.append(key)
+            mapping[local_id] = template_id
+        line_ids = mapping[local_ids]
+
+        if len(templates) > first_new:
+            # 新模板第一次出现的行号
+            new_rows = first_rows[np.flatnonzero(mapping >= first_new)]
+            self._first_lines = np.concatenate([self._first_lines, new_rows + self.line_count])
+            self._counts = np.concatenate([self._counts, np.zeros(len(templates) - first_new, dtype=np.int64)])
+
+        known = line_ids[line_ids >= 0]
+        self._counts += np.bincount(known, minlength=len(self._counts))
+        self.other_count += len(line_ids) - len(known)
+        self._line_parts.append(line_ids)
+        self._line_templates = None
+        self.line_count += len(line_ids)
+
+    def update_from_file(self, filepath: str, progress_callback: Optional[Callable[[int], None]] = None,
+                         is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """从上次读取的位置继续读取文件，增量更新模板统计
+
+        末尾尚未写完换行符的行会等到下一次更新时再计入。新增的数据较多且 jobs 大于 1 时，
+        各块的模板键由多个进程计算，结果仍按块的顺序合并。
+
+        Returns:
+            bool: 是否读取到了新数据
+        """
+        if self._decoder is None:
+            encoding = detect_encoding(filepath)
+            # UTF-16/32 不兼容 ASCII，需要先转码为 UTF-8 再处理
+            if encoding.startswith(("utf-16", "utf-32")):
+                self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            else:
+                self._decoder = False
+                self.encoding = encoding
+
+        if not self._decoder and self.jobs > 1:
+            size = get_content_size(filepath)
+            if size is not None and size - self._file_offset >= PARALLEL_MIN_BYTES:
+                return self._update_in_pool(filepath, progress_callback, is_cancelled)
+
+        updated = False
+        for chunk, offset in read_file_bytes_chunks(filepath, start_offset=self._file_offset):
+            if is_cancelled and is_cancelled():
+                break
+            self._file_offset = offset + len(chunk)
+            if self._decoder:
+                chunk = self._decoder.decode(chunk).encode("utf-8")
+            self.feed(chunk)
+            updated = True
+            if progress_callback:
+                progress_callback(self._file_offset)
+        return updated
+
+    def _update_in_pool(self, filepath: str, progress_callback: Optional[Callable[[int], None]],
+                        is_cancelled: Optional[Callable[[], bool]]) -> bool:
+        # 在界面的后台线程中创建，用 spawn 而不是 fork 启动工作进程（见 PROCESS_CONTEXT）
+        executor = ProcessPoolExecutor(max_workers=self.jobs, mp_context=PROCESS_CONTEXT)
+        # 已提交的块：(任务, 块结束的文件偏移, 块之后剩下的不完整行)，合并时才更新读取位置，取消时状态保持一致
+        in_flight: List[Tuple[Optional[Future], int, bytes]] = []
+        start_offset = self._file_offset
+        pending = self._pending
+
+        def merge_first() -> bool:
+            future, file_offset, rest = in_flight[0]
+            while future is not None:
+                if is_cancelled and is_cancelled():
+                    return False
+                try:
+                    self._merge(*future.result(timeout=0.2))
+                    break
+                except FutureTimeoutError:
+                    continue
+            in_flight.pop(0)
+            self._file_offset = file_offset
+            self._pending = rest
+            if progress_callback:
+                progress_callback(file_offset)
+            return True
+
+        try:
+            for chunk, offset in read_file_bytes_chunks(filepath, start_offset=self._file_offset):
+                if is_cancelled and is_cancelled():
+                    break
+                data = pending + chunk
+                cut = data.rfind(b"\n") + 1
+                pending = data[cut:]
+                future = executor.submit(_chunk_templates, data[:cut - 1]) if cut else None
+                in_flight.append((future, offset + len(chunk), pending))
+                # 限制在途的块数，内存占用不随文件大小增长
+                while len(in_flight) > self.jobs * 2:
+                    if not merge_first():
+                        return self._file_offset != start_offset
+            while in_flight and merge_first():
+                pass
+            return self._file_offset != start_offset
+        finally:
+            # 取消时不等待正在运行的任务
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def line_templates(self) -> np.ndarray:
+        """每行的模板编号（int32，OTHER_TEMPLATE 表示超出模板数上限）"""
+        if self._line_templates is None:
+            parts = self._line_parts
+            self._line_templates = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+            self._line_parts = [self._line_templates]
+        return self._line_templates
+
+    def template_text(self, template_id: int) -> str:
+        if template_id == OTHER_TEMPLATE:
+            return "（其它）"
+        encoding = "utf-8" if self._decoder else self.encoding
+        return self._templates[template_id].decode(encoding, errors="replace")
+
+    def first_line(self, template_id: int) -> int:
+        return int(self._first_lines[template_id])
+
+    def count(self, template_id: int) -> int:
+        return self.other_count if template_id == OTHER_TEMPLATE else int(self._counts[template_id])
+
+    def top_templates(self, limit: int = 0) -> List[Tuple[int, int]]:
+        """出现次数最多的模板 [(模板编号, 次数)]，limit 为 0 表示全部"""
+        counts = self._counts
+        order = np.argsort(-counts, kind="stable")
+        if limit:
+            order = order[:limit]
+        return [(int(template_id), int(counts[template_id])) for template_id in order]
+
+    def next_line(self, template_id: int, after: int = -1) -> int:
+        """after 之后第一个属于该模板的行号，没有时从头查找，都没有时返回 -1"""
+        line_templates = self.line_templates
+        hits = np.flatnonzero(line_templates[after + 1:] == template_id)
+        if len(hits):
+            return int(hits[0]) + after + 1
+        hits = np.flatnonzero(line_templates[:after + 1] == template_id)
+        return int(hits[0]) if len(hits) else -1
+
+    def repeat_runs(self, min_length: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+        """连续重复同一模板的行段
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (每段的起始行号, 每段的行数)，只包含行数不少于 min_length 的段
+        """
+        line_templates = self.line_templates
+        if not len(line_templates):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(line_templates) != 0) + 1))
+        lengths = np.diff(np.append(starts, len(line_templates)))
+        # 超出上限的行不是同一模板，不折叠
+        keep = (lengths >= min_length) & (line_templates[starts] != OTHER_TEMPLATE)
+        return starts[keep], lengths[keep]
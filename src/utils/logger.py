@@ -1,54 +1,165 @@
+import atexit
 import logging
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Tuple
+
+# 日志文件大小上限和保留的备份数量
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# 批量写入：缓冲的记录数达到上限或距上次写入超过间隔时才写入文件
+FLUSH_CAPACITY = 200
+FLUSH_INTERVAL = 2.0
+# 高频事件的采样间隔（秒）：同一控件的同类事件在间隔内只记录一条，被合并的数量附在下一条中
+HIGH_FREQUENCY_EVENTS = {
+    "text_change": 0.5,
+    "navigate": 0.5,
+    "match_count_change": 0.5,
+    "state_change": 0.5,
+}
+
+
+class _BatchedFileHandler(RotatingFileHandler):
+    """按大小轮转的文件处理器，写入每条记录后不立即刷新，由 _TimedMemoryHandler 在一批记录后统一刷新"""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class _TimedMemoryHandler(MemoryHandler):
+    """按数量或时间间隔批量写入目标处理器
+
+    只在收到新记录时检查时间间隔，最后几条记录会在下一条记录到来或程序退出时写入。
+    """
+
+    def __init__(self, capacity: int, interval: float, target: logging.Handler):
+        super().__init__(capacity, flushLevel=logging.WARNING, target=target)
+        self.interval = interval
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        return (super().shouldFlush(record)
+                or time.monotonic() - self._last_flush >= self.interval)
+
+    def flush(self):
+        super().flush()
+        if self.target is not None:  # close() 之后 target 为 None
+            self.target.flush()
+        self._last_flush = time.monotonic()
+
 
 class Logger:
+    """UI 事件日志
+
+    调用方只把记录放入队列，格式化和写文件都在 QueueListener 的后台线程中完成，
+    不会阻塞界面线程；文件按大小轮转。
+    """
     _instance = None
-    
+    _lock = threading.Lock()
+
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(Logger, cls).__new__(cls)
-            cls._instance._initialize_logger()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(Logger, cls).__new__(cls)
+                    instance._initialize_logger()
+                    cls._instance = instance
         return cls._instance
-    
+
     def _initialize_logger(self):
         # 创建logs目录（如果不存在）
         if not os.path.exists('logs'):
             os.makedirs('logs')
-            
+
         # 设置日志格式
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
-        
-        # 创建文件处理器
-        log_file = os.path.join('logs', f'ui_events_{datetime.now().strftime("%Y%m%d")}.log')
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+
+        # 按大小轮转的文件处理器，批量写入
+        log_file = os.path.join('logs', 'ui_events.log')
+        file_handler = _BatchedFileHandler(log_file, maxBytes=LOG_MAX_BYTES,
+                                           backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
         file_handler.setFormatter(formatter)
-        
-        # 创建控制台处理器
+        self.buffer_handler = _TimedMemoryHandler(FLUSH_CAPACITY, FLUSH_INTERVAL, file_handler)
+
+        # 控制台只输出警告和错误
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        
+        console_handler.setLevel(logging.WARNING)
+
+        self.listener = QueueListener(queue.SimpleQueue(), self.buffer_handler, console_handler,
+                                      respect_handler_level=True)
+        self.listener.start()
+        self._stopped = False
+        atexit.register(self.shutdown)
+
         # 配置根日志记录器
         self.logger = logging.getLogger('SCLogAnalysisTool')
         self.logger.setLevel(logging.INFO)
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-    
+        self.logger.propagate = False
+        self.logger.addHandler(QueueHandler(self.listener.queue))
+
+        self._sample_lock = threading.Lock()
+        self._last_emitted: Dict[Tuple[str, str], float] = {}
+        self._suppressed: Dict[Tuple[str, str], int] = {}
+
+    def shutdown(self):
+        """停止后台线程并写入缓冲中的日志"""
+        if not self._stopped:
+            self._stopped = True
+            self.listener.stop()
+            self.buffer_handler.flush()
+
+    def sample(self, event_type: str, widget_name: str) -> Tuple[bool, int]:
+        """高频事件的采样
+
+        Returns:
+            Tuple[bool, int]: (是否记录这一条, 之前被合并的数量)
+        """
+        interval = HIGH_FREQUENCY_EVENTS.get(event_type)
+        if interval is None:
+            return True, 0
+        key = (event_type, widget_name)
+        now = time.monotonic()
+        with self._sample_lock:
+            if now - self._last_emitted.get(key, float("-inf")) < interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False, 0
+            self._last_emitted[key] = now
+            return True, self._suppressed.pop(key, 0)
+
     @staticmethod
     def get_logger():
         return Logger()._instance.logger
 
 def log_ui_event(event_type: str, widget_name: str, additional_info: str = ""):
     """记录UI事件的辅助函数
-    
+
+    只把记录放入队列，不会等待写文件；HIGH_FREQUENCY_EVENTS 中的事件会被采样。
+
     Args:
         event_type: 事件类型（如 'click', 'focus', 'change' 等）
         widget_name: 控件名称
         additional_info: 额外信息
     """
+    instance = Logger()
+    emit, suppressed = instance.sample(event_type, widget_name)
+    if not emit:
+        return
     message = f"UI Event - {event_type} - {widget_name}"
     if additional_info:
         message += f" - {additional_info}"
-    Logger.get_logger().info(message) 
\ No newline at end of file
+    if suppressed:
+        message += f" (合并了之前的 {suppressed} 条)"
+    instance.logger.info(message)
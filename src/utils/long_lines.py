@@ -0,0 +1,117 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 超过这个长度（字符数）的行在编辑器中拆分为多段显示
+LONG_LINE_THRESHOLD = 10000
+# 拆分后每段的长度（字符数），每段是编辑器中的一个块，排版和高亮都只处理一段
+SEGMENT_LENGTH = 4096
+
+
+def find_long_lines(text: str, threshold: int = LONG_LINE_THRESHOLD) -> List[Tuple[int, int]]:
+    """查找长度超过 threshold 的行，返回每行的 (起始位置, 结束位置（不含换行符）)
+
+    每次在 threshold + 1 个字符的窗口中反向查找最后一个换行符：找到时直接跳到它之后，
+    找不到说明从窗口开头开始的这一行超长。扫描在 C 中进行，每次前进约 threshold 个字符，
+    没有超长行时几乎不增加打开文件的耗时。
+    """
+    spans = []
+    pos, size = 0, len(text)
+    while pos + threshold < size:
+        window_end = pos + threshold + 1
+        newline = text.rfind("\n", pos, window_end)
+        if newline != -1:
+            pos = newline + 1
+            continue
+        end = text.find("\n", window_end)
+        if end == -1:
+            end = size
+        spans.append((pos, end))
+        pos = end + 1
+    return spans
+
+
+class LineSegments:
+    """超长行拆分后，原文行号与编辑器块号之间的对应关系
+
+    只记录超长行（行号和段数），其余的行一行一个块；查找时对超长行的行号或首块号二分查找，
+    内存占用与超长行的数量成正比。
+    """
+
+    def __init__(self, long_lines: np.ndarray, segment_counts: np.ndarray, line_count: int,
+                 segment_length: int = SEGMENT_LENGTH):
+        self.long_lines = np.asarray(long_lines, dtype=np.int64)          # 超长行的行号（升序）
+        self.segment_counts = np.asarray(segment_counts, dtype=np.int64)  # 每个超长行拆成的段数
+        self.segment_length = segment_length
+        self.line_count = line_count
+        # 第 i 个超长行之前多出来的块数
+        self._extra_before = np.concatenate(([0], np.cumsum(self.segment_counts - 1)))
+        self._first_blocks = self.long_lines + self._extra_before[:-1]
+        self.block_count = line_count + int(self._extra_before[-1])
+
+    def first_block(self, line: int) -> int:
+        """行的第一个块号"""
+        return line + int(self._extra_before[np.searchsorted(self.long_lines, line)])
+
+    def block_span(self, line: int) -> Tuple[int, int]:
+        """行占用的块 (第一个块号, 块数)"""
+        index = int(np.searchsorted(self.long_lines, line))
+        first = line + int(self._extra_before[index])
+        if index < len(self.long_lines) and self.long_lines[index] == line:
+            return first, int(self.segment_counts[index])
+        return first, 1
+
+    def locate(self, line: int, column: int) -> Tuple[int, int]:
+        """行内的列（字符偏移）所在的 (块号, 块内的列)"""
+        first, count = self.block_span(line)
+        segment = min(max(column, 0) // self.segment_length, count - 1)
+        return first + segment, column - segment * self.segment_length
+
+    def line_of_block(self, block: int) -> Tuple[int, int]:
+        """块所在的 (行号, 块的第一个字符在行内的列)"""
+        index = int(np.searchsorted(self._first_blocks, block, side="right")) - 1
+        if index < 0:
+            return block, 0
+        first = int(self._first_blocks[index])
+        if block < first + int(self.segment_counts[index]):
+            return int(self.long_lines[index]), (block - first) * self.segment_length
+        return block - int(self._extra_before[index + 1]), 0
+
+    def join(self, display_text: str) -> str:
+        """把拆分显示的文本（例如编辑过的内容）还原为原文的行"""
+        blocks = display_text.split("\n")
+        lines = []
+        previous = 0
+        for first, count in zip(self._first_blocks.tolist(), self.segment_counts.tolist()):
+            lines.extend(blocks[previous:first])
+            lines.append("".join(blocks[first:first + count]))
+            previous = first + count
+        lines.extend(blocks[previous:])
+        return "\n".join(lines)
+
+
+def split_long_lines(text: str, threshold: int = LONG_LINE_THRESHOLD,
+                     segment_length: int = SEGMENT_LENGTH) -> Tuple[str, Optional[LineSegments]]:
+    """把超长的行拆分为每段 segment_length 个字符，段之间用换行符分隔
+
+    Returns:
+        Tuple[str, Optional[LineSegments]]: (用于显示的文本, 行与块的对应关系)；
+        没有超长行时原样返回 text 和 None，不复制文本
+    """
+    spans = find_long_lines(text, threshold)
+    if not spans:
+        return text, None
+    pieces = []
+    long_lines, segment_counts = [], []
+    line, previous = 0, 0
+    for start, end in spans:
+        line += text.count("\n", previous, start)
+        pieces.append(text[previous:start])
+        segments = [text[pos:min(pos + segment_length, end)] for pos in range(start, end, segment_length)]
+        pieces.append("\n".join(segments))
+        long_lines.append(line)
+        segment_counts.append(len(segments))
+        previous = end
+    pieces.append(text[previous:])
+    line_count = line + text.count("\n", previous) + 1
+    return "".join(pieces), LineSegments(np.array(long_lines), np.array(segment_counts), line_count, segment_length)
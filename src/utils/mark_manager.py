@@ -1,65 +1,181 @@
+from bisect import bisect_left, insort
 from typing import Dict, List, Optional
+import hashlib
 import json
 import os
 from datetime import datetime
+from src.utils.const import CACHE_DIR
+
+# 标记的存储目录：每个日志文件一个日志式（append-only）存储文件
+MARKS_DIR = os.path.join(CACHE_DIR, "marks")
+# 存储文件中的操作数超过 max(COMPACT_MIN_OPS, 现有标记数 * 2) 时压缩
+COMPACT_MIN_OPS = 500
+
+
+def marks_store_file(filepath: str) -> str:
+    """日志文件对应的标记存储文件"""
+    key = hashlib.sha1(os.path.abspath(filepath).encode("utf-8")).hexdigest()
+    return os.path.join(MARKS_DIR, key + ".jsonl")
+
+
+class FileMarks:
+    """一个文件的标记：按行号索引的字典加上有序的行号列表"""
+
+    def __init__(self):
+        self.by_line: Dict[int, Dict] = {}
+        self.lines: List[int] = []  # 升序
+        self.journal_ops = 0        # 存储文件中的操作数，用于决定何时压缩
+
+    def add(self, mark: Dict) -> bool:
+        line_number = mark["line_number"]
+        if line_number in self.by_line:
+            return False
+        self.by_line[line_number] = mark
+        insort(self.lines, line_number)
+        return True
+
+    def remove(self, line_number: int) -> bool:
+        if self.by_line.pop(line_number, None) is None:
+            return False
+        del self.lines[bisect_left(self.lines, line_number)]
+        return True
+
 
 class MarkManager:
+    """管理每个文件的行标记
+
+    查询按行号索引（O(1)），范围查询在有序行号上二分（O(log n)）。
+    调用 load_marks() 之后，该文件的每次增删都会追加一条记录到 caches/marks 下的
+    存储文件，操作数过多时整体重写（压缩），不会写入日志文件所在的目录。
+    """
+
     def __init__(self):
-        self.marks: Dict[str, List[Dict]] = {}  # filepath -> marks list
-        
+        self.marks: Dict[str, FileMarks] = {}  # filepath -> marks
+        self._persistent = set()  # 已加载、需要写入存储文件的文件
+
+    def _file_marks(self, filepath: str) -> FileMarks:
+        file_marks = self.marks.get(filepath)
+        if file_marks is None:
+            file_marks = self.marks[filepath] = FileMarks()
+        return file_marks
+
     def add_mark(self, filepath: str, line_number: int, content: str, note: str = "") -> bool:
-        """添加标记"""
-        if filepath not in self.marks:
-            self.marks[filepath] = []
-            
-        # 检查是否已存在相同行的标记
-        for mark in self.marks[filepath]:
-            if mark["line_number"] == line_number:
-                return False
-                
+        """添加标记，该行已有标记时返回 False"""
         mark = {
             "line_number": line_number,
             "content": content,
             "timestamp": datetime.now().isoformat(),
             "note": note
         }
-        self.marks[filepath].append(mark)
+        if not self._file_marks(filepath).add(mark):
+            return False
+        self._append(filepath, {"op": "add", **mark})
         return True
-        
+
     def remove_mark(self, filepath: str, line_number: int) -> bool:
         """删除标记"""
-        if filepath not in self.marks:
+        file_marks = self.marks.get(filepath)
+        if file_marks is None or not file_marks.remove(line_number):
             return False
-            
-        for i, mark in enumerate(self.marks[filepath]):
-            if mark["line_number"] == line_number:
-                self.marks[filepath].pop(i)
-                return True
-        return False
-        
+        self._append(filepath, {"op": "remove", "line_number": line_number})
+        return True
+
     def get_marks(self, filepath: str) -> List[Dict]:
-        """获取文件的所有标记"""
-        return self.marks.get(filepath, [])
-        
+        """获取文件的所有标记（按行号排序）"""
+        file_marks = self.marks.get(filepath)
+        if file_marks is None:
+            return []
+        return [file_marks.by_line[line_number] for line_number in file_marks.lines]
+
+    def get_mark(self, filepath: str, line_number: int) -> Optional[Dict]:
+        """获取某一行的标记，没有时返回 None"""
+        file_marks = self.marks.get(filepath)
+        return file_marks.by_line.get(line_number) if file_marks else None
+
     def is_marked(self, filepath: str, line_number: int) -> bool:
         """检查行是否已标记"""
-        if filepath not in self.marks:
-            return False
-            
-        for mark in self.marks[filepath]:
-            if mark["line_number"] == line_number:
-                return True
-        return False
-        
+        file_marks = self.marks.get(filepath)
+        return file_marks is not None and line_number in file_marks.by_line
+
+    def mark_count(self, filepath: str) -> int:
+        file_marks = self.marks.get(filepath)
+        return len(file_marks.lines) if file_marks else 0
+
+    def line_numbers(self, filepath: str) -> List[int]:
+        """文件中所有已标记的行号（升序，只读）"""
+        file_marks = self.marks.get(filepath)
+        return file_marks.lines if file_marks else []
+
+    def marks_in_range(self, filepath: str, start: int, end: int) -> List[int]:
+        """[start, end) 范围内已标记的行号（升序）"""
+        lines = self.line_numbers(filepath)
+        return lines[bisect_left(lines, start):bisect_left(lines, end)]
+
     def save_marks(self, filepath: str):
-        """保存标记到文件"""
-        marks_file = os.path.join(os.path.dirname(filepath), ".marks.json")
-        with open(marks_file, 'w', encoding='utf-8') as f:
-            json.dump(self.marks, f, ensure_ascii=False, indent=2)
-            
+        """压缩存储文件：用当前的所有标记重写"""
+        file_marks = self._file_marks(filepath)
+        store_file = marks_store_file(filepath)
+        os.makedirs(MARKS_DIR, exist_ok=True)
+        temp_file = store_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"filepath": os.path.abspath(filepath)}, ensure_ascii=False) + "\n")
+            for line_number in file_marks.lines:
+                f.write(json.dumps({"op": "add", **file_marks.by_line[line_number]}, ensure_ascii=False) + "\n")
+        os.replace(temp_file, store_file)
+        file_marks.journal_ops = len(file_marks.lines)
+        self._persistent.add(filepath)
+
     def load_marks(self, filepath: str):
-        """从文件加载标记"""
-        marks_file = os.path.join(os.path.dirname(filepath), ".marks.json")
-        if os.path.exists(marks_file):
-            with open(marks_file, 'r', encoding='utf-8') as f:
-                self.marks = json.load(f) 
\ No newline at end of file
+        """从存储文件加载文件的标记，之后的增删会自动保存
+
+        没有存储文件时会导入旧版本保存在日志目录下 .marks.json 中的标记。
+        """
+        file_marks = FileMarks()
+        self.marks[filepath] = file_marks
+        store_file = marks_store_file(filepath)
+        if os.path.exists(store_file):
+            with open(store_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 写入中断留下的不完整记录
+                    op = record.pop("op", None)
+                    if op == "add":
+                        file_marks.add(record)
+                    elif op == "remove":
+                        file_marks.remove(record["line_number"])
+                    file_marks.journal_ops += op is not None
+            self._persistent.add(filepath)
+            if file_marks.journal_ops > max(COMPACT_MIN_OPS, len(file_marks.lines) * 2):
+                self.save_marks(filepath)
+        else:
+            for mark in self._load_legacy_marks(filepath):
+                file_marks.add(mark)
+            if file_marks.lines:
+                self.save_marks(filepath)
+            self._persistent.add(filepath)
+
+    def _load_legacy_marks(self, filepath: str) -> List[Dict]:
+        legacy_file = os.path.join(os.path.dirname(filepath), ".marks.json")
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                marks = json.load(f).get(filepath, [])
+            return [mark for mark in marks if isinstance(mark, dict) and "line_number" in mark]
+        except (OSError, ValueError, AttributeError):
+            return []
+
+    def _append(self, filepath: str, record: Dict):
+        """把一次增删追加到存储文件，必要时压缩"""
+        if filepath not in self._persistent:
+            return
+        file_marks = self.marks[filepath]
+        try:
+            os.makedirs(MARKS_DIR, exist_ok=True)
+            with open(marks_store_file(filepath), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file_marks.journal_ops += 1
+            if file_marks.journal_ops > max(COMPACT_MIN_OPS, len(file_marks.lines) * 2):
+                self.save_marks(filepath)
+        except OSError:
+            pass
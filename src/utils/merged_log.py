@@ -0,0 +1,279 @@
+import heapq
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.bytes_search import ByteSearcher, is_ascii_compatible
+from src.utils.file_utils import detect_encoding, open_log_file, read_file_bytes_chunks
+from src.utils.filter_engine import FilterEngine
+from src.utils.log_fields import SAMPLE_LINES
+from src.utils.log_index import LogIndex
+
+# 读取行内容时的缓存块大小（行数）和缓存块数量
+_BLOCK_LINES = 256
+_MAX_BLOCKS = 64
+
+
+@dataclass
+class MergedSource:
+    """合并视图中的一个源文件"""
+    filepath: str
+    encoding: str
+    offsets: np.ndarray   # 每行的起始字节偏移，末尾附加文件长度，因此长度为行数 + 1
+    keys: np.ndarray      # 每行的排序键（秒），单调不减
+
+    @property
+    def line_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.filepath)
+
+
+def sort_keys(timestamps: np.ndarray) -> np.ndarray:
+    """把每行的时间戳转换为单调不减的排序键
+
+    没有时间戳的行（如堆栈、多行消息的后续行）沿用上一行的时间，保持与上一行相邻；
+    开头没有时间戳的行排在最前面。个别时间倒退的行也沿用之前的最大时间，
+    因此每个文件内部的行顺序在合并后保持不变。
+    """
+    if not len(timestamps):
+        return np.empty(0, dtype=np.float64)
+    valid = ~np.isnan(timestamps)
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(timestamps)), 0))
+    keys = timestamps[last_valid]
+    keys[np.isnan(keys)] = -np.inf
+    return np.maximum.accumulate(keys)
+
+
+def merge_order(keys: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """按排序键对多个文件做 k 路堆归并
+
+    堆中每个文件只保存一个位置。弹出堆顶的文件后，用二分查找一次取出该文件中
+    不晚于下一个堆顶的所有连续行，因此时间上不交错的大段日志只需要一次堆操作。
+    键相同时按文件顺序排列，结果与逐行归并完全一致。
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 合并后每行的 (文件下标, 文件内行号)
+    """
+    heap = [(float(key[0]), source, 0) for source, key in enumerate(keys) if len(key)]
+    heapq.heapify(heap)
+    sources: List[np.ndarray] = []
+    lines: List[np.ndarray] = []
+    while heap:
+        _, source, pos = heapq.heappop(heap)
+        key = keys[source]
+        if heap:
+            bound, other, _ = heap[0]
+            end = int(np.searchsorted(key, bound, side="right" if source < other else "left"))
+            end = max(end, pos + 1)
+        else:
+            end = len(key)
+        sources.append(np.full(end - pos, source, dtype=np.int32))
+        lines.append(np.arange(pos, end, dtype=np.int64))
+        if end < len(key):
+            heapq.heappush(heap, (float(key[end]), source, end))
+    if not sources:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+    return np.concatenate(sources), np.concatenate(lines)
+
+
+def _decode_line(raw: bytes, encoding: str) -> str:
+    if raw.endswith(b"\n"):
+        raw = raw[:-1]
+    if raw.endswith(b"\r"):
+        raw = raw[:-1]
+    return raw.decode(encoding, errors="replace")
+
+
+class MergedLog:
+    """多个日志文件按时间合并的虚拟视图
+
+    每个文件只建立行偏移和时间戳索引，文件内容不会被读入内存；合并结果只是
+    两个数组（来源文件、文件内行号），行内容在需要显示时才按偏移从文件中读取。
+    """
+
+    def __init__(self, filepaths: List[str]):
+        self.filepaths = list(filepaths)
+        self.sources: List[MergedSource] = []
+        self.line_sources = np.empty(0, dtype=np.int32)   # 合并后每行的来源文件下标
+        self.line_numbers = np.empty(0, dtype=np.int64)   # 合并后每行在来源文件中的行号
+        self._handles: Dict[int, BinaryIO] = {}
+        self._blocks: "OrderedDict[int, List[str]]" = OrderedDict()
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_numbers)
+
+    def build(self, progress_callback: Optional[Callable[[int, int], None]] = None,
+              is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """为每个文件建立索引并合并
+
+        Args:
+            progress_callback: 进度回调，参数为 (已读取的字节数, 总字节数)，压缩文件按压缩前的大小估算
+
+        Returns:
+            bool: 是否完成（被取消时返回 False）
+
+        Raises:
+            ValueError: 文件使用 UTF-16/32 等不兼容 ASCII 的编码
+        """
+        total = sum(os.path.getsize(filepath) for filepath in self.filepaths)
+        done = 0
+        sources = []
+        for filepath in self.filepaths:
+            encoding = detect_encoding(filepath)
+            if encoding.startswith(("utf-16", "utf-32")):
+                raise ValueError(f"合并视图不支持 {encoding} 编码的文件：{filepath}")
+            if encoding == "utf-8":
+                encoding = "utf-8-sig"  # 兼容没有被检测到的 BOM
+
+            index = LogIndex()
+            for chunk, _ in read_file_bytes_chunks(filepath):
+                if is_cancelled and is_cancelled():
+                    return False
+                index.feed(chunk)
+                done += len(chunk)
+                if progress_callback:
+                    progress_callback(min(done, total), total)
+            index.finish()
+
+            offsets = np.append(index.offsets, index.byte_count)
+            sources.append(MergedSource(filepath, encoding, offsets, sort_keys(index.timestamps)))
+
+        self.close()
+        self.sources = sources
+        self.line_sources, self.line_numbers = merge_order([source.keys for source in sources])
+        return True
+
+    def source_of(self, row: int) -> Tuple[MergedSource, int]:
+        """合并后的第 row 行对应的 (源文件, 文件内行号)"""
+        return self.sources[int(self.line_sources[row])], int(self.line_numbers[row])
+
+    def timestamp(self, row: int) -> float:
+        """合并后的第 row 行的排序时间（秒），开头没有时间戳的行为 -inf"""
+        source, line_number = self.source_of(row)
+        return float(source.keys[line_number])
+
+    def get_line(self, row: int) -> str:
+        """读取合并后的第 row 行（带缓存）"""
+        block_index = row // _BLOCK_LINES
+        block = self._blocks.get(block_index)
+        if block is None:
+            start = block_index * _BLOCK_LINES
+            block = self.read_lines(start, min(_BLOCK_LINES, self.line_count - start))
+            self._blocks[block_index] = block
+            if len(self._blocks) > _MAX_BLOCKS:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(block_index)
+        return block[row - block_index * _BLOCK_LINES]
+
+    def read_lines(self, start: int, count: int) -> List[str]:
+        """读取合并后的 [start, start + count) 行
+
+        来自同一文件的连续行只读取一次。
+        """
+        sources = self.line_sources[start:start + count]
+        numbers = self.line_numbers[start:start + count]
+        result: List[str] = []
+        i = 0
+        while i < len(numbers):
+            source_index = int(sources[i])
+            j = i + 1
+            while j < len(numbers) and sources[j] == source_index and numbers[j] == numbers[j - 1] + 1:
+                j += 1
+            source = self.sources[source_index]
+            first, last = int(numbers[i]), int(numbers[j - 1])
+            handle = self._get_handle(source_index)
+            handle.seek(int(source.offsets[first]))
+            data = handle.read(int(source.offsets[last + 1] - source.offsets[first]))
+            base = int(source.offsets[first])
+            for line_number in range(first, last + 1):
+                raw = data[int(source.offsets[line_number]) - base:int(source.offsets[line_number + 1]) - base]
+                result.append(_decode_line(raw, source.encoding))
+            i = j
+        return result
+
+    def _get_handle(self, source_index: int) -> BinaryIO:
+        handle = self._handles.get(source_index)
+        if handle is None:
+            handle = open_log_file(self.sources[source_index].filepath)
+            self._handles[source_index] = handle
+        return handle
+
+    def iter_source_lines(self, source_index: int) -> Iterator[str]:
+        """按顺序读取一个源文件中已索引的所有行"""
+        source = self.sources[source_index]
+        with open_log_file(source.filepath) as f:
+            for _ in range(source.line_count):
+                yield _decode_line(f.readline(), source.encoding)
+
+    def filter(self, engine: FilterEngine,
+               progress_callback: Optional[Callable[[int, int], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[np.ndarray]:
+        """用 FilterEngine 过滤合并后的日志
+
+        每个文件顺序扫描一次得到命中行的标记，再按合并顺序映射，不需要拼接文件内容。
+        兼容 ASCII 的编码直接在字节上搜索，只有候选行会被解码。
+
+        Returns:
+            Optional[np.ndarray]: 命中行在合并视图中的行号（升序），被取消时返回 None
+        """
+        total = self.line_count
+        done = 0
+        hits: List[np.ndarray] = []
+        for source_index, source in enumerate(self.sources):
+            def report(line_number: int, base: int = done):
+                if progress_callback:
+                    progress_callback(base + line_number, total)
+
+            hit = self._filter_source(source_index, engine, report, is_cancelled)
+            if hit is None:
+                return None
+            done += source.line_count
+            hits.append(hit)
+
+        mask = np.zeros(total, dtype=bool)
+        for source_index, hit in enumerate(hits):
+            rows = np.flatnonzero(self.line_sources == source_index)
+            mask[rows] = hit[self.line_numbers[rows]]
+        return np.flatnonzero(mask)
+
+    def _filter_source(self, source_index: int, engine: FilterEngine, progress_callback: Callable[[int], None],
+                       is_cancelled: Optional[Callable[[], bool]]) -> Optional[np.ndarray]:
+        """一个源文件中每行是否命中，被取消时返回 None"""
+        source = self.sources[source_index]
+        hit = np.zeros(source.line_count, dtype=bool)
+        if is_ascii_compatible(source.encoding):
+            # 行号按 \n 计算，与 LogIndex 建立的行偏移一致
+            searcher = ByteSearcher([engine], source.encoding)
+            for line_number, _, _ in searcher.search_file(source.filepath, is_cancelled,
+                                                          progress_callback, universal_newlines=False):
+                if line_number >= source.line_count:
+                    break  # 建立索引之后追加的内容
+                hit[line_number] = True
+        else:
+            engine.begin_source("\n".join(islice(self.iter_source_lines(source_index), SAMPLE_LINES)))
+            for line_number, line in enumerate(self.iter_source_lines(source_index)):
+                if engine.match_line(line):
+                    hit[line_number] = True
+                if line_number % 10000 == 0:
+                    if is_cancelled and is_cancelled():
+                        return None
+                    progress_callback(line_number)
+        if is_cancelled and is_cancelled():
+            return None
+        return hit
+
+    def close(self):
+        """关闭打开的文件并清空缓存"""
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+        self._blocks.clear()
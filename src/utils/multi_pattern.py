@@ -0,0 +1,146 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 一条规则：(关键字, 匹配选项)
+PatternRule = Tuple[str, dict]
+
+
+def normalize_options(options: Optional[dict]) -> dict:
+    """统一匹配选项的键名：保存的关键字里全词匹配曾经叫 word_only"""
+    options = options or {}
+    return {
+        "case_sensitive": bool(options.get("case_sensitive", False)),
+        "whole_word": bool(options.get("whole_word", options.get("word_only", False))),
+        "use_regex": bool(options.get("use_regex", False)),
+    }
+
+
+class MultiPatternMatcher:
+    """把多个关键字合并成少数几个正则，扫描一遍就能得到每一处匹配属于哪个关键字
+
+    - 字面关键字按是否区分大小写分成两组，每组合并成一个前瞻多选正则，逐个位置找出
+      从该位置开始的最长关键字，再检查它的前缀中哪些也是关键字。前瞻在每个位置都会
+      命中，同一个关键字从上一次匹配结束之前开始的匹配（如 "AA" 在 "AAA" 中的第二次）
+      丢弃，与正则和全词匹配一样互不重叠。这样每个关键字的次数与单独用 re.finditer
+      查找时相同（包括互相包含的关键字）；单独过滤普通文本时逐个位置查找，只有自身
+      重叠的关键字计数不同。不区分大小写的一组在转成小写的行上匹配，与 FilterEngine
+      一致。多选部分不使用命名分组：命名分组会让 re 无法使用前缀优化，慢一个数量级。
+    - 正则关键字各自编译，在同一次扫描中逐个匹配（合并成一个正则时同一位置只能记
+      一个关键字，互相重叠的正则关键字会少计）；无效的正则按普通文本处理。
+    - 匹配效果相同的规则（文本和选项都相同，或不区分大小写时只有大小写不同）只匹配
+      一次，match_line 中记在第一个规则上，count_lines 中每个规则都计数。
+    """
+
+    def __init__(self, rules: Iterable[PatternRule]):
+        self.rules: List[PatternRule] = [(keyword, normalize_options(options))
+                                         for keyword, options in rules]
+        # 字面关键字：(前瞻正则, 是否在小写行上匹配, 匹配文本 -> (规则序号, [(前缀规则序号, 前缀正则)]))
+        self._literal_scans: List[Tuple[re.Pattern, bool, Dict[str, Tuple[int, list]]]] = []
+        self._regexes: List[Tuple[int, re.Pattern]] = []  # 正则关键字
+        self._duplicates: Dict[int, List[int]] = {}  # 规则序号 -> 与它相同的后续规则
+        self._compile()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _compile(self):
+        seen: Dict[tuple, int] = {}
+        literals = {True: {}, False: {}}  # 是否不区分大小写 -> {(文本, 全词): (规则序号, 正则片段)}
+        for index, (keyword, options) in enumerate(self.rules):
+            if not keyword:
+                continue
+            key = (keyword, options["case_sensitive"], options["whole_word"], options["use_regex"])
+            if key in seen:
+                self._duplicates.setdefault(seen[key], []).append(index)
+                continue
+            seen[key] = index
+            if options["use_regex"]:
+                try:
+                    flags = 0 if options["case_sensitive"] else re.IGNORECASE
+                    self._regexes.append((index, re.compile(keyword, flags)))
+                    continue
+                except re.error:
+                    # 与 FilterEngine 一致：无效的正则按普通文本匹配
+                    options = dict(options, use_regex=False)
+            fold = not options["case_sensitive"]
+            text = keyword.lower() if fold else keyword
+            existing = literals[fold].get((text, options["whole_word"]))
+            if existing is not None:
+                # 只有大小写不同的不区分大小写关键字
+                self._duplicates.setdefault(existing[0], []).append(index)
+                continue
+            body = re.escape(text)
+            if options["whole_word"]:
+                body = r'\b' + body + r'\b'
+            literals[fold][(text, options["whole_word"])] = (index, body)
+
+        for fold, entries in literals.items():
+            if entries:
+                self._literal_scans.append(self._compile_literals(fold, entries))
+
+    @staticmethod
+    def _compile_literals(fold: bool, entries: Dict[Tuple[str, bool], Tuple[int, str]]):
+        # 较长的排在前面；文本相同时不要求全词的在前（它能匹配时全词的不一定能匹配）
+        ordered = sorted(entries.items(), key=lambda item: (-len(item[0][0]), item[0][1], item[1][0]))
+        pattern = re.compile("(?=(" + "|".join(body for _, (_, body) in ordered) + "))")
+        by_text: Dict[str, List[Tuple[int, re.Pattern]]] = {}
+        for (text, _), (index, body) in ordered:
+            by_text.setdefault(text, []).append((index, re.compile(body)))
+        lookup = {}
+        for text, candidates in by_text.items():
+            # 多选正则命中 text 时记在 candidates[0] 上，其余文本相同的和所有更短的前缀都需要再检查
+            prefixes = list(candidates[1:])
+            for length in range(len(text) - 1, 0, -1):
+                prefixes.extend(by_text.get(text[:length], ()))
+            lookup[text] = (candidates[0][0], prefixes)
+        return pattern, fold, lookup
+
+    def match_line(self, line: str) -> List[Tuple[int, int, int]]:
+        """一行中的所有匹配，返回 [(start, end, 规则序号)]，按位置排序"""
+        matches = []
+        lower_line = None
+        for pattern, fold, lookup in self._literal_scans:
+            if fold:
+                if lower_line is None:
+                    lower_line = line.lower()
+                text = lower_line
+            else:
+                text = line
+            ends: Dict[int, int] = {}  # 规则序号 -> 上一次匹配的结束位置
+            for match in pattern.finditer(text):
+                start = match.start()
+                matched = match.group(1)
+                index, prefixes = lookup[matched]
+                if start >= ends.get(index, 0):
+                    ends[index] = start + len(matched)
+                    matches.append((start, start + len(matched), index))
+                for prefix_index, prefix_pattern in prefixes:
+                    if start < ends.get(prefix_index, 0):
+                        continue
+                    prefix_match = prefix_pattern.match(text, start)
+                    if prefix_match is not None:
+                        ends[prefix_index] = prefix_match.end()
+                        matches.append((start, prefix_match.end(), prefix_index))
+        for index, pattern in self._regexes:
+            for match in pattern.finditer(line):
+                start, end = match.span()
+                if start != end:
+                    matches.append((start, end, index))
+        if len(matches) > 1:
+            matches.sort()
+        return matches
+
+    def count_lines(self, lines: Iterable[str]) -> List[int]:
+        """每个规则在这些行中的匹配次数"""
+        counts = [0] * len(self.rules)
+        for line in lines:
+            for _, _, index in self.match_line(line):
+                counts[index] += 1
+        return self.fill_duplicate_counts(counts)
+
+    def fill_duplicate_counts(self, counts: List[int]) -> List[int]:
+        """把只匹配一次的重复规则的次数复制给与它相同的其他规则"""
+        for index, duplicates in self._duplicates.items():
+            for duplicate in duplicates:
+                counts[duplicate] = counts[index]
+        return counts
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Dict, List, Optional
+
+# 延迟直方图的桶上界（毫秒），最后一个桶收集所有更慢的操作
+HISTOGRAM_BOUNDS_MS = [0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+
+# 设置该环境变量为 1 时启动即开启统计
+PROFILE_ENV = "SC_LOG_PROFILE"
+
+_NULL_TIMER = nullcontext()
+
+
+class LatencyHistogram:
+    """一个计时项的耗时统计"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS_MS, seconds * 1000)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """按直方图估算的分位数（毫秒），取所在桶的上界，不超过最大值"""
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                bound = HISTOGRAM_BOUNDS_MS[index] if index < len(HISTOGRAM_BOUNDS_MS) else float("inf")
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 4) if self.count else 0.0,
+            "min_ms": round(self.min * 1000, 4) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 4),
+            "p50_ms": round(self.percentile(0.5), 4),
+            "p95_ms": round(self.percentile(0.95), 4),
+            "histogram": {label: count for label, count in zip(histogram_labels(), self.buckets)},
+        }
+
+
+def histogram_labels() -> List[str]:
+    """直方图各个桶的名称，如 "<=0.5ms"、">5000ms" """
+    return [f"<={bound:g}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]:g}ms"]
+
+
+class Profiler:
+    """本次运行中各热点操作的计时和计数
+
+    默认关闭；关闭时 timer() 返回共享的空上下文，count()/record() 直接返回，
+    开销只有一次属性判断。可以通过环境变量 SC_LOG_PROFILE=1 或开发者面板开启。
+    计时项按 "模块.操作" 命名，如 "filter.filter_text"、"highlight.block"。
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._timers: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+
+    def timer(self, name: str):
+        """计时上下文：with profiler.timer("load.read"): ..."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """记录一次耗时（秒）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._timers.get(name)
+            if histogram is None:
+                histogram = self._timers[name] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def count(self, name: str, value: int = 1):
+        """累加计数器"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        """清空已收集的数据"""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._started = time.time()
+
+    def snapshot(self) -> dict:
+        """当前统计结果的副本（可直接序列化为 JSON）"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+                "timers": {name: histogram.to_dict() for name, histogram in sorted(self._timers.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def dump_json(self, filepath: str):
+        """把统计结果写入 JSON 文件"""
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+def profiled(name: Optional[str] = None):
+    """函数计时装饰器，默认以 "模块名.函数名" 命名"""
+    def decorator(func):
+        timer_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler._timed(timer_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 全局实例
+profiler = Profiler(os.environ.get(PROFILE_ENV, "") in ("1", "true", "yes"))
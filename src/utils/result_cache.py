@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.const import CACHE_DIR
+from src.utils.state_writer import write_json_atomic
+
+# 指定结果缓存目录的环境变量（例如性能测试把缓存放在临时目录中）
+RESULT_CACHE_ENV = "SC_LOG_RESULT_CACHE_DIR"
+# 结果缓存目录，每个文件内容（指纹）一个子目录
+RESULT_CACHE_DIR = os.environ.get(RESULT_CACHE_ENV) or os.path.join(CACHE_DIR, "results")
+# 缓存占用的磁盘空间上限，超出后删除最久没有使用的文件的缓存
+DISK_QUOTA = 2 * 1024 ** 3
+# 每个文件保留的最近过滤结果数
+MAX_FILTER_RESULTS = 32
+# 匹配项超过这个数的过滤结果不缓存（重新过滤并不比读取缓存慢多少，却占用大量磁盘空间）
+MAX_CACHED_MATCHES = 5000000
+# 计算指纹时从文件头、中间和末尾各读取的字节数
+SAMPLE_SIZE = 64 * 1024
+# 缓存格式版本，格式变化后旧的缓存自动失效
+CACHE_VERSION = 1
+
+_META_FILE = "meta.json"
+_evict_lock = threading.Lock()
+
+
+def file_fingerprint(filepath: str) -> str:
+    """文件内容的指纹：大小、修改时间，以及文件头、中间和末尾各一块数据的哈希
+
+    只读取三小块数据，几 GB 的文件也能立即算出；文件被追加或修改后指纹随之改变。
+    """
+    stat = os.stat(filepath)
+    digest = hashlib.sha1(f"{CACHE_VERSION}:{stat.st_size}:{stat.st_mtime_ns}".encode("ascii"))
+    with open(filepath, "rb") as f:
+        for offset in sorted({0, max(stat.st_size // 2 - SAMPLE_SIZE // 2, 0), max(stat.st_size - SAMPLE_SIZE, 0)}):
+            f.seek(offset)
+            digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for entry in os.scandir(path):
+        try:
+            total += entry.stat().st_size
+        except OSError:
+            pass
+    return total
+
+
+def evict(directory: str = RESULT_CACHE_DIR, quota: int = DISK_QUOTA, keep: Optional[str] = None):
+    """按最近使用时间删除文件的缓存，直到总大小不超过 quota；keep 为不删除的指纹（正在使用的文件）"""
+    with _evict_lock:
+        try:
+            entries = [entry for entry in os.scandir(directory) if entry.is_dir()]
+        except OSError:
+            return
+        sizes = []
+        for entry in entries:
+            try:
+                sizes.append((entry.stat().st_mtime, entry.path, entry.name, _directory_size(entry.path)))
+            except OSError:
+                pass
+        total = sum(size for _, _, _, size in sizes)
+        for _, path, name, size in sorted(sizes):
+            if total <= quota:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+class ResultCache:
+    """一个文件内容的计算结果缓存：编码、字段索引（时间、级别等列）和最近的过滤结果
+
+    缓存按文件指纹（见 file_fingerprint()）存放在 caches/results/<指纹>/ 下，
+    数组保存为 .npz，其余信息保存在 meta.json 中。文件内容变化后指纹不同，旧的缓存不再被使用，
+    最终按最近使用时间被淘汰（总大小上限 DISK_QUOTA）。读写失败时当作没有缓存，不影响正常使用。
+    可以在工作线程中调用。
+    """
+
+    def __init__(self, fingerprint: str, directory: str = RESULT_CACHE_DIR, quota: int = DISK_QUOTA):
+        self.fingerprint = fingerprint
+        self.directory = directory
+        self.quota = quota
+        self.path = os.path.join(directory, fingerprint)
+        self._lock = threading.Lock()
+        self._meta = self._read_meta()
+
+    @classmethod
+    def for_file(cls, filepath: str) -> Optional["ResultCache"]:
+        """打开文件对应的缓存，文件无法读取时返回 None"""
+        try:
+            return cls(file_fingerprint(filepath))
+        except OSError:
+            return None
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(os.path.join(self.path, _META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") == CACHE_VERSION:
+                return meta
+        except (OSError, ValueError):
+            pass
+        return {"version": CACHE_VERSION, "entries": {}, "filters": []}
+
+    def _write_meta(self):
+        try:
+            write_json_atomic(os.path.join(self.path, _META_FILE), self._meta)
+        except OSError:
+            pass
+
+    def _touch(self):
+        """更新最近使用时间，淘汰时按目录的修改时间排序"""
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return self._meta.get("encoding")
+
+    def set_encoding(self, encoding: str):
+        """记录文件的编码：只修改内存中的信息，保存结果时一起写入，只是打开文件时不写磁盘"""
+        with self._lock:
+            self._meta["encoding"] = encoding
+
+    def load(self, kind: str, key: str) -> Optional[Tuple[dict, Dict[str, np.ndarray]]]:
+        """读取保存的结果 (附加信息, 数组)，没有缓存时返回 None
+
+        Args:
+            kind: 结果的种类，如 "fields"、"filter"
+            key: 计算条件的文本描述（解析器、过滤表达式和选项等），条件不同的结果分别保存
+        """
+        return self._load(self._entry_name(kind, key))
+
+    def save(self, kind: str, key: str, arrays: Dict[str, np.ndarray], info: Optional[dict] = None):
+        """保存结果，info 为可以 JSON 序列化的附加信息"""
+        if self._save(self._entry_name(kind, key), arrays, info):
+            evict(self.directory, self.quota, keep=self.fingerprint)
+
+    def _load(self, name: str) -> Optional[Tuple[dict, Dict[str, np.ndarray]]]:
+        with self._lock:
+            info = self._meta["entries"].get(name)
+            if info is None:
+                return None
+            try:
+                with np.load(os.path.join(self.path, name + ".npz"), allow_pickle=False) as data:
+                    arrays = {key: data[key] for key in data.files}
+            except (OSError, ValueError):
+                del self._meta["entries"][name]
+                return None
+            if name in self._meta["filters"]:
+                # 最近使用的过滤结果移到末尾
+                self._meta["filters"].remove(name)
+                self._meta["filters"].append(name)
+            self._touch()
+            return info, arrays
+
+    def _save(self, name: str, arrays: Dict[str, np.ndarray], info: Optional[dict] = None) -> bool:
+        """写入一项结果，返回是否成功（不淘汰其它文件的缓存）"""
+        with self._lock:
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                fd, temp_file = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=self.path)
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        np.savez(f, **arrays)
+                    os.replace(temp_file, os.path.join(self.path, name + ".npz"))
+                except BaseException:
+                    try:
+                        os.remove(temp_file)
+                    except OSError:
+                        pass
+                    raise
+            except OSError:
+                return False
+            self._meta["entries"][name] = info or {}
+            self._write_meta()
+            self._touch()
+            return True
+
+    def load_filter(self, key: str) -> Optional[Tuple[dict, Dict[str, np.ndarray]]]:
+        """读取过滤条件 key 的结果"""
+        return self.load("filter", key)
+
+    def save_filter(self, key: str, arrays: Dict[str, np.ndarray], info: Optional[dict] = None):
+        """保存过滤结果，每个文件只保留最近使用的 MAX_FILTER_RESULTS 个
+
+        淘汰其它文件的缓存时不会删除正在使用的文件（keep），所以这个文件自己的缓存超出 quota 时
+        先删除它最久没有使用的过滤结果（至少保留刚保存的一个），总大小才有上限。
+        """
+        name = self._entry_name("filter", key)
+        if not self._save(name, arrays, info):
+            return
+        with self._lock:
+            filters: List[str] = self._meta["filters"]
+            if name in filters:
+                filters.remove(name)
+            filters.append(name)
+            try:
+                size = _directory_size(self.path)
+            except OSError:
+                size = 0
+            while len(filters) > MAX_FILTER_RESULTS or (len(filters) > 1 and size > self.quota):
+                stale = filters.pop(0)
+                self._meta["entries"].pop(stale, None)
+                stale_path = os.path.join(self.path, stale + ".npz")
+                try:
+                    stale_size = os.path.getsize(stale_path)
+                    os.remove(stale_path)
+                    size -= stale_size
+                except OSError:
+                    pass
+            self._write_meta()
+        evict(self.directory, self.quota, keep=self.fingerprint)
+
+    @staticmethod
+    def _entry_name(kind: str, key: str) -> str:
+        return kind + "-" + hashlib.sha1(key.encode("utf-8")).hexdigest()
@@ -0,0 +1,124 @@
+import getpass
+import hashlib
+import json
+import os
+from typing import List, Optional
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from src.utils.logger import Logger
+
+# 连接已运行实例的等待时间（毫秒）：本机连接通常在 1 毫秒内完成，没有实例时立即失败
+CONNECT_TIMEOUT_MS = 200
+# 等待已运行实例确认收到的时间（毫秒）
+ACK_TIMEOUT_MS = 2000
+# 一条消息的长度上限，超过时断开连接
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+
+def server_name() -> str:
+    """本机、当前用户、当前程序目录对应的服务名，不同用户和不同副本互不干扰"""
+    app_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = ""
+    key = hashlib.sha1(f"{user}:{app_root}".encode("utf-8")).hexdigest()[:16]
+    return f"sc_log_tool_{key}"
+
+
+def send_to_running_instance(filepaths: List[str], name: Optional[str] = None) -> bool:
+    """把要打开的文件交给已运行的实例
+
+    不需要 QApplication，可以在创建界面之前调用。
+
+    Returns:
+        bool: 已运行的实例确认收到时返回 True；没有运行中的实例时返回 False
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    message = json.dumps({"files": filepaths}, ensure_ascii=False) + "\n"
+    socket.write(message.encode("utf-8"))
+    if not socket.waitForBytesWritten(ACK_TIMEOUT_MS):
+        return False
+    # 等待确认，避免对方没有读完消息时就当作已经交接
+    reply = b""
+    while b"\n" not in reply and socket.waitForReadyRead(ACK_TIMEOUT_MS):
+        reply += bytes(socket.readAll())
+    socket.disconnectFromServer()
+    return reply.startswith(b"ok")
+
+
+def _server_alive(name: str) -> bool:
+    """是否有实例正在监听 name"""
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    alive = socket.waitForConnected(CONNECT_TIMEOUT_MS)
+    socket.abort()
+    return alive
+
+
+class SingleInstanceServer(QObject):
+    """接收后续启动的实例转交过来的文件
+
+    每个连接发送一行 JSON：{"files": [绝对路径, ...]}，收到后回复 "ok"。
+    """
+    filesReceived = pyqtSignal(list)
+
+    def __init__(self, name: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.name = name or server_name()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        self._buffers = {}  # socket -> 已收到的字节
+
+    def listen(self) -> bool:
+        """开始监听，失败时（如另一个实例刚刚启动）返回 False"""
+        # 先确认没有实例在监听：设置了 socket 选项时 listen 会用新的 socket 文件
+        # 替换已有的文件，不检查就会顶掉正在运行的实例
+        if _server_alive(self.name):
+            Logger.get_logger().warning("单实例服务启动失败: 另一个实例正在监听")
+            return False
+        if self.server.listen(self.name):
+            return True
+        # 连接不上：上次异常退出时留下的 socket 文件，删除后重试
+        QLocalServer.removeServer(self.name)
+        if self.server.listen(self.name):
+            return True
+        Logger.get_logger().warning(f"单实例服务启动失败: {self.server.errorString()}")
+        return False
+
+    def close(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+
+    def _on_ready_read(self, socket: QLocalSocket):
+        buffer = self._buffers.get(socket, b"") + bytes(socket.readAll())
+        if b"\n" not in buffer:
+            if len(buffer) > MAX_MESSAGE_BYTES:
+                socket.abort()
+            else:
+                self._buffers[socket] = buffer
+            return
+        line = buffer.split(b"\n", 1)[0]
+        self._buffers[socket] = b""
+        try:
+            filepaths = json.loads(line.decode("utf-8")).get("files", [])
+        except (ValueError, UnicodeDecodeError, AttributeError):
+            socket.write(b"error\n")
+            return
+        socket.write(b"ok\n")
+        socket.flush()
+        self.filesReceived.emit([path for path in filepaths if isinstance(path, str)])
+
+    def _on_disconnected(self, socket: QLocalSocket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
@@ -0,0 +1,107 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+from src.utils.logger import Logger
+
+# 最后一次修改之后等待多久再写入（秒），期间的修改合并为一次写入
+DEBOUNCE_DELAY = 0.5
+# 持续修改时，距第一次未写入的修改最多等待多久（秒）
+MAX_DELAY = 3.0
+
+_NOTHING = object()
+
+
+def write_json_atomic(filepath: str, data: Any):
+    """先写入同目录下的临时文件再替换，中途退出也不会留下写了一半的文件"""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_file = tempfile.mkstemp(prefix=os.path.basename(filepath) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_file, filepath)
+    except BaseException:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        raise
+
+
+class DebouncedJsonWriter:
+    """合并短时间内的多次保存，在后台线程中原子地写入 JSON 文件
+
+    schedule() 只记录最新的数据并返回，序列化和写文件在后台线程中进行；
+    传入的数据在写入前不能再被修改，调用方每次传入新的对象。
+    程序退出时（atexit）或调用 flush() 时立即写入尚未保存的数据。
+    """
+
+    def __init__(self, filepath: str, delay: float = DEBOUNCE_DELAY, max_delay: float = MAX_DELAY):
+        self.filepath = filepath
+        self.delay = delay
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # 保证同一时间只有一个线程在写文件
+        self._pending: Optional[Any] = None
+        self._has_pending = False
+        self._first_dirty = 0.0
+        self._last_dirty = 0.0
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未写入的数据"""
+        return self._has_pending
+
+    def schedule(self, data: Any):
+        """记录要写入的数据，延迟到没有新的修改时再写入"""
+        with self._condition:
+            now = time.monotonic()
+            if not self._has_pending:
+                self._first_dirty = now
+            self._pending = data
+            self._has_pending = True
+            self._last_dirty = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="DebouncedJsonWriter", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self):
+        """立即写入尚未保存的数据（在调用线程中执行）"""
+        with self._write_lock:
+            data = self._take()
+            if data is not _NOTHING:
+                self._write(data)
+
+    def _take(self):
+        with self._condition:
+            if not self._has_pending:
+                return _NOTHING
+            data, self._pending, self._has_pending = self._pending, None, False
+            return data
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._has_pending:
+                    self._condition.wait()
+                # 等到 delay 内没有新的修改，或者距第一次修改已经过了 max_delay
+                while self._has_pending:
+                    deadline = min(self._last_dirty + self.delay, self._first_dirty + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            self.flush()
+
+    def _write(self, data: Any):
+        try:
+            write_json_atomic(self.filepath, data)
+        except (OSError, TypeError, ValueError) as e:
+            Logger.get_logger().warning(f"保存 {self.filepath} 失败: {e}")
@@ -1,5 +1,15 @@
 #!/bin/bash
 
+# 切换目录之前把已存在的文件参数转换为绝对路径
+args=()
+for arg in "$@"; do
+    if [ -e "$arg" ]; then
+        args+=("$(cd "$(dirname "$arg")" && pwd)/$(basename "$arg")")
+    else
+        args+=("$arg")
+    fi
+done
+
 # 确保脚本在正确的目录下运行
 cd "$(dirname "$0")"
 
@@ -20,4 +30,4 @@ fi
 echo "启动日志分析工具..."
 # 设置环境变量以抑制 IMK 警告
 export PYTHON_IMK_SUPPRESS_WARNING=1
-./venv/bin/python3 main.py 
\ No newline at end of file
+./venv/bin/python3 main.py "${args[@]}" 
\ No newline at end of file